@@ -1,10 +1,12 @@
 """Async API for programmatic scientific document generation."""
 
+import asyncio
+from dataclasses import dataclass, field, replace
 import logging
 import os
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Any, AsyncGenerator, Literal
+from typing import Any, AsyncGenerator, AsyncIterator, Literal
 
 from dotenv import dotenv_values
 
@@ -24,6 +26,13 @@ from .core import (
     resolve_auto_continue,
     setup_claude_skills,
 )
+from .drafting import (
+    SectionTask,
+    build_merge_prompt,
+    build_planning_prompt,
+    build_section_prompt,
+    load_section_plan,
+)
 from .models import ProgressUpdate, TextUpdate, PaperResult, PaperMetadata, PaperFiles, TokenUsage
 from .utils import (
     scan_paper_directory,
@@ -74,6 +83,8 @@ async def generate_paper(
     max_budget_usd: float | None = None,
     max_auto_continuations: int = 1,
     skills: list[str] | Literal["all"] | None = "all",
+    parallel_sections: bool = False,
+    max_concurrent_sections: int = 3,
 ) -> AsyncGenerator[dict[str, Any], None]:
     """
     Generate a scientific document asynchronously with progress updates.
@@ -102,6 +113,13 @@ async def generate_paper(
         max_budget_usd: Optional hard spend ceiling enforced by the SDK.
         max_auto_continuations: Maximum Stop-hook completion-verification passes.
         skills: Skills exposed through the SDK (default: all project skills).
+        parallel_sections: Opt-in staged drafting. A planning session writes a
+            section plan, independent sections are drafted by concurrent
+            sessions into separate drafts/ files, and a merge session assembles
+            and harmonizes the document. ``max_turns`` and ``max_budget_usd``
+            apply to each session.
+        max_concurrent_sections: Maximum section sessions running at once when
+            ``parallel_sections`` is enabled.
 
     Yields:
         Text updates (dict with type="text") as content streams
@@ -139,6 +157,9 @@ async def generate_paper(
     if max_auto_continuations < 0:
         yield _create_error_result("max_auto_continuations cannot be negative")
         return
+    if max_concurrent_sections <= 0:
+        yield _create_error_result("max_concurrent_sections must be greater than zero")
+        return
 
     resolved_model = model or EFFORT_LEVEL_MODELS[effort_level]
     work_dir = Path(cwd).expanduser().resolve() if cwd else Path.cwd().resolve()
@@ -245,11 +266,9 @@ User request:
         hooks=hooks,
     )
 
-    current_stage = "initialization"
-    last_message = ""
-    tool_call_count = 0
-    files_written: set[str] = set()
+    state = _StreamState()
     token_usage = TokenUsage()
+    session_errors: list[str] = []
 
     yield ProgressUpdate(
         message="Starting document generation",
@@ -261,52 +280,24 @@ User request:
     ).to_dict()
 
     try:
-        recent_text = ""
-        async for message in claude_query(prompt=contextual_query, options=options):
-            if track_token_usage and hasattr(message, "usage") and message.usage:
-                token_usage.add_usage(message.usage)
-
-            if hasattr(message, "content") and message.content:
-                for block in message.content:
-                    if hasattr(block, "text"):
-                        text = block.text
-                        recent_text = (recent_text + text)[-20_000:]
-                        yield TextUpdate(content=text).to_dict()
-
-                        stage, msg = _analyze_progress(recent_text, current_stage)
-                        if stage != current_stage and msg and msg != last_message:
-                            current_stage = stage
-                            last_message = msg
-                            yield ProgressUpdate(
-                                message=msg,
-                                stage=stage,
-                            ).to_dict()
-
-                    elif hasattr(block, "type") and block.type == "tool_use":
-                        tool_call_count += 1
-                        tool_name = getattr(block, "name", "unknown")
-                        tool_input = getattr(block, "input", {})
-
-                        if tool_name.lower() == "write":
-                            file_path = tool_input.get("file_path", tool_input.get("path", ""))
-                            if file_path:
-                                files_written.add(file_path)
-
-                        tool_progress = _analyze_tool_use(tool_name, tool_input, current_stage)
-                        if tool_progress:
-                            stage, msg = tool_progress
-                            if msg != last_message:
-                                current_stage = stage
-                                last_message = msg
-                                yield ProgressUpdate(
-                                    message=msg,
-                                    stage=stage,
-                                    details={
-                                        "tool": tool_name,
-                                        "tool_calls": tool_call_count,
-                                        "files_created": len(files_written),
-                                    },
-                                ).to_dict()
+        if parallel_sections:
+            async for event in _generate_with_parallel_sections(
+                contextual_query,
+                output_directory,
+                options,
+                max_concurrent_sections,
+                state,
+                token_usage if track_token_usage else None,
+                session_errors,
+            ):
+                yield event
+        else:
+            async for event in _stream_session(
+                claude_query(prompt=contextual_query, options=options),
+                state,
+                token_usage if track_token_usage else None,
+            ):
+                yield event
 
         yield ProgressUpdate(
             message="Scanning output directory",
@@ -321,6 +312,7 @@ User request:
         )
         if processed_info:
             result.errors.extend(processed_info.get("errors", []))
+        result.errors.extend(session_errors)
         if track_token_usage:
             result.token_usage = token_usage
 
@@ -341,6 +333,275 @@ User request:
         yield error_result
 
 
+@dataclass
+class _StreamState:
+    """Progress bookkeeping shared across the messages of one generation."""
+
+    current_stage: str = "initialization"
+    last_message: str = ""
+    tool_call_count: int = 0
+    files_written: set[str] = field(default_factory=set)
+    recent_text: str = ""
+
+
+async def _stream_session(
+    messages: AsyncIterator[Any],
+    state: _StreamState,
+    token_usage: TokenUsage | None,
+    emit_text: bool = True,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """
+    Translate one SDK message stream into text and progress updates.
+
+    Args:
+        messages: Messages from ``claude_query``.
+        state: Progress state, updated in place.
+        token_usage: Accumulator for SDK usage, or None when not tracking.
+        emit_text: Whether to yield assistant text as TextUpdate events.
+    """
+    async for message in messages:
+        if token_usage is not None and hasattr(message, "usage") and message.usage:
+            token_usage.add_usage(message.usage)
+
+        if not (hasattr(message, "content") and message.content):
+            continue
+        for block in message.content:
+            if hasattr(block, "text"):
+                text = block.text
+                state.recent_text = (state.recent_text + text)[-20_000:]
+                if emit_text:
+                    yield TextUpdate(content=text).to_dict()
+
+                stage, msg = _analyze_progress(state.recent_text, state.current_stage)
+                if stage != state.current_stage and msg and msg != state.last_message:
+                    state.current_stage = stage
+                    state.last_message = msg
+                    yield ProgressUpdate(
+                        message=msg,
+                        stage=stage,
+                    ).to_dict()
+
+            elif hasattr(block, "type") and block.type == "tool_use":
+                state.tool_call_count += 1
+                tool_name = getattr(block, "name", "unknown")
+                tool_input = getattr(block, "input", {})
+
+                if tool_name.lower() == "write":
+                    file_path = tool_input.get("file_path", tool_input.get("path", ""))
+                    if file_path:
+                        state.files_written.add(file_path)
+
+                tool_progress = _analyze_tool_use(tool_name, tool_input, state.current_stage)
+                if tool_progress:
+                    stage, msg = tool_progress
+                    if msg != state.last_message:
+                        state.current_stage = stage
+                        state.last_message = msg
+                        yield ProgressUpdate(
+                            message=msg,
+                            stage=stage,
+                            details={
+                                "tool": tool_name,
+                                "tool_calls": state.tool_call_count,
+                                "files_created": len(state.files_written),
+                            },
+                        ).to_dict()
+
+
+def _section_progress(
+    section: SectionTask,
+    status: str,
+    message: str,
+    **details: Any,
+) -> dict[str, Any]:
+    """Build a per-section progress event for parallel drafting."""
+    return ProgressUpdate(
+        message=message,
+        stage="writing",
+        details={
+            "section": section.name,
+            "section_status": status,
+            "draft": str(section.draft_path),
+            **details,
+        },
+    ).to_dict()
+
+
+async def _draft_sections_concurrently(
+    contextual_query: str,
+    output_directory: Path,
+    options: ClaudeAgentOptions,
+    sections: list[SectionTask],
+    all_sections: list[SectionTask],
+    max_concurrent_sections: int,
+    token_usage: TokenUsage | None,
+    failed: list[SectionTask],
+) -> AsyncGenerator[dict[str, Any], None]:
+    """
+    Run one drafting session per section, at most ``max_concurrent_sections`` at once.
+
+    Sessions stream into a shared queue so their progress events interleave as
+    they happen. Assistant text is not forwarded because concurrent streams
+    would be unreadable; each section reports started, running, and
+    completed/failed progress events instead. Sections that raise or finish
+    without writing their draft are appended to ``failed``.
+    """
+    queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max_concurrent_sections)
+
+    async def draft(section: SectionTask) -> None:
+        try:
+            async with semaphore:
+                await queue.put(
+                    _section_progress(section, "started", f"Drafting {section.name} section")
+                )
+                prompt = build_section_prompt(
+                    contextual_query, output_directory, section, all_sections
+                )
+                state = _StreamState(current_stage="writing")
+                error: str | None = None
+                try:
+                    async for event in _stream_session(
+                        claude_query(prompt=prompt, options=options),
+                        state,
+                        token_usage,
+                        emit_text=False,
+                    ):
+                        await queue.put(
+                            _section_progress(
+                                section,
+                                "running",
+                                f"{section.name}: {event['message']}",
+                                **(event.get("details") or {}),
+                            )
+                        )
+                except Exception as exc:
+                    logger.warning("Drafting section %s failed", section.name, exc_info=True)
+                    error = str(exc)
+
+                if error is None and section.draft_path.is_file():
+                    await queue.put(
+                        _section_progress(section, "completed", f"Drafted {section.name} section")
+                    )
+                else:
+                    failed.append(section)
+                    await queue.put(
+                        _section_progress(
+                            section,
+                            "failed",
+                            f"Could not draft {section.name} section",
+                            error=error or "draft file was not written",
+                        )
+                    )
+        finally:
+            await queue.put(None)
+
+    tasks = [asyncio.create_task(draft(section)) for section in sections]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            event = await queue.get()
+            if event is None:
+                remaining -= 1
+            else:
+                yield event
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _generate_with_parallel_sections(
+    contextual_query: str,
+    output_directory: Path,
+    options: ClaudeAgentOptions,
+    max_concurrent_sections: int,
+    state: _StreamState,
+    token_usage: TokenUsage | None,
+    errors: list[str],
+) -> AsyncGenerator[dict[str, Any], None]:
+    """
+    Plan, draft independent sections concurrently, then merge.
+
+    The Stop-hook completion check only runs in the merge session; planning
+    and section sessions must stop at their own stage rather than finish the
+    whole deliverable. If the plan is missing or invalid, the merge session
+    drafts the whole document itself, which matches the sequential mode.
+    """
+    stage_options = replace(options, hooks=None)
+
+    yield ProgressUpdate(
+        message="Planning document sections",
+        stage="planning",
+    ).to_dict()
+    state.current_stage = "planning"
+    async for event in _stream_session(
+        claude_query(
+            prompt=build_planning_prompt(contextual_query, output_directory),
+            options=stage_options,
+        ),
+        state,
+        token_usage,
+    ):
+        yield event
+
+    try:
+        sections = load_section_plan(output_directory)
+    except ValueError as exc:
+        logger.warning("Parallel drafting disabled for this request: %s", exc)
+        errors.append(f"Parallel drafting skipped: {exc}")
+        sections = []
+
+    independent = [section for section in sections if section.independent]
+    failed: list[SectionTask] = []
+    if independent:
+        yield ProgressUpdate(
+            message=(
+                f"Drafting {len(independent)} section(s) concurrently "
+                f"(limit {max_concurrent_sections})"
+            ),
+            stage="writing",
+            details={
+                "sections": [section.to_dict() for section in independent],
+                "max_concurrent_sections": max_concurrent_sections,
+            },
+        ).to_dict()
+        async for event in _draft_sections_concurrently(
+            contextual_query,
+            output_directory,
+            stage_options,
+            independent,
+            sections,
+            max_concurrent_sections,
+            token_usage,
+            failed,
+        ):
+            yield event
+        errors.extend(f"Parallel draft failed for section: {section.name}" for section in failed)
+
+    drafted = [section for section in independent if section not in failed]
+    yield ProgressUpdate(
+        message="Merging sections and checking consistency",
+        stage="writing",
+        details={
+            "drafted_sections": [section.name for section in drafted],
+            "remaining_sections": [section.name for section in sections if section not in drafted],
+        },
+    ).to_dict()
+    state.current_stage = "writing"
+    merge_prompt = (
+        build_merge_prompt(contextual_query, output_directory, sections, drafted, failed)
+        if sections
+        else contextual_query
+    )
+    async for event in _stream_session(
+        claude_query(prompt=merge_prompt, options=options),
+        state,
+        token_usage,
+    ):
+        yield event
+
+
 def _analyze_progress(text: str, current_stage: str) -> tuple[str, str | None]:
     """
     Minimal fallback for progress detection from text.
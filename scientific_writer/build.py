@@ -0,0 +1,501 @@
+"""Incremental LaTeX builds with content-hash caching.
+
+Compile-fix loops otherwise rerun a full ``pdflatex``/``bibtex`` sequence after
+every edit. ``build_document`` instead runs ``latexmk`` in a persistent build
+directory per document, so latexmk's own dependency database makes reruns
+incremental, and adds two caches on top:
+
+* Outputs (PDF, aux, bbl, toc, ...) of each successful build are snapshotted
+  under ``cache/<engine>-<source-hash>/``; a build with the same engine whose
+  sources hash to a known snapshot restores it without invoking LaTeX at all.
+* BibTeX/Biber is skipped when the ``.bib`` and bibliography style files, the
+  declared bibliography styles, and the set of cite keys are unchanged since
+  the last build and a ``.bbl`` is already present.
+
+Errors are returned as a parsed, deduplicated list instead of the raw log, with
+the rest of the log and BibTeX/Biber diagnostics summarized by ``latex_log``.
+
+Usage:
+    scientific-writer-build drafts/manuscript.tex
+    python -m scientific_writer.build drafts/manuscript.tex --engine xelatex --json
+"""
+
+import argparse
+from dataclasses import asdict, dataclass, field
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import shutil
+import subprocess
+import sys
+import time
+from typing import Any
+
+from .latex_log import LogSummary, parse_log, summarize
+
+logger = logging.getLogger(__name__)
+
+BUILD_DIR_NAME = ".latex_build"
+STATE_FILENAME = "build_state.json"
+CACHE_DIR_NAME = "cache"
+MAX_CACHED_BUILDS = 8
+DEFAULT_TIMEOUT_SECONDS = 300
+
+ENGINE_FLAGS = {
+    "pdflatex": "-pdf",
+    "xelatex": "-pdfxe",
+    "lualatex": "-pdflua",
+}
+# Files whose content can change the compiled output.
+SOURCE_EXTENSIONS = {
+    ".bib", ".bst", ".bbx", ".cbx", ".cls", ".sty", ".tex",
+    ".eps", ".jpeg", ".jpg", ".pdf", ".png", ".svg",
+}
+# Inputs of the BibTeX/Biber run: databases and bibliography styles.
+BIBLIOGRAPHY_EXTENSIONS = {".bib", ".bst", ".bbx", ".cbx"}
+# Build products restored from the output cache.
+CACHED_OUTPUT_EXTENSIONS = {
+    ".aux", ".bbl", ".bcf", ".blg", ".fdb_latexmk", ".fls", ".lof", ".log",
+    ".lot", ".nav", ".out", ".pdf", ".run.xml", ".snm", ".toc",
+}
+CITE_PATTERN = re.compile(
+    r"\\(?:no)?cite[a-zA-Z]*\*?(?:\s*\[[^\]]*\]){0,2}\s*\{([^}]*)\}"
+)
+# \bibliographystyle{...} and the options of \usepackage[...]{biblatex}.
+BIBLIOGRAPHY_STYLE_PATTERN = re.compile(
+    r"\\bibliographystyle\s*\{([^}]*)\}|\\usepackage\s*\[([^\]]*)\]\s*\{biblatex\}"
+)
+
+
+class BuildError(RuntimeError):
+    """Raised when a build cannot be attempted at all."""
+
+
+@dataclass
+class BuildResult:
+    """Outcome of one ``build_document`` call.
+
+    Attributes:
+        success: Whether a PDF was produced for the current sources
+        pdf: Path to the built PDF (copied next to the main .tex file)
+        build_dir: Persistent build directory used for this document
+        log: Path to the LaTeX log of the last real build
+        up_to_date: Sources matched the previous build; nothing was run
+        cache_hit: Outputs were restored from the content-hash cache
+        bibliography_skipped: BibTeX/Biber was skipped (unchanged .bib and style
+            files, declared styles, and cite keys)
+        duration_seconds: Wall time of this call
+        errors: Deduplicated errors with file, line, and message
+        diagnostics: Capped summary of the logs (see ``latex_log.summarize``),
+            including undefined references/citations, missing files, and overfull boxes
+    """
+    success: bool = False
+    pdf: str | None = None
+    build_dir: str = ""
+    log: str | None = None
+    up_to_date: bool = False
+    cache_hit: bool = False
+    bibliography_skipped: bool = False
+    duration_seconds: float = 0.0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    diagnostics: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+
+def _hash_file(path: Path, digest: Any) -> None:
+    with path.open("rb") as handle:
+        while chunk := handle.read(1024 * 1024):
+            digest.update(chunk)
+
+
+def _source_files(source_dir: Path, build_dir: Path) -> list[Path]:
+    """Return every file under source_dir that can affect the output.
+
+    PDFs that sit next to a .tex file of the same name are compiled outputs,
+    not figures, and are excluded so publishing a build does not invalidate it.
+    """
+    files: list[Path] = []
+    for path in sorted(source_dir.rglob("*")):
+        if not path.is_file() or path.suffix.lower() not in SOURCE_EXTENSIONS:
+            continue
+        relative_parts = path.relative_to(source_dir).parts
+        if build_dir in path.parents or any(part.startswith(".") for part in relative_parts):
+            continue
+        if path.suffix.lower() == ".pdf" and path.with_suffix(".tex").is_file():
+            continue
+        files.append(path)
+    return files
+
+
+def _hash_files(files: list[Path], root: Path) -> str:
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(path.relative_to(root).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        _hash_file(path, digest)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _read_tex(path: Path) -> str | None:
+    """Return a .tex file's content with comments removed, or None if unreadable."""
+    try:
+        content = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return None
+    return re.sub(r"(?<!\\)%.*$", "", content, flags=re.MULTILINE)
+
+
+def collect_cite_keys(tex_files: list[Path]) -> list[str]:
+    """Return the sorted set of citation keys used across the given .tex files."""
+    keys: set[str] = set()
+    for path in tex_files:
+        content = _read_tex(path)
+        if content is None:
+            continue
+        for match in CITE_PATTERN.finditer(content):
+            keys.update(key.strip() for key in match.group(1).split(",") if key.strip())
+    return sorted(keys)
+
+
+def collect_bibliography_styles(tex_files: list[Path]) -> list[str]:
+    """Return the sorted ``\\bibliographystyle`` values and biblatex options declared."""
+    styles: set[str] = set()
+    for path in tex_files:
+        content = _read_tex(path)
+        if content is None:
+            continue
+        for match in BIBLIOGRAPHY_STYLE_PATTERN.finditer(content):
+            declared = match.group(1) if match.group(1) is not None else match.group(2)
+            styles.add(" ".join(declared.split()))
+    return sorted(styles)
+
+
+def _bibliography_hash(sources: list[Path], root: Path) -> str:
+    """Hash everything a BibTeX/Biber run reads from the project.
+
+    Styles installed in the TeX tree are not hashed, but switching to one
+    changes the declared style, which is.
+    """
+    files = [path for path in sources if path.suffix.lower() in BIBLIOGRAPHY_EXTENSIONS]
+    styles = collect_bibliography_styles([path for path in sources if path.suffix.lower() == ".tex"])
+    digest = hashlib.sha256(_hash_files(files, root).encode("utf-8"))
+    for style in styles:
+        digest.update(b"\0" + style.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _apply_diagnostics(result: BuildResult, summary: LogSummary) -> None:
+    result.errors = summary.items("errors")
+    result.diagnostics = json.loads(summarize(summary))
+
+
+def read_build_logs(work_dir: Path, stem: str) -> LogSummary:
+    """
+    Parse the LaTeX log and any BibTeX/Biber log left by the last build.
+
+    Args:
+        work_dir: Build directory holding the logs.
+        stem: Base name of the main .tex file.
+
+    Returns:
+        One summary covering every log that exists.
+    """
+    summary = LogSummary()
+    for suffix in (".log", ".blg"):
+        log_path = work_dir / f"{stem}{suffix}"
+        if log_path.is_file():
+            parse_log(log_path, summary)
+    return summary
+
+
+def _load_state(build_dir: Path) -> dict[str, Any]:
+    try:
+        data = json.loads((build_dir / STATE_FILENAME).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_state(build_dir: Path, state: dict[str, Any]) -> None:
+    """Atomically replace the build state file."""
+    temporary = build_dir / f"{STATE_FILENAME}.tmp"
+    temporary.write_text(json.dumps(state, indent=2) + "\n", encoding="utf-8")
+    os.replace(temporary, build_dir / STATE_FILENAME)
+
+
+def _output_files(build_dir: Path, stem: str) -> list[Path]:
+    return [
+        path
+        for path in build_dir.iterdir()
+        if path.is_file()
+        and path.name.startswith(stem)
+        and any(path.name.endswith(suffix) for suffix in CACHED_OUTPUT_EXTENSIONS)
+    ]
+
+
+def _snapshot_key(engine: str, source_hash: str) -> str:
+    """Name of the snapshot for these sources; outputs differ between engines."""
+    return f"{engine}-{source_hash}"
+
+
+def _store_snapshot(build_dir: Path, stem: str, key: str) -> None:
+    """Snapshot build outputs under ``key`` and evict the oldest entries."""
+    cache_root = build_dir / CACHE_DIR_NAME
+    snapshot = cache_root / key
+    staging = cache_root / f".{key}.tmp"
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    for path in _output_files(build_dir, stem):
+        shutil.copy2(path, staging / path.name)
+    if snapshot.exists():
+        shutil.rmtree(snapshot)
+    os.replace(staging, snapshot)
+
+    snapshots = sorted(
+        (entry for entry in cache_root.iterdir() if entry.is_dir() and not entry.name.startswith(".")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for stale in snapshots[MAX_CACHED_BUILDS:]:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def _restore_snapshot(build_dir: Path, key: str) -> bool:
+    snapshot = build_dir / CACHE_DIR_NAME / key
+    if not snapshot.is_dir() or not any(path.suffix == ".pdf" for path in snapshot.iterdir()):
+        return False
+    for path in snapshot.iterdir():
+        shutil.copy2(path, build_dir / path.name)
+    os.utime(snapshot)
+    return True
+
+
+def _publish_pdf(build_dir: Path, tex_file: Path) -> Path | None:
+    """Copy the built PDF next to the main .tex file when its content changed."""
+    built = build_dir / f"{tex_file.stem}.pdf"
+    if not built.is_file():
+        return None
+    published = tex_file.with_suffix(".pdf")
+    if not published.is_file() or published.read_bytes() != built.read_bytes():
+        shutil.copy2(built, published)
+    return published
+
+
+def build_document(
+    tex_file: str | Path,
+    build_dir: str | Path | None = None,
+    engine: str = "pdflatex",
+    force: bool = False,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+) -> BuildResult:
+    """
+    Build a LaTeX document incrementally with latexmk.
+
+    Args:
+        tex_file: Main .tex file.
+        build_dir: Persistent build directory (default: ``.latex_build/<stem>``
+            next to the main file).
+        engine: ``pdflatex``, ``xelatex``, or ``lualatex``.
+        force: Ignore both caches and always run latexmk.
+        timeout: Seconds before the latexmk run is aborted.
+
+    Returns:
+        BuildResult describing the build.
+
+    Raises:
+        BuildError: If the main file does not exist, the engine is unknown, or
+            latexmk is not installed.
+    """
+    started = time.monotonic()
+    tex_path = Path(tex_file).expanduser().resolve()
+    if not tex_path.is_file():
+        raise BuildError(f"LaTeX file not found: {tex_path}")
+    if engine not in ENGINE_FLAGS:
+        raise BuildError(f"Unknown LaTeX engine: {engine} (choose from {', '.join(ENGINE_FLAGS)})")
+
+    source_dir = tex_path.parent
+    work_dir = (
+        Path(build_dir).expanduser().resolve()
+        if build_dir
+        else source_dir / BUILD_DIR_NAME / tex_path.stem
+    )
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    sources = _source_files(source_dir, work_dir)
+    source_hash = _hash_files(sources, source_dir)
+    bib_hash = _bibliography_hash(sources, source_dir)
+    cite_keys = collect_cite_keys([path for path in sources if path.suffix.lower() == ".tex"])
+    previous = _load_state(work_dir)
+    log_path = work_dir / f"{tex_path.stem}.log"
+
+    result = BuildResult(build_dir=str(work_dir), log=str(log_path))
+
+    if not force:
+        up_to_date = (
+            previous.get("engine") == engine
+            and previous.get("source_hash") == source_hash
+            and previous.get("success") is True
+            and (work_dir / f"{tex_path.stem}.pdf").is_file()
+        )
+        if up_to_date or _restore_snapshot(work_dir, _snapshot_key(engine, source_hash)):
+            pdf = _publish_pdf(work_dir, tex_path)
+            result.success = pdf is not None
+            result.pdf = str(pdf) if pdf else None
+            result.up_to_date = up_to_date
+            result.cache_hit = not up_to_date
+            result.bibliography_skipped = True
+            _apply_diagnostics(result, read_build_logs(work_dir, tex_path.stem))
+            if result.cache_hit:
+                _write_state(
+                    work_dir,
+                    {**previous, "engine": engine, "source_hash": source_hash, "bib_hash": bib_hash,
+                     "cite_keys": cite_keys, "success": result.success},
+                )
+            result.duration_seconds = round(time.monotonic() - started, 3)
+            return result
+
+    latexmk = shutil.which("latexmk")
+    if latexmk is None:
+        raise BuildError("latexmk not found on PATH; install a TeX distribution that includes it")
+
+    skip_bibliography = (
+        not force
+        and previous.get("bib_hash") == bib_hash
+        and previous.get("cite_keys") == cite_keys
+        and any(work_dir.glob(f"{tex_path.stem}.bbl"))
+    )
+    command = [
+        latexmk,
+        ENGINE_FLAGS[engine],
+        "-interaction=nonstopmode",
+        "-file-line-error",
+        "-bibtex-" if skip_bibliography else "-bibtex",
+        f"-outdir={work_dir}",
+    ]
+    if force:
+        command.append("-g")
+    command.append(tex_path.name)
+
+    try:
+        completed = subprocess.run(
+            command,
+            cwd=source_dir,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=False,
+        )
+        returncode = completed.returncode
+    except subprocess.TimeoutExpired:
+        logger.warning("latexmk timed out after %s seconds for %s", timeout, tex_path)
+        returncode = None
+
+    result.bibliography_skipped = skip_bibliography
+    _apply_diagnostics(result, read_build_logs(work_dir, tex_path.stem))
+    if returncode is None:
+        result.errors.append(
+            {"file": None, "line": None, "message": f"latexmk timed out after {timeout} seconds", "count": 1}
+        )
+    elif returncode != 0 and not result.errors:
+        result.errors.append(
+            {"file": None, "line": None, "message": f"latexmk exited with status {returncode}", "count": 1}
+        )
+
+    succeeded = returncode == 0
+    pdf = _publish_pdf(work_dir, tex_path) if succeeded else None
+    result.success = pdf is not None
+    result.pdf = str(pdf) if pdf else None
+
+    if result.success:
+        _store_snapshot(work_dir, tex_path.stem, _snapshot_key(engine, source_hash))
+    _write_state(
+        work_dir,
+        {
+            "engine": engine,
+            "source_hash": source_hash,
+            "bib_hash": bib_hash,
+            "cite_keys": cite_keys,
+            "success": result.success,
+        },
+    )
+    result.duration_seconds = round(time.monotonic() - started, 3)
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point used by skills during compile-fix loops."""
+    parser = argparse.ArgumentParser(
+        prog="scientific-writer-build",
+        description="Incrementally build a LaTeX document and report parsed errors.",
+    )
+    parser.add_argument("tex_file", help="main .tex file")
+    parser.add_argument("--build-dir", default=None, help="persistent build directory")
+    parser.add_argument(
+        "--engine",
+        choices=sorted(ENGINE_FLAGS),
+        default="pdflatex",
+        help="LaTeX engine (default: pdflatex)",
+    )
+    parser.add_argument("--force", action="store_true", help="ignore caches and rebuild")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT_SECONDS,
+        help=f"seconds before latexmk is aborted (default: {DEFAULT_TIMEOUT_SECONDS})",
+    )
+    parser.add_argument("--json", action="store_true", help="print the full result as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        result = build_document(
+            args.tex_file,
+            build_dir=args.build_dir,
+            engine=args.engine,
+            force=args.force,
+            timeout=args.timeout,
+        )
+    except BuildError as exc:
+        if args.json:
+            print(json.dumps({"success": False, "errors": [{"message": str(exc)}]}, indent=2))
+        else:
+            print(f"Error: {exc}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        if result.up_to_date:
+            status = "up to date"
+        elif result.cache_hit:
+            status = "restored from cache"
+        else:
+            status = "built" if result.success else "failed"
+        print(f"{status}: {result.pdf or args.tex_file} ({result.duration_seconds:.2f}s)")
+        if result.bibliography_skipped:
+            print("bibliography unchanged; bibtex/biber skipped")
+        for error in result.errors:
+            location = f"{error['file']}:{error['line']}: " if error.get("file") else ""
+            if not location and error.get("line"):
+                location = f"line {error['line']}: "
+            repeat = f" (x{error['count']})" if error.get("count", 1) > 1 else ""
+            print(f"  {location}{error['message']}{repeat}")
+        counts = result.diagnostics.get("counts", {})
+        for category in ("undefined_references", "undefined_citations", "missing_files"):
+            if counts.get(category):
+                keys = ", ".join(
+                    item.get("key") or item.get("name") for item in result.diagnostics[category]
+                )
+                print(f"  {category.replace('_', ' ')} ({counts[category]}): {keys}")
+    return 0 if result.success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,12 +22,11 @@ from .core import (
     get_api_key,
     load_system_instructions,
     ensure_output_folder,
-    get_data_files,
-    process_data_files,
     create_data_context_message,
     resolve_auto_continue,
     setup_claude_skills,
 )
+from .inbox import InboxWatcher
 from .utils import find_existing_papers, detect_paper_reference, scan_paper_directory
 from .models import TokenUsage
 
@@ -47,24 +46,6 @@ def _resolve_model(effort_level: str = "medium") -> str:
     return EFFORT_LEVEL_MODELS.get(effort_level, EFFORT_LEVEL_MODELS["medium"])
 
 
-def _input_signature(path: Path) -> tuple[int, int]:
-    stat = path.stat()
-    return stat.st_size, stat.st_mtime_ns
-
-
-def _remember_processed_inputs(
-    processed_info: dict | None,
-    signatures: dict[Path, tuple[int, int]],
-) -> None:
-    """Avoid re-importing unchanged inbox files on every interactive prompt."""
-    if not processed_info:
-        return
-    for record in processed_info.get("all_files", []):
-        original = Path(record["original"])
-        if original.is_file():
-            signatures[original.resolve()] = _input_signature(original)
-
-
 async def main(
     track_token_usage: bool = False,
     effort_level: Literal["low", "medium", "high"] = "medium",
@@ -169,7 +150,10 @@ IMPORTANT - CONVERSATION CONTINUITY:
 
     # Track conversation state
     current_paper_path = None
-    processed_input_signatures: dict[Path, tuple[int, int]] = {}
+
+    # Watch data/ in the background so prompts do not rescan it. Files are only
+    # staged once a prompt has picked the project they belong to.
+    inbox = InboxWatcher(cwd, delete_originals=consume_inputs).start()
 
     # Token usage tracking (accumulated across all queries in session)
     total_usage = TokenUsage()
@@ -212,96 +196,117 @@ IMPORTANT - CONVERSATION CONTINUITY:
     print("=" * 70)
     print()
 
-    # Main loop
-    while True:
-        try:
-            # Get user input
-            user_input = input("\n> ").strip()
-
-            # Handle special commands
-            if user_input.lower() in ["exit", "quit"]:
-                print("\nThank you for using Scientific Writer CLI. Goodbye!")
-                if track_token_usage:
-                    return total_usage
-                return None
-
-            if user_input.lower() == "help":
-                _print_help()
-                continue
-
-            if not user_input:
-                continue
-
-            # Get all existing papers
-            existing_papers = find_existing_papers(output_folder)
+    # Main loop; the inbox watcher is stopped however the session ends
+    try:
+        while True:
+            try:
+                # Get user input
+                user_input = input("\n> ").strip()
+
+                # Handle special commands
+                if user_input.lower() in ["exit", "quit"]:
+                    print("\nThank you for using Scientific Writer CLI. Goodbye!")
+                    if track_token_usage:
+                        return total_usage
+                    return None
+
+                if user_input.lower() == "help":
+                    _print_help()
+                    continue
+
+                if not user_input:
+                    continue
+
+                # Get all existing papers
+                existing_papers = find_existing_papers(output_folder)
+
+                # Check if user wants to start a new paper
+                new_paper_keywords = [
+                    "new paper", "start fresh", "start afresh", "create new", "different paper", "another paper",
+                    "new presentation", "new poster", "different presentation", "another presentation"
+                ]
+                is_new_paper_request = any(keyword in user_input.lower() for keyword in new_paper_keywords)
+
+                # Try to detect reference to existing paper
+                detected_paper_path = None
+                if not is_new_paper_request:
+                    detected_paper_path = detect_paper_reference(user_input, existing_papers)
+
+                    # If we detected a paper reference and it's different from current, update it
+                    if detected_paper_path and str(detected_paper_path) != current_paper_path:
+                        current_paper_path = str(detected_paper_path)
+                        print(f"\n🔍 Detected reference to existing paper: {detected_paper_path.name}")
+                        print(f"📂 Working on: {current_paper_path}")
+
+                        # Show what files exist in this paper
+                        paper_info = scan_paper_directory(detected_paper_path)
+                        file_count = sum([
+                            1 if paper_info['tex_final'] else 0,
+                            1 if paper_info['pdf_final'] else 0,
+                            len(paper_info['tex_drafts']),
+                            len(paper_info['pdf_drafts']),
+                            len(paper_info['figures']),
+                            len(paper_info['data']),
+                            len(paper_info['sources']),
+                            1 if paper_info['bibliography'] else 0,
+                            1 if paper_info['progress_log'] else 0,
+                            1 if paper_info['summary'] else 0,
+                        ])
+                        print(f"📄 Found {file_count} file(s) in this directory\n")
+
+                    elif detected_paper_path and str(detected_paper_path) == current_paper_path:
+                        # Already working on the right paper, just confirm
+                        print(f"📂 Continuing with: {Path(current_paper_path).name}\n")
+
+                # Check for data files and process them if we have a current paper
+                data_context = ""
+                data_files = inbox.pending_count(current_paper_path)
+
+                # PHASE 1: Handle new paper with data files - create directory first
+                if data_files and (is_new_paper_request or not current_paper_path):
+                    print(f"\n📦 Found {data_files} file(s) in data folder.")
+                    print("📝 Starting a new paper...")
+                    print("⏳ Step 1/2: Creating paper directory...\n")
+
+                    project_dir = create_output_project(output_folder, user_input)
+                    current_paper_path = str(project_dir)
+                    print(f"✓ Directory created: {project_dir.name}\n")
+
+                    # PHASE 2: Process data files before continuing
+                    if current_paper_path:
+                        print("⏳ Step 2/2: Processing and copying data files...")
+                        processed_info = inbox.stage(current_paper_path)
+                        if processed_info:
+                            data_context = create_data_context_message(processed_info)
+                            manuscript_count = len(processed_info.get('manuscript_files', []))
+                            source_count = len(processed_info.get('source_files', []))
+                            data_count = len(processed_info.get('data_files', []))
+                            image_count = len(processed_info.get('image_files', []))
+                            if manuscript_count > 0:
+                                print(f"   ✓ Copied {manuscript_count} .tex manuscript(s) to drafts/ [EDITING MODE]")
+                            if source_count > 0:
+                                print(f"   ✓ Copied {source_count} source/context file(s) to sources/")
+                            if data_count > 0:
+                                print(f"   ✓ Copied {data_count} data file(s) to data/")
+                            if image_count > 0:
+                                print(f"   ✓ Copied {image_count} image(s) to figures/")
+                            action = "Removed" if consume_inputs else "Preserved"
+                            print(f"   ✓ {action} original files in data folder\n")
+                            print("✅ Files processed. Now starting paper generation...\n")
+
+                    # Update prompt to continue with paper generation
+                    contextual_prompt = f"""[CONTEXT: You are working on a paper in: {current_paper_path}]
+[FILES HAVE BEEN PROCESSED AND COPIED - see details below]
+{data_context}
 
-            # Check if user wants to start a new paper
-            new_paper_keywords = [
-                "new paper", "start fresh", "start afresh", "create new", "different paper", "another paper",
-                "new presentation", "new poster", "different presentation", "another presentation"
-            ]
-            is_new_paper_request = any(keyword in user_input.lower() for keyword in new_paper_keywords)
-
-            # Try to detect reference to existing paper
-            detected_paper_path = None
-            if not is_new_paper_request:
-                detected_paper_path = detect_paper_reference(user_input, existing_papers)
-
-                # If we detected a paper reference and it's different from current, update it
-                if detected_paper_path and str(detected_paper_path) != current_paper_path:
-                    current_paper_path = str(detected_paper_path)
-                    print(f"\n🔍 Detected reference to existing paper: {detected_paper_path.name}")
-                    print(f"📂 Working on: {current_paper_path}")
-
-                    # Show what files exist in this paper
-                    paper_info = scan_paper_directory(detected_paper_path)
-                    file_count = sum([
-                        1 if paper_info['tex_final'] else 0,
-                        1 if paper_info['pdf_final'] else 0,
-                        len(paper_info['tex_drafts']),
-                        len(paper_info['pdf_drafts']),
-                        len(paper_info['figures']),
-                        len(paper_info['data']),
-                        len(paper_info['sources']),
-                        1 if paper_info['bibliography'] else 0,
-                        1 if paper_info['progress_log'] else 0,
-                        1 if paper_info['summary'] else 0,
-                    ])
-                    print(f"📄 Found {file_count} file(s) in this directory\n")
-
-                elif detected_paper_path and str(detected_paper_path) == current_paper_path:
-                    # Already working on the right paper, just confirm
-                    print(f"📂 Continuing with: {Path(current_paper_path).name}\n")
-
-            # Check for data files and process them if we have a current paper
-            data_context = ""
-            data_files = [
-                path
-                for path in get_data_files(cwd)
-                if processed_input_signatures.get(path.resolve()) != _input_signature(path)
-            ]
+Now continue with the actual paper generation for the user's request:
+{user_input}"""
 
-            # PHASE 1: Handle new paper with data files - create directory first
-            if data_files and not current_paper_path and (is_new_paper_request or not current_paper_path):
-                print(f"\n📦 Found {len(data_files)} file(s) in data folder.")
-                print("📝 Starting a new paper...")
-                print("⏳ Step 1/2: Creating paper directory...\n")
-
-                project_dir = create_output_project(output_folder, user_input)
-                current_paper_path = str(project_dir)
-                print(f"✓ Directory created: {project_dir.name}\n")
-
-                # PHASE 2: Process data files before continuing
-                if current_paper_path:
-                    print("⏳ Step 2/2: Processing and copying data files...")
-                    processed_info = process_data_files(
-                        cwd,
-                        data_files,
-                        current_paper_path,
-                        delete_originals=consume_inputs,
-                    )
+                elif data_files and current_paper_path and not is_new_paper_request:
+                    # Existing paper with data files - process immediately
+                    print(f"📦 Found {data_files} file(s) in data folder. Processing...")
+                    processed_info = inbox.stage(current_paper_path)
                     if processed_info:
-                        _remember_processed_inputs(processed_info, processed_input_signatures)
                         data_context = create_data_context_message(processed_info)
                         manuscript_count = len(processed_info.get('manuscript_files', []))
                         source_count = len(processed_info.get('source_files', []))
@@ -317,124 +322,94 @@ IMPORTANT - CONVERSATION CONTINUITY:
                             print(f"   ✓ Copied {image_count} image(s) to figures/")
                         action = "Removed" if consume_inputs else "Preserved"
                         print(f"   ✓ {action} original files in data folder\n")
-                        print("✅ Files processed. Now starting paper generation...\n")
-
-                # Update prompt to continue with paper generation
-                contextual_prompt = f"""[CONTEXT: You are working on a paper in: {current_paper_path}]
-[FILES HAVE BEEN PROCESSED AND COPIED - see details below]
-{data_context}
 
-Now continue with the actual paper generation for the user's request:
-{user_input}"""
-
-            elif data_files and current_paper_path and not is_new_paper_request:
-                # Existing paper with data files - process immediately
-                print(f"📦 Found {len(data_files)} file(s) in data folder. Processing...")
-                processed_info = process_data_files(
-                    cwd,
-                    data_files,
-                    current_paper_path,
-                    delete_originals=consume_inputs,
-                )
-                if processed_info:
-                    _remember_processed_inputs(processed_info, processed_input_signatures)
-                    data_context = create_data_context_message(processed_info)
-                    manuscript_count = len(processed_info.get('manuscript_files', []))
-                    source_count = len(processed_info.get('source_files', []))
-                    data_count = len(processed_info.get('data_files', []))
-                    image_count = len(processed_info.get('image_files', []))
-                    if manuscript_count > 0:
-                        print(f"   ✓ Copied {manuscript_count} .tex manuscript(s) to drafts/ [EDITING MODE]")
-                    if source_count > 0:
-                        print(f"   ✓ Copied {source_count} source/context file(s) to sources/")
-                    if data_count > 0:
-                        print(f"   ✓ Copied {data_count} data file(s) to data/")
-                    if image_count > 0:
-                        print(f"   ✓ Copied {image_count} image(s) to figures/")
-                    action = "Removed" if consume_inputs else "Preserved"
-                    print(f"   ✓ {action} original files in data folder\n")
-
-                # Build contextual prompt for existing paper
-                contextual_prompt = f"""[CONTEXT: You are currently working on a paper in: {current_paper_path}]
+                    # Build contextual prompt for existing paper
+                    contextual_prompt = f"""[CONTEXT: You are currently working on a paper in: {current_paper_path}]
 [INSTRUCTION: Continue editing this existing paper. Do NOT create a new paper directory.]
 {data_context}
 User request: {user_input}"""
 
-            elif is_new_paper_request and not data_files:
-                # New document without input files.
-                project_dir = create_output_project(output_folder, user_input)
-                current_paper_path = str(project_dir)
-                print("📝 Starting a new paper...\n")
-                contextual_prompt = f"""[CONTEXT: Work only in {current_paper_path}]
+                elif is_new_paper_request and not data_files:
+                    # New document without input files.
+                    project_dir = create_output_project(output_folder, user_input)
+                    current_paper_path = str(project_dir)
+                    print("📝 Starting a new paper...\n")
+                    contextual_prompt = f"""[CONTEXT: Work only in {current_paper_path}]
 [INSTRUCTION: The project directory already exists. Do not create another one.]
 User request: {user_input}"""
 
-            elif current_paper_path and not data_files:
-                # Detected existing paper without new data files - provide context about what exists
-                paper_info = scan_paper_directory(Path(current_paper_path))
-
-                # Build a context message about the paper's current state
-                context_parts = [
-                    f"[CONTEXT: You are currently working on a paper in: {current_paper_path}]",
-                    "[INSTRUCTION: Continue working on this existing paper. Do NOT create a new paper directory.]",
-                    "\n📁 Current paper contents:"
-                ]
-
-                # Add information about what files exist
-                if paper_info['tex_final']:
-                    context_parts.append(f"  • Final LaTeX: {Path(paper_info['tex_final']).name}")
-                if paper_info['pdf_final']:
-                    context_parts.append(f"  • Final PDF: {Path(paper_info['pdf_final']).name}")
-                if paper_info['tex_drafts']:
-                    context_parts.append(f"  • Draft LaTeX files: {len(paper_info['tex_drafts'])} file(s)")
-                    for draft in paper_info['tex_drafts']:
-                        context_parts.append(f"    - {Path(draft).name}")
-                if paper_info['pdf_drafts']:
-                    context_parts.append(f"  • Draft PDF files: {len(paper_info['pdf_drafts'])} file(s)")
-                if paper_info['figures']:
-                    context_parts.append(f"  • Figures: {len(paper_info['figures'])} file(s)")
-                if paper_info['data']:
-                    context_parts.append(f"  • Data files: {len(paper_info['data'])} file(s)")
-                if paper_info['sources']:
-                    context_parts.append(f"  • Source/context files: {len(paper_info['sources'])} file(s)")
-                if paper_info['bibliography']:
-                    context_parts.append(f"  • Bibliography: {Path(paper_info['bibliography']).name}")
-                if paper_info['progress_log']:
-                    context_parts.append("  • Progress log: progress.md")
-                if paper_info['summary']:
-                    context_parts.append("  • Summary: SUMMARY.md")
-
-                context_parts.append(f"\nUser request: {user_input}")
-                contextual_prompt = "\n".join(context_parts)
-
-            else:
-                # No existing document was referenced: create an invocation-owned project.
-                project_dir = create_output_project(output_folder, user_input)
-                current_paper_path = str(project_dir)
-                contextual_prompt = f"""[CONTEXT: Work only in {current_paper_path}]
+                elif current_paper_path and not data_files:
+                    # Detected existing paper without new data files - provide context about what exists
+                    paper_info = scan_paper_directory(Path(current_paper_path))
+
+                    # Build a context message about the paper's current state
+                    context_parts = [
+                        f"[CONTEXT: You are currently working on a paper in: {current_paper_path}]",
+                        "[INSTRUCTION: Continue working on this existing paper. Do NOT create a new paper directory.]",
+                        "\n📁 Current paper contents:"
+                    ]
+
+                    # Add information about what files exist
+                    if paper_info['tex_final']:
+                        context_parts.append(f"  • Final LaTeX: {Path(paper_info['tex_final']).name}")
+                    if paper_info['pdf_final']:
+                        context_parts.append(f"  • Final PDF: {Path(paper_info['pdf_final']).name}")
+                    if paper_info['tex_drafts']:
+                        context_parts.append(f"  • Draft LaTeX files: {len(paper_info['tex_drafts'])} file(s)")
+                        for draft in paper_info['tex_drafts']:
+                            context_parts.append(f"    - {Path(draft).name}")
+                    if paper_info['pdf_drafts']:
+                        context_parts.append(f"  • Draft PDF files: {len(paper_info['pdf_drafts'])} file(s)")
+                    if paper_info['figures']:
+                        context_parts.append(f"  • Figures: {len(paper_info['figures'])} file(s)")
+                    if paper_info['data']:
+                        context_parts.append(f"  • Data files: {len(paper_info['data'])} file(s)")
+                    if paper_info['sources']:
+                        context_parts.append(f"  • Source/context files: {len(paper_info['sources'])} file(s)")
+                    if paper_info['bibliography']:
+                        context_parts.append(f"  • Bibliography: {Path(paper_info['bibliography']).name}")
+                    if paper_info['progress_log']:
+                        context_parts.append("  • Progress log: progress.md")
+                    if paper_info['summary']:
+                        context_parts.append("  • Summary: SUMMARY.md")
+
+                    context_parts.append(f"\nUser request: {user_input}")
+                    contextual_prompt = "\n".join(context_parts)
+
+                else:
+                    # No existing document was referenced: create an invocation-owned project.
+                    project_dir = create_output_project(output_folder, user_input)
+                    current_paper_path = str(project_dir)
+                    contextual_prompt = f"""[CONTEXT: Work only in {current_paper_path}]
 [INSTRUCTION: The project directory already exists. Do not create another one.]
 User request: {user_input}"""
 
-            # Send query
-            print()  # Add blank line before response
-            async for message in query(prompt=contextual_prompt, options=options):
-                if track_token_usage and hasattr(message, "usage") and message.usage:
-                    total_usage.add_usage(message.usage)
-
-                # Handle AssistantMessage with content blocks
-                if hasattr(message, "content") and message.content:
-                    for block in message.content:
-                        if hasattr(block, "text"):
-                            print(block.text, end="", flush=True)
-
-            print()  # Add blank line after response
-
-        except KeyboardInterrupt:
-            print("\n\nInterrupted. Type 'exit' to quit or continue with a new prompt.")
-            continue
-        except Exception as e:
-            print(f"\nError: {str(e)}")
-            print("Please try again or type 'exit' to quit.")
+                # Send query
+                print()  # Add blank line before response
+                async for message in query(prompt=contextual_prompt, options=options):
+                    if track_token_usage and hasattr(message, "usage") and message.usage:
+                        total_usage.add_usage(message.usage)
+
+                    # Handle AssistantMessage with content blocks
+                    if hasattr(message, "content") and message.content:
+                        for block in message.content:
+                            if hasattr(block, "text"):
+                                print(block.text, end="", flush=True)
+
+                print()  # Add blank line after response
+
+            except KeyboardInterrupt:
+                print("\n\nInterrupted. Type 'exit' to quit or continue with a new prompt.")
+                continue
+            except EOFError:
+                # End of input (Ctrl-D or a closed pipe) ends the session like 'exit'
+                print()
+                break
+            except Exception as e:
+                print(f"\nError: {str(e)}")
+                print("Please try again or type 'exit' to quit.")
+    finally:
+        inbox.stop()
 
     # Return token usage if tracking was enabled (fallback for any exit path)
     if track_token_usage:
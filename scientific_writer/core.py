@@ -6,6 +6,7 @@ from datetime import datetime
 import logging
 import os
 import re
+import secrets
 import shutil
 import zipfile
 from pathlib import Path
@@ -33,6 +34,15 @@ AGENT_DIR_NAMES = (".claude", ".agents")
 # historical name; AGENTS.md is the cross-vendor equivalent.
 INSTRUCTION_FILE_NAMES = ("WRITER.md", "AGENTS.md", "CLAUDE.md")
 
+# Standard layout of every output project.
+PROJECT_SUBDIRECTORIES = ("drafts", "final", "references", "figures", "data", "sources")
+
+# Name collisions within one second get a random hex suffix. 2**32 values make a
+# repeat collision negligible even for thousands of jobs per second, so a small
+# attempt bound is only a guard against a misbehaving filesystem.
+PROJECT_SUFFIX_BYTES = 4
+PROJECT_NAME_ATTEMPTS = 16
+
 
 def create_completion_check_stop_hook(
     auto_continue: bool = True,
@@ -310,21 +320,28 @@ def create_output_project(
     query: str,
     now: datetime | None = None,
 ) -> Path:
-    """Atomically create one standard output project for an invocation."""
+    """
+    Atomically create one standard output project for an invocation.
+
+    The first project for a query in a given second is named
+    ``<timestamp>_<slug>``. If that name is taken, a random suffix is added
+    instead of probing ``_2``, ``_3``, ... in order, so concurrent jobs with
+    similar queries claim a name in O(1) expected ``mkdir`` calls.
+    """
     local_now = (now or datetime.now().astimezone()).astimezone()
     timestamp = local_now.strftime("%Y%m%d_%H%M%S")
     words = re.findall(r"[a-z0-9]+", query.lower())
     slug = "_".join(words[:8])[:64].strip("_") or "document"
     base_name = f"{timestamp}_{slug}"
 
-    for index in range(1, 10_000):
-        suffix = "" if index == 1 else f"_{index}"
-        candidate = output_folder / f"{base_name}{suffix}"
+    candidate = output_folder / base_name
+    for _ in range(PROJECT_NAME_ATTEMPTS):
         try:
             candidate.mkdir(parents=False, exist_ok=False)
         except FileExistsError:
+            candidate = output_folder / f"{base_name}_{secrets.token_hex(PROJECT_SUFFIX_BYTES)}"
             continue
-        for directory in ("drafts", "final", "references", "figures", "data", "sources"):
+        for directory in PROJECT_SUBDIRECTORIES:
             (candidate / directory).mkdir()
         return candidate
 
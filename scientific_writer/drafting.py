@@ -0,0 +1,213 @@
+"""Section plans and prompts for parallel section drafting.
+
+Parallel drafting splits one document request into three kinds of agent
+sessions that share the same output project:
+
+1. A planning session researches the topic and writes ``drafts/section_plan.json``.
+2. One drafting session per independent section, run concurrently, each writing
+   only its own file under ``drafts/``.
+3. A merge session that writes the dependent sections, assembles the document,
+   and harmonizes terminology, citations, and cross-references.
+
+This module owns the plan format and the prompts; ``api.generate_paper``
+schedules the sessions.
+"""
+
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import re
+from typing import Any
+
+SECTION_PLAN_FILENAME = "section_plan.json"
+
+# Sections that usually read only the plan and the shared bibliography, so they
+# can be drafted without waiting on each other.
+DEFAULT_INDEPENDENT_SECTIONS = ("methods", "related work", "discussion", "supplementary")
+
+
+@dataclass
+class SectionTask:
+    """One section from the plan and the draft file it owns."""
+
+    name: str
+    draft_path: Path
+    brief: str = ""
+    independent: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "name": self.name,
+            "draft": str(self.draft_path),
+            "brief": self.brief,
+            "independent": self.independent,
+        }
+
+
+def section_plan_path(project_dir: Path) -> Path:
+    """Return where the planning session writes the section plan."""
+    return project_dir / "drafts" / SECTION_PLAN_FILENAME
+
+
+def _section_slug(name: str) -> str:
+    words = re.findall(r"[a-z0-9]+", name.lower())
+    return "_".join(words)[:48].strip("_") or "section"
+
+
+def _resolve_draft_path(project_dir: Path, value: Any, name: str) -> Path:
+    """Keep every section draft inside the project's drafts/ directory."""
+    drafts_dir = (project_dir / "drafts").resolve()
+    default = drafts_dir / f"section_{_section_slug(name)}.tex"
+    if not isinstance(value, str) or not value.strip():
+        return default
+    candidate = Path(value.strip())
+    if not candidate.is_absolute():
+        candidate = project_dir / candidate
+    candidate = candidate.resolve()
+    if candidate.parent != drafts_dir or candidate.name == SECTION_PLAN_FILENAME:
+        return default
+    return candidate
+
+
+def load_section_plan(project_dir: Path) -> list[SectionTask]:
+    """
+    Load and validate the section plan written by the planning session.
+
+    Args:
+        project_dir: Output project directory.
+
+    Returns:
+        Sections in document order. Draft paths always resolve to distinct files
+        directly under ``drafts/``.
+
+    Raises:
+        ValueError: If the plan is missing, unreadable, or names no sections.
+    """
+    plan_file = section_plan_path(project_dir)
+    try:
+        data = json.loads(plan_file.read_text(encoding="utf-8"))
+    except FileNotFoundError as exc:
+        raise ValueError(f"Section plan not found: {plan_file}") from exc
+    except (OSError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Could not read section plan {plan_file}: {exc}") from exc
+
+    entries = data.get("sections") if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"Section plan lists no sections: {plan_file}")
+
+    sections: list[SectionTask] = []
+    claimed: set[Path] = set()
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError(f"Invalid section entry in {plan_file}: {entry!r}")
+        name = entry.get("name")
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError(f"Section entry without a name in {plan_file}: {entry!r}")
+        name = name.strip()
+        draft_path = _resolve_draft_path(project_dir, entry.get("file"), name)
+        if draft_path in claimed:
+            draft_path = draft_path.with_name(
+                f"{draft_path.stem}_{len(sections) + 1}{draft_path.suffix}"
+            )
+        claimed.add(draft_path)
+        brief = entry.get("brief")
+        sections.append(
+            SectionTask(
+                name=name,
+                draft_path=draft_path,
+                brief=brief.strip() if isinstance(brief, str) else "",
+                independent=entry.get("independent") is True,
+            )
+        )
+    return sections
+
+
+def build_planning_prompt(contextual_query: str, project_dir: Path) -> str:
+    """Prompt for the session that researches and outlines the document."""
+    plan_file = section_plan_path(project_dir)
+    independent = ", ".join(DEFAULT_INDEPENDENT_SECTIONS)
+    return f"""{contextual_query}
+
+[PARALLEL DRAFTING - PLANNING STAGE]
+This request is drafted in stages. In THIS session, only plan and research:
+1. Decide the document structure, venue conventions, and section order.
+2. Gather the literature the document needs and save verified BibTeX entries to
+   {project_dir / "references" / "references.bib"}; save research notes in {project_dir / "sources"}.
+3. Write the section plan as JSON to {plan_file} using exactly this shape:
+   {{"sections": [{{"name": "Methods", "file": "drafts/section_methods.tex",
+     "independent": true, "brief": "what this section covers, key points, citation keys"}}]}}
+   List every section in document order. Set "independent": true only for
+   sections that can be written from the plan and bibliography alone, without
+   reading other sections (typically: {independent}).
+Do NOT draft section text, assemble the manuscript, or compile anything. Other
+sessions will draft the sections from your plan."""
+
+
+def build_section_prompt(
+    contextual_query: str,
+    project_dir: Path,
+    section: SectionTask,
+    sections: list[SectionTask],
+) -> str:
+    """Prompt for one concurrent drafting session that owns a single section."""
+    outline = "\n".join(
+        f"  - {item.name}" + (" (this section)" if item is section else "")
+        for item in sections
+    )
+    brief = section.brief or "Follow the section plan."
+    return f"""[CONTEXT: Work only in {project_dir}]
+[PARALLEL DRAFTING - SECTION STAGE]
+You are drafting ONE section of a larger document while other sessions draft
+other sections at the same time.
+
+Section: {section.name}
+Write it to: {section.draft_path}
+Brief: {brief}
+
+Document outline:
+{outline}
+
+Rules:
+- Write only {section.draft_path}. Do not create, edit, or delete any other file.
+- Read the plan at {section_plan_path(project_dir)}, the bibliography in
+  {project_dir / "references"}, and notes in {project_dir / "sources"} as needed.
+- Cite only keys that exist in the bibliography; do not edit the bibliography.
+- Write section content only (no preamble, \\documentclass, or \\begin{{document}}).
+- Do not compile. A merge session will assemble and compile the document.
+
+Original request:
+{contextual_query}"""
+
+
+def build_merge_prompt(
+    contextual_query: str,
+    project_dir: Path,
+    sections: list[SectionTask],
+    drafted: list[SectionTask],
+    failed: list[SectionTask],
+) -> str:
+    """Prompt for the session that assembles and harmonizes the final document."""
+    drafted_lines = "\n".join(f"  - {item.name}: {item.draft_path}" for item in drafted) or "  (none)"
+    pending = [item for item in sections if item not in drafted]
+    pending_lines = "\n".join(
+        f"  - {item.name}" + (" (parallel draft failed)" if item in failed else "")
+        for item in pending
+    ) or "  (none)"
+    return f"""{contextual_query}
+
+[PARALLEL DRAFTING - MERGE STAGE]
+The plan is at {section_plan_path(project_dir)}. These sections were drafted in
+parallel and are ready to merge:
+{drafted_lines}
+
+Sections you still need to write:
+{pending_lines}
+
+Complete the document:
+1. Read every drafted section and write the remaining sections.
+2. Assemble all sections, in plan order, into the complete document.
+3. Make the document consistent: terminology, notation, abbreviations,
+   tense, citation keys, figure/table references, and cross-references.
+   Remove duplicated material between sections.
+4. Compile and place the final deliverables in {project_dir / "final"} as usual."""
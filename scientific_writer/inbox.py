@@ -0,0 +1,329 @@
+"""Background watcher for the CLI ``data/`` inbox.
+
+Without it, every interactive prompt rescans ``data/``, re-stats each file to
+find what changed, and copies new inputs into the project before the query can
+start. ``InboxWatcher`` moves that work off the prompt path:
+
+* Changes are detected by a background thread, using Linux inotify when it is
+  available and polling the directory otherwise.
+* ``stage`` copies the pending files into a project on a small thread pool and
+  returns the combined ``process_data_files`` result.
+* Callers that know the target project in advance can ``set_project`` to stage
+  changes as they arrive. The CLI does not: until a prompt is submitted it
+  cannot tell whether the inputs belong to the current paper or a new one.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import ctypes
+import ctypes.util
+import logging
+import os
+from pathlib import Path
+import select
+import struct
+import sys
+import threading
+from typing import Any
+
+from .core import get_data_files, process_data_files
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_MAX_WORKERS = 4
+
+# inotify event bits (linux/inotify.h).
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def input_signature(path: Path) -> tuple[int, int]:
+    """Return the (size, mtime) pair used to tell whether an input changed."""
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def merge_processed_info(into: dict[str, Any], info: dict[str, Any] | None) -> None:
+    """Append the per-category lists of one ``process_data_files`` result to another."""
+    if not info:
+        return
+    for key, values in info.items():
+        into.setdefault(key, []).extend(values)
+
+
+class _Inotify:
+    """Minimal ctypes binding for watching one directory with Linux inotify."""
+
+    def __init__(self, directory: Path):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(error, os.strerror(error), str(directory))
+        self.fd = fd
+
+    def read_events(self) -> list[tuple[int, str]]:
+        """Drain queued events without blocking and return ``(mask, name)`` pairs."""
+        events: list[tuple[int, str]] = []
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buffer):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b"\0")
+                offset += length
+                events.append((mask, os.fsdecode(name)))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class InboxWatcher:
+    """
+    Watch ``<cwd>/data/`` and stage new or changed files in the background.
+
+    Args:
+        cwd: CLI working directory whose ``data/`` folder is the inbox.
+        delete_originals: Remove inbox files after they are copied (``--consume-inputs``).
+        poll_interval: Seconds between directory scans when polling, and the
+            longest the watcher thread waits before checking for shutdown.
+        max_workers: Files staged concurrently.
+        use_inotify: Try inotify before falling back to polling.
+    """
+
+    def __init__(
+        self,
+        cwd: Path,
+        *,
+        delete_originals: bool = False,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        use_inotify: bool = True,
+    ):
+        self.cwd = cwd
+        self.data_dir = cwd / "data"
+        self.delete_originals = delete_originals
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inbox-stage")
+        self._thread: threading.Thread | None = None
+        self._inotify: _Inotify | None = None
+        self._project: str | None = None
+        # Signature of each inbox file when it was last staged.
+        self._staged: dict[Path, tuple[int, int]] = {}
+        # Changed files waiting to be staged, and files seen once while polling.
+        self._pending: set[Path] = set()
+        self._unsettled: dict[Path, tuple[int, int]] = {}
+        self._in_flight: dict[Path, Future[None]] = {}
+        # Staging results not yet handed to a prompt, per project directory.
+        self._results: dict[str, dict[str, Any]] = {}
+
+    @property
+    def mode(self) -> str:
+        """``"inotify"`` or ``"polling"``."""
+        return "inotify" if self._inotify is not None else "polling"
+
+    def start(self) -> "InboxWatcher":
+        """Record the current inbox contents and start the watcher thread."""
+        if self.use_inotify and self.data_dir.is_dir():
+            try:
+                self._inotify = _Inotify(self.data_dir)
+            except (OSError, AttributeError) as exc:
+                logger.debug("inotify unavailable for %s, polling instead: %s", self.data_dir, exc)
+        self._scan(settle=False)
+        self._thread = threading.Thread(target=self._run, name="inbox-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop watching and wait for staging that is already running."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+        self._executor.shutdown(wait=True)
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self) -> "InboxWatcher":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def set_project(self, project_dir: str | Path | None) -> None:
+        """Stage future inbox changes into ``project_dir`` in the background."""
+        with self._lock:
+            self._project = str(project_dir) if project_dir else None
+        self._dispatch()
+
+    def pending_count(self, project_dir: str | Path | None = None) -> int:
+        """
+        Count inbox files the next prompt would import.
+
+        Includes files still waiting, files being staged, and files already
+        staged into ``project_dir`` but not yet returned by ``stage``.
+        """
+        self._refresh()
+        with self._lock:
+            staged = 0
+            if project_dir:
+                staged = len(self._results.get(str(project_dir), {}).get("all_files", []))
+            return len(self._pending) + len(self._unsettled) + len(self._in_flight) + staged
+
+    def stage(self, project_dir: str | Path) -> dict[str, Any] | None:
+        """
+        Stage everything left in the inbox into ``project_dir`` and return the results.
+
+        Args:
+            project_dir: Project directory that receives the files.
+
+        Returns:
+            Combined ``process_data_files`` result for every file staged into
+            ``project_dir`` since the last call, or None if nothing was staged.
+        """
+        self._refresh()
+        with self._lock:
+            self._pending.update(self._unsettled)
+            self._unsettled.clear()
+        while True:
+            self._dispatch(project_dir)
+            with self._lock:
+                in_flight = list(self._in_flight.values())
+                if not in_flight and not self._pending:
+                    return self._results.pop(str(project_dir), None)
+            wait(in_flight)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            if self._inotify is not None:
+                try:
+                    select.select([self._inotify.fd], [], [], self.poll_interval)
+                except (OSError, ValueError):
+                    break
+                if self._stopped.is_set():
+                    break
+                self._refresh()
+            else:
+                if self._stopped.wait(self.poll_interval):
+                    break
+                self._scan(settle=True)
+            self._dispatch()
+
+    def _refresh(self) -> None:
+        """Bring the pending set up to date: drain inotify events, or rescan when polling."""
+        with self._refresh_lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self) -> None:
+        inotify = self._inotify
+        if inotify is None:
+            self._scan(settle=False)
+            return
+        try:
+            events = inotify.read_events()
+        except OSError:
+            events = [(_IN_IGNORED, "")]
+        for mask, name in events:
+            if mask & (_IN_Q_OVERFLOW | _IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                if mask & _IN_Q_OVERFLOW:
+                    self._scan(settle=False)
+                    continue
+                logger.debug("inotify watch on %s ended; polling instead", self.data_dir)
+                self._inotify = None
+                inotify.close()
+                self._scan(settle=False)
+                return
+            if name:
+                self._note(self.data_dir / name)
+
+    def _note(self, path: Path) -> None:
+        """Queue ``path`` if it differs from what was last staged, or forget it if it is gone."""
+        try:
+            signature = input_signature(path) if path.is_file() else None
+        except OSError:
+            signature = None
+        with self._lock:
+            if signature is None:
+                self._pending.discard(path)
+                self._unsettled.pop(path, None)
+                self._staged.pop(path, None)
+            elif self._staged.get(path) != signature:
+                self._pending.add(path)
+
+    def _scan(self, settle: bool) -> None:
+        """
+        Rescan the inbox directory.
+
+        With ``settle``, a new signature must be seen on two consecutive scans
+        before the file is queued, so files still being written are not staged.
+        """
+        current: dict[Path, tuple[int, int]] = {}
+        for path in get_data_files(self.cwd):
+            try:
+                current[path] = input_signature(path)
+            except OSError:
+                continue
+        with self._lock:
+            for path in set(self._staged) - set(current):
+                del self._staged[path]
+            self._pending &= set(current)
+            unsettled: dict[Path, tuple[int, int]] = {}
+            for path, signature in current.items():
+                if self._staged.get(path) == signature:
+                    self._pending.discard(path)
+                elif not settle or self._unsettled.get(path) == signature:
+                    self._pending.add(path)
+                else:
+                    unsettled[path] = signature
+            self._unsettled = unsettled
+
+    def _dispatch(self, project_dir: str | Path | None = None) -> None:
+        """Submit pending files to the staging pool when there is a project to stage into."""
+        with self._lock:
+            project = str(project_dir) if project_dir else self._project
+            if project is None or (self._stopped.is_set() and project_dir is None):
+                return
+            for path in sorted(self._pending - set(self._in_flight)):
+                self._pending.discard(path)
+                self._in_flight[path] = self._executor.submit(self._stage_one, path, project)
+
+    def _stage_one(self, path: Path, project: str) -> None:
+        try:
+            signature = input_signature(path)
+        except OSError:
+            signature = None
+        info = None
+        try:
+            if signature is not None:
+                info = process_data_files(self.cwd, [path], project, delete_originals=self.delete_originals)
+        except Exception as exc:
+            logger.warning("Could not stage %s: %s", path.name, exc, exc_info=True)
+            info = {"errors": [f"Could not process {path.name}: {exc}"]}
+        with self._lock:
+            del self._in_flight[path]
+            if info:
+                merge_processed_info(self._results.setdefault(project, {}), info)
+                if signature is not None and info.get("all_files") and not self.delete_originals:
+                    self._staged[path] = signature
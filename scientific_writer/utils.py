@@ -1,5 +1,6 @@
 """Utility functions for scientific writer."""
 
+from collections.abc import Iterable
 import logging
 from pathlib import Path
 import re
@@ -261,6 +262,39 @@ def scan_paper_directory(paper_dir: Path) -> dict[str, Any]:
     return result
 
 
+_BIB_TOKEN = re.compile(r'@\s*([A-Za-z][\w-]*)\s*([{(])|[{})]')
+_BIB_DIRECTIVES = frozenset({"comment", "preamble", "string"})
+
+
+def _count_bib_entries(lines: Iterable[str]) -> int:
+    """Count entries line by line, tracking brace depth across lines.
+
+    An ``@type{`` is only an entry when it appears between entries, so ``@`` inside
+    abstracts, notes or ``@comment`` bodies is not counted.
+    """
+    count = 0
+    depth = 0
+    in_parens = False
+    for line in lines:
+        for token in _BIB_TOKEN.finditer(line):
+            entry_type, opener = token.group(1, 2)
+            char = opener or token.group()
+            if entry_type and depth == 0 and not in_parens:
+                if entry_type.lower() not in _BIB_DIRECTIVES:
+                    count += 1
+                if opener == '{':
+                    depth = 1
+                else:
+                    in_parens = True
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth = max(depth - 1, 0)
+            elif char == ')' and depth == 0:
+                in_parens = False
+    return count
+
+
 def count_citations_in_bib(bib_file: str | None) -> int:
     """
     Count the number of citations in a BibTeX file.
@@ -275,11 +309,8 @@ def count_citations_in_bib(bib_file: str | None) -> int:
         return 0
 
     try:
-        with open(bib_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-            entry_types = re.findall(r'@([a-zA-Z]+)\s*[\{\(]', content)
-            directives = {"comment", "preamble", "string"}
-            return sum(1 for entry_type in entry_types if entry_type.lower() not in directives)
+        with open(bib_file, 'r', encoding='utf-8', errors='replace') as f:
+            return _count_bib_entries(f)
     except Exception:
         logger.warning("Could not count citations in %s", bib_file, exc_info=True)
         return 0
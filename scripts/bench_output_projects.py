@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Benchmark concurrent output project allocation.
+
+Batch runners start many jobs with similar queries in the same second, which
+is the worst case for ``create_output_project``: every job wants the same
+``<timestamp>_<slug>`` name. This script allocates N projects for one query and
+one fixed timestamp from a thread pool, checks that every project is distinct
+and complete, and reports latency. ``--compare-linear`` also times the previous
+``_2``, ``_3``, ... probing scheme on the same workload.
+
+Usage:
+    python scripts/bench_output_projects.py
+    python scripts/bench_output_projects.py --count 1000 --workers 64 --compare-linear
+    python scripts/bench_output_projects.py --output-folder /mnt/nfs/scratch
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from scientific_writer.core import PROJECT_SUBDIRECTORIES, create_output_project  # noqa: E402
+
+QUERY = "Create a concise report on protein folding benchmarks"
+NOW = datetime(2026, 1, 1, 12, 0, 0).astimezone()
+
+
+def linear_probe_create(output_folder: Path, query: str, now: datetime) -> Path:
+    """The previous allocation scheme, kept here only as a baseline."""
+    base_name = f"{now.strftime('%Y%m%d_%H%M%S')}_{'_'.join(query.lower().split()[:8])}"
+    for index in range(1, 10_000):
+        suffix = "" if index == 1 else f"_{index}"
+        candidate = output_folder / f"{base_name}{suffix}"
+        try:
+            candidate.mkdir(parents=False, exist_ok=False)
+        except FileExistsError:
+            continue
+        for directory in PROJECT_SUBDIRECTORIES:
+            (candidate / directory).mkdir()
+        return candidate
+    raise FileExistsError(f"Could not create a unique project in {output_folder}")
+
+
+def run(
+    allocate: Callable[[Path, str, datetime], Path],
+    output_folder: Path,
+    count: int,
+    workers: int,
+) -> dict[str, float]:
+    """Allocate ``count`` projects concurrently and return timing statistics."""
+    latencies: list[float] = []
+
+    def timed(_: int) -> Path:
+        started = time.perf_counter()
+        project = allocate(output_folder, QUERY, NOW)
+        latencies.append(time.perf_counter() - started)
+        return project
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        projects = list(pool.map(timed, range(count)))
+    elapsed = time.perf_counter() - started
+
+    if len(set(projects)) != count:
+        raise SystemExit(f"FAIL: {count - len(set(projects))} duplicate project(s)")
+    expected = set(PROJECT_SUBDIRECTORIES)
+    incomplete = [p for p in projects if {child.name for child in p.iterdir()} != expected]
+    if incomplete:
+        raise SystemExit(f"FAIL: {len(incomplete)} incomplete project(s), e.g. {incomplete[0]}")
+
+    latencies.sort()
+    return {
+        "total_s": elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def _report(label: str, stats: dict[str, float], count: int) -> None:
+    print(
+        f"{label:<14} {count} projects in {stats['total_s']:.3f}s  "
+        f"mean {stats['mean_ms']:.2f} ms  p95 {stats['p95_ms']:.2f} ms  max {stats['max_ms']:.2f} ms"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark concurrent output project allocation.")
+    parser.add_argument("--count", type=int, default=1000, help="projects to allocate (default: 1000)")
+    parser.add_argument("--workers", type=int, default=32, help="concurrent allocators (default: 32)")
+    parser.add_argument(
+        "--output-folder",
+        type=Path,
+        default=None,
+        help="directory to allocate in (default: a temporary directory)",
+    )
+    parser.add_argument(
+        "--compare-linear",
+        action="store_true",
+        help="also time the previous sequential-suffix scheme",
+    )
+    args = parser.parse_args()
+    if args.count <= 0 or args.workers <= 0:
+        parser.error("--count and --workers must be greater than zero")
+
+    with tempfile.TemporaryDirectory(dir=args.output_folder) as scratch:
+        root = Path(scratch)
+        current = root / "current"
+        current.mkdir()
+        _report("random suffix", run(create_output_project, current, args.count, args.workers), args.count)
+        if args.compare_linear:
+            linear = root / "linear"
+            linear.mkdir()
+            _report("linear probe", run(linear_probe_create, linear, args.count, args.workers), args.count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming BibTeX tokenizer and index on a synthetic library.
+
+Usage:
+    python bench_bibtex.py                # 100,000 entries
+    python bench_bibtex.py --entries 20000 --lookups 500
+
+Also times ``format_bibtex.py`` in full and with ``--incremental``: a cold
+run, the rerun right after it, one entry added (which also compacts the
+sidecar), another added, and an unchanged file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from bibtex_stream import BibIndex, count_entries, iter_entries
+from format_bibtex import BibTeXFormatter
+
+_WORDS = (
+    "sleep memory spindle cortex consolidation hippocampal network adult cohort "
+    "trial protein expression signal model variance regression imaging neural"
+).split()
+
+
+def synthetic_entry(number: int, rng: random.Random) -> str:
+    title = " ".join(rng.choice(_WORDS) for _ in range(8)).capitalize()
+    abstract = " ".join(rng.choice(_WORDS) for _ in range(60))
+    return (
+        f"@article{{ref{number},\n"
+        f"  author   = {{Author{number % 977}, A. and {{Group {number % 31}}}}},\n"
+        f"  title    = {{{title} {{{rng.choice(_WORDS).upper()}}}}},\n"
+        f'  journal  = "Journal of {rng.choice(_WORDS).capitalize()}",\n'
+        f"  year     = {1990 + number % 35},\n"
+        f"  volume   = {{{number % 90}}},\n"
+        f"  pages    = {{{number % 500}--{number % 500 + 12}}},\n"
+        f"  doi      = {{10.{1000 + number % 9000}/bench.{number}}},\n"
+        f"  abstract = {{{abstract}}}\n"
+        f"}}\n\n"
+    )
+
+
+def timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    print(f"{label:<36} {time.perf_counter() - started:8.2f} s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark BibTeX streaming and indexing")
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        bib = Path(tmp) / "library.bib"
+        with open(bib, "w", encoding="utf-8") as handle:
+            for number in range(args.entries):
+                handle.write(synthetic_entry(number, rng))
+        print(f"{args.entries} entries, {bib.stat().st_size / 1e6:.1f} MB")
+
+        timed("count entries", lambda: count_entries(bib))
+        timed("parse all fields", lambda: sum(1 for _ in iter_entries(bib)))
+        with BibIndex(Path(tmp) / "index.sqlite3") as index:
+            timed("build key/DOI index", lambda: index.refresh(bib))
+            timed("refresh (unchanged)", lambda: index.refresh(bib))
+            with open(bib, "a", encoding="utf-8") as handle:
+                handle.write(synthetic_entry(args.entries, rng))
+            timed("refresh (one entry appended)", lambda: index.refresh(bib))
+            keys = [f"ref{rng.randrange(args.entries)}" for _ in range(args.lookups)]
+            timed(
+                f"{args.lookups} key lookups",
+                lambda: [index.lookup(bib, key=key) for key in keys],
+            )
+            dois = [f"10.{1000 + n % 9000}/bench.{n}" for n in map(int, (k[3:] for k in keys))]
+            timed(
+                f"{args.lookups} DOI lookups",
+                lambda: [index.lookup(bib, doi=doi) for doi in dois],
+            )
+
+        formatter = BibTeXFormatter()
+        formatted = Path(tmp) / "formatted.bib"
+        shutil.copy(bib, formatted)
+
+        def run_format(path: Path, incremental: bool) -> None:
+            # Silence the formatter's progress lines.
+            with contextlib.redirect_stderr(io.StringIO()):
+                formatter.format_file(str(path), deduplicate=True, incremental=incremental)
+
+        timed("format (full)", lambda: run_format(bib, False))
+        timed("format --incremental (cold)", lambda: run_format(formatted, True))
+        timed("format --incremental (rerun)", lambda: run_format(formatted, True))
+        with open(formatted, "a", encoding="utf-8") as handle:
+            handle.write(synthetic_entry(args.entries + 1, rng))
+        timed("format --incremental (one added)", lambda: run_format(formatted, True))
+        with open(formatted, "a", encoding="utf-8") as handle:
+            handle.write(synthetic_entry(args.entries + 2, rng))
+        timed("format --incremental (another added)", lambda: run_format(formatted, True))
+        modified = formatted.stat().st_mtime_ns
+        timed("format --incremental (unchanged)", lambda: run_format(formatted, True))
+        if formatted.stat().st_mtime_ns != modified:
+            raise RuntimeError("an unchanged file was rewritten")
+
+
+if __name__ == "__main__":
+    main()
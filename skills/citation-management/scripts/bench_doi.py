@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Benchmark DOIConverter.convert_multiple against the offline DOI stand-in.
+
+Starts ``doi_standin.py`` on a free local port and converts the same DOIs with a
+cold cache at the polite-pool rate, with rate limiting disabled (to measure the
+worker pool alone), and again with a warm cache. ``--serial`` also runs the old
+one-at-a-time behavior (one worker, 0.5 s delay) for comparison.
+
+Usage:
+    python bench_doi.py
+    python bench_doi.py --dois 1000 --workers 8 --latency 0.1 --serial
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+from citation_cache import CitationCache
+from doi_standin import start_server
+from doi_to_bibtex import DEFAULT_RATE, DOIConverter
+
+
+def run(label: str, converter: DOIConverter, dois: list[str], delay: float | None = None) -> None:
+    started = time.perf_counter()
+    entries = converter.convert_multiple(dois, delay=delay)
+    elapsed = time.perf_counter() - started
+    if len(entries) != len(dois):
+        raise RuntimeError(f"{label}: converted {len(entries)}/{len(dois)} DOIs")
+    print(f"{label:<40} {elapsed:8.2f} s  ({len(dois) / elapsed:7.1f} DOIs/s)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark DOI to BibTeX conversion offline.")
+    parser.add_argument("--dois", type=int, default=300, help="DOIs to convert")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests")
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Stand-in seconds per response"
+    )
+    parser.add_argument(
+        "--throttle-every", type=int, default=0, help="Stand-in answers every Nth request with 429"
+    )
+    parser.add_argument(
+        "--serial", action="store_true", help="Also time the old serial 0.5 s-delay loop"
+    )
+    args = parser.parse_args()
+    if args.dois < 1 or args.workers < 1:
+        parser.error("--dois and --workers must be at least 1")
+
+    server = start_server(
+        latency=args.latency, throttle_every=args.throttle_every, retry_after=0.5
+    )
+    dois = [f"10.{1000 + n % 9000}/bench.{n}" for n in range(args.dois)]
+    print(f"{args.dois} DOIs, {args.workers} workers, {args.latency:g} s stand-in latency")
+    try:
+        # Silence the converter's per-DOI progress lines.
+        with tempfile.TemporaryDirectory() as scratch, contextlib.redirect_stderr(io.StringIO()):
+            if args.serial:
+                serial = DOIConverter(workers=1, resolver=server.base_url)
+                run("serial, 0.5 s delay (old behavior)", serial, dois, delay=0.5)
+            for label, rate in (
+                (f"concurrent, polite pool {DEFAULT_RATE:g}/s", DEFAULT_RATE),
+                ("concurrent, no rate limit", 0.0),
+            ):
+                cache = CitationCache(f"{scratch}/{rate:g}")
+                converter = DOIConverter(
+                    cache=cache, workers=args.workers, rate=rate, resolver=server.base_url
+                )
+                run(label + ", cold cache", converter, dois)
+            run("warm cache", converter, dois)
+    finally:
+        server.shutdown()
+    if server.throttled:
+        print(f"stand-in throttled {server.throttled} requests (all retried)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
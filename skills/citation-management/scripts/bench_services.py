@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Benchmark the citation clients end to end against the offline service stand-ins.
+
+Starts ``service_standin.py`` on a free local port, points the scripts at it
+through their base-URL environment variables, and measures throughput at each
+worker count for:
+
+    DOIConverter.convert_multiple        DOIs to BibTeX (doi.org)
+    MetadataExtractor.extract_many       a DOI/PMID/arXiv mix (CrossRef, EFetch, arXiv)
+    PubMedSearcher.iter_search_results   one query streamed via the history server
+    CitationVerifier.verify_all          literature-review's DOI check (handle + CrossRef)
+
+CitationVerifier is imported from the literature-review skill next to this one
+and is skipped by default when that skill is not installed alongside.
+
+Every run starts with a cold cache. The stand-in's latency, jitter, error rate
+and rate limits apply to all clients; their own rate limiters are off unless
+``--polite``, so the stand-in's limits are what push back. Each row reports the
+requests the stand-in received and how many it answered with 429 or 5xx; every
+one of those was retried by the client, and "failed" counts the items that
+still came back empty.
+
+Usage:
+    python bench_services.py
+    python bench_services.py --workers 1,8,32 --latency 0.2 --jitter 0.1 \\
+        --error-rate 0.05 --rate-limit 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from doi_to_bibtex import DOIConverter
+from extract_metadata import MetadataExtractor
+from polite_http import RateLimiter
+from search_pubmed import PubMedSearcher
+from service_standin import PUBLISHED_LIMITS, ServiceStandin, parse_rate_limits, start_server
+
+LITERATURE_REVIEW_SCRIPTS = Path(__file__).resolve().parents[2] / "literature-review" / "scripts"
+
+
+def convert_dois(count: int, workers: int, polite: bool) -> Callable[[], tuple[int, int]]:
+    dois = [f"10.{1000 + n % 9000}/bench.{n}" for n in range(count)]
+    converter = DOIConverter(workers=workers, **({} if polite else {"rate": 0.0}))
+    return lambda: (len(dois), len(dois) - len(converter.convert_multiple(dois)))
+
+
+def extract_mixed(count: int, workers: int, polite: bool) -> Callable[[], tuple[int, int]]:
+    identifiers = []
+    for n in range(count):
+        kind = n % 3
+        if kind == 0:
+            identifiers.append(f"10.{1000 + n % 9000}/bench.{n}")
+        elif kind == 1:
+            identifiers.append(str(31_000_000 + n))
+        else:
+            identifiers.append(f"arXiv:{2101 + n % 12:04d}.{n:05d}")
+    extractor = MetadataExtractor(workers=workers)
+    if not polite:
+        extractor.limiters = {name: RateLimiter(0) for name in extractor.limiters}
+
+    def run() -> tuple[int, int]:
+        results = extractor.extract_many(identifiers)
+        return len(results), sum(result is None for result in results)
+
+    return run
+
+
+def stream_pubmed(count: int, workers: int, polite: bool) -> Callable[[], tuple[int, int]]:
+    searcher = PubMedSearcher(workers=workers)
+    if not polite:
+        searcher.limiter = RateLimiter(0)
+
+    def run() -> tuple[int, int]:
+        fetched = sum(1 for _ in searcher.iter_search_results("sleep AND memory"))
+        return fetched, max(0, count - fetched)
+
+    return run
+
+
+def verify_dois(count: int, workers: int, polite: bool) -> Callable[[], tuple[int, int]]:
+    # Appended, so this skill's own modules (the shared polite_http) come first
+    sys.path.append(str(LITERATURE_REVIEW_SCRIPTS))
+    from verify_citations import CitationVerifier
+
+    dois = [f"10.{1000 + n % 9000}/bench.{n}" for n in range(count)]
+    # Every service shares the stand-in's host, so the host limit is the worker count
+    verifier = CitationVerifier(workers=workers, per_host=workers)
+    if not polite:
+        verifier.crossref_limiter = RateLimiter(0)
+
+    def run() -> tuple[int, int]:
+        results = verifier.verify_all(dois)
+        return len(results), sum(not result["ok"] or "error" in result["detail"] for result in results)
+
+    return run
+
+
+CLIENTS = {
+    "DOIConverter": convert_dois,
+    "MetadataExtractor": extract_mixed,
+    "PubMedSearcher": stream_pubmed,
+    "CitationVerifier": verify_dois,
+}
+DEFAULT_CLIENTS = [
+    name
+    for name in CLIENTS
+    if name != "CitationVerifier" or (LITERATURE_REVIEW_SCRIPTS / "verify_citations.py").is_file()
+]
+
+
+def measure(server: ServiceStandin, label: str, workers: int, run: Callable[[], tuple[int, int]]) -> None:
+    server.reset_stats()
+    started = time.perf_counter()
+    # Silence the clients' per-item progress lines.
+    with contextlib.redirect_stderr(io.StringIO()):
+        items, failed = run()
+    elapsed = time.perf_counter() - started
+    stats = server.stats.values()
+    received = sum(stat.received for stat in stats)
+    throttled = sum(stat.throttled for stat in stats)
+    errors = sum(stat.errors for stat in stats)
+    print(
+        f"{label:<18} {workers:>7} {items:>7} {elapsed:8.2f} {items / elapsed:9.1f}"
+        f" {received:>8} {throttled:>6} {errors:>6} {failed:>6}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark citation clients offline.")
+    parser.add_argument("--items", type=int, default=300, help="DOIs and identifiers per client")
+    parser.add_argument(
+        "--pubmed-records", type=int, default=5000, help="Records the PubMed search streams"
+    )
+    parser.add_argument(
+        "--workers", default="1,4,16", help="Comma-separated worker counts (default: 1,4,16)"
+    )
+    parser.add_argument(
+        "--clients",
+        default=",".join(DEFAULT_CLIENTS),
+        help=f"Comma-separated clients to run (default: {','.join(DEFAULT_CLIENTS)})",
+    )
+    parser.add_argument("--latency", type=float, default=0.05, help="Stand-in seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many more seconds")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests answered with 5xx"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="[SERVICE=]RATE",
+        help="Stand-in requests per second before 429; repeatable",
+    )
+    parser.add_argument(
+        "--published-limits", action="store_true", help="Stand-in enforces published rate limits"
+    )
+    parser.add_argument(
+        "--polite", action="store_true", help="Keep the clients' own rate limiters on"
+    )
+    args = parser.parse_args()
+    try:
+        worker_counts = [int(value) for value in args.workers.split(",")]
+        limits = dict(PUBLISHED_LIMITS) if args.published_limits else {}
+        limits.update(parse_rate_limits(args.rate_limit))
+    except ValueError as exc:
+        parser.error(str(exc))
+    clients = args.clients.split(",")
+    unknown = sorted(set(clients) - set(CLIENTS))
+    if unknown:
+        parser.error(f"unknown clients: {', '.join(unknown)}")
+    if args.items < 1 or args.pubmed_records < 1 or min(worker_counts) < 1:
+        parser.error("--items, --pubmed-records and --workers must be at least 1")
+
+    server = start_server(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limits=limits,
+        pubmed_records=args.pubmed_records,
+    )
+    os.environ.update(server.environment())
+    print(
+        f"stand-in latency {args.latency:g} s (+{args.jitter:g} s jitter), "
+        f"error rate {args.error_rate:g}, rate limits {limits or 'none'}, "
+        f"client limiters {'on' if args.polite else 'off'}"
+    )
+    print(
+        f"{'client':<18} {'workers':>7} {'items':>7} {'seconds':>8} {'items/s':>9}"
+        f" {'requests':>8} {'429':>6} {'5xx':>6} {'failed':>6}"
+    )
+    try:
+        for name in clients:
+            count = args.pubmed_records if name == "PubMedSearcher" else args.items
+            for workers in worker_counts:
+                measure(server, name, workers, CLIENTS[name](count, workers, args.polite))
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Streaming BibTeX tokenizer and on-disk entry index.
+
+The tokenizer reads a .bib file in fixed-size chunks, so memory stays bounded by
+the largest single entry rather than the library. Entry bodies may nest braces to
+any depth, and every entry records the byte offsets it occupies in the file. The
+index stores those offsets by citation key and DOI in SQLite, so a lookup seeks
+straight to one entry instead of re-parsing the library.
+
+Usage:
+    python bibtex_stream.py count references.bib
+    python bibtex_stream.py index references.bib
+    python bibtex_stream.py lookup references.bib --key smith2020
+    python bibtex_stream.py lookup references.bib --doi 10.1038/nature12345
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import IO, Iterator
+
+from citation_cache import default_cache_dir
+
+CHUNK_SIZE = 1 << 20
+INDEX_FILENAME = "bibtex-index.sqlite3"
+DIRECTIVES = frozenset({"comment", "preamble", "string"})
+# Bumped when the index tables change; an index with another version is rebuilt.
+INDEX_SCHEMA_VERSION = 2
+
+_ENTRY_START = re.compile(rb"@[ \t\r\n]*([A-Za-z][\w-]*)[ \t\r\n]*([{(])")
+_BRACES = re.compile(rb"[{}]")
+_BRACES_OR_PAREN = re.compile(rb"[{})]")
+_TEXT_ENTRY_START = re.compile(r"@\s*([A-Za-z][\w-]*)\s*[{(]")
+_TEXT_BRACES = re.compile(r"[{}]")
+_TEXT_QUOTE_BRACES = re.compile(r'[{}"]')
+_SIMPLE_FIELD = re.compile(
+    r'\s*([^\s=,{}"#()]+)\s*=\s*(?:\{([^{}]*)\}|"([^"{}]*)"|(\d+))\s*(?:,|$)'
+)
+_FIELD_NAME = re.compile(r'\s*([^\s=,{}"#()]+)\s*=\s*')
+_SIMPLE_BRACED = re.compile(r"\{([^{}]*)\}")
+_BARE_VALUE = re.compile(r'[^\s,#{}"]+')
+
+# Matches a brace group nested up to four levels deep in one C-level pass; deeper
+# nesting, or a group cut off at the end of the buffer, falls back to counting.
+_BALANCED_PATTERN = rb"\{[^{}]*\}"
+for _ in range(3):
+    _BALANCED_PATTERN = rb"\{[^{}]*(?:" + _BALANCED_PATTERN + rb"[^{}]*)*\}"
+_BALANCED = re.compile(_BALANCED_PATTERN)
+_DOI_PREFIX = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    indexed_end INTEGER NOT NULL,
+    prefix_hash BLOB NOT NULL,
+    entries INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT NOT NULL,
+    key TEXT NOT NULL,
+    doi TEXT,
+    type TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_key ON entries(path, key);
+CREATE INDEX IF NOT EXISTS entries_doi ON entries(path, doi);
+"""
+
+
+def default_index_path() -> Path:
+    """Return the index database path inside the citation cache directory."""
+    return default_cache_dir() / INDEX_FILENAME
+
+
+def normalize_doi(doi: str) -> str:
+    """Strip resolver prefixes and case-fold a DOI for index lookups."""
+    return _DOI_PREFIX.sub("", doi.strip()).strip().lower()
+
+
+def iter_spans(
+    stream: IO[bytes], *, start: int = 0, chunk_size: int = CHUNK_SIZE
+) -> Iterator[tuple[str, int, int, bytes]]:
+    """Yield ``(entry_type, start, end, raw_bytes)`` for each entry in a binary stream.
+
+    ``start`` is the absolute offset the stream is positioned at, so offsets stay
+    file-relative when resuming mid-file. Text between entries is ignored, as BibTeX
+    does. An entry whose braces never balance is skipped and scanning resumes just
+    after its ``@``, so one typo does not swallow the rest of the library.
+    """
+    buf = b""
+    base = start
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, base, pos, eof
+        if eof:
+            return False
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        base += pos
+        pos = 0
+        return True
+
+    while True:
+        match = _ENTRY_START.search(buf, pos)
+        if match is None:
+            tail = buf.rfind(b"@", pos)
+            pos = tail if tail >= 0 else len(buf)
+            if not fill():
+                return
+            continue
+
+        entry_start = match.start()
+        pos = entry_start
+        entry_type = match.group(1).decode("ascii").lower()
+        if match.group(2) == b"{":
+            balanced = _BALANCED.match(buf, match.end() - 1)
+            if balanced is not None:
+                yield entry_type, base + pos, base + balanced.end(), buf[pos : balanced.end()]
+                pos = balanced.end()
+                continue
+        delims = _BRACES if match.group(2) == b"{" else _BRACES_OR_PAREN
+        depth = 1 if match.group(2) == b"{" else 0
+        scan = match.end() - pos
+        end = -1
+        while end < 0:
+            for delim in delims.finditer(buf, pos + scan):
+                char = delim.group()
+                if char == b"{":
+                    depth += 1
+                elif char == b"}":
+                    depth -= 1
+                    if depth == 0 and delims is _BRACES:
+                        end = delim.end()
+                        break
+                    depth = max(depth, 0)
+                elif depth == 0:
+                    end = delim.end()
+                    break
+            if end >= 0:
+                break
+            scan = len(buf) - pos
+            if not fill():
+                break
+        if end < 0:
+            pos += 1
+            continue
+
+        yield entry_type, base + pos, base + end, buf[pos:end]
+        pos = end
+
+
+def iter_entries(
+    source: str | os.PathLike[str] | IO[bytes],
+    *,
+    start: int = 0,
+    chunk_size: int = CHUNK_SIZE,
+    include_raw: bool = False,
+) -> Iterator[dict]:
+    """Yield parsed entries from a .bib path or binary stream.
+
+    Each entry is ``{"type", "key", "fields", "start", "end"}`` plus ``"raw"`` when
+    requested. Field names are lower-cased; values keep their inner braces, are
+    stripped, and have ``@string`` macros and ``#`` concatenation resolved.
+    ``@comment``, ``@preamble`` and ``@string`` blocks are not yielded.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as stream:
+            if start:
+                stream.seek(start)
+            yield from iter_entries(
+                stream, start=start, chunk_size=chunk_size, include_raw=include_raw
+            )
+        return
+
+    macros: dict[str, str] = {}
+    for entry_type, entry_start, entry_end, raw in iter_spans(
+        source, start=start, chunk_size=chunk_size
+    ):
+        text = raw.decode("utf-8", errors="replace")
+        if entry_type in DIRECTIVES:
+            if entry_type == "string":
+                header = _TEXT_ENTRY_START.match(text)
+                if header is not None:
+                    macros.update(_parse_fields(text[header.end() : -1], macros))
+            continue
+        entry = parse_entry(text, macros)
+        if entry is None:
+            continue
+        entry["start"] = entry_start
+        entry["end"] = entry_end
+        if include_raw:
+            entry["raw"] = text
+        yield entry
+
+
+def iter_entry_texts(
+    path: str | os.PathLike[str], *, chunk_size: int = CHUNK_SIZE
+) -> Iterator[tuple[str, dict[str, str], str]]:
+    """Yield ``(text, macros, macro_digest)`` for each citation entry, unparsed.
+
+    ``macros`` holds the ``@string`` definitions in effect at the entry and
+    ``macro_digest`` changes whenever they do, so a caller can key per-entry work
+    by ``(macro_digest, text)`` and call ``parse_entry(text, macros)`` only for
+    entries it has not seen.
+    """
+    macros: dict[str, str] = {}
+    macro_digest = ""
+    with open(path, "rb") as stream:
+        for entry_type, _start, _end, raw in iter_spans(stream, chunk_size=chunk_size):
+            text = raw.decode("utf-8", errors="replace")
+            if entry_type == "string":
+                header = _TEXT_ENTRY_START.match(text)
+                if header is not None:
+                    macros.update(_parse_fields(text[header.end() : -1], macros))
+                    macro_digest = hashlib.blake2b(
+                        (macro_digest + text).encode("utf-8"), digest_size=16
+                    ).hexdigest()
+            elif entry_type not in DIRECTIVES:
+                yield text, macros, macro_digest
+
+
+def parse_entry(text: str, macros: dict[str, str] | None = None) -> dict | None:
+    """Parse one complete ``@type{key, field = value, ...}`` entry."""
+    match = _TEXT_ENTRY_START.match(text)
+    if match is None:
+        return None
+    key, comma, rest = text[match.end() : -1].partition(",")
+    key = key.strip()
+    if not key:
+        return None
+    fields = _parse_fields(rest, macros or {}) if comma else {}
+    return {"type": match.group(1).lower(), "key": key, "fields": fields}
+
+
+def count_entries(path: str | os.PathLike[str]) -> int:
+    """Count citation entries without parsing their fields."""
+    with open(path, "rb") as stream:
+        return sum(
+            1 for entry_type, *_ in iter_spans(stream) if entry_type not in DIRECTIVES
+        )
+
+
+def read_entry(path: str | os.PathLike[str], start: int, end: int) -> dict | None:
+    """Parse the single entry stored at ``[start, end)`` of a .bib file."""
+    with open(path, "rb") as stream:
+        stream.seek(start)
+        raw = stream.read(end - start)
+    entry = parse_entry(raw.decode("utf-8", errors="replace"))
+    if entry is not None:
+        entry["start"] = start
+        entry["end"] = end
+    return entry
+
+
+def _parse_fields(text: str, macros: dict[str, str]) -> dict[str, str]:
+    fields: dict[str, str] = {}
+    pos = 0
+    length = len(text)
+    while pos < length:
+        simple = _SIMPLE_FIELD.match(text, pos)
+        if simple is not None:
+            name, braced, quoted, number = simple.group(1, 2, 3, 4)
+            value = braced if braced is not None else quoted if quoted is not None else number
+            fields[name.lower()] = value.strip()
+            pos = simple.end()
+            continue
+        match = _FIELD_NAME.match(text, pos)
+        if match is None:
+            break
+        name = match.group(1).lower()
+        pos = match.end()
+        parts: list[str] = []
+        while True:
+            part, pos = _parse_value(text, pos, macros)
+            if part is None:
+                return fields
+            parts.append(part)
+            while pos < length and text[pos].isspace():
+                pos += 1
+            if pos < length and text[pos] == "#":
+                pos += 1
+                while pos < length and text[pos].isspace():
+                    pos += 1
+                continue
+            break
+        fields[name] = "".join(parts).strip()
+        if pos < length and text[pos] == ",":
+            pos += 1
+        elif text[pos:].strip():
+            break
+    return fields
+
+
+def _parse_value(
+    text: str, pos: int, macros: dict[str, str]
+) -> tuple[str | None, int]:
+    if pos >= len(text):
+        return None, pos
+    char = text[pos]
+    if char == "{":
+        simple = _SIMPLE_BRACED.match(text, pos)
+        if simple is not None:
+            return simple.group(1), simple.end()
+        depth = 0
+        for delim in _TEXT_BRACES.finditer(text, pos):
+            depth += 1 if delim.group() == "{" else -1
+            if depth == 0:
+                return text[pos + 1 : delim.start()], delim.end()
+        return None, pos
+    if char == '"':
+        depth = 0
+        for delim in _TEXT_QUOTE_BRACES.finditer(text, pos + 1):
+            token = delim.group()
+            if token == "{":
+                depth += 1
+            elif token == "}":
+                depth -= 1
+            elif depth == 0:
+                return text[pos + 1 : delim.start()], delim.end()
+        return None, pos
+    bare = _BARE_VALUE.match(text, pos)
+    if bare is None:
+        return None, pos
+    token = bare.group()
+    return macros.get(token.lower(), token), bare.end()
+
+
+class BibIndex:
+    """SQLite index of entry offsets by citation key and DOI, across .bib files.
+
+    ``refresh`` re-tokenizes a file only when its size or mtime changed, and when
+    the file merely grew with its indexed prefix intact (the usual append of new
+    references) it tokenizes only the appended bytes. The prefix is checked
+    against a hash of every indexed byte, so an in-place edit of the same length
+    still forces a full reindex.
+    """
+
+    def __init__(self, path: str | os.PathLike[str] | None = None):
+        self.path = Path(path) if path else default_index_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_SCHEMA_VERSION:
+            with self.conn:
+                self.conn.execute("DROP TABLE IF EXISTS files")
+                self.conn.execute("DROP TABLE IF EXISTS entries")
+                self.conn.execute(f"PRAGMA user_version = {INDEX_SCHEMA_VERSION}")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> BibIndex:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def refresh(self, bib_path: str | os.PathLike[str]) -> int:
+        """Bring the index for ``bib_path`` up to date and return its entry count."""
+        bib = str(Path(bib_path).resolve())
+        stat = os.stat(bib)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, indexed_end, prefix_hash, entries FROM files WHERE path = ?",
+            (bib,),
+        ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[4]
+
+        with open(bib, "rb") as stream:
+            resume = 0
+            digest = _new_digest()
+            if row and stat.st_size >= row[0]:
+                # Hashing reads the prefix but is far cheaper than tokenizing it
+                _hash_range(stream, 0, row[2], digest)
+                if digest.digest() == row[3]:
+                    resume = row[2]
+                else:
+                    digest = _new_digest()
+            with self.conn:
+                if not resume:
+                    self.conn.execute("DELETE FROM entries WHERE path = ?", (bib,))
+                stream.seek(resume)
+                indexed_end = resume
+                added = 0
+                batch = []
+                for entry in iter_entries(stream, start=resume):
+                    doi = entry["fields"].get("doi")
+                    batch.append(
+                        (
+                            bib,
+                            entry["key"],
+                            normalize_doi(doi) if doi else None,
+                            entry["type"],
+                            entry["start"],
+                            entry["end"],
+                        )
+                    )
+                    indexed_end = entry["end"]
+                    added += 1
+                    if len(batch) >= 5000:
+                        self.conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)", batch)
+                        batch.clear()
+                self.conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)", batch)
+                total = (row[4] if resume and row else 0) + added
+                _hash_range(stream, resume, indexed_end, digest)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        bib,
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                        indexed_end,
+                        digest.digest(),
+                        total,
+                    ),
+                )
+        return total
+
+    def offsets(
+        self,
+        bib_path: str | os.PathLike[str],
+        *,
+        key: str | None = None,
+        doi: str | None = None,
+    ) -> list[tuple[int, int]]:
+        """Return ``(start, end)`` offsets of entries matching a key or DOI."""
+        if (key is None) == (doi is None):
+            raise ValueError("Pass exactly one of key or doi")
+        bib = str(Path(bib_path).resolve())
+        self.refresh(bib)
+        column, value = ("key", key) if key is not None else ("doi", normalize_doi(doi or ""))
+        return self.conn.execute(
+            f"SELECT start, end FROM entries WHERE path = ? AND {column} = ? ORDER BY start",
+            (bib, value),
+        ).fetchall()
+
+    def lookup(
+        self,
+        bib_path: str | os.PathLike[str],
+        *,
+        key: str | None = None,
+        doi: str | None = None,
+    ) -> list[dict]:
+        """Return the parsed entries matching a key or DOI, reading only their bytes."""
+        entries = []
+        for start, end in self.offsets(bib_path, key=key, doi=doi):
+            entry = read_entry(bib_path, start, end)
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+
+def _new_digest() -> hashlib.blake2b:
+    return hashlib.blake2b(digest_size=16)
+
+
+def _hash_range(stream: IO[bytes], start: int, end: int, digest: hashlib.blake2b) -> None:
+    stream.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = stream.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        digest.update(chunk)
+        remaining -= len(chunk)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream, count, and index BibTeX files")
+    parser.add_argument("--index-path", help="Index database (default: user cache directory)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    count_parser = subparsers.add_parser("count", help="Count citation entries")
+    count_parser.add_argument("file")
+
+    index_parser = subparsers.add_parser("index", help="Build or refresh the key/DOI index")
+    index_parser.add_argument("file", nargs="+")
+
+    lookup_parser = subparsers.add_parser("lookup", help="Print entries by key or DOI as JSON")
+    lookup_parser.add_argument("file")
+    target = lookup_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--key")
+    target.add_argument("--doi")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "count":
+            print(count_entries(args.file))
+            return
+        with BibIndex(args.index_path) as index:
+            if args.command == "index":
+                for path in args.file:
+                    print(f"{path}: {index.refresh(path)} entries", file=sys.stderr)
+            else:
+                entries = index.lookup(args.file, key=args.key, doi=args.doi)
+                print(json.dumps(entries, indent=2, ensure_ascii=False))
+                if not entries:
+                    sys.exit(1)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Persistent SQLite cache shared by the citation scripts.
+
+Entries are grouped by namespace (``"bibtex"`` for DOI content negotiation, and so
+on) and keyed by a normalized identifier. A cached value is reused until an
+optional per-call TTL expires, so DOI→BibTeX conversions done for one project are
+instant in the next.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+CACHE_FILENAME = "citations.sqlite3"
+# Errors from an unusable cache directory or database. The cache only saves
+# requests, so callers carry on uncached when they see one.
+CACHE_ERRORS = (OSError, sqlite3.Error)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    created REAL NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+
+def default_cache_dir() -> Path:
+    """Return the cache directory, honoring ``XDG_CACHE_HOME``."""
+    base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "scientific-writer" / "citation-management"
+
+
+def open_cache(directory: str | Path | None = None) -> CitationCache | None:
+    """Open the cache, or warn and return None when it cannot be used."""
+    try:
+        return CitationCache(directory)
+    except CACHE_ERRORS as exc:
+        print(f"Warning: Citation cache unavailable, continuing without it: {exc}", file=sys.stderr)
+        return None
+
+
+class CitationCache:
+    """Namespaced key/value cache on disk.
+
+    Safe to share between threads; each operation uses its own connection, and
+    SQLite's locking also makes the file safe to share between processes.
+    """
+
+    def __init__(self, directory: str | Path | None = None):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.path = self.directory / CACHE_FILENAME
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        connection = self._connect()
+        try:
+            connection.executescript(_SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def _record(self, hits: int, misses: int) -> None:
+        with self._counter_lock:
+            self.hits += hits
+            self.misses += misses
+
+    def get(self, namespace: str, key: str, *, ttl: float | None = None) -> Any | None:
+        """Return the cached value, or None when missing or older than ``ttl`` seconds."""
+        return self.get_many(namespace, [key], ttl=ttl).get(key)
+
+    def get_many(
+        self, namespace: str, keys: Iterable[str], *, ttl: float | None = None
+    ) -> dict[str, Any]:
+        """Return ``{key: value}`` for every fresh cached key."""
+        wanted = list(dict.fromkeys(keys))
+        found: dict[str, Any] = {}
+        oldest = time.time() - ttl if ttl is not None else None
+        connection = self._connect()
+        try:
+            for offset in range(0, len(wanted), 500):
+                chunk = wanted[offset : offset + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for key, created, value in connection.execute(
+                    f"SELECT key, created, value FROM entries "
+                    f"WHERE namespace = ? AND key IN ({placeholders})",
+                    (namespace, *chunk),
+                ):
+                    if oldest is None or created >= oldest:
+                        found[key] = json.loads(value)
+        finally:
+            connection.close()
+        self._record(len(found), len(wanted) - len(found))
+        return found
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        """Store one value."""
+        self.put_many(namespace, {key: value})
+
+    def put_many(self, namespace: str, values: dict[str, Any]) -> None:
+        """Store several values in one transaction."""
+        if not values:
+            return
+        now = time.time()
+        rows = [
+            (namespace, key, now, json.dumps(value, ensure_ascii=False))
+            for key, value in values.items()
+        ]
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "INSERT OR REPLACE INTO entries (namespace, key, created, value) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def stats(self) -> dict[str, int]:
+        """Return hit and miss counts for this cache object."""
+        with self._counter_lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Persistent citation graph for a manuscript project.
+
+One pass over a project's LaTeX, Markdown, and .bib files records where each
+cite key is used (file, line, column) and each bibliography entry's key and DOI.
+The graph lives in the same SQLite database as the BibTeX index
+(``bibtex_stream.BibIndex``). A refresh rescans only files whose size or mtime
+changed and forgets files that were deleted, and per-key use counts are adjusted
+by those files alone, so undefined- and unused-citation checks cost O(changed
+files) plus a query over the distinct keys, not a rescan of the project.
+
+Usage:
+    python citation_graph.py refresh paper/
+    python citation_graph.py check paper/
+    python citation_graph.py check paper/ --bib ~/library/references.bib
+    python citation_graph.py where paper/ smith2020
+    python citation_graph.py entries paper/ --unused
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import os
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from bibtex_stream import BibIndex
+
+LATEX_SUFFIXES = frozenset({".tex", ".ltx"})
+MARKDOWN_SUFFIXES = frozenset({".md", ".markdown", ".qmd", ".rmd"})
+SKIPPED_DIRECTORIES = frozenset({"node_modules", "__pycache__", "venv"})
+
+# \cite, \citep, \nocite, \parencite, \textcite, \Autocite, ... with up to two
+# optional arguments before the key list.
+_LATEX_CITE = re.compile(r"\\[A-Za-z]*[cC]ite[A-Za-z]*\*?(?:\s*\[[^\]]*\]){0,2}\s*\{([^}]*)\}")
+_LATEX_COMMENT = re.compile(r"(?<!\\)%.*")
+# Pandoc citations: @key or [@key1; @key2]. The look-behind skips e-mail
+# addresses and handles.
+_MARKDOWN_CITE = re.compile(r"(?<![a-zA-Z0-9_.-])@([a-zA-Z0-9_\-:]+)")
+_FENCE = re.compile(r"^[ \t]*(```|~~~)", re.MULTILINE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manuscripts (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    citations INTEGER NOT NULL,
+    PRIMARY KEY (root, path)
+);
+CREATE TABLE IF NOT EXISTS citations (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    key TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    col INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cited (
+    root TEXT NOT NULL,
+    key TEXT NOT NULL,
+    uses INTEGER NOT NULL,
+    PRIMARY KEY (root, key)
+);
+CREATE TABLE IF NOT EXISTS bibliographies (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS citations_path ON citations(root, path, key);
+CREATE INDEX IF NOT EXISTS citations_key ON citations(root, key);
+CREATE INDEX IF NOT EXISTS bibliographies_root ON bibliographies(root);
+CREATE INDEX IF NOT EXISTS entries_key_only ON entries(key);
+"""
+
+
+def manuscript_kind(path: str | os.PathLike[str]) -> str | None:
+    """Return ``"latex"`` or ``"markdown"`` for a manuscript file, else None."""
+    suffix = Path(path).suffix.lower()
+    if suffix in LATEX_SUFFIXES:
+        return "latex"
+    if suffix in MARKDOWN_SUFFIXES:
+        return "markdown"
+    return None
+
+
+def scan_text(text: str, kind: str | None = None) -> list[tuple[str, int, int]]:
+    """Return ``(key, line, column)`` for every citation in ``text``, 1-based.
+
+    ``kind="latex"`` reads cite commands outside ``%`` comments. Markdown also
+    reads Pandoc ``@key`` citations outside fenced code blocks, along with any
+    raw LaTeX cite commands; ``None`` (an unknown file type) reads both
+    everywhere.
+    """
+    line_starts = [0] + [match.end() for match in re.finditer("\n", text)]
+    if kind == "latex":
+        text = _LATEX_COMMENT.sub(lambda match: " " * len(match.group()), text)
+    elif kind == "markdown":
+        text = _blank_fences(text)
+
+    found = []
+    for match in _LATEX_CITE.finditer(text):
+        offset = match.start(1)
+        for part in match.group(1).split(","):
+            key = part.strip()
+            if key:
+                found.append((key, offset + part.index(key)))
+            offset += len(part) + 1
+    if kind != "latex":
+        for match in _MARKDOWN_CITE.finditer(text):
+            # Trailing punctuation ends a Pandoc key: "@smith2020: ..." cites smith2020.
+            key = match.group(1).rstrip(":-")
+            if key and not key.isdigit():
+                found.append((key, match.start(1)))
+
+    found.sort(key=lambda item: item[1])
+    citations = []
+    for key, offset in found:
+        line = bisect.bisect_right(line_starts, offset)
+        citations.append((key, line, offset - line_starts[line - 1] + 1))
+    return citations
+
+
+def scan_file(path: str | os.PathLike[str]) -> list[tuple[str, int, int]]:
+    """Read a manuscript and return its ``(key, line, column)`` citations."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return scan_text(f.read(), manuscript_kind(path))
+
+
+def _blank_fences(text: str) -> str:
+    """Blank out fenced code blocks, keeping line and column positions."""
+    fences = list(_FENCE.finditer(text))
+    if len(fences) < 2:
+        return text
+    pieces = []
+    position = 0
+    opened = None
+    for fence in fences:
+        if opened is None:
+            opened = fence
+        elif fence.group(1) == opened.group(1):
+            pieces.append(text[position:opened.start()])
+            pieces.append(re.sub(r"[^\n]", " ", text[opened.start():fence.end()]))
+            position = fence.end()
+            opened = None
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+
+def iter_project_files(root: str | os.PathLike[str]) -> Iterator[Path]:
+    """Yield manuscript and .bib files under ``root``, skipping hidden directories."""
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(
+            name
+            for name in subdirectories
+            if not name.startswith(".") and name not in SKIPPED_DIRECTORIES
+        )
+        for name in sorted(files):
+            path = Path(directory, name)
+            if path.suffix.lower() == ".bib" or manuscript_kind(path):
+                yield path
+
+
+class CitationGraph:
+    """Cite-key locations and bibliography entries per project, kept in SQLite.
+
+    Each project root has its own rows, so one database serves any number of
+    projects. Alongside every citation's location, ``refresh`` keeps a count
+    of uses per key for the project, adjusted only by the files that changed;
+    the undefined and unused checks read those counts instead of the
+    citations themselves.
+    """
+
+    def __init__(self, path: str | os.PathLike[str] | None = None):
+        self.bib_index = BibIndex(path)
+        self.conn = self.bib_index.conn
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.bib_index.close()
+
+    def __enter__(self) -> CitationGraph:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def refresh(
+        self,
+        root: str | os.PathLike[str],
+        bib_files: Iterable[str | os.PathLike[str]] = (),
+    ) -> dict[str, int]:
+        """Bring the graph for ``root`` up to date.
+
+        ``bib_files`` outside the project are indexed too. Returns counts of
+        manuscripts ``scanned`` (new or changed), ``unchanged``, and
+        ``removed``, and of bibliography ``entries``.
+        """
+        project = _project(root)
+        stats = {"scanned": 0, "unchanged": 0, "removed": 0, "entries": 0}
+        known = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self.conn.execute(
+                "SELECT path, size, mtime_ns FROM manuscripts WHERE root = ?", (project,)
+            )
+        }
+        bibs = []
+        with self.conn:
+            for path in iter_project_files(project):
+                resolved = str(path.resolve())
+                if path.suffix.lower() == ".bib":
+                    bibs.append(resolved)
+                    continue
+                stat = os.stat(resolved)
+                previous = known.pop(resolved, None)
+                if previous == (stat.st_size, stat.st_mtime_ns):
+                    stats["unchanged"] += 1
+                    continue
+                citations = scan_file(resolved)
+                if previous is not None:
+                    self._forget_manuscript(project, resolved)
+                self.conn.executemany(
+                    "INSERT INTO citations VALUES (?, ?, ?, ?, ?)",
+                    [(project, resolved, key, line, column) for key, line, column in citations],
+                )
+                self.conn.executemany(
+                    "INSERT INTO cited VALUES (?, ?, ?) ON CONFLICT (root, key) "
+                    "DO UPDATE SET uses = uses + excluded.uses",
+                    [(project, key, uses) for key, uses in Counter(c[0] for c in citations).items()],
+                )
+                self.conn.execute(
+                    "INSERT INTO manuscripts VALUES (?, ?, ?, ?, ?)",
+                    (project, resolved, stat.st_size, stat.st_mtime_ns, len(citations)),
+                )
+                stats["scanned"] += 1
+            for resolved in known:
+                self._forget_manuscript(project, resolved)
+                stats["removed"] += 1
+            self.conn.execute("DELETE FROM cited WHERE root = ? AND uses <= 0", (project,))
+            self.conn.execute("DELETE FROM bibliographies WHERE root = ?", (project,))
+            self.conn.executemany(
+                "INSERT INTO bibliographies VALUES (?, ?)", [(project, bib) for bib in bibs]
+            )
+        for bib in bibs + [str(Path(path).resolve()) for path in bib_files]:
+            stats["entries"] += self.bib_index.refresh(bib)
+        return stats
+
+    def _forget_manuscript(self, project: str, path: str) -> None:
+        """Drop a manuscript's citations and subtract them from the key counts."""
+        self.conn.executemany(
+            "UPDATE cited SET uses = uses - ? WHERE root = ? AND key = ?",
+            [
+                (uses, project, key)
+                for key, uses in self.conn.execute(
+                    "SELECT key, COUNT(*) FROM citations WHERE root = ? AND path = ? GROUP BY key",
+                    (project, path),
+                ).fetchall()
+            ],
+        )
+        self.conn.execute("DELETE FROM citations WHERE root = ? AND path = ?", (project, path))
+        self.conn.execute("DELETE FROM manuscripts WHERE root = ? AND path = ?", (project, path))
+
+    def citations(self, root: str | os.PathLike[str]) -> dict[str, int]:
+        """Map each key cited under ``root`` to its number of uses, in key order."""
+        return dict(
+            self.conn.execute(
+                "SELECT key, uses FROM cited WHERE root = ? ORDER BY key", (_project(root),)
+            ).fetchall()
+        )
+
+    def locations(self, root: str | os.PathLike[str], key: str) -> list[dict]:
+        """Return every use of ``key`` under ``root`` as ``file``, ``line``, ``column``."""
+        rows = self.conn.execute(
+            "SELECT path, line, col FROM citations WHERE root = ? AND key = ? "
+            "ORDER BY path, line, col",
+            (_project(root), key),
+        )
+        return [{"file": path, "line": line, "column": column} for path, line, column in rows]
+
+    def entries(
+        self,
+        root: str | os.PathLike[str],
+        bib_files: Iterable[str | os.PathLike[str]] | None = None,
+    ) -> list[dict]:
+        """Return the bibliography entries with their DOI and use count under ``root``.
+
+        The bibliography is ``bib_files`` when given, else every .bib file
+        under ``root``.
+        """
+        project = _project(root)
+        scope, parameters = _bib_scope(project, bib_files)
+        rows = self.conn.execute(
+            "SELECT e.key, e.doi, e.path, COALESCE(c.uses, 0) FROM entries e "
+            "LEFT JOIN cited c ON c.root = ? AND c.key = e.key "
+            f"WHERE {scope} ORDER BY e.path, e.start",
+            (project, *parameters),
+        )
+        return [
+            {"key": key, "doi": doi, "file": path, "uses": uses}
+            for key, doi, path, uses in rows
+        ]
+
+    def undefined(
+        self,
+        root: str | os.PathLike[str],
+        bib_files: Iterable[str | os.PathLike[str]] | None = None,
+    ) -> list[str]:
+        """Return keys cited under ``root`` with no entry in the bibliography."""
+        project = _project(root)
+        scope, parameters = _bib_scope(project, bib_files)
+        rows = self.conn.execute(
+            "SELECT c.key FROM cited c WHERE c.root = ? AND c.key != '*' AND NOT EXISTS "
+            f"(SELECT 1 FROM entries e WHERE e.key = c.key AND {scope}) ORDER BY c.key",
+            (project, *parameters),
+        )
+        return [row[0] for row in rows]
+
+    def unused(
+        self,
+        root: str | os.PathLike[str],
+        bib_files: Iterable[str | os.PathLike[str]] | None = None,
+    ) -> list[str]:
+        """Return bibliography keys never cited under ``root`` (none after ``\\nocite{*}``)."""
+        if self.conn.execute(
+            "SELECT 1 FROM cited WHERE root = ? AND key = '*'", (_project(root),)
+        ).fetchone():
+            return []
+        return [entry["key"] for entry in self.entries(root, bib_files) if not entry["uses"]]
+
+
+def _project(root: str | os.PathLike[str]) -> str:
+    return str(Path(root).resolve())
+
+
+def _bib_scope(
+    project: str, bib_files: Iterable[str | os.PathLike[str]] | None
+) -> tuple[str, tuple]:
+    """SQL condition on ``e.path`` selecting the bibliography, with its parameters."""
+    if bib_files is None:
+        return "e.path IN (SELECT path FROM bibliographies WHERE root = ?)", (project,)
+    paths = tuple(str(Path(path).resolve()) for path in bib_files)
+    if not paths:
+        return "0", ()
+    return f"e.path IN ({', '.join('?' * len(paths))})", paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Index cite keys and bibliography entries across a manuscript project"
+    )
+    parser.add_argument("--index-path", help="Index database (default: user cache directory)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    refresh_parser = subparsers.add_parser("refresh", help="Build or update the graph")
+    check_parser = subparsers.add_parser(
+        "check", help="Report undefined and unused citations as JSON (exit 1 if any undefined)"
+    )
+    where_parser = subparsers.add_parser("where", help="Print where a key is cited as JSON")
+    entries_parser = subparsers.add_parser(
+        "entries", help="Print bibliography entries with DOI and use count as JSON"
+    )
+    for subparser in (refresh_parser, check_parser, where_parser, entries_parser):
+        subparser.add_argument("root", help="Project directory")
+        subparser.add_argument(
+            "--bib",
+            action="append",
+            help="Bibliography file to check against (repeatable; default: .bib files in the project)",
+        )
+    where_parser.add_argument("key")
+    entries_parser.add_argument("--unused", action="store_true", help="Only uncited entries")
+
+    args = parser.parse_args()
+    if not os.path.isdir(args.root):
+        print(f"Error: {args.root} is not a directory", file=sys.stderr)
+        sys.exit(1)
+    try:
+        with CitationGraph(args.index_path) as graph:
+            stats = graph.refresh(args.root, args.bib or ())
+            if args.command == "refresh":
+                print(
+                    f"{stats['scanned']} manuscripts scanned, {stats['unchanged']} unchanged, "
+                    f"{stats['removed']} removed; {stats['entries']} bibliography entries",
+                    file=sys.stderr,
+                )
+            elif args.command == "check":
+                undefined = graph.undefined(args.root, args.bib)
+                report = {
+                    "cited_keys": len(graph.citations(args.root)),
+                    "undefined": [
+                        {"key": key, "locations": graph.locations(args.root, key)}
+                        for key in undefined
+                    ],
+                    "unused": graph.unused(args.root, args.bib),
+                }
+                print(json.dumps(report, indent=2, ensure_ascii=False))
+                if undefined:
+                    sys.exit(1)
+            elif args.command == "where":
+                print(json.dumps(graph.locations(args.root, args.key), indent=2))
+            else:
+                entries = graph.entries(args.root, args.bib)
+                if args.unused:
+                    unused = set(graph.unused(args.root, args.bib))
+                    entries = [entry for entry in entries if entry["key"] in unused]
+                print(json.dumps(entries, indent=2, ensure_ascii=False))
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
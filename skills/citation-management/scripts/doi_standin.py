@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Offline stand-in for DOI content negotiation.
+
+Answers ``GET /<doi>`` with ``Accept: application/x-bibtex`` by returning a
+deterministic BibTeX entry, over HTTP/1.1 keep-alive, with optional latency,
+throttling and advertised rate limits. DOIs whose suffix starts with ``missing``
+return 404. ``doi_to_bibtex.py`` and its benchmark can then run without network
+access.
+
+Usage:
+    python doi_standin.py --port 8766 --latency 0.2 --throttle-every 50
+    DOI_RESOLVER_BASE=http://127.0.0.1:8766 \\
+        python doi_to_bibtex.py 10.1000/example.1 10.1000/example.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import unquote
+
+
+def bibtex_payload(doi: str) -> str:
+    """Return a deterministic BibTeX entry for a DOI."""
+    digest = hashlib.sha256(doi.lower().encode("utf-8")).hexdigest()
+    year = 1990 + int(digest[:4], 16) % 35
+    return (
+        f"@article{{Standin_{digest[:8]}_{year},\n"
+        f"\ttitle = {{Stand-in study {{{digest[8:14]}}}}},\n"
+        f"\tauthor = {{Author, Ada and Writer, Ben}},\n"
+        f"\tjournal = {{Journal of Stand-ins}},\n"
+        f"\tyear = {year},\n"
+        f"\tvolume = {{{int(digest[14:16], 16)}}},\n"
+        f"\tpages = {{1--{int(digest[16:18], 16) + 2}}},\n"
+        f"\tdoi = {{{doi}}},\n"
+        f"\turl = {{http://dx.doi.org/{doi}}}\n"
+        f"}}"
+    )
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY, Nagle's
+    # algorithm and delayed ACKs add ~40 ms to every keep-alive response.
+    disable_nagle_algorithm = True
+    server: "StandinServer"
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming
+        doi = unquote(self.path.lstrip("/"))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.should_throttle():
+            self._reply(429, "Too Many Requests", {"Retry-After": f"{self.server.retry_after:g}"})
+            return
+        if "bibtex" not in (self.headers.get("Accept") or ""):
+            self._reply(406, "Only application/x-bibtex is served")
+            return
+        if "/" not in doi or doi.split("/", 1)[1].startswith("missing"):
+            self._reply(404, f"DOI not found: {doi}")
+            return
+        self.server.count_request()
+        self._reply(200, bibtex_payload(doi), content_type="application/x-bibtex; charset=utf-8")
+
+    def _reply(
+        self,
+        status: int,
+        text: str,
+        headers: dict[str, str] | None = None,
+        content_type: str = "text/plain; charset=utf-8",
+    ) -> None:
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if self.server.advertised_rate:
+            self.send_header("X-Rate-Limit-Limit", str(self.server.advertised_rate))
+            self.send_header("X-Rate-Limit-Interval", "1s")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        del format, args
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Threaded stand-in; ``requests_served`` counts entries returned and
+    ``throttled`` counts 429 responses."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        latency: float = 0.0,
+        throttle_every: int = 0,
+        retry_after: float = 1.0,
+        advertised_rate: int = 0,
+    ):
+        super().__init__(address, StandinHandler)
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.advertised_rate = advertised_rate
+        self.requests_received = 0
+        self.requests_served = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def should_throttle(self) -> bool:
+        with self._lock:
+            self.requests_received += 1
+            if self.throttle_every and self.requests_received % self.throttle_every == 0:
+                self.throttled += 1
+                return True
+            return False
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests_served += 1
+
+
+def start_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    throttle_every: int = 0,
+    retry_after: float = 1.0,
+    advertised_rate: int = 0,
+) -> StandinServer:
+    """Start a stand-in server on a background thread and return it.
+
+    Port 0 picks a free port; read it back from ``server.base_url``. Call
+    ``server.shutdown()`` when done.
+    """
+    server = StandinServer(
+        (host, port), latency, throttle_every, retry_after, advertised_rate
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every response"
+    )
+    parser.add_argument(
+        "--throttle-every", type=int, default=0, help="Answer every Nth request with 429"
+    )
+    parser.add_argument(
+        "--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429"
+    )
+    parser.add_argument(
+        "--advertise-rate",
+        type=int,
+        default=0,
+        help="Requests per second advertised in X-Rate-Limit-* headers",
+    )
+    args = parser.parse_args()
+    server = StandinServer(
+        (args.host, args.port),
+        args.latency,
+        args.throttle_every,
+        args.retry_after,
+        args.advertise_rate,
+    )
+    print(f"DOI stand-in listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,24 +2,72 @@
 """
 DOI to BibTeX Converter
 Quick utility to convert DOIs to BibTeX format using CrossRef API.
+
+Batches resolve concurrently over one keep-alive session, throttled by a
+polite-pool rate limiter that honors Retry-After and is shared with every other
+process on the machine that calls CrossRef. Converted entries are kept in a
+persistent cache, so a DOI resolved once is instant in every later project. Set
+DOI_RESOLVER_BASE to point the converter at doi_standin.py.
 """
 
+import os
 import sys
 import requests
 import argparse
-import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List
 
+from citation_cache import CACHE_ERRORS, CitationCache, open_cache
+from polite_http import RateLimiter, pooled_session, send
+
+DEFAULT_RESOLVER = 'https://doi.org'
+DEFAULT_WORKERS = 4
+# CrossRef's polite pool; lowered automatically to any X-Rate-Limit-* budget
+# the server advertises.
+DEFAULT_RATE = 10.0
+CACHE_NAMESPACE = 'bibtex'
+
+
 class DOIConverter:
     """Convert DOIs to BibTeX entries using CrossRef API."""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'DOIConverter/1.0 (Citation Management Tool; mailto:support@example.com)'
+    def __init__(self, cache: Optional[CitationCache] = None, workers: int = DEFAULT_WORKERS,
+                 rate: float = DEFAULT_RATE, mailto: Optional[str] = None,
+                 resolver: Optional[str] = None, refresh: bool = False):
+        """
+        Args:
+            cache: Persistent DOI→BibTeX cache (None disables caching)
+            workers: Concurrent requests in convert_multiple
+            rate: Maximum requests per second across all workers (0 disables)
+            mailto: Contact address for CrossRef's polite pool
+                (default: CROSSREF_MAILTO)
+            resolver: DOI resolver root (default: DOI_RESOLVER_BASE or doi.org)
+            refresh: Ignore cached entries and re-resolve every DOI
+        """
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.refresh = refresh
+        self.resolver = (resolver or os.getenv('DOI_RESOLVER_BASE') or DEFAULT_RESOLVER).rstrip('/')
+        # doi.org hands content negotiation to CrossRef, so both share one budget
+        self.limiter = RateLimiter(rate, burst=self.workers, service='crossref')
+        mailto = mailto or os.getenv('CROSSREF_MAILTO') or 'support@example.com'
+        self.session = pooled_session(self.workers, {
+            'User-Agent': f'DOIConverter/1.0 (Citation Management Tool; mailto:{mailto})'
         })
     
+    @staticmethod
+    def clean_doi(doi: str) -> str:
+        """Strip whitespace and resolver prefixes from a DOI."""
+        doi = doi.strip()
+        if doi.startswith('https://doi.org/'):
+            doi = doi.replace('https://doi.org/', '')
+        elif doi.startswith('http://doi.org/'):
+            doi = doi.replace('http://doi.org/', '')
+        elif doi.startswith('doi:'):
+            doi = doi.replace('doi:', '')
+        return doi
+    
     def doi_to_bibtex(self, doi: str) -> Optional[str]:
         """
         Convert a single DOI to BibTeX format.
@@ -30,30 +78,40 @@ class DOIConverter:
         Returns:
             BibTeX string or None if conversion fails
         """
-        # Clean DOI (remove URL prefix if present)
-        doi = doi.strip()
-        if doi.startswith('https://doi.org/'):
-            doi = doi.replace('https://doi.org/', '')
-        elif doi.startswith('http://doi.org/'):
-            doi = doi.replace('http://doi.org/', '')
-        elif doi.startswith('doi:'):
-            doi = doi.replace('doi:', '')
+        doi = self.clean_doi(doi)
+        
+        # DOIs are case-insensitive, so the cache key is case-folded
+        cache_key = doi.lower()
+        if self.cache is not None and not self.refresh:
+            try:
+                cached = self.cache.get(CACHE_NAMESPACE, cache_key)
+            except CACHE_ERRORS as e:
+                print(f'Warning: Could not read the DOI cache for {doi}: {e}', file=sys.stderr)
+                cached = None
+            if cached is not None:
+                return cached
         
-        # Request BibTeX from CrossRef content negotiation
-        url = f'https://doi.org/{doi}'
-        headers = {
-            'Accept': 'application/x-bibtex',
-            'User-Agent': 'DOIConverter/1.0 (Citation Management Tool)'
-        }
+        # Request BibTeX from CrossRef content negotiation. The session's
+        # User-Agent carries the polite-pool mailto.
+        url = f'{self.resolver}/{doi}'
+        headers = {'Accept': 'application/x-bibtex'}
         
         try:
-            response = self.session.get(url, headers=headers, timeout=15)
+            response = send(self.session, 'GET', url, limiter=self.limiter,
+                            headers=headers, timeout=15)
             
             if response.status_code == 200:
+                response.encoding = response.encoding or 'utf-8'
                 bibtex = response.text.strip()
                 # CrossRef sometimes returns entries with @data type, convert to @misc
                 if bibtex.startswith('@data{'):
                     bibtex = bibtex.replace('@data{', '@misc{', 1)
+                if self.cache is not None:
+                    try:
+                        self.cache.put(CACHE_NAMESPACE, cache_key, bibtex)
+                    except CACHE_ERRORS as e:
+                        # The entry is still returned; only the cache misses out
+                        print(f'Warning: Could not cache BibTeX for {doi}: {e}', file=sys.stderr)
                 return bibtex
             elif response.status_code == 404:
                 print(f'Error: DOI not found: {doi}', file=sys.stderr)
@@ -69,29 +127,44 @@ class DOIConverter:
             print(f'Error: Request failed for {doi}: {e}', file=sys.stderr)
             return None
     
-    def convert_multiple(self, dois: List[str], delay: float = 0.5) -> List[str]:
+    def convert_multiple(self, dois: List[str], delay: Optional[float] = None) -> List[str]:
         """
-        Convert multiple DOIs to BibTeX.
+        Convert multiple DOIs to BibTeX concurrently.
+        
+        Cached DOIs return immediately; the rest are resolved by the worker
+        pool under the shared rate limiter. Repeated DOIs are resolved once.
         
         Args:
             dois: List of DOIs
-            delay: Delay between requests (seconds) for rate limiting
+            delay: Minimum seconds between requests; overrides the polite-pool
+                rate when given
             
         Returns:
-            List of BibTeX entries (excludes failed conversions)
+            List of BibTeX entries in input order (excludes failed conversions)
         """
-        bibtex_entries = []
+        if delay is not None:
+            self.limiter.rate = 1 / delay if delay > 0 else 0
         
-        for i, doi in enumerate(dois):
-            print(f'Converting DOI {i+1}/{len(dois)}: {doi}', file=sys.stderr)
-            bibtex = self.doi_to_bibtex(doi)
-            
+        # DOIs are case-insensitive; resolve each distinct one once
+        unique = {}
+        for doi in dois:
+            cleaned = self.clean_doi(doi)
+            unique.setdefault(cleaned.lower(), cleaned)
+        total = len(unique)
+        
+        def convert(item):
+            i, doi = item
+            print(f'Converting DOI {i+1}/{total}: {doi}', file=sys.stderr)
+            return self.doi_to_bibtex(doi)
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = dict(zip(unique, pool.map(convert, enumerate(unique.values()))))
+        
+        bibtex_entries = []
+        for doi in dois:
+            bibtex = results.get(self.clean_doi(doi).lower())
             if bibtex:
                 bibtex_entries.append(bibtex)
-            
-            # Rate limiting
-            if i < len(dois) - 1:  # Don't delay after last request
-                time.sleep(delay)
         
         return bibtex_entries
 
@@ -122,8 +195,43 @@ def main():
     parser.add_argument(
         '--delay',
         type=float,
-        default=0.5,
-        help='Delay between requests in seconds (default: 0.5)'
+        help='Minimum delay between requests in seconds (overrides --rate)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Concurrent requests (default: {DEFAULT_WORKERS})'
+    )
+    
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=DEFAULT_RATE,
+        help=f'Maximum requests per second across workers (default: {DEFAULT_RATE:g})'
+    )
+    
+    parser.add_argument(
+        '--mailto',
+        help='Contact email for the CrossRef polite pool (default: CROSSREF_MAILTO)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        help='Directory of the persistent DOI cache (default: user cache directory)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the persistent DOI cache'
+    )
+    
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Re-resolve every DOI and overwrite cached entries'
     )
     
     parser.add_argument(
@@ -157,8 +265,13 @@ def main():
         parser.print_help()
         sys.exit(1)
     
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    
     # Convert DOIs
-    converter = DOIConverter()
+    cache = None if args.no_cache else open_cache(args.cache_dir)
+    converter = DOIConverter(cache=cache, workers=args.workers, rate=args.rate,
+                             mailto=args.mailto, refresh=args.refresh)
     
     if len(dois) == 1:
         bibtex = converter.doi_to_bibtex(dois[0])
@@ -198,6 +311,8 @@ def main():
     if len(dois) > 1:
         success_rate = len(bibtex_entries) / len(dois) * 100
         print(f'\nConverted {len(bibtex_entries)}/{len(dois)} DOIs ({success_rate:.1f}%)', file=sys.stderr)
+        if cache is not None:
+            print(f'Cache hits: {cache.stats()["hits"]}', file=sys.stderr)
 
 
 if __name__ == '__main__':
@@ -2,34 +2,84 @@
 """
 Metadata Extraction Tool
 Extract citation metadata from DOI, PMID, arXiv ID, or URL using various APIs.
+
+Lists of identifiers are resolved in bulk: PubMed and arXiv IDs in batched
+requests, DOIs concurrently, each service under its own rate limit, which every
+process on the machine shares. Normalized metadata is kept in the persistent
+citation cache for a configurable TTL.
 """
 
 import sys
 import os
-import requests
 import argparse
-import time
 import re
 import json
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List, Tuple
 from urllib.parse import urlparse
 
+from citation_cache import CACHE_ERRORS, CitationCache, open_cache
+from polite_http import ConditionalCache, RateLimiter, pooled_session, send
+
+CROSSREF_API = 'https://api.crossref.org'
+EFETCH_URL = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi'
+ARXIV_API = 'http://export.arxiv.org/api/query'
+ARXIV_NS = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
+
+# NCBI accepts up to 200 IDs per efetch; arXiv id_list queries are kept to 100.
+PUBMED_BATCH_SIZE = 200
+ARXIV_BATCH_SIZE = 100
+DEFAULT_WORKERS = 4
+# Requests per second: CrossRef's polite pool, NCBI without/with an API key,
+# and arXiv's one request every three seconds.
+CROSSREF_RATE = 10.0
+NCBI_RATE = 3.0
+NCBI_KEY_RATE = 10.0
+ARXIV_RATE = 1 / 3
+CACHE_NAMESPACE = 'metadata'
+DEFAULT_CACHE_TTL = 30 * 24 * 3600
+
+
 class MetadataExtractor:
     """Extract metadata from various sources and generate BibTeX."""
     
-    def __init__(self, email: Optional[str] = None):
+    def __init__(self, email: Optional[str] = None, cache: Optional[CitationCache] = None,
+                 workers: int = DEFAULT_WORKERS, cache_ttl: float = DEFAULT_CACHE_TTL,
+                 refresh: bool = False):
         """
         Initialize extractor.
         
         Args:
             email: Email for Entrez API (recommended for PubMed)
+            cache: Persistent metadata cache (None disables caching)
+            workers: Concurrent requests in extract_many
+            cache_ttl: Seconds cached metadata stays fresh
+            refresh: Ignore cached metadata and fetch everything again
         """
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'MetadataExtractor/1.0 (Citation Management Tool)'
-        })
+        self.workers = max(1, workers)
+        user_agent = 'MetadataExtractor/1.0 (Citation Management Tool)'
+        mailto = os.getenv('CROSSREF_MAILTO')
+        if mailto:
+            user_agent = f'MetadataExtractor/1.0 (Citation Management Tool; mailto:{mailto})'
+        self.session = pooled_session(self.workers, {'User-Agent': user_agent})
         self.email = email or os.getenv('NCBI_EMAIL', '')
+        self.cache = cache
+        # Expired metadata is revalidated with ETag/Last-Modified, not re-downloaded
+        self.http_cache = ConditionalCache(cache.directory / 'http') if cache is not None else None
+        self.cache_ttl = cache_ttl
+        self.refresh = refresh
+        # The environment can point each service elsewhere, e.g. at service_standin.py
+        self.crossref_api = (os.getenv('CROSSREF_API_BASE') or CROSSREF_API).rstrip('/')
+        eutils_base = os.getenv('EUTILS_BASE')
+        self.efetch_url = eutils_base + 'efetch.fcgi' if eutils_base else EFETCH_URL
+        self.arxiv_api = os.getenv('ARXIV_API_URL') or ARXIV_API
+        ncbi_rate = NCBI_KEY_RATE if os.getenv('NCBI_API_KEY') else NCBI_RATE
+        self.limiters = {
+            'crossref': RateLimiter(CROSSREF_RATE, burst=self.workers, service='crossref'),
+            'pubmed': RateLimiter(ncbi_rate, service='ncbi'),
+            'arxiv': RateLimiter(ARXIV_RATE, service='arxiv'),
+        }
     
     def identify_type(self, identifier: str) -> Tuple[str, str]:
         """
@@ -105,31 +155,15 @@ class MetadataExtractor:
         Returns:
             Metadata dictionary or None
         """
-        url = f'https://api.crossref.org/works/{doi}'
+        url = f'{self.crossref_api}/works/{doi}'
         
         try:
-            response = self.session.get(url, timeout=15)
+            response = send(self.session, 'GET', url, limiter=self.limiters['crossref'],
+                            cache=self.http_cache, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
-                message = data.get('message', {})
-                
-                metadata = {
-                    'type': 'doi',
-                    'entry_type': self._crossref_type_to_bibtex(message.get('type')),
-                    'doi': doi,
-                    'title': message.get('title', [''])[0],
-                    'authors': self._format_authors_crossref(message.get('author', [])),
-                    'year': self._extract_year_crossref(message),
-                    'journal': message.get('container-title', [''])[0] if message.get('container-title') else '',
-                    'volume': str(message.get('volume', '')) if message.get('volume') else '',
-                    'issue': str(message.get('issue', '')) if message.get('issue') else '',
-                    'pages': message.get('page', ''),
-                    'publisher': message.get('publisher', ''),
-                    'url': f'https://doi.org/{doi}'
-                }
-                
-                return metadata
+                return self._metadata_from_crossref(doi, data.get('message', {}))
             else:
                 print(f'Error: CrossRef API returned status {response.status_code} for DOI: {doi}', file=sys.stderr)
                 return None
@@ -148,10 +182,21 @@ class MetadataExtractor:
         Returns:
             Metadata dictionary or None
         """
-        url = f'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi'
+        return self.extract_from_pmids([pmid]).get(pmid)
+    
+    def extract_from_pmids(self, pmids: List[str]) -> Dict[str, Dict]:
+        """
+        Extract metadata for up to PUBMED_BATCH_SIZE PMIDs with one efetch call.
+        
+        Args:
+            pmids: PubMed IDs
+            
+        Returns:
+            Dictionary mapping each found PMID to its metadata
+        """
         params = {
             'db': 'pubmed',
-            'id': pmid,
+            'id': ','.join(pmids),
             'retmode': 'xml',
             'rettype': 'abstract'
         }
@@ -163,52 +208,31 @@ class MetadataExtractor:
         if api_key:
             params['api_key'] = api_key
         
+        found = {}
         try:
-            response = self.session.get(url, params=params, timeout=15)
+            # POST keeps long ID lists out of the URL, as NCBI recommends
+            # EFetch only reads, so a timed-out POST is safe to send again
+            response = send(self.session, 'POST', self.efetch_url, limiter=self.limiters['pubmed'],
+                            data=params, timeout=30, idempotent=True)
             
             if response.status_code == 200:
                 root = ET.fromstring(response.content)
-                article = root.find('.//PubmedArticle')
-                
-                if article is None:
-                    print(f'Error: No article found for PMID: {pmid}', file=sys.stderr)
-                    return None
-                
-                # Extract metadata from XML
-                medline_citation = article.find('.//MedlineCitation')
-                article_elem = medline_citation.find('.//Article')
-                journal = article_elem.find('.//Journal')
-                
-                # Get DOI if available
-                doi = None
-                article_ids = article.findall('.//ArticleId')
-                for article_id in article_ids:
-                    if article_id.get('IdType') == 'doi':
-                        doi = article_id.text
-                        break
-                
-                metadata = {
-                    'type': 'pmid',
-                    'entry_type': 'article',
-                    'pmid': pmid,
-                    'title': article_elem.findtext('.//ArticleTitle', ''),
-                    'authors': self._format_authors_pubmed(article_elem.findall('.//Author')),
-                    'year': self._extract_year_pubmed(article_elem),
-                    'journal': journal.findtext('.//Title', ''),
-                    'volume': journal.findtext('.//JournalIssue/Volume', ''),
-                    'issue': journal.findtext('.//JournalIssue/Issue', ''),
-                    'pages': article_elem.findtext('.//Pagination/MedlinePgn', ''),
-                    'doi': doi
-                }
-                
-                return metadata
+                for article in root.iter('PubmedArticle'):
+                    metadata = self._metadata_from_pubmed(article)
+                    if metadata:
+                        found[metadata['pmid']] = metadata
             else:
-                print(f'Error: PubMed API returned status {response.status_code} for PMID: {pmid}', file=sys.stderr)
-                return None
+                print(f'Error: PubMed API returned status {response.status_code} for PMIDs: {", ".join(pmids)}', file=sys.stderr)
+                return found
                 
         except Exception as e:
-            print(f'Error extracting metadata from PMID {pmid}: {e}', file=sys.stderr)
-            return None
+            print(f'Error extracting metadata from PMIDs {", ".join(pmids)}: {e}', file=sys.stderr)
+            return found
+        
+        for pmid in pmids:
+            if pmid not in found:
+                print(f'Error: No article found for PMID: {pmid}', file=sys.stderr)
+        return found
     
     def extract_from_arxiv(self, arxiv_id: str) -> Optional[Dict]:
         """
@@ -220,65 +244,204 @@ class MetadataExtractor:
         Returns:
             Metadata dictionary or None
         """
-        url = 'http://export.arxiv.org/api/query'
+        return self.extract_from_arxiv_ids([arxiv_id]).get(arxiv_id)
+    
+    def extract_from_arxiv_ids(self, arxiv_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Extract metadata for several arXiv IDs with one id_list query.
+        
+        An ID without a version matches the latest version arXiv returns.
+        
+        Args:
+            arxiv_ids: arXiv identifiers
+            
+        Returns:
+            Dictionary mapping each found ID (as given) to its metadata
+        """
         params = {
-            'id_list': arxiv_id,
-            'max_results': 1
+            'id_list': ','.join(arxiv_ids),
+            'max_results': len(arxiv_ids)
         }
         
+        found = {}
         try:
-            response = self.session.get(url, params=params, timeout=15)
+            response = send(self.session, 'GET', self.arxiv_api, limiter=self.limiters['arxiv'],
+                            cache=self.http_cache, params=params, timeout=30)
             
             if response.status_code == 200:
                 # Parse Atom XML
                 root = ET.fromstring(response.content)
-                ns = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
-                
-                entry = root.find('atom:entry', ns)
-                if entry is None:
-                    print(f'Error: No entry found for arXiv ID: {arxiv_id}', file=sys.stderr)
-                    return None
-                
-                # Extract DOI if published
-                doi_elem = entry.find('arxiv:doi', ns)
-                doi = doi_elem.text if doi_elem is not None else None
-                
-                # Extract journal reference if published
-                journal_ref_elem = entry.find('arxiv:journal_ref', ns)
-                journal_ref = journal_ref_elem.text if journal_ref_elem is not None else None
-                
-                # Get publication date
-                published = entry.findtext('atom:published', '', ns)
-                year = published[:4] if published else ''
-                
-                # Get authors
-                authors = []
-                for author in entry.findall('atom:author', ns):
-                    name = author.findtext('atom:name', '', ns)
-                    if name:
-                        authors.append(name)
-                
-                metadata = {
-                    'type': 'arxiv',
-                    'entry_type': 'misc' if not doi else 'article',
-                    'arxiv_id': arxiv_id,
-                    'title': entry.findtext('atom:title', '', ns).strip().replace('\n', ' '),
-                    'authors': ' and '.join(authors),
-                    'year': year,
-                    'doi': doi,
-                    'journal_ref': journal_ref,
-                    'abstract': entry.findtext('atom:summary', '', ns).strip().replace('\n', ' '),
-                    'url': f'https://arxiv.org/abs/{arxiv_id}'
-                }
-                
-                return metadata
+                entries = {}
+                for entry in root.findall('atom:entry', ARXIV_NS):
+                    entry_id = entry.findtext('atom:id', '', ARXIV_NS).rsplit('/abs/', 1)[-1]
+                    entries[entry_id] = entry
+                    entries.setdefault(re.sub(r'v\d+$', '', entry_id), entry)
+                for arxiv_id in arxiv_ids:
+                    entry = entries.get(arxiv_id)
+                    if entry is None:
+                        print(f'Error: No entry found for arXiv ID: {arxiv_id}', file=sys.stderr)
+                        continue
+                    found[arxiv_id] = self._metadata_from_arxiv(arxiv_id, entry)
             else:
-                print(f'Error: arXiv API returned status {response.status_code} for ID: {arxiv_id}', file=sys.stderr)
-                return None
+                print(f'Error: arXiv API returned status {response.status_code} for IDs: {", ".join(arxiv_ids)}', file=sys.stderr)
                 
         except Exception as e:
-            print(f'Error extracting metadata from arXiv {arxiv_id}: {e}', file=sys.stderr)
+            print(f'Error extracting metadata from arXiv {", ".join(arxiv_ids)}: {e}', file=sys.stderr)
+        
+        return found
+    
+    def extract_many(self, identifiers: List[str]) -> List[Optional[Dict]]:
+        """
+        Extract metadata for many identifiers at once.
+        
+        Identifiers are grouped by type. Cached metadata is reused while fresher
+        than the cache TTL; the rest is fetched concurrently: PubMed in efetch
+        batches of PUBMED_BATCH_SIZE, arXiv in id_list batches of
+        ARXIV_BATCH_SIZE, and CrossRef one DOI per request. Each service keeps
+        its own rate limit.
+        
+        Args:
+            identifiers: DOIs, PMIDs, arXiv IDs, or URLs
+            
+        Returns:
+            Metadata dictionaries (None for failures), in input order
+        """
+        typed = [self.identify_type(identifier) for identifier in identifiers]
+        wanted = {}
+        for identifier, (id_type, clean_id) in zip(identifiers, typed):
+            print(f'Identified as {id_type}: {clean_id}', file=sys.stderr)
+            if id_type in ('doi', 'pmid', 'arxiv'):
+                wanted.setdefault(id_type, {})[self._cache_key(id_type, clean_id)] = clean_id
+            else:
+                print(f'Error: Unknown identifier type: {identifier}', file=sys.stderr)
+        
+        results = {}
+        if self.cache is not None and not self.refresh:
+            keys = [key for group in wanted.values() for key in group]
+            try:
+                results.update(self.cache.get_many(CACHE_NAMESPACE, keys, ttl=self.cache_ttl))
+            except CACHE_ERRORS as e:
+                print(f'Warning: Could not read the metadata cache: {e}', file=sys.stderr)
+        pending = {
+            id_type: [clean_id for key, clean_id in group.items() if key not in results]
+            for id_type, group in wanted.items()
+        }
+        
+        tasks = []
+        pmids = pending.get('pmid', [])
+        for offset in range(0, len(pmids), PUBMED_BATCH_SIZE):
+            tasks.append(('pmid', self.extract_from_pmids, pmids[offset:offset + PUBMED_BATCH_SIZE]))
+        arxiv_ids = pending.get('arxiv', [])
+        for offset in range(0, len(arxiv_ids), ARXIV_BATCH_SIZE):
+            tasks.append(('arxiv', self.extract_from_arxiv_ids, arxiv_ids[offset:offset + ARXIV_BATCH_SIZE]))
+        for doi in pending.get('doi', []):
+            tasks.append(('doi', lambda batch: {batch[0]: self.extract_from_doi(batch[0])}, [doi]))
+        
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [(id_type, pool.submit(fetch, batch)) for id_type, fetch, batch in tasks]
+            for id_type, future in futures:
+                for clean_id, metadata in future.result().items():
+                    if metadata:
+                        fetched[self._cache_key(id_type, clean_id)] = metadata
+        
+        if self.cache is not None:
+            try:
+                self.cache.put_many(CACHE_NAMESPACE, fetched)
+            except CACHE_ERRORS as e:
+                # The fetched metadata is still returned; only the cache misses out
+                print(f'Warning: Could not update the metadata cache: {e}', file=sys.stderr)
+        results.update(fetched)
+        
+        return [results.get(self._cache_key(id_type, clean_id)) for id_type, clean_id in typed]
+    
+    @staticmethod
+    def _cache_key(id_type: str, clean_id: str) -> str:
+        """Cache key for an identifier; DOIs are case-insensitive."""
+        return f'{id_type}:{clean_id.lower() if id_type == "doi" else clean_id}'
+    
+    def _metadata_from_crossref(self, doi: str, message: Dict) -> Dict:
+        """Normalize a CrossRef work record."""
+        return {
+            'type': 'doi',
+            'entry_type': self._crossref_type_to_bibtex(message.get('type')),
+            'doi': doi,
+            'title': message.get('title', [''])[0] if message.get('title') else '',
+            'authors': self._format_authors_crossref(message.get('author', [])),
+            'year': self._extract_year_crossref(message),
+            'journal': message.get('container-title', [''])[0] if message.get('container-title') else '',
+            'volume': str(message.get('volume', '')) if message.get('volume') else '',
+            'issue': str(message.get('issue', '')) if message.get('issue') else '',
+            'pages': message.get('page', ''),
+            'publisher': message.get('publisher', ''),
+            'url': f'https://doi.org/{doi}'
+        }
+    
+    def _metadata_from_pubmed(self, article: ET.Element) -> Optional[Dict]:
+        """Normalize one PubmedArticle element."""
+        medline_citation = article.find('.//MedlineCitation')
+        if medline_citation is None:
             return None
+        article_elem = medline_citation.find('.//Article')
+        if article_elem is None:
+            return None
+        journal = article_elem.find('.//Journal')
+        
+        # Get DOI if available
+        doi = None
+        article_ids = article.findall('.//ArticleId')
+        for article_id in article_ids:
+            if article_id.get('IdType') == 'doi':
+                doi = article_id.text
+                break
+        
+        return {
+            'type': 'pmid',
+            'entry_type': 'article',
+            'pmid': medline_citation.findtext('PMID', ''),
+            'title': article_elem.findtext('.//ArticleTitle', ''),
+            'authors': self._format_authors_pubmed(article_elem.findall('.//Author')),
+            'year': self._extract_year_pubmed(article_elem),
+            'journal': journal.findtext('.//Title', '') if journal is not None else '',
+            'volume': journal.findtext('.//JournalIssue/Volume', '') if journal is not None else '',
+            'issue': journal.findtext('.//JournalIssue/Issue', '') if journal is not None else '',
+            'pages': article_elem.findtext('.//Pagination/MedlinePgn', ''),
+            'doi': doi
+        }
+    
+    def _metadata_from_arxiv(self, arxiv_id: str, entry: ET.Element) -> Dict:
+        """Normalize one arXiv Atom entry."""
+        # Extract DOI if published
+        doi_elem = entry.find('arxiv:doi', ARXIV_NS)
+        doi = doi_elem.text if doi_elem is not None else None
+        
+        # Extract journal reference if published
+        journal_ref_elem = entry.find('arxiv:journal_ref', ARXIV_NS)
+        journal_ref = journal_ref_elem.text if journal_ref_elem is not None else None
+        
+        # Get publication date
+        published = entry.findtext('atom:published', '', ARXIV_NS)
+        year = published[:4] if published else ''
+        
+        # Get authors
+        authors = []
+        for author in entry.findall('atom:author', ARXIV_NS):
+            name = author.findtext('atom:name', '', ARXIV_NS)
+            if name:
+                authors.append(name)
+        
+        return {
+            'type': 'arxiv',
+            'entry_type': 'misc' if not doi else 'article',
+            'arxiv_id': arxiv_id,
+            'title': entry.findtext('atom:title', '', ARXIV_NS).strip().replace('\n', ' '),
+            'authors': ' and '.join(authors),
+            'year': year,
+            'doi': doi,
+            'journal_ref': journal_ref,
+            'abstract': entry.findtext('atom:summary', '', ARXIV_NS).strip().replace('\n', ' '),
+            'url': f'https://arxiv.org/abs/{arxiv_id}'
+        }
     
     def metadata_to_bibtex(self, metadata: Dict, citation_key: Optional[str] = None) -> str:
         """
@@ -464,21 +627,7 @@ class MetadataExtractor:
         Returns:
             BibTeX string or None
         """
-        id_type, clean_id = self.identify_type(identifier)
-        
-        print(f'Identified as {id_type}: {clean_id}', file=sys.stderr)
-        
-        metadata = None
-        
-        if id_type == 'doi':
-            metadata = self.extract_from_doi(clean_id)
-        elif id_type == 'pmid':
-            metadata = self.extract_from_pmid(clean_id)
-        elif id_type == 'arxiv':
-            metadata = self.extract_from_arxiv(clean_id)
-        else:
-            print(f'Error: Unknown identifier type: {identifier}', file=sys.stderr)
-            return None
+        metadata = self.extract_many([identifier])[0]
         
         if metadata:
             return self.metadata_to_bibtex(metadata)
@@ -501,6 +650,13 @@ def main():
     parser.add_argument('-o', '--output', help='Output file for BibTeX (default: stdout)')
     parser.add_argument('--format', choices=['bibtex', 'json'], default='bibtex', help='Output format')
     parser.add_argument('--email', help='Email for NCBI E-utilities (recommended)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Concurrent requests (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--cache-dir', help='Directory of the persistent metadata cache (default: user cache directory)')
+    parser.add_argument('--cache-ttl-days', type=float, default=DEFAULT_CACHE_TTL / 86400,
+                        help=f'Days cached metadata stays fresh (default: {DEFAULT_CACHE_TTL // 86400})')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the metadata cache')
+    parser.add_argument('--refresh', action='store_true', help='Fetch everything again and overwrite cached metadata')
     
     args = parser.parse_args()
     
@@ -528,19 +684,19 @@ def main():
         parser.print_help()
         sys.exit(1)
     
-    # Extract metadata
-    extractor = MetadataExtractor(email=args.email)
-    bibtex_entries = []
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
     
-    for i, identifier in enumerate(identifiers):
-        print(f'\nProcessing {i+1}/{len(identifiers)}...', file=sys.stderr)
-        bibtex = extractor.extract(identifier)
-        if bibtex:
-            bibtex_entries.append(bibtex)
-        
-        # Rate limiting
-        if i < len(identifiers) - 1:
-            time.sleep(0.5)
+    # Extract metadata
+    cache = None if args.no_cache else open_cache(args.cache_dir)
+    extractor = MetadataExtractor(email=args.email, cache=cache, workers=args.workers,
+                                  cache_ttl=args.cache_ttl_days * 86400, refresh=args.refresh)
+    print(f'Processing {len(identifiers)} identifier(s)...', file=sys.stderr)
+    bibtex_entries = [
+        extractor.metadata_to_bibtex(metadata)
+        for metadata in extractor.extract_many(identifiers)
+        if metadata
+    ]
     
     if not bibtex_entries:
         print('Error: No successful extractions', file=sys.stderr)
@@ -564,6 +720,8 @@ def main():
         print(output)
     
     print(f'\nExtracted {len(bibtex_entries)}/{len(identifiers)} entries', file=sys.stderr)
+    if cache is not None:
+        print(f'Cache hits: {cache.stats()["hits"]}', file=sys.stderr)
 
 
 if __name__ == '__main__':
@@ -2,14 +2,55 @@
 """
 BibTeX Formatter and Cleaner
 Format, clean, sort, and deduplicate BibTeX files.
+
+With ``--incremental``, a hidden sidecar next to the output
+(``.<name>.format-cache.jsonl``) keeps each entry's fixed fields and formatted
+text keyed by a hash of its source text, so only new or changed entries are
+parsed, fixed, and formatted again. A run on an unchanged file returns without
+parsing, and the output is never rewritten when its content would not change,
+which keeps its mtime (and LaTeX builds keyed on it) stable.
 """
 
 import sys
+import os
 import re
+import json
+import hashlib
 import argparse
-from typing import List, Dict, Tuple
+import tempfile
+from typing import List, Dict, Optional, Tuple
 from collections import OrderedDict
 
+from bib_duplicates import DEFAULT_THRESHOLD as DEFAULT_DUPLICATE_THRESHOLD, DuplicateIndex
+from bibtex_stream import iter_entries, iter_entry_texts, parse_entry
+
+# Bump when fix_common_issues or format_entry change their output, so stale
+# sidecars are discarded.
+SIDECAR_VERSION = 1
+
+
+def sidecar_path(output_file: str) -> str:
+    """Return the incremental-formatting sidecar path for an output file."""
+    directory, name = os.path.split(os.path.abspath(output_file))
+    return os.path.join(directory, f'.{name}.format-cache.jsonl')
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _file_digest(path: str) -> Optional[str]:
+    """Hash a file in chunks; None if it cannot be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
 class BibTeXFormatter:
     """Format and clean BibTeX entries."""
     
@@ -23,11 +64,18 @@ class BibTeXFormatter:
             'howpublished', 'doi', 'url', 'isbn', 'issn',
             'note', 'abstract', 'keywords'
         ]
+        
+        # Fields describing one version of a work (e.g. a preprint), which
+        # are not copied into the entry it is merged into
+        self.version_fields = {'note', 'howpublished'}
     
     def parse_bibtex_file(self, filepath: str) -> List[Dict]:
         """
         Parse BibTeX file and extract entries.
         
+        Uses the streaming tokenizer in bibtex_stream.py, so nested braces are
+        kept intact and each entry carries its 'start'/'end' byte offsets.
+        
         Args:
             filepath: Path to BibTeX file
             
@@ -35,45 +83,10 @@ class BibTeXFormatter:
             List of entry dictionaries
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            return list(iter_entries(filepath))
         except Exception as e:
             print(f'Error reading file: {e}', file=sys.stderr)
             return []
-        
-        entries = []
-        
-        # Match BibTeX entries
-        pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\}'
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        for match in matches:
-            entry_type = match.group(1).lower()
-            citation_key = match.group(2).strip()
-            fields_text = match.group(3)
-            
-            # Parse fields
-            fields = OrderedDict()
-            field_pattern = r'(\w+)\s*=\s*\{([^}]*)\}|(\w+)\s*=\s*"([^"]*)"'
-            field_matches = re.finditer(field_pattern, fields_text)
-            
-            for field_match in field_matches:
-                if field_match.group(1):
-                    field_name = field_match.group(1).lower()
-                    field_value = field_match.group(2)
-                else:
-                    field_name = field_match.group(3).lower()
-                    field_value = field_match.group(4)
-                
-                fields[field_name] = field_value.strip()
-            
-            entries.append({
-                'type': entry_type,
-                'key': citation_key,
-                'fields': fields
-            })
-        
-        return entries
     
     def format_entry(self, entry: Dict) -> str:
         """
@@ -163,12 +176,20 @@ class BibTeXFormatter:
         fixed['fields'] = fields
         return fixed
     
-    def deduplicate_entries(self, entries: List[Dict]) -> List[Dict]:
+    def deduplicate_entries(self, entries: List[Dict], fuzzy: bool = False,
+                            threshold: float = DEFAULT_DUPLICATE_THRESHOLD) -> List[Dict]:
         """
         Remove duplicate entries based on DOI or citation key.
         
+        With ``fuzzy``, an entry whose title, first author, and year nearly
+        match an earlier entry (see ``bib_duplicates``) is merged into it: the
+        earlier entry is kept and gains any fields it lacks, other than
+        ``version_fields``. Entries with different DOIs are never merged.
+        
         Args:
             entries: List of entry dictionaries
+            fuzzy: Also merge near-duplicates
+            threshold: Minimum similarity score (0-1) for a fuzzy merge
             
         Returns:
             List of unique entries
@@ -176,6 +197,7 @@ class BibTeXFormatter:
         seen_dois = set()
         seen_keys = set()
         unique_entries = []
+        index = DuplicateIndex(threshold=threshold) if fuzzy else None
         
         for entry in entries:
             doi = entry['fields'].get('doi', '').strip()
@@ -194,10 +216,36 @@ class BibTeXFormatter:
                 continue
             seen_keys.add(key)
             
+            if index is not None:
+                position = len(unique_entries)
+                target = self._merge_target(entry, index.add(position, entry), unique_entries)
+                if target is not None:
+                    index.discard(position)
+                    kept, score = target
+                    for field, value in entry['fields'].items():
+                        if field not in self.version_fields:
+                            kept['fields'].setdefault(field, value)
+                    print(f'Near-duplicate found: {key} merged into {kept["key"]} '
+                          f'(similarity {score:.2f})', file=sys.stderr)
+                    continue
+            
             unique_entries.append(entry)
         
         return unique_entries
     
+    @staticmethod
+    def _merge_target(entry: Dict, matches: List[Tuple[int, Dict]],
+                      unique_entries: List[Dict]) -> Optional[Tuple[Dict, float]]:
+        """Return the best earlier entry to merge ``entry`` into, with its score."""
+        doi = entry['fields'].get('doi', '').strip().lower()
+        for position, evidence in matches:
+            kept = unique_entries[position]
+            kept_doi = kept['fields'].get('doi', '').strip().lower()
+            if doi and kept_doi and doi != kept_doi:
+                continue
+            return kept, evidence['score']
+        return None
+    
     def sort_entries(self, entries: List[Dict], sort_by: str = 'key', descending: bool = False) -> List[Dict]:
         """
         Sort entries by specified field.
@@ -232,10 +280,15 @@ class BibTeXFormatter:
     
     def format_file(self, filepath: str, output: str = None,
                    deduplicate: bool = False, sort_by: str = None,
-                   descending: bool = False, fix_issues: bool = True) -> None:
+                   descending: bool = False, fix_issues: bool = True,
+                   fuzzy: bool = False,
+                   duplicate_threshold: float = DEFAULT_DUPLICATE_THRESHOLD,
+                   incremental: bool = False) -> None:
         """
         Format entire BibTeX file.
         
+        The output is only written when its content changes.
+        
         Args:
             filepath: Input BibTeX file
             output: Output file (None for in-place)
@@ -243,9 +296,36 @@ class BibTeXFormatter:
             sort_by: Field to sort by
             descending: Sort in descending order
             fix_issues: Fix common formatting issues
+            fuzzy: When deduplicating, also merge near-duplicate entries
+            duplicate_threshold: Minimum similarity score for a fuzzy merge
+            incremental: Reuse the sidecar of per-entry results, and skip
+                the run entirely when the input and output are unchanged
         """
+        output_file = output or filepath
+        sidecar = None
+        input_digest = None
+        if incremental:
+            options = {
+                'deduplicate': deduplicate, 'sort_by': sort_by, 'descending': descending,
+                'fuzzy': fuzzy, 'duplicate_threshold': duplicate_threshold,
+            }
+            sidecar = self._load_sidecar_header(output_file, fix_issues)
+            input_digest = _file_digest(filepath)
+            in_place = os.path.abspath(filepath) == os.path.abspath(output_file)
+            output_digest = input_digest if in_place else _file_digest(output_file)
+            if (input_digest is not None and sidecar['options'] == options
+                    and sidecar['input'] == input_digest
+                    and sidecar['output'] == output_digest):
+                print(f'{output_file} is up to date', file=sys.stderr)
+                return
+            sidecar['options'] = options
+            sidecar['entries'] = self._load_sidecar_entries(output_file, sidecar)
+        
         print(f'Parsing {filepath}...', file=sys.stderr)
-        entries = self.parse_bibtex_file(filepath)
+        if sidecar is not None:
+            entries = self._parse_incremental(filepath, fix_issues, sidecar)
+        else:
+            entries = self.parse_bibtex_file(filepath)
         
         if not entries:
             print('No entries found', file=sys.stderr)
@@ -254,7 +334,7 @@ class BibTeXFormatter:
         print(f'Found {len(entries)} entries', file=sys.stderr)
         
         # Fix common issues
-        if fix_issues:
+        if fix_issues and sidecar is None:
             print('Fixing common issues...', file=sys.stderr)
             entries = [self.fix_common_issues(e) for e in entries]
         
@@ -262,7 +342,7 @@ class BibTeXFormatter:
         if deduplicate:
             print('Removing duplicates...', file=sys.stderr)
             original_count = len(entries)
-            entries = self.deduplicate_entries(entries)
+            entries = self.deduplicate_entries(entries, fuzzy, duplicate_threshold)
             removed = original_count - len(entries)
             if removed > 0:
                 print(f'Removed {removed} duplicate(s)', file=sys.stderr)
@@ -274,19 +354,192 @@ class BibTeXFormatter:
         
         # Format entries
         print('Formatting entries...', file=sys.stderr)
-        formatted_entries = [self.format_entry(e) for e in entries]
+        stable = False
+        if sidecar is not None:
+            results = [self._cached_result(e, sidecar['entries']) for e in entries]
+            formatted_entries = [text for text, _ in results]
+            # Every entry a fixed point: formatting the output reproduces it.
+            stable = all(fixed for _, fixed in results)
+        else:
+            formatted_entries = [self.format_entry(e) for e in entries]
         
         # Write output
         output_content = '\n\n'.join(formatted_entries) + '\n'
         
-        output_file = output or filepath
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(output_content)
-            print(f'Successfully wrote {len(entries)} entries to {output_file}', file=sys.stderr)
+            written = self._write_if_changed(output_file, output_content)
         except Exception as e:
             print(f'Error writing file: {e}', file=sys.stderr)
             sys.exit(1)
+        if written:
+            print(f'Successfully wrote {len(entries)} entries to {output_file}', file=sys.stderr)
+        else:
+            print(f'{output_file} is already formatted ({len(entries)} entries); not rewritten',
+                  file=sys.stderr)
+        
+        if sidecar is not None:
+            sidecar['output'] = _digest(output_content.encode('utf-8'))
+            # After an in-place write the output is the next run's input, which
+            # is up to date when every entry is a fixed point.
+            sidecar['input'] = sidecar['output'] if in_place and stable else input_digest
+            self._save_sidecar(output_file, sidecar)
+    
+    def _parse_incremental(self, filepath: str, fix_issues: bool, sidecar: Dict) -> List[Dict]:
+        """
+        Parse and fix entries, reusing sidecar results for unchanged entry text.
+        
+        Replaces ``sidecar['entries']`` with the results for this file's
+        entries. A new result whose formatted text parses back to the same
+        entry is a fixed point: it is also stored under the hash of that text,
+        so the next run over the formatted file finds every entry cached.
+        """
+        cached = sidecar['entries']
+        current: Dict[str, Dict] = {}
+        entries = []
+        reused = 0
+        try:
+            texts = iter_entry_texts(filepath)
+            for text, macros, macro_digest in texts:
+                digest = _digest(f'{macro_digest}\0{text}'.encode('utf-8'))
+                result = current.get(digest) or cached.get(digest)
+                if result is not None:
+                    reused += 1
+                    if result['text'] is None:
+                        # Saved without its text, which is this source text.
+                        result['text'] = text
+                else:
+                    entry = parse_entry(text, macros)
+                    if entry is None:
+                        continue
+                    if fix_issues:
+                        entry = self.fix_common_issues(entry)
+                    entry = {'type': entry['type'], 'key': entry['key'], 'fields': entry['fields']}
+                    formatted = self.format_entry(entry)
+                    fixed = formatted == text
+                    if not fixed:
+                        again = parse_entry(formatted)
+                        if again is not None and fix_issues:
+                            again = self.fix_common_issues(again)
+                        fixed = again == entry
+                    result = {'entry': entry, 'text': formatted, 'fixed': fixed}
+                    if fixed:
+                        current[_digest(f'\0{formatted}'.encode('utf-8'))] = result
+                current[digest] = result
+                # Copy the fields: deduplication may merge into them.
+                entries.append({**result['entry'], 'fields': dict(result['entry']['fields']),
+                                'digest': digest})
+        except Exception as e:
+            print(f'Error reading file: {e}', file=sys.stderr)
+            return []
+        sidecar['entries'] = current
+        print(f'{reused} unchanged entries reused, {len(entries) - reused} parsed and formatted',
+              file=sys.stderr)
+        return entries
+    
+    def _cached_result(self, entry: Dict, results: Dict[str, Dict]) -> Tuple[str, bool]:
+        """
+        Return an entry's formatted text and whether it is a fixed point.
+        
+        The sidecar's text is reused unless deduplication changed the fields.
+        """
+        result = results.get(entry.get('digest'))
+        if result is not None and result['entry']['fields'] == entry['fields']:
+            return result['text'], result['fixed']
+        return self.format_entry(entry), False
+    
+    def _sidecar_fingerprint(self, fix_issues: bool) -> Dict:
+        return {
+            'version': SIDECAR_VERSION,
+            'fix_issues': fix_issues,
+            'field_order': self.field_order,
+        }
+    
+    def _load_sidecar_header(self, output_file: str, fix_issues: bool) -> Dict:
+        """
+        Read the first line of the sidecar for ``output_file``.
+        
+        Returns an empty header if the sidecar is stale or missing; the
+        per-entry results are only read when the file must be formatted.
+        """
+        fingerprint = self._sidecar_fingerprint(fix_issues)
+        empty = {'format': fingerprint, 'options': None, 'input': None, 'output': None}
+        try:
+            with open(sidecar_path(output_file), 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+        except (OSError, ValueError):
+            return empty
+        if not isinstance(header, dict) or header.get('format') != fingerprint:
+            return empty
+        return {**empty, **header, 'valid': True}
+    
+    @staticmethod
+    def _load_sidecar_entries(output_file: str, header: Dict) -> Dict[str, Dict]:
+        """Map each cached entry-text hash to its result."""
+        results: Dict[str, Dict] = {}
+        if not header.pop('valid', False):
+            return results
+        try:
+            with open(sidecar_path(output_file), 'r', encoding='utf-8') as f:
+                f.readline()
+                for line in f:
+                    digests, entry, text, fixed = json.loads(line)
+                    result = {'entry': entry, 'text': text, 'fixed': fixed,
+                              'line': line, 'digests': digests}
+                    for digest in digests:
+                        results[digest] = result
+        except (OSError, ValueError, TypeError) as e:
+            print(f'Warning: ignoring unreadable {sidecar_path(output_file)}: {e}', file=sys.stderr)
+            return {}
+        return results
+    
+    def _save_sidecar(self, output_file: str, sidecar: Dict) -> None:
+        """
+        Write the header line, then one line per result with all hashes that map to it.
+        
+        Lines of results loaded from the previous sidecar are copied as read
+        when their hashes are unchanged, so a run that parses a few entries
+        does not re-encode the rest. A fixed point found only under the hash
+        of its own formatted text is saved without that text, which the next
+        hit reads from the file.
+        """
+        path = sidecar_path(output_file)
+        digests_by_result: Dict[int, Tuple[Dict, List[str]]] = {}
+        for digest, result in sidecar['entries'].items():
+            digests_by_result.setdefault(id(result), (result, []))[1].append(digest)
+        header = {key: sidecar[key] for key in ('format', 'options', 'input', 'output')}
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(header) + '\n')
+                for result, digests in digests_by_result.values():
+                    if result.get('digests') == digests:
+                        f.write(result['line'])
+                        continue
+                    text = result['text']
+                    if result['fixed'] and digests == [_digest(f'\0{text}'.encode('utf-8'))]:
+                        text = None
+                    f.write(json.dumps([digests, result['entry'], text, result['fixed']],
+                                       ensure_ascii=False, separators=(',', ':')) + '\n')
+            # mkstemp creates the file private; match the output's permissions.
+            os.chmod(temp_path, os.stat(output_file).st_mode & 0o777)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f'Warning: could not save {path}: {e}', file=sys.stderr)
+    
+    @staticmethod
+    def _write_if_changed(output_file: str, content: str) -> bool:
+        """Write ``content`` unless the file already holds it; return whether it was written."""
+        data = content.encode('utf-8')
+        try:
+            if os.path.getsize(output_file) == len(data):
+                with open(output_file, 'rb') as f:
+                    if f.read() == data:
+                        return False
+        except OSError:
+            pass
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return True
 
 
 def main():
@@ -312,6 +565,20 @@ def main():
         help='Remove duplicate entries'
     )
     
+    parser.add_argument(
+        '--fuzzy',
+        action='store_true',
+        help='With --deduplicate, also merge near-duplicates (same work with '
+             'different casing, punctuation, or LaTeX markup in the title)'
+    )
+    
+    parser.add_argument(
+        '--duplicate-threshold',
+        type=float,
+        default=DEFAULT_DUPLICATE_THRESHOLD,
+        help=f'Minimum similarity (0-1) for --fuzzy merges (default: {DEFAULT_DUPLICATE_THRESHOLD})'
+    )
+    
     parser.add_argument(
         '--sort',
         choices=['key', 'year', 'author', 'title'],
@@ -330,8 +597,20 @@ def main():
         help='Do not fix common issues'
     )
     
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only re-fix and re-format new or changed entries, using a hidden '
+             'per-entry hash sidecar next to the output; unchanged files are skipped'
+    )
+    
     args = parser.parse_args()
     
+    if args.fuzzy and not args.deduplicate:
+        parser.error('--fuzzy requires --deduplicate')
+    if not 0 < args.duplicate_threshold <= 1:
+        parser.error('--duplicate-threshold must be between 0 and 1')
+    
     # Format file
     formatter = BibTeXFormatter()
     formatter.format_file(
@@ -340,7 +619,10 @@ def main():
         deduplicate=args.deduplicate,
         sort_by=args.sort,
         descending=args.descending,
-        fix_issues=not args.no_fix
+        fix_issues=not args.no_fix,
+        fuzzy=args.fuzzy,
+        duplicate_threshold=args.duplicate_threshold,
+        incremental=args.incremental
     )
 
 
@@ -6,32 +6,74 @@ Search PubMed using E-utilities API and export results.
 
 import sys
 import os
-import requests
 import argparse
+import calendar
 import json
-import time
+import re
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Optional
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from polite_http import DEFAULT_RETRIES, RateLimiter, pooled_session, send
+
+EUTILS_BASE = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/'
+# PubMed's history server keeps at most 10,000 records per search, so larger
+# result sets are split into publication-date slices below this size.
+HISTORY_LIMIT = 10_000
+EFETCH_PAGE_SIZE = 500
+DEFAULT_WORKERS = 3
+# Requests per second across all E-utilities: without and with an API key.
+NCBI_RATE = 3.0
+NCBI_KEY_RATE = 10.0
+EARLIEST_DATE = date(1781, 1, 1)
+
+
+def parse_pubmed_date(value: str, end: bool = False) -> date:
+    """
+    Parse YYYY, YYYY/MM, or YYYY/MM/DD; ``end`` picks the period's last day.
+    """
+    parts = [int(part) for part in re.split(r'[/-]', value.strip())]
+    year = parts[0]
+    if len(parts) == 1:
+        return date(year, 12, 31) if end else date(year, 1, 1)
+    month = parts[1]
+    if len(parts) == 2:
+        return date(year, month, calendar.monthrange(year, month)[1] if end else 1)
+    return date(year, month, parts[2])
+
 
 class PubMedSearcher:
     """Search PubMed using NCBI E-utilities API."""
     
-    def __init__(self, api_key: Optional[str] = None, email: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, email: Optional[str] = None,
+                 workers: int = DEFAULT_WORKERS, page_size: int = EFETCH_PAGE_SIZE):
         """
         Initialize searcher.
         
         Args:
             api_key: NCBI API key (optional but recommended)
             email: Email for Entrez (optional but recommended)
+            workers: EFetch pages in flight at once
+            page_size: Records per EFetch page
         """
         self.api_key = api_key or os.getenv('NCBI_API_KEY', '')
         self.email = email or os.getenv('NCBI_EMAIL', '')
-        self.base_url = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/'
-        self.session = requests.Session()
+        self.base_url = os.getenv('EUTILS_BASE') or EUTILS_BASE
+        self.workers = max(1, workers)
+        self.page_size = max(1, page_size)
+        self.session = pooled_session(self.workers)
         
-        # Rate limiting
-        self.delay = 0.11 if self.api_key else 0.34  # 10/sec with key, 3/sec without
+        # One token bucket for every E-utilities call: 10/sec with key, 3/sec without,
+        # shared with every other process calling NCBI
+        self.limiter = RateLimiter(NCBI_KEY_RATE if self.api_key else NCBI_RATE, service='ncbi')
+        # EFetch pages that still failed after retries, and matching records that
+        # were not retrieved (failed pages, single days above HISTORY_LIMIT)
+        self.failed_pages = 0
+        self.missing_records = 0
     
     def search(self, query: str, max_results: int = 100,
                date_start: Optional[str] = None, date_end: Optional[str] = None,
@@ -50,7 +92,7 @@ class PubMedSearcher:
             List of PMIDs
         """
         # Build query with filters
-        full_query = query
+        full_query = self._build_query(query, publication_types)
         
         # Add date range
         if date_start or date_end:
@@ -58,11 +100,6 @@ class PubMedSearcher:
             end = date_end or datetime.now().strftime('%Y')
             full_query += f' AND {start}:{end}[Publication Date]'
         
-        # Add publication types
-        if publication_types:
-            pub_type_query = ' OR '.join([f'"{pt}"[Publication Type]' for pt in publication_types])
-            full_query += f' AND ({pub_type_query})'
-        
         print(f'Searching PubMed: {full_query}', file=sys.stderr)
         
         # ESearch to get PMIDs
@@ -74,13 +111,9 @@ class PubMedSearcher:
             'retmode': 'json'
         }
         
-        if self.email:
-            params['email'] = self.email
-        if self.api_key:
-            params['api_key'] = self.api_key
-        
         try:
-            response = self.session.get(esearch_url, params=params, timeout=30)
+            response = send(self.session, 'GET', esearch_url, limiter=self.limiter,
+                            params=self._with_credentials(params), timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -105,51 +138,222 @@ class PubMedSearcher:
         Returns:
             List of metadata dictionaries
         """
-        if not pmids:
-            return []
-        
-        metadata_list = []
+        return list(self.iter_metadata(pmids))
+    
+    def iter_metadata(self, pmids: Iterable[str]) -> Iterator[Dict]:
+        """
+        Stream metadata for PMIDs, fetching up to ``workers`` pages at once.
         
-        # Fetch in batches of 200
-        batch_size = 200
-        for i in range(0, len(pmids), batch_size):
-            batch = pmids[i:i+batch_size]
-            print(f'Fetching metadata for PMIDs {i+1}-{min(i+batch_size, len(pmids))}...', file=sys.stderr)
-            
-            efetch_url = self.base_url + 'efetch.fcgi'
-            params = {
-                'db': 'pubmed',
-                'id': ','.join(batch),
-                'retmode': 'xml',
-                'rettype': 'abstract'
-            }
+        Args:
+            pmids: PubMed IDs
             
-            if self.email:
-                params['email'] = self.email
-            if self.api_key:
-                params['api_key'] = self.api_key
+        Yields:
+            Metadata dictionaries, in the order of ``pmids``
+        """
+        pmids = list(pmids)
+        pages = (
+            {'id': ','.join(pmids[i:i + self.page_size])}
+            for i in range(0, len(pmids), self.page_size)
+        )
+        yield from self._fetch_pages(pages)
+    
+    def iter_search_results(self, query: str, max_results: Optional[int] = None,
+                            date_start: Optional[str] = None, date_end: Optional[str] = None,
+                            publication_types: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        Stream metadata for every record matching a query (systematic-review mode).
+        
+        Matches stay on the NCBI history server (ESearch ``usehistory``) and are
+        paged out with EFetch by WebEnv and query key, so no PMID list is held
+        in memory. Searches above the history server's 10,000-record limit are
+        split into publication-date slices. Memory stays bounded by the pages in
+        flight, whatever the number of records.
+        
+        Args:
+            query: Search query
+            max_results: Stop after this many records (None for all)
+            date_start: Start date (YYYY/MM/DD, YYYY/MM, or YYYY)
+            date_end: End date (YYYY/MM/DD, YYYY/MM, or YYYY)
+            publication_types: List of publication types to filter
             
+        Yields:
+            Metadata dictionaries
+        """
+        term = self._build_query(query, publication_types)
+        start = parse_pubmed_date(date_start) if date_start else None
+        end = parse_pubmed_date(date_end, end=True) if date_end else None
+        print(f'Searching PubMed: {term}', file=sys.stderr)
+        
+        def pages() -> Iterator[Dict]:
+            remaining = max_results
+            for count, webenv, query_key in self._history_slices(term, start, end):
+                available = min(count, HISTORY_LIMIT)
+                if remaining is not None:
+                    available = min(available, remaining)
+                    remaining -= available
+                for retstart in range(0, available, self.page_size):
+                    yield {
+                        'WebEnv': webenv,
+                        'query_key': query_key,
+                        'retstart': retstart,
+                        'retmax': min(self.page_size, available - retstart),
+                    }
+                if remaining == 0:
+                    return
+        
+        yield from self._fetch_pages(pages())
+    
+    def search_history(self, term: str, start: Optional[date] = None,
+                       end: Optional[date] = None) -> Tuple[int, str, str]:
+        """
+        Run ESearch with ``usehistory``, optionally over a publication-date range.
+        
+        Returns:
+            (count, WebEnv, query_key)
+        """
+        params = {
+            'db': 'pubmed',
+            'term': term,
+            'usehistory': 'y',
+            'retmax': 0,
+            'retmode': 'json',
+        }
+        if start or end:
+            params.update({
+                'datetype': 'pdat',
+                'mindate': f'{start or EARLIEST_DATE:%Y/%m/%d}',
+                'maxdate': f'{end or self._latest_date():%Y/%m/%d}',
+            })
+        response = send(self.session, 'GET', self.base_url + 'esearch.fcgi', limiter=self.limiter,
+                        params=self._with_credentials(params), timeout=30)
+        response.raise_for_status()
+        result = response.json()['esearchresult']
+        if 'ERROR' in result:
+            raise RuntimeError(f'ESearch error: {result["ERROR"]}')
+        return int(result['count']), result.get('webenv', ''), result.get('querykey', '')
+    
+    def _history_slices(self, term: str, start: Optional[date],
+                        end: Optional[date]) -> Iterator[Tuple[int, str, str]]:
+        """Yield history-server searches covering the range, each within HISTORY_LIMIT."""
+        pending = [(start, end)]
+        while pending:
+            low, high = pending.pop()
+            count, webenv, query_key = self.search_history(term, low, high)
+            if count > HISTORY_LIMIT:
+                low = low or EARLIEST_DATE
+                high = high or self._latest_date()
+                if low < high:
+                    # Bisect by date; the earlier half is searched first
+                    middle = low + (high - low) // 2
+                    pending.append((middle + timedelta(days=1), high))
+                    pending.append((low, middle))
+                    continue
+                # A single day cannot be split further: the rest are reported missing
+                print(f'Warning: {count} records dated {low:%Y/%m/%d}; retrieving the first '
+                      f'{HISTORY_LIMIT}', file=sys.stderr)
+                self.missing_records += count - HISTORY_LIMIT
+            if count:
+                label = 'all dates'
+                if low or high:
+                    label = f'{low or EARLIEST_DATE:%Y/%m/%d}-{high or self._latest_date():%Y/%m/%d}'
+                print(f'{label}: {count} records', file=sys.stderr)
+                yield count, webenv, query_key
+    
+    @staticmethod
+    def _latest_date() -> date:
+        # Some records carry publication dates in the coming year
+        return date(date.today().year + 1, 12, 31)
+    
+    def _fetch_pages(self, pages: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Run EFetch for each page of parameters, keeping ``workers`` pages in
+        flight, and yield records in page order. Pages that fail after retries
+        are skipped and counted in ``failed_pages`` and ``missing_records``.
+        """
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = deque()
+            pages = iter(pages)
+            while True:
+                while len(in_flight) < self.workers:
+                    page = next(pages, None)
+                    if page is None:
+                        break
+                    in_flight.append((page, executor.submit(self._fetch_page, page)))
+                if not in_flight:
+                    break
+                page, future = in_flight.popleft()
+                records = future.result()
+                if records is None:
+                    self.failed_pages += 1
+                    self.missing_records += page.get('retmax') or len(page['id'].split(','))
+                    continue
+                fetched += len(records)
+                print(f'Fetched {fetched} records', file=sys.stderr)
+                yield from records
+    
+    def _fetch_page(self, page: Dict) -> Optional[List[Dict]]:
+        """Fetch one EFetch page and parse it incrementally; None if it failed."""
+        params = self._with_credentials({
+            'db': 'pubmed',
+            'retmode': 'xml',
+            'rettype': 'abstract',
+            **page,
+        })
+        for attempt in range(DEFAULT_RETRIES + 1):
             try:
-                response = self.session.get(efetch_url, params=params, timeout=60)
-                response.raise_for_status()
-                
-                # Parse XML
-                root = ET.fromstring(response.content)
-                articles = root.findall('.//PubmedArticle')
-                
-                for article in articles:
-                    metadata = self._extract_metadata_from_xml(article)
-                    if metadata:
-                        metadata_list.append(metadata)
-                
-                # Rate limiting
-                time.sleep(self.delay)
-                
+                # POST keeps long ID lists out of the URL, as NCBI recommends; EFetch
+                # only reads, so a timed-out POST is safe to send again
+                response = send(self.session, 'POST', self.base_url + 'efetch.fcgi', limiter=self.limiter,
+                                data=params, timeout=120, stream=True, idempotent=True)
+                with response:
+                    response.raise_for_status()
+                    response.raw.decode_content = True
+                    return self._parse_articles(response.raw)
+            except (requests.ConnectionError, requests.Timeout, ET.ParseError) as e:
+                # A response cut off mid-body is retried from the start of the page
+                if attempt == DEFAULT_RETRIES:
+                    print(f'Error fetching metadata for page: {e}', file=sys.stderr)
             except Exception as e:
-                print(f'Error fetching metadata for batch: {e}', file=sys.stderr)
+                print(f'Error fetching metadata for page: {e}', file=sys.stderr)
+                break
+        return None
+    
+    def _parse_articles(self, stream: IO[bytes]) -> List[Dict]:
+        """
+        Parse PubmedArticle elements from an EFetch XML stream, clearing each
+        one after it is read so the tree never holds more than one article.
+        """
+        records = []
+        root = None
+        for event, element in ET.iterparse(stream, events=('start', 'end')):
+            if root is None:
+                root = element
+            if event != 'end':
                 continue
-        
-        return metadata_list
+            if element.tag == 'PubmedArticle':
+                metadata = self._extract_metadata_from_xml(element)
+                if metadata:
+                    records.append(metadata)
+                root.clear()
+            elif element.tag == 'ERROR':
+                raise RuntimeError(f'EFetch error: {element.text}')
+        return records
+    
+    def _build_query(self, query: str, publication_types: Optional[List[str]] = None) -> str:
+        """Add publication type filters to a query."""
+        if not publication_types:
+            return query
+        pub_type_query = ' OR '.join([f'"{pt}"[Publication Type]' for pt in publication_types])
+        return f'{query} AND ({pub_type_query})'
+    
+    def _with_credentials(self, params: Dict) -> Dict:
+        """Add the email and API key NCBI asks clients to send."""
+        if self.email:
+            params['email'] = self.email
+        if self.api_key:
+            params['api_key'] = self.api_key
+        return params
     
     def _extract_metadata_from_xml(self, article: ET.Element) -> Optional[Dict]:
         """Extract metadata from PubmedArticle XML element."""
@@ -187,7 +391,6 @@ class PubMedSearcher:
             if not year:
                 medline_date = article_elem.findtext('.//Journal/JournalIssue/PubDate/MedlineDate', '')
                 if medline_date:
-                    import re
                     year_match = re.search(r'\d{4}', medline_date)
                     if year_match:
                         year = year_match.group()
@@ -264,6 +467,36 @@ class PubMedSearcher:
         lines.append('}')
         
         return '\n'.join(lines)
+    
+    def write_results(self, records: Iterable[Dict], handle: IO[str], output_format: str,
+                      query: str) -> int:
+        """
+        Write records as they arrive, holding none of them in memory.
+        
+        Args:
+            records: Metadata dictionaries (e.g. from ``iter_search_results``)
+            handle: Open text file
+            output_format: 'json', 'jsonl', or 'bibtex'
+            query: Query recorded in JSON output
+            
+        Returns:
+            Number of records written
+        """
+        count = 0
+        if output_format == 'json':
+            handle.write(f'{{\n  "query": {json.dumps(query)},\n  "results": [')
+        for metadata in records:
+            if output_format == 'jsonl':
+                handle.write(json.dumps(metadata, ensure_ascii=False) + '\n')
+            elif output_format == 'json':
+                entry = json.dumps(metadata, indent=2).replace('\n', '\n    ')
+                handle.write(('\n    ' if count == 0 else ',\n    ') + entry)
+            else:
+                handle.write(('' if count == 0 else '\n') + self.metadata_to_bibtex(metadata) + '\n')
+            count += 1
+        if output_format == 'json':
+            handle.write(f'\n  ],\n  "count": {count}\n}}\n')
+        return count
 
 
 def main():
@@ -297,6 +530,12 @@ def main():
         help='Maximum number of results (default: 100)'
     )
     
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        help='Retrieve every matching record, ignoring --limit (systematic reviews)'
+    )
+    
     parser.add_argument(
         '--date-start',
         help='Start date (YYYY/MM/DD or YYYY)'
@@ -319,9 +558,16 @@ def main():
     
     parser.add_argument(
         '--format',
-        choices=['json', 'bibtex'],
+        choices=['json', 'jsonl', 'bibtex'],
         default='json',
-        help='Output format (default: json)'
+        help='Output format (default: json; jsonl writes one record per line)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'EFetch pages in flight, within the NCBI rate limit (default: {DEFAULT_WORKERS})'
     )
     
     parser.add_argument(
@@ -336,6 +582,9 @@ def main():
     
     args = parser.parse_args()
     
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    
     # Get query
     query = args.query or args.query_arg
     
@@ -356,41 +605,53 @@ def main():
     if args.publication_types:
         pub_types = [pt.strip() for pt in args.publication_types.split(',')]
     
-    # Search PubMed
-    searcher = PubMedSearcher(api_key=args.api_key, email=args.email)
-    pmids = searcher.search(
-        query,
-        max_results=args.limit,
-        date_start=args.date_start,
-        date_end=args.date_end,
-        publication_types=pub_types
-    )
+    # Search PubMed and stream records to the output as they are fetched
+    searcher = PubMedSearcher(api_key=args.api_key, email=args.email, workers=args.workers)
+    if args.all:
+        # Every match, paged through the history server in date slices
+        records = searcher.iter_search_results(
+            query,
+            date_start=args.date_start,
+            date_end=args.date_end,
+            publication_types=pub_types
+        )
+    else:
+        # One ESearch keeps PubMed's default ordering for the top --limit matches
+        pmids = searcher.search(
+            query,
+            max_results=args.limit,
+            date_start=args.date_start,
+            date_end=args.date_end,
+            publication_types=pub_types
+        )
+        if not pmids:
+            print('No results found', file=sys.stderr)
+            sys.exit(1)
+        records = searcher.iter_metadata(pmids)
     
-    if not pmids:
-        print('No results found', file=sys.stderr)
+    try:
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                count = searcher.write_results(records, f, args.format, query)
+            print(f'Wrote {count} results to {args.output}', file=sys.stderr)
+        else:
+            count = searcher.write_results(records, sys.stdout, args.format, query)
+    except (requests.RequestException, RuntimeError, ValueError) as e:
+        print(f'Error searching PubMed: {e}', file=sys.stderr)
         sys.exit(1)
     
-    # Fetch metadata
-    metadata_list = searcher.fetch_metadata(pmids)
-    
-    # Format output
-    if args.format == 'json':
-        output = json.dumps({
-            'query': query,
-            'count': len(metadata_list),
-            'results': metadata_list
-        }, indent=2)
-    else:  # bibtex
-        bibtex_entries = [searcher.metadata_to_bibtex(m) for m in metadata_list]
-        output = '\n\n'.join(bibtex_entries) + '\n'
-    
-    # Write output
-    if args.output:
-        with open(args.output, 'w', encoding='utf-8') as f:
-            f.write(output)
-        print(f'Wrote {len(metadata_list)} results to {args.output}', file=sys.stderr)
-    else:
-        print(output)
+    # A partial result must not pass for complete retrieval (--all)
+    if searcher.missing_records:
+        detail = ''
+        if searcher.failed_pages:
+            detail = f' ({searcher.failed_pages} EFetch page(s) failed after retries)'
+        print(f'Error: up to {searcher.missing_records} matching records are missing from the '
+              f'output{detail}', file=sys.stderr)
+        sys.exit(1)
+    
+    if count == 0:
+        print('No results found', file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == '__main__':
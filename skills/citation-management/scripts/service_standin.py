@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""Offline stand-ins for the metadata services the citation scripts call.
+
+One threaded HTTP/1.1 keep-alive server answers, under separate path prefixes:
+
+    /doi/<doi>                DOI content negotiation (BibTeX; HEAD redirects)
+    /doi/api/handles/<doi>    doi.org handle records (JSON)
+    /crossref/works/<doi>     CrossRef work records (JSON)
+    /eutils/esearch.fcgi      PubMed ESearch (JSON, with the history server)
+    /eutils/efetch.fcgi       PubMed EFetch (PubmedArticle XML, by ID or WebEnv)
+    /arxiv/api/query          arXiv ``id_list`` queries (Atom)
+
+Bodies are replayed from a directory of recorded responses when one matches the
+request and are otherwise synthesized deterministically in each service's own
+format. Every service can add latency with jitter, answer a share of requests
+with transient 5xx errors, and enforce a rate limit the way the real services
+do: 429 with ``Retry-After`` once its token bucket is empty. Identifiers whose
+suffix starts with ``missing`` return 404. The stand-in matches every ESearch
+term against one corpus of ``--pubmed-records`` records spread evenly over
+1990-2025, so date-sliced history searches see realistic counts.
+
+Recorded responses live in ``<recordings>/<service>/<identifier>.<ext>``, with
+the identifier percent-encoded (``10.1038%2Fnature12373``): ``doi/*.bib`` and
+``crossref/*.json`` are whole bodies, ``pubmed/<pmid>.xml`` holds one
+``<PubmedArticle>`` and ``arxiv/<id>.xml`` one Atom ``<entry>``.
+
+Usage:
+    python service_standin.py --port 8767 --latency 0.1 --jitter 0.05 \\
+        --error-rate 0.02 --rate-limit crossref=50 --rate-limit eutils=10
+    # then export the variables it prints, e.g.
+    EUTILS_BASE=http://127.0.0.1:8767/eutils/ python search_pubmed.py "sleep" --all
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+from xml.sax.saxutils import escape
+
+from doi_standin import bibtex_payload
+
+SERVICES = ("doi", "crossref", "eutils", "arxiv")
+# Published limits: CrossRef's polite pool, NCBI with an API key, arXiv's one
+# request every three seconds. doi.org publishes none; 50/s mirrors CrossRef.
+PUBLISHED_LIMITS = {"doi": 50.0, "crossref": 50.0, "eutils": 10.0, "arxiv": 1 / 3}
+ERROR_STATUSES = (500, 502, 503)
+CORPUS_START = date(1990, 1, 1)
+CORPUS_END = date(2025, 12, 31)
+FIRST_PMID = 30_000_001
+_MONTHS = "Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec".split()
+
+
+def _digest(identifier: str) -> str:
+    return hashlib.sha256(identifier.lower().encode("utf-8")).hexdigest()
+
+
+def crossref_payload(doi: str) -> dict[str, Any]:
+    """Return a deterministic CrossRef ``/works/<doi>`` response."""
+    digest = _digest(doi)
+    year = 1990 + int(digest[:4], 16) % 35
+    month = 1 + int(digest[4:6], 16) % 12
+    return {
+        "status": "ok",
+        "message-type": "work",
+        "message-version": "1.0.0",
+        "message": {
+            "DOI": doi,
+            "type": "journal-article",
+            "title": [f"Stand-in study {digest[8:14]}"],
+            "author": [
+                {"given": "Ada", "family": "Author", "sequence": "first"},
+                {"given": "Ben", "family": "Writer", "sequence": "additional"},
+            ],
+            "container-title": ["Journal of Stand-ins"],
+            "publisher": "Stand-in Press",
+            "volume": str(int(digest[14:16], 16)),
+            "issue": str(1 + int(digest[16:17], 16) % 12),
+            "page": f"1-{int(digest[17:19], 16) + 2}",
+            "published-print": {"date-parts": [[year, month]]},
+            "URL": f"https://doi.org/{doi}",
+        },
+    }
+
+
+def _pubmed_date(pmid: int, total: int) -> date:
+    index = pmid - FIRST_PMID
+    if 0 <= index < total:
+        return CORPUS_START + timedelta(days=index * _corpus_days() // total)
+    return CORPUS_START + timedelta(days=pmid % _corpus_days())
+
+
+def _corpus_days() -> int:
+    return (CORPUS_END - CORPUS_START).days + 1
+
+
+def pubmed_article_xml(pmid: int, published: date) -> str:
+    """Return one deterministic ``<PubmedArticle>`` element."""
+    digest = _digest(str(pmid))
+    return (
+        "<PubmedArticle><MedlineCitation Status=\"MEDLINE\" Owner=\"NLM\">"
+        f"<PMID Version=\"1\">{pmid}</PMID><Article PubModel=\"Print\"><Journal>"
+        f"<JournalIssue CitedMedium=\"Internet\"><Volume>{int(digest[:2], 16)}</Volume>"
+        f"<Issue>{1 + int(digest[2], 16) % 12}</Issue><PubDate><Year>{published.year}</Year>"
+        f"<Month>{_MONTHS[published.month - 1]}</Month></PubDate></JournalIssue>"
+        "<Title>Journal of Stand-ins</Title></Journal>"
+        f"<ArticleTitle>Stand-in study {digest[8:14]} of sleep and memory.</ArticleTitle>"
+        f"<Pagination><MedlinePgn>1-{int(digest[14:16], 16) + 2}</MedlinePgn></Pagination>"
+        "<Abstract><AbstractText>A cohort study found an association with the outcome."
+        "</AbstractText></Abstract><AuthorList CompleteYN=\"Y\">"
+        "<Author ValidYN=\"Y\"><LastName>Author</LastName><ForeName>Ada</ForeName>"
+        "<Initials>A</Initials></Author><Author ValidYN=\"Y\"><LastName>Writer</LastName>"
+        "<ForeName>Ben</ForeName><Initials>B</Initials></Author></AuthorList>"
+        "</Article></MedlineCitation><PubmedData><ArticleIdList>"
+        f"<ArticleId IdType=\"pubmed\">{pmid}</ArticleId>"
+        f"<ArticleId IdType=\"doi\">10.5555/standin.{pmid}</ArticleId>"
+        "</ArticleIdList></PubmedData></PubmedArticle>"
+    )
+
+
+def arxiv_entry_xml(arxiv_id: str) -> str:
+    """Return one deterministic Atom ``<entry>`` for an arXiv ID."""
+    digest = _digest(arxiv_id)
+    year = 2008 + int(digest[:2], 16) % 17
+    versioned = arxiv_id if re.search(r"v\d+$", arxiv_id) else f"{arxiv_id}v1"
+    published = int(digest[2:4], 16) % 2 == 0
+    return (
+        f"<entry><id>http://arxiv.org/abs/{escape(versioned)}</id>"
+        f"<updated>{year}-03-02T00:00:00Z</updated>"
+        f"<published>{year}-03-01T00:00:00Z</published>"
+        f"<title>Stand-in preprint {digest[8:14]}:\n  scaling laws</title>"
+        "<summary>  We study a stand-in problem and report results.\n</summary>"
+        "<author><name>Ada Author</name></author><author><name>Ben Writer</name></author>"
+        + (
+            f"<arxiv:doi>10.5555/arxiv.{digest[:8]}</arxiv:doi>"
+            f"<arxiv:journal_ref>J. Stand-ins {int(digest[4:6], 16)} ({year})</arxiv:journal_ref>"
+            if published
+            else ""
+        )
+        + "</entry>"
+    )
+
+
+@dataclass
+class ServiceStats:
+    """Per-service counters; ``received`` counts every request."""
+
+    received: int = 0
+    served: int = 0
+    throttled: int = 0
+    errors: int = 0
+    not_found: int = 0
+
+
+@dataclass
+class _Bucket:
+    """Server-side token bucket holding up to one second of requests."""
+
+    rate: float
+    tokens: float = field(init=False)
+    updated: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        self.tokens = max(1.0, self.rate)
+
+    def take(self) -> float:
+        """Take a token; return 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY, Nagle's
+    # algorithm and delayed ACKs add ~40 ms to every keep-alive response.
+    disable_nagle_algorithm = True
+    server: "ServiceStandin"
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming
+        self._dispatch()
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._dispatch()
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        url = urlsplit(self.path)
+        service, _, rest = url.path.lstrip("/").partition("/")
+        params = parse_qs(url.query)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode("utf-8")
+            for name, values in parse_qs(body).items():
+                params.setdefault(name, []).extend(values)
+        if service not in SERVICES:
+            self._reply(404, f"Unknown service: {service}")
+            return
+        refusal = self.server.admit(service)
+        if refusal is not None:
+            self._reply(*refusal)
+            return
+        route = getattr(self, f"_{service}")
+        status, text, content_type, headers = route(unquote(rest), params)
+        self.server.count(service, status)
+        self._reply(status, text, headers, content_type)
+
+    def _doi(self, doi: str, params: dict[str, list[str]]) -> tuple:
+        del params
+        handle = doi.removeprefix("api/handles/")
+        if handle != doi:
+            found = "/" in handle and not handle.split("/", 1)[1].startswith("missing")
+            record = {"responseCode": 1 if found else 100, "handle": handle}
+            if found:
+                record["values"] = [
+                    {"index": 1, "type": "URL", "data": {"format": "string", "value": f"https://example.org/{handle}"}}
+                ]
+            return 200 if found else 404, json.dumps(record), "application/json", {}
+        if "/" not in doi or doi.split("/", 1)[1].startswith("missing"):
+            return 404, f"DOI not found: {doi}", "text/plain; charset=utf-8", {}
+        if self.command == "HEAD":
+            return 302, "", "text/plain", {"Location": f"https://example.org/{doi}"}
+        if "bibtex" not in (self.headers.get("Accept") or ""):
+            return 406, "Only application/x-bibtex is served", "text/plain", {}
+        text = self.server.recorded("doi", doi, ".bib") or bibtex_payload(doi)
+        return 200, text, "application/x-bibtex; charset=utf-8", {}
+
+    def _crossref(self, path: str, params: dict[str, list[str]]) -> tuple:
+        del params
+        doi = path.removeprefix("works/")
+        if doi == path or "/" not in doi or doi.split("/", 1)[1].startswith("missing"):
+            return 404, "Resource not found.", "text/plain; charset=utf-8", {}
+        text = self.server.recorded("crossref", doi, ".json")
+        return 200, text or json.dumps(crossref_payload(doi)), "application/json", {}
+
+    def _eutils(self, path: str, params: dict[str, list[str]]) -> tuple:
+        if path == "esearch.fcgi":
+            return 200, json.dumps(self.server.esearch(params)), "application/json", {}
+        if path == "efetch.fcgi":
+            return 200, self.server.efetch(params), "text/xml; charset=utf-8", {}
+        return 404, f"Unknown E-utility: {path}", "text/plain", {}
+
+    def _arxiv(self, path: str, params: dict[str, list[str]]) -> tuple:
+        if path != "api/query":
+            return 404, f"Unknown arXiv path: {path}", "text/plain", {}
+        ids = [item for value in params.get("id_list", []) for item in value.split(",") if item]
+        entries = [self.server.recorded("arxiv", i, ".xml") or arxiv_entry_xml(i) for i in ids]
+        feed = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom" '
+            'xmlns:arxiv="http://arxiv.org/schemas/atom" '
+            'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+            f"<title>arXiv Query: id_list={escape(','.join(ids))}</title>"
+            f"<opensearch:totalResults>{len(entries)}</opensearch:totalResults>"
+            + "".join(entries)
+            + "</feed>"
+        )
+        return 200, feed, "application/atom+xml; charset=utf-8", {}
+
+    def _reply(
+        self,
+        status: int,
+        text: str,
+        headers: dict[str, str] | None = None,
+        content_type: str = "text/plain; charset=utf-8",
+    ) -> None:
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if self.server.advertised_rate:
+            self.send_header("X-Rate-Limit-Limit", str(self.server.advertised_rate))
+            self.send_header("X-Rate-Limit-Interval", "1s")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        del format, args
+
+
+class ServiceStandin(ThreadingHTTPServer):
+    """Threaded stand-in for every citation service.
+
+    Args:
+        address: ``(host, port)``; port 0 picks a free port.
+        latency: Seconds added to every response.
+        jitter: Up to this many further seconds, drawn uniformly per response.
+        error_rate: Share of requests answered with a 500, 502 or 503.
+        rate_limits: Requests per second per service; over budget answers 429.
+        throttle_every: Also answer every Nth request with 429.
+        retry_after: ``Retry-After`` seconds sent with 429 for ``throttle_every``;
+            rate-limited answers send the time until the next token, rounded up.
+        advertised_rate: Requests per second advertised in ``X-Rate-Limit-*``.
+        pubmed_records: Records in the corpus every ESearch term matches.
+        recordings: Directory of recorded responses to replay.
+        seed: Seed for jitter and error injection.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limits: dict[str, float] | None = None,
+        throttle_every: int = 0,
+        retry_after: float = 1.0,
+        advertised_rate: int = 0,
+        pubmed_records: int = 5000,
+        recordings: str | Path | None = None,
+        seed: int = 7,
+    ):
+        super().__init__(address, ServiceHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.advertised_rate = advertised_rate
+        self.pubmed_records = pubmed_records
+        self.recordings = Path(recordings) if recordings else None
+        self.buckets = {
+            service: _Bucket(rate) for service, rate in (rate_limits or {}).items() if rate > 0
+        }
+        self.stats = {service: ServiceStats() for service in SERVICES}
+        self._received = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self) -> dict[str, str]:
+        """Environment variables pointing the citation scripts at this server."""
+        return {
+            "DOI_RESOLVER_BASE": f"{self.base_url}/doi",
+            "CROSSREF_API_BASE": f"{self.base_url}/crossref",
+            "EUTILS_BASE": f"{self.base_url}/eutils/",
+            "ARXIV_API_URL": f"{self.base_url}/arxiv/api/query",
+        }
+
+    def admit(self, service: str) -> tuple[int, str, dict[str, str]] | None:
+        """Apply latency, throttling and error injection to one request.
+
+        Returns None to serve it, or the ``(status, text, headers)`` to answer.
+        """
+        with self._lock:
+            self._received += 1
+            stats = self.stats[service]
+            stats.received += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            wait = self.buckets[service].take() if service in self.buckets else 0.0
+            if not wait and self.throttle_every and self._received % self.throttle_every == 0:
+                wait = self.retry_after
+            failure = 0
+            if not wait and self.error_rate and self._random.random() < self.error_rate:
+                failure = self._random.choice(ERROR_STATUSES)
+            if wait:
+                stats.throttled += 1
+            elif failure:
+                stats.errors += 1
+        if delay:
+            time.sleep(delay)
+        if wait:
+            return 429, "Too Many Requests", {"Retry-After": str(max(1, math.ceil(wait)))}
+        if failure:
+            return failure, "Service temporarily unavailable", {}
+        return None
+
+    def count(self, service: str, status: int) -> None:
+        with self._lock:
+            if status == 404:
+                self.stats[service].not_found += 1
+            elif status < 400:
+                self.stats[service].served += 1
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = {service: ServiceStats() for service in SERVICES}
+
+    def recorded(self, service: str, identifier: str, suffix: str) -> str | None:
+        """Return the recorded body for an identifier, if there is one."""
+        if self.recordings is None:
+            return None
+        path = self.recordings / service / f"{quote(identifier.lower(), safe='')}{suffix}"
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def esearch(self, params: dict[str, list[str]]) -> dict[str, Any]:
+        """Answer ESearch over the synthetic corpus, by publication-date range."""
+
+        def value(name: str, default: str = "") -> str:
+            return (params.get(name) or [default])[0]
+
+        first, count = 0, self.pubmed_records
+        if value("mindate") or value("maxdate"):
+            low = _parse_date(value("mindate"), CORPUS_START)
+            high = _parse_date(value("maxdate"), CORPUS_END)
+            first = self._first_index(low)
+            count = max(0, self._first_index(high + timedelta(days=1)) - first)
+        retmax = int(value("retmax", "20") or 0)
+        result: dict[str, Any] = {
+            "count": str(count),
+            "retmax": str(min(retmax, count)),
+            "retstart": "0",
+            "idlist": [str(FIRST_PMID + first + i) for i in range(min(retmax, count))],
+        }
+        if value("usehistory") == "y":
+            result.update({"webenv": f"MCID_standin_{first}_{count}", "querykey": "1"})
+        return {"header": {"type": "esearch", "version": "0.3"}, "esearchresult": result}
+
+    def efetch(self, params: dict[str, list[str]]) -> str:
+        """Answer EFetch for an ``id`` list or a history-server page."""
+        if params.get("id"):
+            pmids = [
+                int(item) for value in params["id"] for item in value.split(",")
+                if item.strip().isdigit()
+            ]
+        else:
+            webenv = (params.get("WebEnv") or [""])[0]
+            try:
+                _, _, first, count = webenv.split("_")
+                start = int((params.get("retstart") or ["0"])[0])
+                size = int((params.get("retmax") or ["20"])[0])
+            except ValueError:
+                return f"<eFetchResult><ERROR>Unknown WebEnv: {escape(webenv)}</ERROR></eFetchResult>"
+            stop = min(int(count), start + size)
+            pmids = [FIRST_PMID + int(first) + index for index in range(start, stop)]
+        articles = (
+            self.recorded("pubmed", str(pmid), ".xml")
+            or pubmed_article_xml(pmid, _pubmed_date(pmid, self.pubmed_records))
+            for pmid in pmids
+        )
+        return '<?xml version="1.0" ?>\n<PubmedArticleSet>' + "".join(articles) + "</PubmedArticleSet>"
+
+    def _first_index(self, day: date) -> int:
+        """Index of the first corpus record published on or after ``day``."""
+        days = min(max((day - CORPUS_START).days, 0), _corpus_days())
+        return -(-days * self.pubmed_records // _corpus_days())
+
+
+def _parse_date(value: str, default: date) -> date:
+    parts = [int(part) for part in value.split("/") if part.isdigit()]
+    if not parts:
+        return default
+    return date(parts[0], *(parts[1:] + [1, 1])[:2])
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **options: Any) -> ServiceStandin:
+    """Start a stand-in on a background thread and return it.
+
+    ``options`` are ``ServiceStandin`` keyword arguments. Port 0 picks a free
+    port; read the URLs back from ``server.environment()``. Call
+    ``server.shutdown()`` when done.
+    """
+    server = ServiceStandin((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_rate_limits(values: list[str]) -> dict[str, float]:
+    """Parse ``SERVICE=RATE`` items; a bare ``RATE`` applies to every service."""
+    limits: dict[str, float] = {}
+    for item in values:
+        service, _, rate = item.rpartition("=")
+        for name in [service] if service else SERVICES:
+            if name not in SERVICES:
+                raise ValueError(f"unknown service {name!r}; expected one of {', '.join(SERVICES)}")
+            limits[name] = float(rate)
+    return limits
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many more seconds, at random")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests answered with 500/502/503"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="[SERVICE=]RATE",
+        help=f"Requests per second before 429, per service ({', '.join(SERVICES)}); repeatable",
+    )
+    parser.add_argument(
+        "--published-limits", action="store_true", help="Enforce each service's published rate limit"
+    )
+    parser.add_argument(
+        "--throttle-every", type=int, default=0, help="Also answer every Nth request with 429"
+    )
+    parser.add_argument(
+        "--retry-after", type=float, default=1.0, help="Retry-After seconds sent with --throttle-every"
+    )
+    parser.add_argument(
+        "--advertise-rate",
+        type=int,
+        default=0,
+        help="Requests per second advertised in X-Rate-Limit-* headers",
+    )
+    parser.add_argument(
+        "--pubmed-records", type=int, default=5000, help="Records every PubMed search matches"
+    )
+    parser.add_argument("--recordings", help="Directory of recorded responses to replay")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for jitter and injected errors")
+    args = parser.parse_args()
+    try:
+        limits = dict(PUBLISHED_LIMITS) if args.published_limits else {}
+        limits.update(parse_rate_limits(args.rate_limit))
+    except ValueError as exc:
+        parser.error(str(exc))
+    server = ServiceStandin(
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limits=limits,
+        throttle_every=args.throttle_every,
+        retry_after=args.retry_after,
+        advertised_rate=args.advertise_rate,
+        pubmed_records=args.pubmed_records,
+        recordings=args.recordings,
+        seed=args.seed,
+    )
+    print(f"Citation service stand-in listening on {server.base_url}")
+    for name, value in server.environment().items():
+        print(f"export {name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
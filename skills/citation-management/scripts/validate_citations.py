@@ -2,24 +2,69 @@
 """
 Citation Validation Tool
 Validate BibTeX files for accuracy, completeness, and format compliance.
+
+DOI checks run on a bounded worker pool over one keep-alive session, and their
+verdicts are cached on disk, so re-validating the same .bib during a
+compile-fix loop only checks DOIs that are new.
 """
 
+import os
 import sys
 import re
-import requests
+import time
 import argparse
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
 from collections import defaultdict
 
+from bib_duplicates import DEFAULT_THRESHOLD as DEFAULT_DUPLICATE_THRESHOLD, find_near_duplicates
+from bibtex_stream import iter_entries
+from citation_cache import CACHE_ERRORS, CitationCache, open_cache
+from citation_graph import CitationGraph, iter_project_files, scan_file
+from polite_http import ConditionalCache, RateLimiter, pooled_session, send
+
+CROSSREF_API = 'https://api.crossref.org'
+DEFAULT_RESOLVER = 'https://doi.org'
+DEFAULT_WORKERS = 8
+# Requests per second shared by all workers (CrossRef's polite pool)
+DEFAULT_RATE = 10.0
+VERDICT_NAMESPACE = 'doi-verdict'
+# A resolving DOI stays resolved; a failing one is re-checked sooner, since it
+# may have just been registered or corrected.
+VALID_VERDICT_TTL = 30 * 24 * 3600
+INVALID_VERDICT_TTL = 24 * 3600
+
+
 class CitationValidator:
     """Validate BibTeX entries for errors and inconsistencies."""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'CitationValidator/1.0 (Citation Management Tool)'
-        })
+    def __init__(self, cache: Optional[CitationCache] = None, workers: int = DEFAULT_WORKERS,
+                 rate: float = DEFAULT_RATE, refresh: bool = False,
+                 duplicate_threshold: float = DEFAULT_DUPLICATE_THRESHOLD):
+        """
+        Args:
+            cache: Persistent DOI verdict cache (None disables caching)
+            workers: Concurrent DOI checks
+            rate: Maximum requests per second across workers (0 disables)
+            refresh: Ignore cached verdicts and re-check every DOI
+            duplicate_threshold: Minimum similarity score (0-1) for reporting
+                two entries as possible duplicates
+        """
+        self.cache = cache
+        # Expired verdicts are revalidated with ETag/Last-Modified, not re-downloaded
+        self.http_cache = ConditionalCache(cache.directory / 'http') if cache is not None else None
+        self.duplicate_threshold = duplicate_threshold
+        self.workers = max(1, workers)
+        self.refresh = refresh
+        self.limiter = RateLimiter(rate, burst=self.workers, service='crossref')
+        self.crossref_api = (os.getenv('CROSSREF_API_BASE') or CROSSREF_API).rstrip('/')
+        self.resolver = (os.getenv('DOI_RESOLVER_BASE') or DEFAULT_RESOLVER).rstrip('/')
+        user_agent = 'CitationValidator/1.0 (Citation Management Tool)'
+        mailto = os.getenv('CROSSREF_MAILTO')
+        if mailto:
+            user_agent = f'CitationValidator/1.0 (Citation Management Tool; mailto:{mailto})'
+        self.session = pooled_session(self.workers, {'User-Agent': user_agent})
         
         # Required fields by entry type
         self.required_fields = {
@@ -44,6 +89,9 @@ class CitationValidator:
         """
         Parse BibTeX file and extract entries.
         
+        Uses the streaming tokenizer in bibtex_stream.py, so nested braces are
+        kept intact and each entry carries its 'start'/'end' byte offsets.
+        
         Args:
             filepath: Path to BibTeX file
             
@@ -51,46 +99,10 @@ class CitationValidator:
             List of entry dictionaries
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            return list(iter_entries(filepath, include_raw=True))
         except Exception as e:
             print(f'Error reading file: {e}', file=sys.stderr)
             return []
-        
-        entries = []
-        
-        # Match BibTeX entries
-        pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\}'
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        for match in matches:
-            entry_type = match.group(1).lower()
-            citation_key = match.group(2).strip()
-            fields_text = match.group(3)
-            
-            # Parse fields
-            fields = {}
-            field_pattern = r'(\w+)\s*=\s*\{([^}]*)\}|(\w+)\s*=\s*"([^"]*)"'
-            field_matches = re.finditer(field_pattern, fields_text)
-            
-            for field_match in field_matches:
-                if field_match.group(1):
-                    field_name = field_match.group(1).lower()
-                    field_value = field_match.group(2)
-                else:
-                    field_name = field_match.group(3).lower()
-                    field_value = field_match.group(4)
-                
-                fields[field_name] = field_value.strip()
-            
-            entries.append({
-                'type': entry_type,
-                'key': citation_key,
-                'fields': fields,
-                'raw': match.group(0)
-            })
-        
-        return entries
     
     def validate_entry(self, entry: Dict) -> Tuple[List[Dict], List[Dict]]:
         """
@@ -208,33 +220,83 @@ class CitationValidator:
         Returns:
             Tuple of (is_valid, metadata)
         """
+        is_valid, metadata, _ = self._check_doi(doi)
+        return is_valid, metadata
+    
+    def _check_doi(self, doi: str) -> Tuple[bool, Optional[Dict], bool]:
+        """Check one DOI; the third value says whether the verdict is cacheable."""
         try:
-            url = f'https://doi.org/{doi}'
-            response = self.session.head(url, timeout=10, allow_redirects=True)
+            # A CrossRef record proves the DOI is registered and carries the
+            # metadata, so most DOIs need a single request
+            crossref_url = f'{self.crossref_api}/works/{doi}'
+            metadata_response = send(self.session, 'GET', crossref_url,
+                                     limiter=self.limiter, cache=self.http_cache, timeout=10)
             
-            if response.status_code < 400:
-                # DOI resolves, now get metadata from CrossRef
-                crossref_url = f'https://api.crossref.org/works/{doi}'
-                metadata_response = self.session.get(crossref_url, timeout=10)
+            if metadata_response.status_code == 200:
+                data = metadata_response.json()
+                message = data.get('message', {})
                 
-                if metadata_response.status_code == 200:
-                    data = metadata_response.json()
-                    message = data.get('message', {})
-                    
-                    # Extract key metadata
-                    metadata = {
-                        'title': message.get('title', [''])[0],
-                        'year': self._extract_year_crossref(message),
-                        'authors': self._format_authors_crossref(message.get('author', [])),
-                    }
-                    return True, metadata
-                else:
-                    return True, None  # DOI resolves but no CrossRef metadata
-            else:
-                return False, None
+                # Extract key metadata
+                metadata = {
+                    'title': message.get('title', [''])[0] if message.get('title') else '',
+                    'year': self._extract_year_crossref(message),
+                    'authors': self._format_authors_crossref(message.get('author', [])),
+                }
+                return True, metadata, True
+            
+            # Other registrars (DataCite, mEDRA, ...): ask the resolver itself.
+            # Its redirect is the answer, so the publisher site is not fetched.
+            url = f'{self.resolver}/{doi}'
+            response = send(self.session, 'HEAD', url, limiter=self.limiter,
+                            timeout=10, allow_redirects=False)
+            if response.status_code < 400:
+                return True, None, True  # DOI resolves but no CrossRef metadata
+            return False, None, response.status_code == 404
                 
         except Exception:
-            return False, None
+            return False, None, False
+    
+    def verify_dois(self, dois: List[str]) -> Dict[str, Tuple[bool, Optional[Dict]]]:
+        """
+        Verify many DOIs concurrently, reusing cached verdicts.
+        
+        Args:
+            dois: Digital Object Identifiers
+            
+        Returns:
+            Dictionary mapping each DOI to (is_valid, metadata)
+        """
+        unique = list(dict.fromkeys(dois))
+        verdicts = {}
+        if self.cache is not None and not self.refresh:
+            try:
+                cached = self.cache.get_many(VERDICT_NAMESPACE, [doi.lower() for doi in unique],
+                                             ttl=VALID_VERDICT_TTL)
+            except CACHE_ERRORS as e:
+                print(f'Warning: Could not read the DOI verdict cache: {e}', file=sys.stderr)
+                cached = {}
+            now = time.time()
+            for doi in unique:
+                verdict = cached.get(doi.lower())
+                if verdict and (verdict['valid'] or now - verdict['checked'] < INVALID_VERDICT_TTL):
+                    verdicts[doi] = (verdict['valid'], verdict['metadata'])
+        
+        pending = [doi for doi in unique if doi not in verdicts]
+        print(f'Verifying {len(pending)} DOI(s) ({len(verdicts)} cached)...', file=sys.stderr)
+        
+        fresh = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for doi, (is_valid, metadata, cacheable) in zip(pending, pool.map(self._check_doi, pending)):
+                verdicts[doi] = (is_valid, metadata)
+                if cacheable:
+                    fresh[doi.lower()] = {'valid': is_valid, 'metadata': metadata, 'checked': time.time()}
+        
+        if self.cache is not None:
+            try:
+                self.cache.put_many(VERDICT_NAMESPACE, fresh)
+            except CACHE_ERRORS as e:
+                print(f'Warning: Could not update the DOI verdict cache: {e}', file=sys.stderr)
+        return verdicts
     
     def detect_duplicates(self, entries: List[Dict]) -> List[Dict]:
         """
@@ -280,63 +342,89 @@ class CitationValidator:
                     'message': f'Citation key "{key}" appears {count} times'
                 })
         
-        # Check for similar titles (possible duplicates)
-        titles = {}
-        for entry in entries:
-            title = entry['fields'].get('title', '').lower()
-            title = re.sub(r'[^\w\s]', '', title)  # Remove punctuation
-            title = ' '.join(title.split())  # Normalize whitespace
-            
-            if title:
-                if title in titles:
-                    duplicates.append({
-                        'type': 'similar_title',
-                        'entries': [titles[title], entry['key']],
-                        'severity': 'medium',
-                        'message': f'Possible duplicate: "{titles[title]}" and "{entry["key"]}" have identical titles'
-                    })
-                else:
-                    titles[title] = entry['key']
+        # Check for near-duplicate titles (LaTeX, case, and punctuation
+        # differences are normalized away; author and year must agree)
+        for pair in find_near_duplicates(entries, threshold=self.duplicate_threshold):
+            left = entries[pair['left']]['key']
+            right = entries[pair['right']]['key']
+            duplicates.append({
+                'type': 'similar_title',
+                'entries': [left, right],
+                'score': pair['score'],
+                'title_similarity': pair['title_similarity'],
+                'severity': 'medium',
+                'message': (
+                    f'Possible duplicate: "{left}" and "{right}" '
+                    f'(similarity {pair["score"]:.2f}, title {pair["title_similarity"]:.0%})'
+                )
+            })
         
         return duplicates
     
     def parse_manuscript_citations(self, filepath: str) -> List[str]:
         """
-        Parse a manuscript file (Markdown or LaTeX) and extract all cited keys.
+        Parse a manuscript (Markdown or LaTeX file, or a project directory) and
+        extract all cited keys.
         
         Args:
-            filepath: Path to manuscript file
+            filepath: Path to manuscript file or project directory
             
         Returns:
             List of cited citation keys
         """
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            print(f'Error reading manuscript file {filepath}: {e}', file=sys.stderr)
-            return []
+        cited_keys, _ = self.manuscript_citations(filepath)
+        return cited_keys
+    
+    def manuscript_citations(self, path: str,
+                             bib_keys: Optional[set] = None) -> Tuple[List[str], Dict[str, Dict]]:
+        """
+        Find the keys cited in a manuscript file or project directory.
         
-        cited_keys = set()
+        A directory is read through the persistent citation graph
+        (``citation_graph.py``), which rescans only the .tex and Markdown
+        files changed since the last run. When the graph cannot be opened,
+        every manuscript in the directory is scanned instead.
         
-        # 1. LaTeX citations: \cite{key1, key2}, \citep{key}, \citet{key}, etc.
-        latex_matches = re.findall(r'\\cite[a-z]*\*?\{([^}]+)\}', content)
-        for match in latex_matches:
-            keys = [k.strip() for k in match.split(',')]
-            for key in keys:
-                if key:
-                    cited_keys.add(key)
-                    
-        # 2. Markdown / Pandoc citations: @key or [@key1; @key2]
-        # Match @ followed by valid citation key chars (alphanumeric, -, _, :, .)
-        # Avoid email addresses, twitter handles, etc. by requiring that @ is not preceded by alphanumeric/dot/dash/underscore
-        md_matches = re.findall(r'(?<![a-zA-Z0-9_.-])@([a-zA-Z0-9_\-:]+)', content)
-        for key in md_matches:
-            # Exclude common false positives
-            if key and not key.isdigit():
-                cited_keys.add(key)
-                
-        return list(cited_keys)
+        Args:
+            path: Manuscript file or project directory
+            bib_keys: Keys defined in the bibliography, if known
+            
+        Returns:
+            The cited keys, and the first use (file, line, column) of each
+            cited key missing from ``bib_keys``
+        """
+        files = [path]
+        if os.path.isdir(path):
+            try:
+                with CitationGraph() as graph:
+                    graph.refresh(path)
+                    cited_keys = list(graph.citations(path))
+                    first_uses = {
+                        key: graph.locations(path, key)[0]
+                        for key in cited_keys
+                        if bib_keys is not None and key not in bib_keys and key != '*'
+                    }
+                return cited_keys, first_uses
+            except CACHE_ERRORS as e:
+                print(f'Warning: Citation graph unavailable, scanning {path} directly: {e}',
+                      file=sys.stderr)
+            files = [str(file.resolve()) for file in iter_project_files(path)
+                     if file.suffix.lower() != '.bib']
+        
+        first_uses: Dict[str, Dict] = {}
+        for filepath in files:
+            try:
+                citations = scan_file(filepath)
+            except Exception as e:
+                print(f'Error reading manuscript file {filepath}: {e}', file=sys.stderr)
+                continue
+            for key, line, column in citations:
+                first_uses.setdefault(key, {'file': filepath, 'line': line, 'column': column})
+        cited_keys = list(first_uses)
+        if bib_keys is not None:
+            first_uses = {key: use for key, use in first_uses.items()
+                          if key not in bib_keys and key != '*'}
+        return cited_keys, first_uses
 
     def validate_file(self, filepath: str, check_dois: bool = False, min_count: Optional[int] = None, venue: Optional[str] = None, manuscript_filepath: Optional[str] = None) -> Dict:
         """
@@ -397,12 +485,11 @@ class CitationValidator:
         # Verify DOIs if requested
         doi_errors = []
         if check_dois:
-            print('Verifying DOIs...', file=sys.stderr)
-            for i, entry in enumerate(entries):
-                doi = entry['fields'].get('doi', '')
+            dois = [entry['fields'].get('doi', '') for entry in entries]
+            verdicts = self.verify_dois([doi for doi in dois if doi])
+            for entry, doi in zip(entries, dois):
                 if doi:
-                    print(f'Verifying DOI {i+1}: {doi}', file=sys.stderr)
-                    is_valid, metadata = self.verify_doi(doi)
+                    is_valid, metadata = verdicts[doi]
                     
                     if not is_valid:
                         doi_errors.append({
@@ -488,25 +575,29 @@ class CitationValidator:
             manuscript_results['checked'] = True
             manuscript_results['manuscript_filepath'] = manuscript_filepath
             
+            bib_keys = {entry['key'] for entry in entries}
+            
             # Parse cited keys
-            cited_keys = self.parse_manuscript_citations(manuscript_filepath)
+            cited_keys, first_uses = self.manuscript_citations(manuscript_filepath, bib_keys)
             manuscript_results['cited_keys'] = cited_keys
             
-            bib_keys = {entry['key'] for entry in entries}
-            
             # Missing references: cited in manuscript but not defined in BibTeX
-            missing_keys = [key for key in cited_keys if key not in bib_keys]
+            missing_keys = [key for key in cited_keys if key not in bib_keys and key != '*']
             manuscript_results['missing_keys'] = missing_keys
             for key in missing_keys:
+                use = first_uses[key]
                 all_errors.append({
                     'type': 'unresolved_citation',
                     'entry': key,
+                    'location': use,
                     'severity': 'high',
-                    'message': f'Unresolved citation: Key "@{key}" is cited in manuscript "{manuscript_filepath}" but not defined in the BibTeX file.'
+                    'message': f'Unresolved citation: Key "@{key}" is cited in manuscript "{manuscript_filepath}" (first at {use["file"]}:{use["line"]}) but not defined in the BibTeX file.'
                 })
                 
             # Unused references: defined in BibTeX but not cited in manuscript
-            unused_keys = [key for key in bib_keys if key not in cited_keys]
+            # (\nocite{*} uses every entry)
+            cited = set(cited_keys)
+            unused_keys = [] if '*' in cited else [key for key in bib_keys if key not in cited]
             manuscript_results['unused_keys'] = unused_keys
             for key in unused_keys:
                 all_warnings.append({
@@ -517,7 +608,7 @@ class CitationValidator:
                 })
                 
             # Check the count of ACTUALLY used citations
-            actual_count = len(cited_keys) - len(missing_keys)
+            actual_count = len(cited - {'*'}) - len(missing_keys)
             if target_min is not None:
                 critical_min = int(target_min * 0.7)
                 if critical_min < 1:
@@ -596,6 +687,38 @@ def main():
         help='Verify DOIs resolve correctly (slow)'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Concurrent DOI checks (default: {DEFAULT_WORKERS})'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        help='Directory of the persistent DOI verdict cache (default: user cache directory)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write cached DOI verdicts'
+    )
+    
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Re-check every DOI and overwrite cached verdicts'
+    )
+    
+    parser.add_argument(
+        '--duplicate-threshold',
+        type=float,
+        default=DEFAULT_DUPLICATE_THRESHOLD,
+        help=f'Minimum similarity (0-1) to report possible duplicates '
+             f'(default: {DEFAULT_DUPLICATE_THRESHOLD})'
+    )
+    
     parser.add_argument(
         '--auto-fix',
         action='store_true',
@@ -626,13 +749,21 @@ def main():
     
     parser.add_argument(
         '--manuscript',
-        help='Path to manuscript file (Markdown or LaTeX) to check for unresolved or unused citations'
+        help='Manuscript file (Markdown or LaTeX), or a project directory of them, to check '
+             'for unresolved or unused citations'
     )
     
     args = parser.parse_args()
     
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if not 0 < args.duplicate_threshold <= 1:
+        parser.error('--duplicate-threshold must be between 0 and 1')
+    
     # Validate file
-    validator = CitationValidator()
+    cache = None if args.no_cache or not args.check_dois else open_cache(args.cache_dir)
+    validator = CitationValidator(cache=cache, workers=args.workers, refresh=args.refresh,
+                                  duplicate_threshold=args.duplicate_threshold)
     report = validator.validate_file(
         args.file, 
         check_dois=args.check_dois,
@@ -11,7 +11,7 @@ This script uses a smart iterative refinement approach:
 
 Requirements:
     - OPENROUTER_API_KEY environment variable
-    - requests library
+    - requests library (and polite_http.py, shipped next to this script)
 
 Usage:
     python generate_infographic_ai.py "5 benefits of exercise" -o benefits.png --type list
@@ -35,6 +35,14 @@ except ImportError:
     print("Error: requests library not found. Install with: pip install requests")
     sys.exit(1)
 
+from polite_http import RateLimiter, pooled_session, send
+
+# Seconds to connect, and to wait for an image: generation is slow.
+CONNECT_TIMEOUT = 10
+REQUEST_TIMEOUT = 120
+# OpenRouter calls per second, shared with every skill process on the machine.
+OPENROUTER_RATE = 1.0
+
 
 def _resolve_api_key(explicit: Optional[str] = None) -> Optional[str]:
     """Resolve the OpenRouter key from --api-key, the environment, then any .env file.
@@ -351,7 +359,11 @@ IMPORTANT - NO META CONTENT:
         
         self.verbose = verbose
         self._last_error = None
-        self.base_url = "https://openrouter.ai/api/v1"
+        self.base_url = (os.getenv("OPENROUTER_API_BASE") or "https://openrouter.ai/api/v1").rstrip("/")
+        self.limiter = RateLimiter(OPENROUTER_RATE, service="openrouter")
+        # One keep-alive connection for research, generation and review calls;
+        # throttled and 5xx responses are retried with backoff.
+        self.session = pooled_session(1)
         # Nano Banana Pro for image generation. The slug must be an image-output
         # model; a text-only chat model is rejected with "No endpoints found that
         # support the requested output modalities".
@@ -443,11 +455,14 @@ Include citation hints where possible."""
                 "search_context_size": "high"
             }
             
-            response = requests.post(
+            response = send(
+                self.session,
+                "POST",
                 f"{self.base_url}/chat/completions",
+                limiter=self.limiter,
                 headers=headers,
                 json=payload,
-                timeout=60
+                timeout=(CONNECT_TIMEOUT, 60)
             )
             
             if response.status_code != 200:
@@ -525,11 +540,14 @@ Be concise and factual. Focus on information useful for an infographic."""
                 "temperature": 0.1
             }
             
-            response = requests.post(
+            response = send(
+                self.session,
+                "POST",
                 f"{self.base_url}/chat/completions",
+                limiter=self.limiter,
                 headers=headers,
                 json=payload,
-                timeout=30
+                timeout=(CONNECT_TIMEOUT, 30)
             )
             
             if response.status_code != 200:
@@ -598,11 +616,14 @@ Incorporate specific numbers, percentages, and dates from the research."""
         self._log(f"Making request to {model}...")
         
         try:
-            response = requests.post(
+            response = send(
+                self.session,
+                "POST",
                 f"{self.base_url}/chat/completions",
+                limiter=self.limiter,
                 headers=headers,
                 json=payload,
-                timeout=120
+                timeout=(CONNECT_TIMEOUT, REQUEST_TIMEOUT)
             )
             
             try:
@@ -617,7 +638,7 @@ Incorporate specific numbers, percentages, and dates from the research."""
             
             return response_json
         except requests.exceptions.Timeout:
-            raise RuntimeError("API request timed out after 120 seconds")
+            raise RuntimeError(f"API request timed out after {REQUEST_TIMEOUT} seconds")
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"API request failed: {str(e)}")
     
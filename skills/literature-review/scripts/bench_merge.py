@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming merge on synthetic multi-database exports.
+
+Writes a JSON array (PubMed-like, with PMIDs), an RIS file (Scopus-like), and a
+CSV file (Web of Science-like) with a shared pool of works, then merges them
+with ``ResultMerger`` the way ``search_databases.py --deduplicate --rank
+citations --top K`` does. Each planted duplicate re-enters an earlier work in
+another export with one realistic variation: a resolver-prefixed DOI, a
+re-cased and re-punctuated title without DOI, a one-letter typo, British
+spelling, or a year off by one with the author written differently.
+
+Usage:
+    python bench_merge.py                      # 200,000 records
+    python bench_merge.py --records 1000000 --top 500
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from result_merge import ResultMerger, iter_records
+
+_SYLLABLES = "ba co de fi gu ha ki lo ma ne pi ro sa tu ve xi yo ze tri pla ctor gen ase ium".split()
+_SPELLINGS = {'or': 'our', 'ize': 'ise', 'er': 're'}
+
+
+def vocabulary(size, rng):
+    words = {"".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(size * 2)}
+    return sorted(words)[:size]
+
+
+def variant(work, rng):
+    """Return ``(record, kind)``: a planted duplicate of ``work``."""
+    copy = dict(work)
+    kind = rng.randrange(5)
+    if kind == 0:
+        copy['doi'] = 'https://doi.org/' + work['doi'].upper()
+        copy['title'] = work['title'].upper()
+    else:
+        copy.pop('doi')
+        copy.pop('pmid', None)
+        title = work['title']
+        if kind == 1:
+            copy['title'] = title.title().replace(' ', ', ', 1) + '.'
+        elif kind == 2:
+            position = rng.randrange(1, len(title))
+            copy['title'] = title[:position] + title[position + 1:]
+        elif kind == 3:
+            for american, british in _SPELLINGS.items():
+                if american in title:
+                    title = title.replace(american, british, 1)
+                    break
+            else:
+                title += ' s'
+            copy['title'] = title
+        else:
+            copy['year'] = str(int(work['year']) + rng.choice((-1, 1)))
+            surname, _, initial = work['authors'][0].partition(', ')
+            copy['authors'] = [f"{surname} {initial[0]}"] + work['authors'][1:]
+    # Re-cased titles and shifted years still match an exact normalized title.
+    return copy, ('approximate' if kind in (2, 3) else 'exact')
+
+
+def write_exports(directory, records, planted_share, seed):
+    """Write the three exports; return ``(paths, planted counts by kind)``."""
+    rng = random.Random(seed)
+    words = vocabulary(20_000, rng)
+    surnames = vocabulary(5_000, rng)
+    # Zipf-like word choice, so common words repeat across titles.
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    paths = [directory / 'pubmed.json', directory / 'scopus.ris', directory / 'wos.csv']
+    handles = [path.open('w', encoding='utf-8', newline='') for path in paths]
+    json_handle, ris_handle, csv_handle = handles
+    writer = csv.writer(csv_handle)
+    writer.writerow(['Authors', 'Article Title', 'Publication Year', 'Source Title', 'DOI',
+                     'Times Cited', 'Abstract'])
+    json_handle.write('[')
+    recent = []
+    planted = {'exact': 0, 'approximate': 0}
+    for number in range(records):
+        if recent and rng.random() < planted_share:
+            record, kind = variant(rng.choice(recent), rng)
+            planted[kind] += 1
+        else:
+            title = " ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(6, 14)))
+            record = {
+                'title': title.capitalize(),
+                'authors': [f"{rng.choice(surnames).capitalize()}, {rng.choice('ABCDEFGH')}."
+                            for _ in range(rng.randint(1, 6))],
+                'year': str(rng.randint(1990, 2025)),
+                'doi': f"10.{1000 + number % 9000}/bench.{number}",
+                'journal': rng.choice(words).capitalize() + ' Journal',
+                'citations': int(rng.paretovariate(1.2)) - 1,
+                'abstract': " ".join(rng.choices(words, cum_weights=cumulative, k=150)),
+            }
+            if len(recent) < 5_000:
+                recent.append(record)
+            else:
+                recent[rng.randrange(len(recent))] = record
+        target = rng.randrange(3)
+        if target == 0:
+            entry = dict(record, pmid=str(number + 1), source='PubMed')
+            json_handle.write((',' if number else '') + json.dumps(entry))
+        elif target == 1:
+            ris_handle.write('TY  - JOUR\n')
+            ris_handle.write(f"TI  - {record['title']}\n")
+            ris_handle.writelines(f"AU  - {author}\n" for author in record['authors'])
+            ris_handle.write(f"PY  - {record['year']}\n")
+            if record.get('doi'):
+                ris_handle.write(f"DO  - {record['doi']}\n")
+            ris_handle.write(f"JO  - {record['journal']}\nAB  - {record['abstract']}\n")
+            ris_handle.write(f"N1  - Cited By: {record['citations']}\nDB  - Scopus\nER  - \n\n")
+        else:
+            writer.writerow(['; '.join(record['authors']), record['title'], record['year'],
+                             record['journal'], record.get('doi', ''), record['citations'],
+                             record['abstract']])
+    json_handle.write(']')
+    for handle in handles:
+        handle.close()
+    return paths, planted
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the streaming search-result merge')
+    parser.add_argument('--records', type=int, default=200_000)
+    parser.add_argument('--planted', type=float, default=0.1, help='Fraction of planted duplicates')
+    parser.add_argument('--top', type=int, default=1000, help='Results kept by the ranking heap')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        started = time.perf_counter()
+        paths, planted = write_exports(Path(scratch), args.records, args.planted, args.seed)
+        size = sum(path.stat().st_size for path in paths) / 1e6
+        print(f"{args.records} records ({size:.0f} MB in JSON, RIS, and CSV), "
+              f"{planted['exact']} exact and {planted['approximate']} near duplicates planted "
+              f"({time.perf_counter() - started:.1f} s to generate)")
+        baseline = peak_rss_mb()
+
+        started = time.perf_counter()
+        with ResultMerger(rank='citations', top=args.top) as merger:
+            for path in paths:
+                merger.extend(iter_records(str(path)))
+            top = list(merger.results())
+        elapsed = time.perf_counter() - started
+        counts = merger.counts
+
+    print(f"{'merge, dedupe, and rank':<32} {elapsed:8.2f} s  ({args.records / elapsed:,.0f} records/s)")
+    print(f"{'peak RSS':<32} {peak_rss_mb():8.0f} MB  (generator alone: {baseline:.0f} MB)")
+    for kind in ('exact', 'approximate'):
+        removed = getattr(counts, f"duplicates_{kind}")
+        print(f"{kind + ' duplicates removed':<32} {removed:8d}  (planted: {planted[kind]})")
+    print(f"{'top results kept':<32} {len(top):8d}")
+    print(json.dumps(counts.as_dict(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
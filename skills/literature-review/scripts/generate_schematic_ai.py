@@ -10,7 +10,7 @@ This script uses a smart iterative refinement approach:
 
 Requirements:
     - OPENROUTER_API_KEY environment variable
-    - requests library
+    - requests library (and polite_http.py, shipped next to this script)
 
 Usage:
     python generate_schematic_ai.py "Create a flowchart showing CONSORT participant flow" -o flowchart.png
@@ -33,6 +33,14 @@ except ImportError:
     print("Error: requests library not found. Install with: pip install requests")
     sys.exit(1)
 
+from polite_http import RateLimiter, pooled_session, send
+
+# Seconds to connect, and to wait for a response: image generation is slow.
+CONNECT_TIMEOUT = 10
+REQUEST_TIMEOUT = 120
+# OpenRouter calls per second, shared with every skill process on the machine.
+OPENROUTER_RATE = 1.0
+
 def _resolve_api_key(explicit: Optional[str] = None) -> Optional[str]:
     """Resolve the OpenRouter key from --api-key, the environment, then any .env file.
 
@@ -160,7 +168,16 @@ IMPORTANT - NO FIGURE NUMBERS:
         
         self.verbose = verbose
         self._last_error = None  # Track last error for better reporting
-        self.base_url = "https://openrouter.ai/api/v1"
+        self.base_url = (os.getenv("OPENROUTER_API_BASE") or "https://openrouter.ai/api/v1").rstrip("/")
+        self.limiter = RateLimiter(OPENROUTER_RATE, service="openrouter")
+        # One keep-alive connection for every generation and review call;
+        # throttled and 5xx responses are retried with backoff.
+        self.session = pooled_session(1, {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://github.com/scientific-writer",
+            "X-Title": "Scientific Schematic Generator"
+        })
         # Nano Banana 2 - Google's advanced image generation model. The slug must
         # be an image-output model; a text-only chat model is rejected with
         # "No endpoints found that support the requested output modalities".
@@ -187,13 +204,6 @@ IMPORTANT - NO FIGURE NUMBERS:
         Returns:
             API response as dictionary
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/scientific-writer",
-            "X-Title": "Scientific Schematic Generator"
-        }
-        
         payload = {
             "model": model,
             "messages": messages
@@ -205,11 +215,13 @@ IMPORTANT - NO FIGURE NUMBERS:
         self._log(f"Making request to {model}...")
         
         try:
-            response = requests.post(
+            response = send(
+                self.session,
+                "POST",
                 f"{self.base_url}/chat/completions",
-                headers=headers,
+                limiter=self.limiter,
                 json=payload,
-                timeout=120
+                timeout=(CONNECT_TIMEOUT, REQUEST_TIMEOUT)
             )
             
             # Try to get response body even on error
@@ -226,7 +238,7 @@ IMPORTANT - NO FIGURE NUMBERS:
             
             return response_json
         except requests.exceptions.Timeout:
-            raise RuntimeError("API request timed out after 120 seconds")
+            raise RuntimeError(f"API request timed out after {REQUEST_TIMEOUT} seconds")
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"API request failed: {str(e)}")
     
@@ -0,0 +1,859 @@
+"""
+Streaming merge, deduplication, and ranking of literature search exports.
+
+Records are read one at a time from JSON (an array, JSON Lines, or an object
+wrapping a ``results`` list), RIS, and CSV/TSV exports, so a multi-database
+export never has to fit in memory. Identifiers are normalized: DOIs lose their
+resolver prefixes and case, PMIDs and arXiv IDs are also taken from PubMed and
+arXiv URLs, and arXiv DOIs map to arXiv IDs.
+
+Duplicates are found in two steps:
+
+1. Exactly, by a shared DOI, PMID, or arXiv ID, or by an identical normalized
+   title whose DOI, year, and first author do not conflict.
+2. Approximately, within blocks of records that share a first author, title
+   numbers ("Part II", "phase 3"), and a publication year (one year either
+   side is probed). Records in a block are compared by a 16-byte MinHash
+   fingerprint of the title's character 4-grams.
+
+For each distinct work the merger keeps a few identifier hashes and the
+fingerprint, never the record. Kept records go to a temporary spool file or,
+when ranking with a limit, into a heap holding only the top ``k``. PRISMA
+identification counts are tallied in the same pass.
+"""
+
+import csv
+import heapq
+import io
+import json
+import re
+import sys
+import tempfile
+import unicodedata
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import unquote
+
+# Minimum estimated title Jaccard similarity for an approximate duplicate.
+DEFAULT_SIMILARITY = 0.7
+FINGERPRINT_BINS = 16
+MAX_YEAR_GAP = 1
+# Titles shorter than this (after removing spaces) only match exactly.
+MIN_FUZZY_LENGTH = 12
+# Records compared per block, so a pathological block cannot stall the merge.
+MAX_BLOCK_SCAN = 1000
+RANK_CRITERIA = ('citations', 'year', 'relevance')
+INPUT_FORMATS = ('json', 'jsonl', 'ris', 'csv', 'tsv')
+_CHUNK_SIZE = 1 << 16
+
+_MARKUP = re.compile(r'<[^>]+>|\\[A-Za-z]+\*?|[{}]')
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+# Digits, and roman numerals up to x. A single-letter numeral only counts after
+# a word that introduces one, so the "x" of "X-ray" is not a number.
+_NUMBER_TOKEN = re.compile(
+    r'\b(?:(part|phase|vol|volume|chapter|book|type|stage|class|series) )?'
+    r'(\d+|i{1,3}|iv|vi{0,3}|ix|x)\b'
+)
+_YEAR = re.compile(r'\d{4}')
+_DOI = re.compile(r'10\.\d{4,9}/\S+')
+_ARXIV_ID = re.compile(r'(\d{4}\.\d{4,5}|[a-z][a-z\-]+(?:\.[a-z]{2})?/\d{7})(?:v\d+)?', re.I)
+_ARXIV_REFERENCE = re.compile(r'arxiv\.org/(?:abs|pdf)/|arxiv[:.]', re.I)
+_PMID_URL = re.compile(r'(?:pubmed\.ncbi\.nlm\.nih\.gov/|ncbi\.nlm\.nih\.gov/pubmed/)(\d+)')
+_INITIALS = re.compile(r'^(?:[A-Z]\.?){1,3}$')
+_SEPARATORS = re.compile(r'[\s,]*')
+_RIS_LINE = re.compile(r'^([A-Z][A-Z0-9])  -(?: (.*))?$')
+_CITED_BY = re.compile(r'cited by:?\s*(\d+)', re.I)
+
+_RIS_TYPES = {
+    'JOUR': 'article', 'JFULL': 'article', 'EJOUR': 'article', 'MGZN': 'article',
+    'CONF': 'inproceedings', 'CPAPER': 'inproceedings', 'BOOK': 'book',
+    'CHAP': 'incollection', 'THES': 'phdthesis', 'RPRT': 'techreport',
+}
+_RIS_FIELDS = {
+    'TI': 'title', 'T1': 'title', 'PY': 'year', 'Y1': 'year', 'DA': 'year',
+    'DO': 'doi', 'UR': 'url', 'L2': 'url', 'JF': 'journal', 'JO': 'journal',
+    'T2': 'journal', 'JA': 'journal', 'VL': 'volume', 'IS': 'issue',
+    'AB': 'abstract', 'N2': 'abstract', 'DB': 'source', 'DP': 'source',
+}
+# CSV column names of PubMed, Scopus, Web of Science, and Dimensions exports,
+# lower-cased with punctuation and spaces removed.
+_CSV_COLUMNS = {
+    'title': 'title', 'articletitle': 'title', 'documenttitle': 'title', 'ti': 'title',
+    'authors': 'authors', 'author': 'authors', 'au': 'authors',
+    'year': 'year', 'publicationyear': 'year', 'pubyear': 'year', 'py': 'year',
+    'doi': 'doi', 'di': 'doi',
+    'pmid': 'pmid', 'pubmedid': 'pmid', 'pm': 'pmid',
+    'journal': 'journal', 'sourcetitle': 'journal', 'journalbook': 'journal',
+    'publicationtitle': 'journal', 'so': 'journal',
+    'volume': 'volume', 'vl': 'volume', 'issue': 'issue', 'is': 'issue',
+    'pages': 'pages', 'pagestart': 'page_start', 'bp': 'page_start',
+    'pageend': 'page_end', 'ep': 'page_end',
+    'abstract': 'abstract', 'ab': 'abstract',
+    'citedby': 'citations', 'timescited': 'citations', 'tc': 'citations',
+    'citations': 'citations', 'citationcount': 'citations',
+    'link': 'url', 'url': 'url',
+    'source': 'source', 'database': 'source',
+    'relevancescore': 'relevance_score', 'relevance': 'relevance_score',
+}
+# Fields a duplicate may fill in on the record held for a work.
+_FILL_FIELDS = ('doi', 'pmid', 'arxiv_id', 'abstract', 'url', 'journal', 'volume', 'pages')
+
+
+# ---------------------------------------------------------------------------
+# Normalization
+# ---------------------------------------------------------------------------
+
+def _ascii_fold(text: str) -> str:
+    folded = []
+    for char in unicodedata.normalize('NFKD', text):
+        if unicodedata.combining(char):
+            continue
+        if char.isascii():
+            folded.append(char)
+        elif unicodedata.name(char, '').startswith('GREEK'):
+            # "α-synuclein" and "alpha-synuclein" should normalize alike.
+            folded.append(' ' + unicodedata.name(char).split()[-1] + ' ')
+        else:
+            folded.append(' ')
+    return ''.join(folded)
+
+
+def normalize_title(title: str) -> str:
+    """Case-fold a title and drop HTML/LaTeX markup, accents, and punctuation."""
+    text = _MARKUP.sub(' ', str(title or ''))
+    if not text.isascii():
+        text = _ascii_fold(text)
+    return _NON_WORD.sub(' ', text.casefold()).strip()
+
+
+def _number_tokens(title: str) -> Set[str]:
+    """Return the numbers in a normalized title, which must agree between duplicates."""
+    return {
+        number
+        for marker, number in _NUMBER_TOKEN.findall(title)
+        if marker or len(number) > 1 or number.isdigit()
+    }
+
+
+def normalize_doi(value) -> Optional[str]:
+    """Return a bare lower-case DOI from a DOI, ``doi:`` string, or resolver URL."""
+    if not value:
+        return None
+    match = _DOI.search(unquote(str(value)).strip().lower())
+    if not match:
+        return None
+    doi = match.group().rstrip('.,;')
+    # Parentheses are legal in DOIs; only strip a closing one left unbalanced.
+    while doi.endswith(')') and doi.count(')') > doi.count('('):
+        doi = doi[:-1].rstrip('.,;')
+    return doi
+
+
+def normalize_arxiv_id(value) -> Optional[str]:
+    """Return a version-less arXiv ID from an ID, ``arXiv:`` string, DOI, or URL."""
+    text = str(value or '').strip()
+    if not text:
+        return None
+    reference = _ARXIV_REFERENCE.search(text)
+    match = _ARXIV_ID.match(text, reference.end()) if reference else _ARXIV_ID.fullmatch(text)
+    return match.group(1).lower() if match else None
+
+
+def record_identifiers(record: Dict) -> Dict[str, str]:
+    """Return the normalized ``doi``, ``pmid``, and ``arxiv`` of a record, where present."""
+    url = str(record.get('url') or '')
+    identifiers = {}
+    doi = normalize_doi(record.get('doi')) or normalize_doi(url if 'doi.org/' in url else None)
+    if doi:
+        identifiers['doi'] = doi
+    pmid = str(record.get('pmid') or record.get('PMID') or '').strip()
+    if not pmid.isdigit():
+        match = _PMID_URL.search(url)
+        pmid = match.group(1) if match else ''
+    if pmid:
+        identifiers['pmid'] = pmid.lstrip('0') or pmid
+    arxiv = (
+        normalize_arxiv_id(record.get('arxiv_id') or record.get('arxiv'))
+        or normalize_arxiv_id(doi)
+        or normalize_arxiv_id(url)
+    )
+    if arxiv:
+        identifiers['arxiv'] = arxiv
+    return identifiers
+
+
+def first_author(authors) -> str:
+    """Return the normalized family name of the first author.
+
+    Accepts a list of names or name dicts, or a string in BibTeX (``and``),
+    semicolon, or comma-separated Vancouver (``Smith J, Doe A``) form.
+    """
+    if isinstance(authors, list):
+        first = authors[0] if authors else ''
+    else:
+        first = re.split(r';|\s+and\s+', str(authors or ''), maxsplit=1)[0]
+    if isinstance(first, dict):
+        first = first.get('family') or first.get('last') or first.get('name') or ''
+    first = str(first).split(',', 1)[0].strip()
+    words = first.split()
+    if len(words) > 1:
+        # "Smith JA" (Vancouver) keeps the leading words, "Jane Smith" the last.
+        words = words[:-1] if _INITIALS.match(words[-1]) else words[-1:]
+    return normalize_title(' '.join(words)).replace(' ', '')
+
+
+def publication_year(value) -> Optional[int]:
+    """Return the first four-digit year in ``value``, if any."""
+    match = _YEAR.search(str(value or ''))
+    return int(match.group()) if match else None
+
+
+def _number(value) -> float:
+    try:
+        return float(str(value).replace(',', '').strip())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def rank_key(record: Dict, criteria: str) -> float:
+    """Return the ranking value of ``record``; higher ranks first."""
+    if criteria == 'citations':
+        return _number(record.get('citations'))
+    if criteria == 'year':
+        return float(publication_year(record.get('year')) or 0)
+    if criteria == 'relevance':
+        return _number(record.get('relevance_score'))
+    raise ValueError(f"Unknown ranking criteria: {criteria}")
+
+
+def title_fingerprint(title: str) -> bytes:
+    """Return a one-permutation MinHash of a normalized title's character 4-grams.
+
+    Each byte is the minimum 4-gram hash of one of ``FINGERPRINT_BINS`` bins
+    (empty bins copy the next non-empty one), so the fraction of equal bytes
+    between two fingerprints estimates the titles' Jaccard similarity.
+    """
+    compact = title.replace(' ', '').encode('ascii')
+    grams = [compact[start:start + 4] for start in range(max(len(compact) - 3, 1))]
+    # dict() keeps the last value per bin, and hashes are visited from largest
+    # to smallest, so each bin ends up with its minimum.
+    ordered = sorted(map(zlib.crc32, grams), reverse=True)
+    minima = dict(zip([hashed % FINGERPRINT_BINS for hashed in ordered], ordered))
+    lanes = list(map(minima.get, range(FINGERPRINT_BINS)))
+    if len(minima) < FINGERPRINT_BINS:
+        for slot in range(FINGERPRINT_BINS):
+            offset = slot
+            while lanes[slot] is None:
+                offset = (offset + 1) % FINGERPRINT_BINS
+                lanes[slot] = minima.get(offset)
+    return bytes([(value >> 4) & 0xFF for value in lanes])
+
+
+def fingerprint_similarity(left: bytes, right: bytes) -> float:
+    """Return the fraction of equal bins in two title fingerprints."""
+    difference = int.from_bytes(left, 'little') ^ int.from_bytes(right, 'little')
+    return difference.to_bytes(len(left), 'little').count(0) / len(left)
+
+
+# ---------------------------------------------------------------------------
+# Lazy readers
+# ---------------------------------------------------------------------------
+
+def detect_format(path: str) -> str:
+    """Guess an export's format from its extension (and, for ``.txt``, its first line)."""
+    suffix = Path(path).suffix.lower()
+    known = {
+        '.json': 'json', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.ris': 'ris',
+        '.csv': 'csv', '.tsv': 'tsv', '.tab': 'tsv',
+    }
+    if suffix in known:
+        return known[suffix]
+    if suffix == '.txt':
+        with open(path, encoding='utf-8-sig', errors='replace') as handle:
+            line = handle.readline()
+        return 'ris' if _RIS_LINE.match(line.rstrip('\r\n')) else 'tsv'
+    raise ValueError(f"Cannot tell the format of {path}; pass an input format")
+
+
+def _refill(handle: IO[str], buffer: str, position: int) -> Tuple[str, int, bool]:
+    chunk = handle.read(_CHUNK_SIZE)
+    return buffer[position:] + chunk, 0, not chunk
+
+
+def _json_values(handle: IO[str], buffer: str) -> Iterator[object]:
+    """Yield JSON values separated by whitespace or commas, up to ``]`` or EOF."""
+    decoder = json.JSONDecoder()
+    position = 0
+    eof = False
+    while True:
+        position = _SEPARATORS.match(buffer, position).end()
+        if position == len(buffer):
+            if eof:
+                return
+            buffer, position, eof = _refill(handle, buffer, position)
+            continue
+        if buffer[position] == ']':
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            buffer, position, eof = _refill(handle, buffer, position)
+            continue
+        if end == len(buffer) and not eof:
+            # A value ending at the chunk boundary may continue in the next chunk.
+            buffer, position, eof = _refill(handle, buffer, position)
+            continue
+        position = end
+        yield value
+
+
+def _wrapped_records(value: object) -> Iterator[Dict]:
+    if isinstance(value, dict):
+        for key in ('results', 'records', 'items', 'data'):
+            if isinstance(value.get(key), list):
+                value = value[key]
+                break
+        else:
+            yield value
+            return
+    if isinstance(value, list):
+        yield from (item for item in value if isinstance(item, dict))
+
+
+def iter_json(handle: IO[str]) -> Iterator[Dict]:
+    """Yield records from a JSON array or JSON Lines stream, one at a time.
+
+    A single top-level object is read whole and its ``results``, ``records``,
+    ``items``, or ``data`` list is used.
+    """
+    buffer = ''
+    while True:
+        chunk = handle.read(_CHUNK_SIZE)
+        buffer = (buffer + chunk).lstrip('\ufeff \t\r\n')
+        if buffer or not chunk:
+            break
+    if buffer.startswith('['):
+        for value in _json_values(handle, buffer[1:]):
+            if isinstance(value, dict):
+                yield value
+        return
+    values = _json_values(handle, buffer)
+    first = next(values, None)
+    second = next(values, None)
+    if second is None:
+        yield from _wrapped_records(first)
+        return
+    for value in chain((first, second), values):
+        if isinstance(value, dict):
+            yield value
+
+
+def _ris_record(fields: Dict, authors: List[str], start: str, end: str) -> Dict:
+    if authors:
+        fields['authors'] = authors
+    if start:
+        fields['pages'] = f"{start}-{end}" if end else start
+    if 'year' in fields:
+        year = publication_year(fields['year'])
+        fields['year'] = str(year) if year else fields['year']
+    return fields
+
+
+def iter_ris(handle: IO[str]) -> Iterator[Dict]:
+    """Yield records from an RIS export, one ``TY``…``ER`` block at a time."""
+    fields: Dict = {}
+    authors: List[str] = []
+    start = end = ''
+    last = None
+    for line in handle:
+        line = line.rstrip('\r\n').lstrip('\ufeff')
+        match = _RIS_LINE.match(line)
+        if not match:
+            # Continuation of a wrapped field such as an abstract.
+            if last and line.strip():
+                fields[last] += ' ' + line.strip()
+            continue
+        tag, value = match.group(1), (match.group(2) or '').strip()
+        last = None
+        if tag == 'ER':
+            if fields or authors:
+                yield _ris_record(fields, authors, start, end)
+            fields, authors, start, end = {}, [], '', ''
+        elif tag == 'TY':
+            fields['type'] = _RIS_TYPES.get(value.upper(), 'misc')
+        elif tag in ('AU', 'A1'):
+            authors.append(value)
+        elif tag == 'SP':
+            start = value
+        elif tag == 'EP':
+            end = value
+        elif tag == 'N1':
+            cited = _CITED_BY.search(value)
+            if cited:
+                fields.setdefault('citations', int(cited.group(1)))
+        elif tag in _RIS_FIELDS and value:
+            name = _RIS_FIELDS[tag]
+            if name not in fields:
+                fields[name] = value
+                last = name
+    if fields or authors:
+        yield _ris_record(fields, authors, start, end)
+
+
+def iter_csv(handle: IO[str], delimiter: Optional[str] = None) -> Iterator[Dict]:
+    """Yield records from a CSV or tab-delimited export with a header row."""
+    if delimiter is None:
+        sample = handle.read(_CHUNK_SIZE)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=',;\t').delimiter
+        except csv.Error:
+            delimiter = ','
+        # Finish the sampled line so the reader never sees half a line.
+        sample += handle.readline()
+        handle = chain(io.StringIO(sample), handle)  # type: ignore[assignment]
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    reader = csv.reader(handle, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns: Dict[int, str] = {}
+    taken = set()
+    for position, name in enumerate(header):
+        canonical = _CSV_COLUMNS.get(_NON_WORD.sub('', name.lstrip('\ufeff').lower()))
+        if canonical and canonical not in taken:
+            columns[position] = canonical
+            taken.add(canonical)
+    for row in reader:
+        record = {
+            columns[position]: value.strip()
+            for position, value in enumerate(row)
+            if position in columns and value.strip()
+        }
+        if not record:
+            continue
+        start = record.pop('page_start', '')
+        end = record.pop('page_end', '')
+        if start and 'pages' not in record:
+            record['pages'] = f"{start}-{end}" if end else start
+        if 'authors' in record and ';' in record['authors']:
+            record['authors'] = [name.strip() for name in record['authors'].split(';') if name.strip()]
+        yield record
+
+
+def iter_records(path: str, input_format: Optional[str] = None) -> Iterator[Dict]:
+    """Yield the records of one export file, lazily.
+
+    Records are mapped to the fields ``search_databases.py`` uses (``title``,
+    ``authors``, ``year``, ``doi``, ``journal``, ``citations``, ...), and get
+    the file name's stem as ``source`` if the export does not name its
+    database. ``ResultMerger.add`` normalizes their identifiers.
+    """
+    input_format = input_format or detect_format(path)
+    if input_format not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input format: {input_format}")
+    source = Path(path).stem
+    with open(path, encoding='utf-8-sig', errors='replace', newline='') as handle:
+        if input_format in ('json', 'jsonl'):
+            records = iter_json(handle)
+        elif input_format == 'ris':
+            records = iter_ris(handle)
+        else:
+            records = iter_csv(handle, '\t' if input_format == 'tsv' else None)
+        for record in records:
+            if not record.get('source'):
+                record['source'] = source
+            yield record
+
+
+def _store_identifiers(record: Dict) -> Dict[str, str]:
+    identifiers = record_identifiers(record)
+    for name, key in (('doi', 'doi'), ('pmid', 'pmid'), ('arxiv', 'arxiv_id')):
+        if name in identifiers:
+            record[key] = identifiers[name]
+    return identifiers
+
+
+def normalize_record(record: Dict, default_source: str = 'Unknown') -> Dict:
+    """Store canonical identifiers and a source on ``record`` and return it."""
+    _store_identifiers(record)
+    if not record.get('source'):
+        record['source'] = default_source
+    return record
+
+
+# ---------------------------------------------------------------------------
+# Merge
+# ---------------------------------------------------------------------------
+
+@dataclass
+class PrismaCounts:
+    """PRISMA 2020 identification counts for one merge."""
+
+    identified: int = 0
+    by_source: Dict[str, int] = field(default_factory=dict)
+    duplicates_exact: int = 0
+    duplicates_approximate: int = 0
+    ineligible: int = 0
+    removed_other: int = 0
+    screened: int = 0
+
+    @property
+    def duplicates(self) -> int:
+        return self.duplicates_exact + self.duplicates_approximate
+
+    def as_dict(self) -> Dict:
+        return {
+            'records_identified': self.identified,
+            'records_identified_by_source': dict(self.by_source),
+            'duplicates_removed': self.duplicates,
+            'duplicates_removed_exact': self.duplicates_exact,
+            'duplicates_removed_approximate': self.duplicates_approximate,
+            'records_marked_ineligible_by_automation': self.ineligible,
+            'records_removed_other_reasons': self.removed_other,
+            'records_screened': self.screened,
+        }
+
+
+class SummaryStats:
+    """Running source, year, and citation statistics over a record stream."""
+
+    def __init__(self):
+        self.total = 0
+        self.sources: Dict[str, int] = {}
+        self.years: Dict[str, int] = {}
+        self.citations = 0
+        self.cited = 0
+
+    def add(self, record: Dict) -> None:
+        self.total += 1
+        source = record.get('source', 'Unknown')
+        self.sources[source] = self.sources.get(source, 0) + 1
+        year = record.get('year', 'Unknown')
+        self.years[year] = self.years.get(year, 0) + 1
+        if record.get('citations'):
+            try:
+                self.citations += int(record['citations'])
+                self.cited += 1
+            except (ValueError, TypeError):
+                pass
+
+    def as_dict(self) -> Dict:
+        return {
+            'total_results': self.total,
+            'sources': self.sources,
+            'year_distribution': self.years,
+            'avg_citations': self.citations / self.cited if self.cited else 0,
+            'total_citations': self.citations,
+        }
+
+
+class _Features(NamedTuple):
+    identifiers: Dict[str, str]
+    title: str
+    year: int
+    author: str
+    numbers: str
+
+    @property
+    def doi_hash(self) -> int:
+        return hash(self.identifiers['doi']) if 'doi' in self.identifiers else 0
+
+    @property
+    def author_hash(self) -> int:
+        return hash(self.author) if self.author else 0
+
+
+class ResultMerger:
+    """Single-pass merge of search results: dedupe, year filter, rank, count.
+
+    Call ``add`` for every record, then iterate ``results()``. Without
+    ``rank``, works are returned in first-seen order (the first ``top``, if
+    given) from a temporary spool file. With ``rank``, each work ranks by the
+    best value among its duplicates and a heap keeps the ``top`` best; the
+    record held for a work is filled in with fields its duplicates add.
+    Ranking without ``top`` holds every work in memory.
+
+    Args:
+        deduplicate: Remove duplicate records.
+        approximate: Also remove near-duplicates (needs ``deduplicate``).
+        similarity: Minimum estimated title similarity for a near-duplicate.
+        rank: Ranking criteria, one of ``RANK_CRITERIA``.
+        top: Maximum number of works to return.
+        year_start: Minimum publication year (inclusive).
+        year_end: Maximum publication year (inclusive).
+        spool: Spool unranked results to a temporary file instead of a list.
+    """
+
+    def __init__(
+        self,
+        *,
+        deduplicate: bool = True,
+        approximate: bool = True,
+        similarity: float = DEFAULT_SIMILARITY,
+        rank: Optional[str] = None,
+        top: Optional[int] = None,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        spool: bool = True,
+    ):
+        if rank is not None and rank not in RANK_CRITERIA:
+            raise ValueError(f"Unknown ranking criteria: {rank}")
+        if top is not None and top < 1:
+            raise ValueError("top must be at least 1")
+        self.deduplicate = deduplicate
+        self.approximate = deduplicate and approximate
+        self.similarity = similarity
+        self.rank = rank
+        self.top = top
+        self.year_start = year_start
+        self.year_end = year_end
+        self.counts = PrismaCounts()
+        self.summary = SummaryStats()
+
+        # Per-work state, indexed by work number in first-seen order.
+        self._keys: Dict[int, int] = {}
+        self._blocks: Dict[int, int] = {}
+        self._doi = array('q')
+        self._year = array('H')
+        self._author = array('q')
+        self._next = array('l')
+        self._fingerprints = bytearray()
+        self._eligible = bytearray()
+        self._best = array('d')
+
+        self._heap: List[list] = []
+        self._held: Dict[int, list] = {}
+        self._kept = 0
+        self._spool: Optional[IO[str]] = None
+        self._list: List[Dict] = []
+        if rank is None and spool:
+            self._spool = tempfile.TemporaryFile('w+', encoding='utf-8')
+
+    def add(self, record: Dict) -> None:
+        """Normalize the identifiers of ``record``, count it, and keep it if it is a new, eligible work."""
+        counts = self.counts
+        counts.identified += 1
+        source = str(record.get('source') or 'Unknown')
+        counts.by_source[source] = counts.by_source.get(source, 0) + 1
+
+        identifiers = _store_identifiers(record)
+        title = normalize_title(record.get('title', ''))
+        if not title and not identifiers:
+            counts.removed_other += 1
+            return
+        year = publication_year(record.get('year'))
+        features = _Features(
+            identifiers,
+            title,
+            year if year and 0 < year < 65536 else 0,
+            first_author(record.get('authors') or record.get('author') or ''),
+            ' '.join(sorted(_number_tokens(title))),
+        )
+        fingerprint = None
+        if self.deduplicate:
+            work, exact, fingerprint = self._match(features)
+            if work is not None:
+                if exact:
+                    counts.duplicates_exact += 1
+                else:
+                    counts.duplicates_approximate += 1
+                self._absorb(work, record, identifiers)
+                return
+        eligible = not (
+            year and (
+                (self.year_start and year < self.year_start)
+                or (self.year_end and year > self.year_end)
+            )
+        )
+        work = self._register(record, features, fingerprint, eligible)
+        if not eligible:
+            counts.ineligible += 1
+            return
+        counts.screened += 1
+        self.summary.add(record)
+        self._keep(work, record)
+
+    def extend(self, records: Iterable[Dict]) -> 'ResultMerger':
+        """Add every record in ``records`` and return the merger."""
+        for record in records:
+            self.add(record)
+        return self
+
+    def results(self) -> Iterator[Dict]:
+        """Yield the kept records, ranked if ``rank`` was given."""
+        if self.rank is not None:
+            live = [entry for entry in self._heap if entry[3] is not None]
+            live.sort(key=lambda entry: (-entry[0], entry[2]))
+            for entry in live:
+                yield entry[3]
+        elif self._spool is not None:
+            self._spool.seek(0)
+            for line in self._spool:
+                yield json.loads(line)
+        else:
+            yield from self._list
+
+    @property
+    def kept(self) -> int:
+        """Number of records ``results()`` yields."""
+        return len(self._held) if self.rank is not None else self._kept
+
+    def close(self) -> None:
+        """Delete the spool file."""
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+    def __enter__(self) -> 'ResultMerger':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # -- deduplication -----------------------------------------------------
+
+    def _match(self, features: '_Features') -> Tuple[Optional[int], bool, Optional[bytes]]:
+        """Return ``(work, exact, fingerprint)`` for the work a record duplicates."""
+        for name, value in features.identifiers.items():
+            work = self._keys.get(hash((name, value)))
+            if work is not None:
+                return work, True, None
+        if features.title:
+            work = self._keys.get(hash(('title', features.title)))
+            if work is not None and self._compatible(work, features):
+                return work, True, None
+        if not self._fuzzy(features):
+            return None, False, None
+        fingerprint = title_fingerprint(features.title)
+        best, best_similarity = None, self.similarity
+        year = features.year
+        width = FINGERPRINT_BINS
+        for probe in ((year - 1, year, year + 1) if year else (0,)):
+            work = self._blocks.get(self._block(features, probe), -1)
+            scanned = 0
+            while work >= 0 and scanned < MAX_BLOCK_SCAN:
+                scanned += 1
+                if self._compatible(work, features):
+                    stored = self._fingerprints[work * width:(work + 1) * width]
+                    similarity = fingerprint_similarity(fingerprint, stored)
+                    if similarity >= best_similarity:
+                        best, best_similarity = work, similarity
+                work = self._next[work]
+        return best, False, fingerprint
+
+    def _fuzzy(self, features: '_Features') -> bool:
+        return self.approximate and bool(features.author) and len(features.title) >= MIN_FUZZY_LENGTH
+
+    @staticmethod
+    def _block(features: '_Features', year: int) -> int:
+        return hash((features.author, year, features.numbers))
+
+    def _compatible(self, work: int, features: '_Features') -> bool:
+        doi, year, author = features.doi_hash, features.year, features.author_hash
+        if doi and self._doi[work] and self._doi[work] != doi:
+            return False
+        if year and self._year[work] and abs(self._year[work] - year) > MAX_YEAR_GAP:
+            return False
+        return not (author and self._author[work] and self._author[work] != author)
+
+    def _register(
+        self,
+        record: Dict,
+        features: '_Features',
+        fingerprint: Optional[bytes],
+        eligible: bool,
+    ) -> int:
+        work = len(self._eligible)
+        self._eligible.append(eligible)
+        if self.rank is not None:
+            self._best.append(rank_key(record, self.rank))
+        if not self.deduplicate:
+            return work
+        self._doi.append(features.doi_hash)
+        self._year.append(features.year)
+        self._author.append(features.author_hash)
+        for name, value in features.identifiers.items():
+            self._keys.setdefault(hash((name, value)), work)
+        if features.title:
+            self._keys.setdefault(hash(('title', features.title)), work)
+        if self._fuzzy(features):
+            block = self._block(features, features.year)
+            self._next.append(self._blocks.get(block, -1))
+            self._blocks[block] = work
+            self._fingerprints += fingerprint or title_fingerprint(features.title)
+        else:
+            self._next.append(-1)
+            self._fingerprints += bytes(FINGERPRINT_BINS)
+        return work
+
+    def _absorb(self, work: int, record: Dict, identifiers: Dict[str, str]) -> None:
+        """Fold a duplicate of ``work`` into the work's identifiers and held record."""
+        for name, value in identifiers.items():
+            self._keys.setdefault(hash((name, value)), work)
+        if 'doi' in identifiers and not self._doi[work]:
+            self._doi[work] = hash(identifiers['doi'])
+        if self.rank is None or not self._eligible[work]:
+            return
+        key = rank_key(record, self.rank)
+        held = self._held.get(work)
+        if held is not None:
+            kept = held[3]
+            for name in _FILL_FIELDS:
+                if not kept.get(name) and record.get(name):
+                    kept[name] = record[name]
+            if _number(record.get('citations')) > _number(kept.get('citations')):
+                kept['citations'] = record['citations']
+            if key > held[0]:
+                held[3] = None
+                self._offer(key, work, kept)
+        elif key > self._best[work]:
+            self._offer(key, work, record)
+        if key > self._best[work]:
+            self._best[work] = key
+
+    # -- ranking and output ------------------------------------------------
+
+    def _keep(self, work: int, record: Dict) -> None:
+        if self.rank is not None:
+            self._offer(self._best[work], work, record)
+            return
+        if self.top is not None and self._kept >= self.top:
+            return
+        self._kept += 1
+        if self._spool is not None:
+            self._spool.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            self._list.append(record)
+
+    def _offer(self, key: float, work: int, record: Dict) -> None:
+        """Push a work onto the top-k heap; stale entries have ``None`` records."""
+        entry = [key, -work, work, record]
+        heap = self._heap
+        if work in self._held or self.top is None or len(self._held) < self.top:
+            self._held[work] = entry
+            heapq.heappush(heap, entry)
+        else:
+            while heap[0][3] is None:
+                heapq.heappop(heap)
+            lowest = heap[0]
+            if (key, -work) <= (lowest[0], lowest[1]):
+                return
+            del self._held[lowest[2]]
+            self._held[work] = entry
+            heapq.heapreplace(heap, entry)
+        if len(heap) > 2 * len(self._held) + 64:
+            self._heap = [entry for entry in heap if entry[3] is not None]
+            heapq.heapify(self._heap)
+
+
+def merge_records(records: Iterable[Dict], **options) -> Tuple[List[Dict], PrismaCounts]:
+    """Merge an in-memory record list; see ``ResultMerger`` for ``options``."""
+    with ResultMerger(spool=False, **options) as merger:
+        merger.extend(records)
+        return list(merger.results()), merger.counts
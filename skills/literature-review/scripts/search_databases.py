@@ -2,118 +2,157 @@
 """
 Literature Database Search Script
 Searches multiple literature databases and aggregates results.
+
+Exports from several databases (JSON, JSON Lines, RIS, CSV/TSV) are merged in
+one streaming pass through ``result_merge.ResultMerger``: identifiers are
+normalized, exact and near-duplicates are removed, a heap keeps the top-ranked
+results, and the PRISMA identification counts are tallied as records go by.
 """
 
+import argparse
+import io
 import json
 import sys
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, TextIO
 from datetime import datetime
 
-def format_search_results(results: List[Dict], output_format: str = 'json') -> str:
-    """
-    Format search results for output.
+from result_merge import (
+    DEFAULT_SIMILARITY,
+    INPUT_FORMATS,
+    RANK_CRITERIA,
+    ResultMerger,
+    SummaryStats,
+    iter_records,
+    merge_records,
+    publication_year,
+    rank_key,
+)
 
-    Args:
-        results: List of search results
-        output_format: Format (json, markdown, or bibtex)
-
-    Returns:
-        Formatted string
-    """
-    if output_format == 'json':
-        return json.dumps(results, indent=2)
+OUTPUT_FORMATS = ('json', 'jsonl', 'markdown', 'bibtex')
 
-    elif output_format == 'markdown':
-        md = f"# Literature Search Results\n\n"
-        md += f"**Search Date**: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
-        md += f"**Total Results**: {len(results)}\n\n"
+def _author_text(authors, separator: str) -> str:
+    if isinstance(authors, list):
+        return separator.join(
+            author.get('name', '') if isinstance(author, dict) else str(author)
+            for author in authors
+        )
+    return authors
 
-        for i, result in enumerate(results, 1):
-            md += f"## {i}. {result.get('title', 'Untitled')}\n\n"
-            md += f"**Authors**: {result.get('authors', 'Unknown')}\n\n"
-            md += f"**Year**: {result.get('year', 'N/A')}\n\n"
-            md += f"**Source**: {result.get('source', 'Unknown')}\n\n"
+def _markdown_entry(number: int, result: Dict) -> str:
+    md = f"## {number}. {result.get('title', 'Untitled')}\n\n"
+    md += f"**Authors**: {_author_text(result.get('authors', 'Unknown'), '; ')}\n\n"
+    md += f"**Year**: {result.get('year', 'N/A')}\n\n"
+    md += f"**Source**: {result.get('source', 'Unknown')}\n\n"
 
-            if result.get('abstract'):
-                md += f"**Abstract**: {result['abstract']}\n\n"
+    if result.get('abstract'):
+        md += f"**Abstract**: {result['abstract']}\n\n"
 
-            if result.get('doi'):
-                md += f"**DOI**: [{result['doi']}](https://doi.org/{result['doi']})\n\n"
+    if result.get('doi'):
+        md += f"**DOI**: [{result['doi']}](https://doi.org/{result['doi']})\n\n"
 
-            if result.get('url'):
-                md += f"**URL**: {result['url']}\n\n"
+    if result.get('url'):
+        md += f"**URL**: {result['url']}\n\n"
 
-            if result.get('citations'):
-                md += f"**Citations**: {result['citations']}\n\n"
+    if result.get('citations'):
+        md += f"**Citations**: {result['citations']}\n\n"
 
-            md += "---\n\n"
+    return md + "---\n\n"
 
-        return md
+def _bibtex_entry(result: Dict) -> str:
+    entry_type = result.get('type', 'article')
+    cite_key = f"{result.get('first_author', 'unknown')}{result.get('year', '0000')}"
 
-    elif output_format == 'bibtex':
-        bibtex = ""
-        for i, result in enumerate(results, 1):
-            entry_type = result.get('type', 'article')
-            cite_key = f"{result.get('first_author', 'unknown')}{result.get('year', '0000')}"
+    bibtex = f"@{entry_type}{{{cite_key},\n"
+    bibtex += f"  title = {{{result.get('title', '')}}},\n"
+    bibtex += f"  author = {{{_author_text(result.get('authors', ''), ' and ')}}},\n"
+    bibtex += f"  year = {{{result.get('year', '')}}},\n"
 
-            bibtex += f"@{entry_type}{{{cite_key},\n"
-            bibtex += f"  title = {{{result.get('title', '')}}},\n"
-            bibtex += f"  author = {{{result.get('authors', '')}}},\n"
-            bibtex += f"  year = {{{result.get('year', '')}}},\n"
+    if result.get('journal'):
+        bibtex += f"  journal = {{{result['journal']}}},\n"
 
-            if result.get('journal'):
-                bibtex += f"  journal = {{{result['journal']}}},\n"
+    if result.get('volume'):
+        bibtex += f"  volume = {{{result['volume']}}},\n"
 
-            if result.get('volume'):
-                bibtex += f"  volume = {{{result['volume']}}},\n"
+    if result.get('pages'):
+        bibtex += f"  pages = {{{result['pages']}}},\n"
 
-            if result.get('pages'):
-                bibtex += f"  pages = {{{result['pages']}}},\n"
+    if result.get('doi'):
+        bibtex += f"  doi = {{{result['doi']}}},\n"
 
-            if result.get('doi'):
-                bibtex += f"  doi = {{{result['doi']}}},\n"
+    return bibtex + "}\n\n"
 
-            bibtex += "}\n\n"
+def write_search_results(results: Iterable[Dict], handle: TextIO, output_format: str = 'json',
+                         total: Optional[int] = None) -> int:
+    """
+    Write search results to a text stream one record at a time.
 
-        return bibtex
+    Args:
+        results: Search results (any iterable, consumed once)
+        handle: Writable text stream
+        output_format: Format (json, jsonl, markdown, or bibtex)
+        total: Result count for the markdown header (default: counted first)
 
-    else:
+    Returns:
+        Number of results written
+    """
+    if output_format not in OUTPUT_FORMATS:
         raise ValueError(f"Unknown format: {output_format}")
+    if output_format == 'markdown':
+        if total is None:
+            results = list(results)
+            total = len(results)
+        handle.write("# Literature Search Results\n\n")
+        handle.write(f"**Search Date**: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
+        handle.write(f"**Total Results**: {total}\n\n")
+
+    count = 0
+    for count, result in enumerate(results, 1):
+        if output_format == 'json':
+            # Same layout as json.dumps(results, indent=2), one record at a time.
+            body = json.dumps(result, indent=2).replace('\n', '\n  ')
+            handle.write(('[\n  ' if count == 1 else ',\n  ') + body)
+        elif output_format == 'jsonl':
+            handle.write(json.dumps(result, ensure_ascii=False) + '\n')
+        elif output_format == 'markdown':
+            handle.write(_markdown_entry(count, result))
+        else:
+            handle.write(_bibtex_entry(result))
+    if output_format == 'json':
+        handle.write('\n]' if count else '[]')
+    return count
 
-def deduplicate_results(results: List[Dict]) -> List[Dict]:
+def format_search_results(results: List[Dict], output_format: str = 'json') -> str:
     """
-    Remove duplicate results based on DOI or title.
+    Format search results for output.
 
     Args:
         results: List of search results
+        output_format: Format (json, jsonl, markdown, or bibtex)
 
     Returns:
-        Deduplicated list
+        Formatted string
     """
-    seen_dois = set()
-    seen_titles = set()
-    unique_results = []
+    buffer = io.StringIO()
+    write_search_results(results, buffer, output_format, total=len(results))
+    return buffer.getvalue()
 
-    for result in results:
-        doi = result.get('doi', '').lower().strip()
-        title = result.get('title', '').lower().strip()
-
-        # Check DOI first (more reliable)
-        if doi and doi in seen_dois:
-            continue
-
-        # Check title as fallback
-        if not doi and title in seen_titles:
-            continue
+def deduplicate_results(results: List[Dict], approximate: bool = False) -> List[Dict]:
+    """
+    Remove duplicate results by identifier or title.
 
-        # Add to results
-        if doi:
-            seen_dois.add(doi)
-        if title:
-            seen_titles.add(title)
+    Records sharing a normalized DOI, PMID, or arXiv ID, or an identical
+    normalized title (without a conflicting DOI, year, or first author), are
+    duplicates; the first is kept. With ``approximate``, near-identical titles
+    by the same first author within a year are duplicates too.
 
-        unique_results.append(result)
+    Args:
+        results: List of search results
+        approximate: Also remove near-duplicates
 
+    Returns:
+        Deduplicated list
+    """
+    unique_results, _ = merge_records(results, approximate=approximate)
     return unique_results
 
 def rank_results(results: List[Dict], criteria: str = 'citations') -> List[Dict]:
@@ -127,14 +166,9 @@ def rank_results(results: List[Dict], criteria: str = 'citations') -> List[Dict]
     Returns:
         Ranked list
     """
-    if criteria == 'citations':
-        return sorted(results, key=lambda x: x.get('citations', 0), reverse=True)
-    elif criteria == 'year':
-        return sorted(results, key=lambda x: x.get('year', '0'), reverse=True)
-    elif criteria == 'relevance':
-        return sorted(results, key=lambda x: x.get('relevance_score', 0), reverse=True)
-    else:
+    if criteria not in RANK_CRITERIA:
         return results
+    return sorted(results, key=lambda result: rank_key(result, criteria), reverse=True)
 
 def filter_by_year(results: List[Dict], start_year: int = None, end_year: int = None) -> List[Dict]:
     """
@@ -151,16 +185,13 @@ def filter_by_year(results: List[Dict], start_year: int = None, end_year: int =
     filtered = []
 
     for result in results:
-        try:
-            year = int(result.get('year', 0))
-            if start_year and year < start_year:
-                continue
-            if end_year and year > end_year:
-                continue
-            filtered.append(result)
-        except (ValueError, TypeError):
-            # Include if year parsing fails
-            filtered.append(result)
+        year = publication_year(result.get('year'))
+        # Include if year parsing fails
+        if year and start_year and year < start_year:
+            continue
+        if year and end_year and year > end_year:
+            continue
+        filtered.append(result)
 
     return filtered
 
@@ -174,130 +205,91 @@ def generate_search_summary(results: List[Dict]) -> Dict:
     Returns:
         Summary dictionary
     """
-    summary = {
-        'total_results': len(results),
-        'sources': {},
-        'year_distribution': {},
-        'avg_citations': 0,
-        'total_citations': 0
-    }
-
-    citations = []
-
+    stats = SummaryStats()
     for result in results:
-        # Count by source
-        source = result.get('source', 'Unknown')
-        summary['sources'][source] = summary['sources'].get(source, 0) + 1
-
-        # Count by year
-        year = result.get('year', 'Unknown')
-        summary['year_distribution'][year] = summary['year_distribution'].get(year, 0) + 1
-
-        # Collect citations
-        if result.get('citations'):
-            try:
-                citations.append(int(result['citations']))
-            except (ValueError, TypeError):
-                pass
-
-    if citations:
-        summary['avg_citations'] = sum(citations) / len(citations)
-        summary['total_citations'] = sum(citations)
-
-    return summary
+        stats.add(result)
+    return stats.as_dict()
 
 def main():
     """Command-line interface for search result processing."""
-    if len(sys.argv) < 2:
-        print("Usage: python search_databases.py <results.json> [options]")
-        print("\nOptions:")
-        print("  --format FORMAT          Output format (json, markdown, bibtex)")
-        print("  --output FILE            Output file (default: stdout)")
-        print("  --rank CRITERIA          Rank by (citations, year, relevance)")
-        print("  --year-start YEAR        Filter by start year")
-        print("  --year-end YEAR          Filter by end year")
-        print("  --deduplicate            Remove duplicates")
-        print("  --summary                Show summary statistics")
-        sys.exit(1)
-
-    # Load results
-    results_file = sys.argv[1]
-    try:
-        with open(results_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
-    except Exception as e:
-        print(f"Error loading results: {e}")
-        sys.exit(1)
-
-    # Parse options
-    output_format = 'markdown'
-    output_file = None
-    rank_criteria = None
-    year_start = None
-    year_end = None
-    do_dedup = False
-    show_summary = False
-
-    i = 2
-    while i < len(sys.argv):
-        arg = sys.argv[i]
-
-        if arg == '--format' and i + 1 < len(sys.argv):
-            output_format = sys.argv[i + 1]
-            i += 2
-        elif arg == '--output' and i + 1 < len(sys.argv):
-            output_file = sys.argv[i + 1]
-            i += 2
-        elif arg == '--rank' and i + 1 < len(sys.argv):
-            rank_criteria = sys.argv[i + 1]
-            i += 2
-        elif arg == '--year-start' and i + 1 < len(sys.argv):
-            year_start = int(sys.argv[i + 1])
-            i += 2
-        elif arg == '--year-end' and i + 1 < len(sys.argv):
-            year_end = int(sys.argv[i + 1])
-            i += 2
-        elif arg == '--deduplicate':
-            do_dedup = True
-            i += 1
-        elif arg == '--summary':
-            show_summary = True
-            i += 1
+    parser = argparse.ArgumentParser(
+        description='Merge, deduplicate, rank, and format literature search exports.',
+        epilog='Inputs are read one record at a time, so exports of a million records '
+               'merge in bounded memory; use --top with --rank to keep that bound.',
+    )
+    parser.add_argument('inputs', nargs='+', metavar='FILE',
+                        help='Search exports (JSON, JSON Lines, RIS, CSV, or TSV)')
+    parser.add_argument('--input-format', choices=INPUT_FORMATS,
+                        help='Format of every input (default: from each file extension)')
+    parser.add_argument('--format', dest='output_format', choices=OUTPUT_FORMATS,
+                        default='markdown', help='Output format (default: markdown)')
+    parser.add_argument('--output', help='Output file (default: stdout)')
+    parser.add_argument('--rank', choices=RANK_CRITERIA, help='Rank by citations, year, or relevance')
+    parser.add_argument('--top', type=int, help='Keep only the first (or best-ranked) N results')
+    parser.add_argument('--year-start', type=int, help='Filter by start year')
+    parser.add_argument('--year-end', type=int, help='Filter by end year')
+    parser.add_argument('--deduplicate', action='store_true', help='Remove duplicates')
+    parser.add_argument('--exact-only', action='store_true',
+                        help='Only remove duplicates sharing an identifier or exact title')
+    parser.add_argument('--similarity', type=float, default=DEFAULT_SIMILARITY,
+                        help=f'Title similarity for near-duplicates (default: {DEFAULT_SIMILARITY})')
+    parser.add_argument('--summary', action='store_true', help='Show summary statistics')
+    parser.add_argument('--prisma', metavar='FILE', help='Write PRISMA identification counts as JSON')
+    args = parser.parse_args()
+    if args.top is not None and args.top < 1:
+        parser.error('--top must be at least 1')
+    if not 0 < args.similarity <= 1:
+        parser.error('--similarity must be in (0, 1]')
+
+    merger = ResultMerger(
+        deduplicate=args.deduplicate,
+        approximate=not args.exact_only,
+        similarity=args.similarity,
+        rank=args.rank,
+        top=args.top,
+        year_start=args.year_start,
+        year_end=args.year_end,
+    )
+    with merger:
+        for path in args.inputs:
+            try:
+                merger.extend(iter_records(path, args.input_format))
+            except (OSError, ValueError) as e:
+                print(f"Error loading results from {path}: {e}", file=sys.stderr)
+                sys.exit(1)
+
+        counts = merger.counts
+        print(f"Loaded {counts.identified} records from {len(args.inputs)} file(s)", file=sys.stderr)
+        if args.deduplicate:
+            print(f"After deduplication: {counts.identified - counts.removed_other - counts.duplicates} "
+                  f"results ({counts.duplicates_exact} exact and "
+                  f"{counts.duplicates_approximate} near duplicates removed)", file=sys.stderr)
+        if args.year_start or args.year_end:
+            print(f"After year filter: {counts.screened} results", file=sys.stderr)
+        if args.rank:
+            print(f"Ranked by: {args.rank}", file=sys.stderr)
+
+        if args.summary:
+            print("\n" + "="*60, file=sys.stderr)
+            print("SEARCH SUMMARY", file=sys.stderr)
+            print("="*60, file=sys.stderr)
+            print(json.dumps({**merger.summary.as_dict(), 'prisma': counts.as_dict()}, indent=2),
+                  file=sys.stderr)
+            print(file=sys.stderr)
+
+        if args.prisma:
+            with open(args.prisma, 'w', encoding='utf-8') as f:
+                json.dump(counts.as_dict(), f, indent=2)
+            print(f"✓ PRISMA counts saved to: {args.prisma}", file=sys.stderr)
+
+        # Write output
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                write_search_results(merger.results(), f, args.output_format, total=merger.kept)
+            print(f"✓ Results saved to: {args.output}", file=sys.stderr)
         else:
-            i += 1
-
-    # Process results
-    if do_dedup:
-        results = deduplicate_results(results)
-        print(f"After deduplication: {len(results)} results")
-
-    if year_start or year_end:
-        results = filter_by_year(results, year_start, year_end)
-        print(f"After year filter: {len(results)} results")
-
-    if rank_criteria:
-        results = rank_results(results, rank_criteria)
-        print(f"Ranked by: {rank_criteria}")
-
-    # Show summary
-    if show_summary:
-        summary = generate_search_summary(results)
-        print("\n" + "="*60)
-        print("SEARCH SUMMARY")
-        print("="*60)
-        print(json.dumps(summary, indent=2))
-        print()
-
-    # Format output
-    output = format_search_results(results, output_format)
-
-    # Write output
-    if output_file:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(output)
-        print(f"✓ Results saved to: {output_file}")
-    else:
-        print(output)
+            write_search_results(merger.results(), sys.stdout, args.output_format, total=merger.kept)
+            sys.stdout.write('\n')
 
 if __name__ == "__main__":
     main()
@@ -2,26 +2,150 @@
 """
 Citation Verification Script
 Verifies DOIs, URLs, and citation metadata for accuracy.
+
+DOIs and URLs are checked concurrently: a thread pool spreads requests across
+hosts, each host gets at most ``per_host`` requests in flight over keep-alive
+connections, and verdicts are cached on disk so re-running on a revised draft
+only checks new references. ``--sequential`` restores the one-at-a-time loop.
 """
 
-import re
-import requests
+import argparse
 import json
-from typing import Dict, List, Tuple
-from urllib.parse import urlparse
+import os
+import re
+import sqlite3
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import zip_longest
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from polite_http import RETRY_STATUSES, ConditionalCache, RateLimiter, pooled_session, send
+
+DEFAULT_WORKERS = 16
+DEFAULT_PER_HOST = 4
+SEQUENTIAL_DELAY = 0.5
+# Accessible/resolving verdicts are kept for 30 days, failures for one day.
+VALID_TTL = 30 * 24 * 3600
+INVALID_TTL = 24 * 3600
+# Throttled and 5xx answers are retried this many times, honoring Retry-After.
+RETRIES = 2
+# CrossRef metadata calls per second, shared with every process on the machine.
+CROSSREF_RATE = 10.0
+# Some servers reject HEAD but serve GET.
+HEAD_UNSUPPORTED = (403, 405, 501)
+DEFAULT_RESOLVER = 'https://doi.org'
+CROSSREF_API = 'https://api.crossref.org'
+# Errors from an unusable cache directory or database; checks then run uncached.
+CACHE_ERRORS = (OSError, sqlite3.Error)
+
+
+def default_cache_dir() -> Path:
+    """Return the verdict cache directory, honoring ``XDG_CACHE_HOME``."""
+    base = os.getenv('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+    return Path(base) / 'scientific-writer' / 'literature-review'
+
+
+class VerdictCache:
+    """On-disk cache of DOI and URL verdicts, safe to share between threads."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / 'verdicts.sqlite3'
+        connection = self._connect()
+        try:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS verdicts ('
+                'kind TEXT NOT NULL, key TEXT NOT NULL, checked REAL NOT NULL, '
+                'ok INTEGER NOT NULL, detail TEXT NOT NULL, PRIMARY KEY (kind, key))'
+            )
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute('PRAGMA journal_mode=WAL')
+        return connection
+
+    def get(self, kind: str, key: str) -> Optional[Tuple[bool, object]]:
+        """Return ``(ok, detail)`` if a fresh verdict is cached."""
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                'SELECT checked, ok, detail FROM verdicts WHERE kind = ? AND key = ?',
+                (kind, key),
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        checked, ok, detail = row
+        if time.time() - checked > (VALID_TTL if ok else INVALID_TTL):
+            return None
+        return bool(ok), json.loads(detail)
+
+    def put(self, kind: str, key: str, ok: bool, detail: object) -> None:
+        """Store a verdict."""
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO verdicts (kind, key, checked, ok, detail) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (kind, key, time.time(), int(ok), json.dumps(detail)),
+                )
+        finally:
+            connection.close()
+
 
 class CitationVerifier:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+    def __init__(self, workers: int = DEFAULT_WORKERS, per_host: int = DEFAULT_PER_HOST,
+                 cache: Optional[VerdictCache] = None, refresh: bool = False,
+                 sequential: bool = False):
+        """
+        Args:
+            workers: Checks in flight across all hosts
+            per_host: Requests in flight to any one host
+            cache: Verdict cache (None disables caching)
+            refresh: Ignore cached verdicts and check everything again
+            sequential: Check one item at a time with a 0.5 s pause (the
+                original behavior)
+        """
+        self.workers = 1 if sequential else max(1, workers)
+        self.sequential = sequential
+        self.cache = cache
+        self.refresh = refresh
+        self.per_host = max(1, per_host)
+        # Expired CrossRef metadata is revalidated with ETag/Last-Modified
+        self.http_cache = ConditionalCache(cache.directory / 'http') if cache is not None else None
+        # The environment can point both services elsewhere, e.g. at citation-management's
+        # service_standin.py
+        resolver = (os.getenv('DOI_RESOLVER_BASE') or DEFAULT_RESOLVER).rstrip('/')
+        self.doi_api = f'{resolver}/api/handles/'
+        self.crossref_api = (os.getenv('CROSSREF_API_BASE') or CROSSREF_API).rstrip('/') + '/works/'
+        self.crossref_limiter = RateLimiter(CROSSREF_RATE, burst=self.per_host, service='crossref')
+        # One keep-alive pool per host; a host's pool size is its in-flight limit
+        self.session = pooled_session(64, {
             'User-Agent': 'CitationVerifier/1.0 (Literature Review Tool)'
-        })
+        }, per_host=self.per_host)
 
     def extract_dois(self, text: str) -> List[str]:
-        """Extract all DOIs from text."""
+        """Extract all DOIs from text, without trailing sentence punctuation."""
         doi_pattern = r'10\.\d{4,}/[^\s\]\)"]+'
-        return re.findall(doi_pattern, text)
+        return [doi.rstrip('.,;:') for doi in re.findall(doi_pattern, text)]
+
+    def extract_urls(self, text: str) -> List[str]:
+        """Extract http(s) URLs from text, excluding DOI links (checked as DOIs)."""
+        urls = [url.rstrip('.,;:') for url in re.findall(r'https?://[^\s<>\]\)"\'`]+', text)]
+        return [url for url in urls if urlparse(url).netloc.lower() not in ('doi.org', 'dx.doi.org')]
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request within the host's limit, retrying throttled and 5xx answers."""
+        return send(self.session, method, url, retries=RETRIES, timeout=10, **kwargs)
 
     def verify_doi(self, doi: str) -> Tuple[bool, Dict]:
         """
@@ -29,13 +153,15 @@ class CitationVerifier:
         Returns (is_valid, metadata)
         """
         try:
-            url = f"https://doi.org/api/handles/{doi}"
-            response = self.session.get(url, timeout=10)
+            response = self._request('GET', self.doi_api + doi)
 
             if response.status_code == 200:
                 # DOI exists, now get metadata from CrossRef
                 metadata = self._get_crossref_metadata(doi)
                 return True, metadata
+            elif response.status_code in RETRY_STATUSES:
+                # Still throttled or failing after retries: no verdict either way
+                return False, {"error": f"DOI resolver returned HTTP {response.status_code}"}
             else:
                 return False, {}
         except Exception as e:
@@ -44,8 +170,8 @@ class CitationVerifier:
     def _get_crossref_metadata(self, doi: str) -> Dict:
         """Get metadata from CrossRef API."""
         try:
-            url = f"https://api.crossref.org/works/{doi}"
-            response = self.session.get(url, timeout=10)
+            response = self._request('GET', self.crossref_api + doi, limiter=self.crossref_limiter,
+                                     cache=self.http_cache)
 
             if response.status_code == 200:
                 data = response.json()
@@ -62,7 +188,10 @@ class CitationVerifier:
                     'doi': doi
                 }
                 return metadata
-            return {}
+            if response.status_code == 404:
+                # Registered with another agency (e.g. DataCite): valid, no CrossRef record
+                return {}
+            return {"error": f"CrossRef returned HTTP {response.status_code}"}
         except Exception as e:
             return {"error": str(e)}
 
@@ -99,21 +228,31 @@ class CitationVerifier:
         Returns (is_accessible, status_code)
         """
         try:
-            response = self.session.head(url, timeout=10, allow_redirects=True)
+            response = self._request('HEAD', url, allow_redirects=True)
+            if response.status_code in HEAD_UNSUPPORTED:
+                response = self._request('GET', url, allow_redirects=True, stream=True)
+                response.close()
             is_accessible = response.status_code < 400
             return is_accessible, response.status_code
-        except Exception as e:
+        except Exception:
             return False, 0
 
-    def verify_citations_in_file(self, filepath: str) -> Dict:
+    def verify_citations_in_file(self, filepath: str, check_urls: bool = False,
+                                 progress: Optional[Callable[[Dict], None]] = None) -> Dict:
         """
         Verify all citations in a markdown file.
         Returns a report of verification results.
+
+        Args:
+            filepath: Markdown file
+            check_urls: Also check that non-DOI URLs are accessible
+            progress: Called with each result as it completes (see ``verify_all``)
         """
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
 
-        dois = self.extract_dois(content)
+        dois = list(dict.fromkeys(self.extract_dois(content)))
+        urls = list(dict.fromkeys(self.extract_urls(content))) if check_urls else []
 
         report = {
             'total_dois': len(dois),
@@ -121,21 +260,102 @@ class CitationVerifier:
             'failed': [],
             'metadata': {}
         }
+        if check_urls:
+            report.update({'total_urls': len(urls), 'accessible_urls': [], 'broken_urls': {}})
 
-        for doi in dois:
-            print(f"Verifying DOI: {doi}")
-            is_valid, metadata = self.verify_doi(doi)
+        results = {(result['kind'], result['key']): result
+                   for result in self.verify_all(dois, urls, progress)}
 
-            if is_valid:
+        # Report in document order, whatever order the checks finished in
+        for doi in dois:
+            result = results[('doi', doi)]
+            if result['ok']:
                 report['verified'].append(doi)
-                report['metadata'][doi] = metadata
+                report['metadata'][doi] = result['detail']
             else:
                 report['failed'].append(doi)
-
-            time.sleep(0.5)  # Rate limiting
+        for url in urls:
+            result = results[('url', url)]
+            if result['ok']:
+                report['accessible_urls'].append(url)
+            else:
+                report['broken_urls'][url] = result['detail']
 
         return report
 
+    def verify_all(self, dois: List[str], urls: List[str] = (),
+                   progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Verify DOIs and URLs, yielding to ``progress`` as each one completes.
+
+        Cached verdicts are reported first. The rest run on ``workers`` threads,
+        submitted round-robin across hosts so one slow host does not occupy the
+        whole pool. In sequential mode they run one at a time with a 0.5 s pause.
+
+        Returns:
+            Result dicts with ``kind`` ('doi' or 'url'), ``key``, ``ok``,
+            ``detail`` (metadata, or the HTTP status), and ``cached``
+        """
+        pending = [('doi', doi) for doi in dois] + [('url', url) for url in urls]
+        total = len(pending)
+        results: List[Dict] = []
+
+        def record(result: Dict) -> None:
+            results.append(result)
+            if progress:
+                progress({**result, 'done': len(results), 'total': total})
+
+        if self.cache is not None and not self.refresh:
+            unchecked = []
+            for kind, key in pending:
+                try:
+                    cached = self.cache.get(kind, key)
+                except CACHE_ERRORS:
+                    cached = None
+                if cached is None:
+                    unchecked.append((kind, key))
+                else:
+                    record({'kind': kind, 'key': key, 'ok': cached[0], 'detail': cached[1],
+                            'cached': True})
+            pending = unchecked
+
+        if self.sequential:
+            for index, (kind, key) in enumerate(pending):
+                if index:
+                    time.sleep(SEQUENTIAL_DELAY)
+                record(self._check(kind, key))
+            return results
+
+        # Interleave hosts so the first submissions are not all for one host
+        by_host: Dict[str, List[Tuple[str, str]]] = {}
+        for kind, key in pending:
+            host = 'doi.org' if kind == 'doi' else urlparse(key).netloc.lower()
+            by_host.setdefault(host, []).append((kind, key))
+        ordered = [item for group in zip_longest(*by_host.values()) for item in group if item]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._check, kind, key) for kind, key in ordered]
+            for future in as_completed(futures):
+                record(future.result())
+        return results
+
+    def _check(self, kind: str, key: str) -> Dict:
+        """Check one DOI or URL and cache verdicts that are not transient failures."""
+        if kind == 'doi':
+            ok, detail = self.verify_doi(key)
+            # An error means the DOI or its metadata was never fetched; check again next time
+            cacheable = 'error' not in detail
+        else:
+            ok, detail = self.verify_url(key)
+            # No response, or still throttled or failing after retries
+            cacheable = detail != 0 and detail not in RETRY_STATUSES
+        if self.cache is not None and cacheable:
+            try:
+                self.cache.put(kind, key, ok, detail)
+            except CACHE_ERRORS as e:
+                print(f"Warning: Could not cache the verdict for {key}: {e}", flush=True)
+        return {'kind': kind, 'key': key, 'ok': ok, 'detail': detail, 'cached': False}
+
     def format_citation_apa(self, metadata: Dict) -> str:
         """Format citation in APA style."""
         authors = metadata.get('authors', '')
@@ -179,19 +399,50 @@ class CitationVerifier:
 
         return citation
 
-def main():
-    """Example usage."""
-    import sys
+def print_progress(result: Dict) -> None:
+    """Print one line per completed check."""
+    status = 'ok' if result['ok'] else 'FAILED'
+    source = ' (cached)' if result.get('cached') else ''
+    print(f"[{result['done']}/{result['total']}] {status:<6} {result['kind'].upper()} "
+          f"{result['key']}{source}", flush=True)
 
-    if len(sys.argv) < 2:
-        print("Usage: python verify_citations.py <markdown_file>")
-        sys.exit(1)
 
-    filepath = sys.argv[1]
-    verifier = CitationVerifier()
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Verify the DOIs (and optionally URLs) cited in a markdown file',
+        epilog='Example: python verify_citations.py review.md --urls'
+    )
+    parser.add_argument('file', help='Markdown file to check')
+    parser.add_argument('--urls', action='store_true',
+                        help='Also check that cited non-DOI URLs are accessible')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Checks in flight across all hosts (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST,
+                        help=f'Requests in flight to one host (default: {DEFAULT_PER_HOST})')
+    parser.add_argument('--sequential', action='store_true',
+                        help='Check one item at a time with a 0.5 s pause (original behavior)')
+    parser.add_argument('--cache-dir', help='Verdict cache directory (default: user cache directory)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write cached verdicts')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Check everything again and overwrite cached verdicts')
+    args = parser.parse_args()
+    if args.workers < 1 or args.per_host < 1:
+        parser.error('--workers and --per-host must be at least 1')
+
+    filepath = args.file
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = VerdictCache(args.cache_dir)
+        except CACHE_ERRORS as e:
+            print(f"Warning: Verdict cache unavailable, continuing without it: {e}")
+    verifier = CitationVerifier(workers=args.workers, per_host=args.per_host, cache=cache,
+                                refresh=args.refresh, sequential=args.sequential)
 
     print(f"Verifying citations in: {filepath}")
-    report = verifier.verify_citations_in_file(filepath)
+    report = verifier.verify_citations_in_file(filepath, check_urls=args.urls,
+                                               progress=print_progress)
 
     print("\n" + "="*60)
     print("CITATION VERIFICATION REPORT")
@@ -199,12 +450,19 @@ def main():
     print(f"\nTotal DOIs found: {report['total_dois']}")
     print(f"Verified: {len(report['verified'])}")
     print(f"Failed: {len(report['failed'])}")
+    if args.urls:
+        print(f"URLs checked: {report['total_urls']}, broken: {len(report['broken_urls'])}")
 
     if report['failed']:
         print("\nFailed DOIs:")
         for doi in report['failed']:
             print(f"  - {doi}")
 
+    if args.urls and report['broken_urls']:
+        print("\nBroken URLs:")
+        for url, status in report['broken_urls'].items():
+            print(f"  - {url} ({status or 'no response'})")
+
     if report['metadata']:
         print("\n\nVerified Citations (APA format):")
         for doi, metadata in report['metadata'].items():
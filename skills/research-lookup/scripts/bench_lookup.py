@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark ResearchLookup.batch_lookup end to end against the offline stand-in.
+
+Starts ``parallel_standin.py`` on a free local port, points Parallel Search,
+Extract and Chat and the OpenRouter Perplexity backend at it, and runs the same
+batch of queries through each backend at each worker count, with the lookup
+cache off. Search goes over the pooled HTTP transport; with ``--academic`` it
+runs the whole multi-pass search and extract pipeline per query. The
+stand-in's latency, jitter, error rate and per-route rate limits apply; the
+client's own rate limits are off unless ``--polite``.
+
+Usage:
+    python bench_lookup.py
+    python bench_lookup.py --academic --queries 40 --workers 1,4,16 --latency 0.2 \\
+        --error-rate 0.05 --rate-limit 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from parallel_standin import StandinServer, parse_rate_limits, start_server
+from research_lookup import DEFAULT_RATE_LIMITS, ResearchLookup
+
+BACKENDS = ("search", "chat", "perplexity")
+
+
+def run(
+    server: StandinServer,
+    backend: str,
+    queries: list[str],
+    workers: int,
+    *,
+    academic: bool,
+    polite: bool,
+) -> None:
+    research = ResearchLookup(
+        force_backend=backend,
+        academic=academic,
+        transport="http",
+        rate_limits=None if polite else dict.fromkeys(DEFAULT_RATE_LIMITS, 0.0),
+    )
+    server.reset_counts()
+    started = time.perf_counter()
+    # Silence the per-query progress lines.
+    with contextlib.redirect_stderr(io.StringIO()):
+        results = research.batch_lookup(queries, delay=0.0, max_workers=workers)
+    elapsed = time.perf_counter() - started
+    failed = sum(not result.get("success") for result in results)
+    print(
+        f"{backend:<11} {workers:>7} {len(queries):>7} {elapsed:8.2f} {len(queries) / elapsed:9.1f}"
+        f" {server.requests_served:>8} {server.throttled:>6} {server.errors:>6} {failed:>6}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark research lookups offline.")
+    parser.add_argument("--queries", type=int, default=20, help="Queries per batch")
+    parser.add_argument(
+        "--workers", default="1,4,16", help="Comma-separated worker counts (default: 1,4,16)"
+    )
+    parser.add_argument(
+        "--backends",
+        default=",".join(BACKENDS),
+        help=f"Comma-separated backends (default: {','.join(BACKENDS)})",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Stand-in seconds per response"
+    )
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many more seconds")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of calls answered with 5xx"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="[ROUTE=]RATE",
+        help="Stand-in calls per second before 429; repeatable",
+    )
+    parser.add_argument(
+        "--academic", action="store_true", help="Run Search in academic multi-pass mode"
+    )
+    parser.add_argument(
+        "--polite", action="store_true", help="Keep the client's own rate limits on"
+    )
+    args = parser.parse_args()
+    try:
+        worker_counts = [int(value) for value in args.workers.split(",")]
+        limits = parse_rate_limits(args.rate_limit)
+    except ValueError as exc:
+        parser.error(str(exc))
+    backends = args.backends.split(",")
+    unknown = sorted(set(backends) - set(BACKENDS))
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(unknown)}")
+    if args.queries < 1 or min(worker_counts) < 1:
+        parser.error("--queries and --workers must be at least 1")
+
+    server = start_server(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, rate_limits=limits
+    )
+    os.environ["PARALLEL_API_BASE"] = server.base_url
+    os.environ["OPENROUTER_API_BASE"] = f"{server.base_url}/api/v1"
+    os.environ.setdefault("PARALLEL_API_KEY", "stand-in")
+    os.environ.setdefault("OPENROUTER_API_KEY", "stand-in")
+    queries = [
+        f"effect of intervention {index} on sleep and memory consolidation in adults"
+        for index in range(args.queries)
+    ]
+    print(
+        f"stand-in latency {args.latency:g} s (+{args.jitter:g} s jitter), "
+        f"error rate {args.error_rate:g}, rate limits {limits or 'none'}, "
+        f"client limits {'on' if args.polite else 'off'}"
+    )
+    print(
+        f"{'backend':<11} {'workers':>7} {'queries':>7} {'seconds':>8} {'queries/s':>9}"
+        f" {'calls':>8} {'429':>6} {'5xx':>6} {'failed':>6}"
+    )
+    try:
+        for backend in backends:
+            for workers in worker_counts:
+                run(
+                    server,
+                    backend,
+                    queries,
+                    workers,
+                    academic=args.academic,
+                    polite=args.polite,
+                )
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
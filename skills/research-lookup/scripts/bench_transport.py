@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Benchmark the CLI and pooled HTTP transports against the offline stand-in.
+
+Starts ``parallel_standin.py`` on a free local port, then issues the same
+Search calls through ``ResearchLookup`` twice: once with ``--transport cli``,
+where a stub ``parallel-cli`` starts a Python process per call and forwards it
+to the stand-in, and once with ``--transport http`` over one keep-alive
+session. The stub is lighter than the real CLI, so the measured gap is a
+lower bound. Rate limits are disabled so only transport cost is measured.
+
+Usage:
+    python bench_transport.py
+    python bench_transport.py --calls 200 --workers 8 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import stat
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from parallel_standin import start_server
+from research_lookup import ResearchLookup
+
+STUB_CLI = """\
+#!{python}
+import json, sys, urllib.request
+sys.path.insert(0, {scripts!r})
+from parallel_transport import request_for_args
+path, body = request_for_args(sys.argv[1:])
+request = urllib.request.Request(
+    {base!r} + path,
+    data=json.dumps(body).encode(),
+    headers={{"Content-Type": "application/json", "x-api-key": "stub"}},
+)
+with urllib.request.urlopen(request) as response:
+    sys.stdout.write(response.read().decode())
+"""
+
+
+def run(research: ResearchLookup, calls: int, workers: int) -> float:
+    """Issue ``calls`` Search calls on ``workers`` threads; return elapsed seconds."""
+
+    def one(index: int) -> None:
+        payload = research._run_parallel_cli(
+            ["search", f"benchmark objective {index}", "--max-results", "10", "--json"]
+        )
+        if len(payload.get("results") or []) != 10:
+            raise RuntimeError(f"unexpected payload for call {index}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one, range(calls)))
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Parallel transports offline.")
+    parser.add_argument("--calls", type=int, default=100, help="Search calls per transport")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent callers")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Stand-in seconds per response"
+    )
+    args = parser.parse_args()
+    if args.calls < 1 or args.workers < 1:
+        parser.error("--calls and --workers must be at least 1")
+
+    server = start_server(latency=args.latency)
+    no_limits = {"search": 0.0, "extract": 0.0}
+    with tempfile.TemporaryDirectory() as scratch:
+        stub = Path(scratch) / "parallel-cli"
+        stub.write_text(
+            STUB_CLI.format(
+                python=sys.executable,
+                scripts=str(Path(__file__).resolve().parent),
+                base=server.base_url,
+            )
+        )
+        stub.chmod(stub.stat().st_mode | stat.S_IXUSR)
+        os.environ["PATH"] = f"{scratch}{os.pathsep}{os.environ.get('PATH', '')}"
+        os.environ["PARALLEL_API_BASE"] = server.base_url
+        os.environ.setdefault("PARALLEL_API_KEY", "stand-in")
+
+        results = {}
+        for transport in ("cli", "http"):
+            research = ResearchLookup(
+                force_backend="search", transport=transport, rate_limits=no_limits
+            )
+            elapsed = run(research, args.calls, args.workers)
+            results[transport] = elapsed
+            print(
+                f"{transport:<5} {args.calls} calls in {elapsed:.2f}s "
+                f"({args.calls / elapsed:.1f} calls/s)"
+            )
+    server.shutdown()
+    print(f"speedup {results['cli'] / results['http']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
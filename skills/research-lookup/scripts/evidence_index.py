@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""Local full-text index of evidence from saved manuscript research packets.
+
+Every ``save_packet`` directory holds a ``packet.json``. ``EvidenceIndex``
+ingests its references, supporting excerpts, and claim map into a SQLite FTS5
+table ranked by BM25, tagged with the project the packet belongs to, so a
+later lookup can reuse evidence that an earlier one already verified.
+
+Usage:
+    python evidence_index.py reindex writing_outputs
+    python evidence_index.py search "sleep spindles memory consolidation" --project my-paper
+    python evidence_index.py stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from lookup_cache import default_cache_dir
+
+
+PACKET_FILENAME = "packet.json"
+
+# Weight title matches above body matches when ranking with bm25().
+TITLE_WEIGHT = 4.0
+BODY_WEIGHT = 1.0
+
+# Share of a query's distinctive terms a hit must contain. Terms match on their
+# first PREFIX_CHARS characters, so "reduction" also finds "reduced".
+MIN_TERM_COVERAGE = 0.75
+PREFIX_CHARS = 5
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be by evidence for from how in into is it of on or paper
+    papers research review study studies that the their this to was were what
+    when which with
+    """.split()
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS packets (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    project TEXT NOT NULL,
+    query TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    indexed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS packets_project ON packets (project);
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    packet_id INTEGER NOT NULL,
+    project TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    reference_id TEXT NOT NULL,
+    reference_key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    record TEXT
+);
+CREATE INDEX IF NOT EXISTS documents_packet ON documents (packet_id, reference_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, body, project UNINDEXED,
+    content='documents', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts (rowid, title, body, project)
+    VALUES (new.id, new.title, new.body, new.project);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, title, body, project)
+    VALUES ('delete', old.id, old.title, old.body, old.project);
+END;
+"""
+
+
+def default_index_path() -> Path:
+    """Return the index file beside the lookup cache."""
+    return default_cache_dir() / "evidence.sqlite3"
+
+
+def project_for(directory: str | Path) -> str:
+    """Name the project a packet directory belongs to.
+
+    Packets normally live under ``<project>/sources/...``; otherwise the packet
+    directory's own name is used.
+    """
+    resolved = Path(directory).resolve()
+    for parent in (resolved, *resolved.parents):
+        if parent.name == "sources" and parent.parent != parent:
+            return parent.parent.name
+    return resolved.name
+
+
+def query_terms(query: str) -> list[str]:
+    """Return the distinctive lowercase terms of a query, in order."""
+    terms = re.findall(r"[^\W_]+", query.lower())
+    return list(
+        dict.fromkeys(
+            term for term in terms if term not in STOPWORDS and (len(term) > 2 or term.isdigit())
+        )
+    )
+
+
+def _term_prefix(term: str) -> str:
+    return term[:PREFIX_CHARS]
+
+
+def _term_patterns(terms: list[str]) -> list[re.Pattern[str]]:
+    return [re.compile(rf"\b{re.escape(_term_prefix(term))}", re.IGNORECASE) for term in terms]
+
+
+def term_coverage(terms: list[str], text: str) -> float:
+    """Return the share of ``terms`` whose prefix starts a word of ``text``."""
+    return _coverage(_term_patterns(terms), text)
+
+
+def _coverage(patterns: list[re.Pattern[str]], text: str) -> float:
+    if not patterns:
+        return 0.0
+    return sum(1 for pattern in patterns if pattern.search(text)) / len(patterns)
+
+
+def _snippet(patterns: list[re.Pattern[str]], text: str, width: int = 160) -> str:
+    """Return about ``width`` characters of ``text`` around the first matched term."""
+    starts = [match.start() for pattern in patterns if (match := pattern.search(text))]
+    start = max(0, min(starts, default=0) - width // 4)
+    snippet = " ".join(text[start : start + width].split())
+    return f"{'... ' if start else ''}{snippet}{' ...' if start + width < len(text) else ''}"
+
+
+def reference_key(reference: dict[str, Any]) -> str:
+    """Identify a reference across packets by DOI, PMID, or URL."""
+    if reference.get("doi"):
+        return f"doi:{str(reference['doi']).lower()}"
+    if reference.get("pmid"):
+        return f"pmid:{reference['pmid']}"
+    return f"url:{reference.get('url') or reference.get('title') or ''}"
+
+
+def source_from_reference(reference: dict[str, Any]) -> dict[str, Any]:
+    """Turn an indexed reference back into a source record for a new packet."""
+    return {
+        "url": reference.get("url") or "",
+        "title": reference.get("title") or "",
+        "doi": reference.get("doi") or "",
+        "pmid": reference.get("pmid") or "",
+        "publish_date": reference.get("year") or "",
+        "excerpts": list(
+            reference.get("supporting_excerpts") or reference.get("key_findings") or []
+        ),
+        "facets": sorted({*(reference.get("facets") or []), "local-index"}),
+        "extracted": reference.get("verification_status") == "extracted",
+    }
+
+
+def _reference_body(reference: dict[str, Any]) -> str:
+    parts: list[Any] = [
+        reference.get("authors"),
+        reference.get("venue"),
+        reference.get("study_design"),
+        reference.get("population_or_system"),
+        reference.get("methods"),
+        reference.get("intervention_or_exposure"),
+        reference.get("comparator"),
+        reference.get("outcomes"),
+        *(reference.get("key_findings") or []),
+        *(reference.get("quantitative_findings") or []),
+        *(reference.get("limitations") or []),
+        *(reference.get("supporting_excerpts") or []),
+    ]
+    return "\n".join(str(part) for part in parts if part)
+
+
+def _documents(packet: dict[str, Any]) -> Iterable[tuple[str, str, str, str, str, str | None]]:
+    """Yield ``(kind, reference_id, reference_key, title, body, record)`` rows."""
+    keys: dict[str, tuple[str, str]] = {}
+    for reference in packet.get("references") or []:
+        reference_id = str(reference.get("reference_id") or "")
+        key = reference_key(reference)
+        title = str(reference.get("title") or "")
+        keys[reference_id] = (key, title)
+        yield (
+            "reference",
+            reference_id,
+            key,
+            title,
+            _reference_body(reference),
+            json.dumps(reference, ensure_ascii=False),
+        )
+        for excerpt in reference.get("supporting_excerpts") or []:
+            yield "excerpt", reference_id, key, title, str(excerpt), None
+    for claim in packet.get("claim_source_map") or []:
+        for reference_id in claim.get("reference_ids") or []:
+            if reference_id not in keys:
+                continue
+            key, title = keys[reference_id]
+            body = "\n".join(
+                [str(claim.get("claim") or ""), *map(str, claim.get("supporting_excerpts") or [])]
+            )
+            yield "claim", reference_id, key, title, body, None
+
+
+class EvidenceIndex:
+    """BM25 full-text index over saved research packets, grouped by project.
+
+    Safe to share between threads; each operation uses its own connection, and
+    SQLite's locking also makes the file safe to share between processes.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else default_index_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        connection = self._connect()
+        try:
+            connection.executescript(_SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def add_packet(
+        self,
+        directory: str | Path,
+        *,
+        project: str | None = None,
+        force: bool = False,
+    ) -> int:
+        """Index the packet saved in ``directory``, replacing any earlier version.
+
+        A packet whose ``packet.json`` is unchanged since it was last indexed is
+        skipped unless ``force`` is set.
+
+        Returns:
+            The number of documents indexed, or 0 when the packet was skipped.
+
+        Raises:
+            OSError: if ``packet.json`` cannot be read.
+            ValueError: if it is not a packet.
+        """
+        packet_path = Path(directory).resolve() / PACKET_FILENAME
+        mtime = packet_path.stat().st_mtime
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT mtime FROM packets WHERE path = ?", (str(packet_path.parent),)
+            ).fetchone()
+            if row is not None and row[0] == mtime and not force:
+                return 0
+            try:
+                packet = json.loads(packet_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{packet_path} is not valid JSON: {exc}") from exc
+            if not isinstance(packet, dict) or not isinstance(packet.get("references"), list):
+                raise ValueError(f"{packet_path} is not a manuscript research packet")
+            rows = list(_documents(packet))
+            project = project or project_for(packet_path.parent)
+            with self._lock:
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    packet_id = self._replace_packet(
+                        connection,
+                        str(packet_path.parent),
+                        project,
+                        str(packet.get("query") or ""),
+                        mtime,
+                    )
+                    connection.executemany(
+                        "INSERT INTO documents (packet_id, project, kind, reference_id, "
+                        "reference_key, title, body, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(packet_id, project, *document) for document in rows],
+                    )
+                    connection.execute("COMMIT")
+                except sqlite3.Error:
+                    connection.execute("ROLLBACK")
+                    raise
+        finally:
+            connection.close()
+        return len(rows)
+
+    @staticmethod
+    def _replace_packet(
+        connection: sqlite3.Connection, path: str, project: str, query: str, mtime: float
+    ) -> int:
+        row = connection.execute("SELECT id FROM packets WHERE path = ?", (path,)).fetchone()
+        if row is not None:
+            connection.execute("DELETE FROM documents WHERE packet_id = ?", (row[0],))
+            connection.execute(
+                "UPDATE packets SET project = ?, query = ?, mtime = ?, indexed = ? WHERE id = ?",
+                (project, query, mtime, time.time(), row[0]),
+            )
+            return int(row[0])
+        cursor = connection.execute(
+            "INSERT INTO packets (path, project, query, mtime, indexed) VALUES (?, ?, ?, ?, ?)",
+            (path, project, query, mtime, time.time()),
+        )
+        return int(cursor.lastrowid or 0)
+
+    def remove_packet(self, directory: str | Path) -> bool:
+        """Drop a packet and its documents; return whether it was indexed."""
+        path = str(Path(directory).resolve())
+        connection = self._connect()
+        try:
+            with self._lock:
+                connection.execute("BEGIN IMMEDIATE")
+                row = connection.execute(
+                    "SELECT id FROM packets WHERE path = ?", (path,)
+                ).fetchone()
+                if row is not None:
+                    connection.execute("DELETE FROM documents WHERE packet_id = ?", (row[0],))
+                    connection.execute("DELETE FROM packets WHERE id = ?", (row[0],))
+                connection.execute("COMMIT")
+        finally:
+            connection.close()
+        return row is not None
+
+    def reindex(
+        self,
+        roots: Iterable[str | Path],
+        *,
+        force: bool = False,
+        project: str | None = None,
+    ) -> dict[str, int]:
+        """Index every packet under ``roots`` and drop packets that no longer exist.
+
+        Unchanged packets are skipped unless ``force`` is set; ``force`` also
+        rebuilds the full-text index from the stored documents.
+        """
+        stats = {"packets_indexed": 0, "packets_unchanged": 0, "packets_failed": 0}
+        stats["documents_indexed"] = 0
+        seen: set[str] = set()
+        for root in roots:
+            for packet_path in sorted(Path(root).rglob(PACKET_FILENAME)):
+                seen.add(str(packet_path.parent.resolve()))
+                try:
+                    count = self.add_packet(packet_path.parent, project=project, force=force)
+                except (OSError, ValueError) as exc:
+                    print(f"Skipping {packet_path}: {exc}", file=sys.stderr)
+                    stats["packets_failed"] += 1
+                    continue
+                if count:
+                    stats["packets_indexed"] += 1
+                    stats["documents_indexed"] += count
+                else:
+                    stats["packets_unchanged"] += 1
+
+        removed = 0
+        connection = self._connect()
+        try:
+            for (path,) in connection.execute("SELECT path FROM packets").fetchall():
+                if path not in seen and not (Path(path) / PACKET_FILENAME).exists():
+                    removed += int(self.remove_packet(path))
+            if force:
+                connection.execute("INSERT INTO documents_fts (documents_fts) VALUES ('rebuild')")
+            connection.execute("INSERT INTO documents_fts (documents_fts) VALUES ('optimize')")
+        finally:
+            connection.close()
+        stats["packets_removed"] = removed
+        return stats
+
+    def search(
+        self,
+        query: str,
+        *,
+        project: str | None = None,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """Return the best-matching references for ``query``, best first.
+
+        A reference, one of its excerpts, or one of its claims must contain at
+        least ``MIN_TERM_COVERAGE`` of the query's distinctive terms. Matches
+        are ranked by BM25 (title weighted above body) and collapsed to one
+        hit per DOI, PMID, or URL across packets.
+
+        Returns:
+            Dicts with ``reference``, ``project``, ``packet``, ``packet_query``,
+            ``score`` (higher is better), ``matched`` document kinds, and a
+            ``snippet`` of the best match.
+        """
+        terms = query_terms(query)
+        if not terms or limit < 1:
+            return []
+        match = " OR ".join(f'"{_term_prefix(term)}"*' for term in terms)
+        patterns = _term_patterns(terms)
+        # Rank inside the FTS table first so document text is only read for the
+        # rows that survive the LIMIT.
+        project_filter = "AND project = ? " if project else ""
+        sql = (
+            "SELECT d.packet_id, d.reference_id, d.reference_key, d.kind, d.title, d.body, "
+            "ranked.rank, p.project, p.path, p.query "
+            f"FROM (SELECT rowid, bm25(documents_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS rank "
+            f"FROM documents_fts WHERE documents_fts MATCH ? {project_filter}"
+            "ORDER BY rank LIMIT ?) AS ranked "
+            "JOIN documents d ON d.id = ranked.rowid "
+            "JOIN packets p ON p.id = d.packet_id "
+            "ORDER BY ranked.rank"
+        )
+        parameters: list[Any] = [match, *([project] if project else []), limit * 20]
+
+        connection = self._connect()
+        try:
+            hits: dict[str, dict[str, Any]] = {}
+            for (
+                packet_id,
+                reference_id,
+                key,
+                kind,
+                title,
+                body,
+                rank,
+                project_name,
+                path,
+                packet_query,
+            ) in connection.execute(sql, parameters).fetchall():
+                hit = hits.get(key)
+                if hit is None and len(hits) >= limit:
+                    break
+                if _coverage(patterns, f"{title} {body}") < MIN_TERM_COVERAGE:
+                    continue
+                if hit is None:
+                    hit = hits[key] = {
+                        "packet_id": packet_id,
+                        "reference_id": reference_id,
+                        "project": project_name,
+                        "packet": path,
+                        "packet_query": packet_query,
+                        "score": round(-rank, 3),
+                        "matched": [],
+                        "snippet": _snippet(patterns, body),
+                    }
+                if kind not in hit["matched"]:
+                    hit["matched"].append(kind)
+            for hit in hits.values():
+                row = connection.execute(
+                    "SELECT record FROM documents "
+                    "WHERE packet_id = ? AND reference_id = ? AND kind = 'reference'",
+                    (hit.pop("packet_id"), hit.pop("reference_id")),
+                ).fetchone()
+                hit["reference"] = json.loads(row[0]) if row and row[0] else {}
+        finally:
+            connection.close()
+        return [hit for hit in hits.values() if hit["reference"]]
+
+    def stats(self) -> dict[str, Any]:
+        """Return packet and document counts per project."""
+        connection = self._connect()
+        try:
+            projects = {
+                project: {"packets": packets, "documents": documents}
+                for project, packets, documents in connection.execute(
+                    "SELECT p.project, COUNT(DISTINCT p.id), COUNT(d.id) "
+                    "FROM packets p LEFT JOIN documents d ON d.packet_id = p.id "
+                    "GROUP BY p.project ORDER BY p.project"
+                )
+            }
+        finally:
+            connection.close()
+        return {"path": str(self.path), "projects": projects}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--index", help=f"Index file (default: {default_index_path()})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    reindex = commands.add_parser("reindex", help="Index every packet under the given roots")
+    reindex.add_argument("roots", nargs="*", default=["writing_outputs"])
+    reindex.add_argument("--force", action="store_true", help="Re-read unchanged packets too")
+    reindex.add_argument("--project", help="Project name for every packet found")
+    search = commands.add_parser("search", help="Search indexed evidence")
+    search.add_argument("query")
+    search.add_argument("--project", help="Only search this project's packets")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--json", action="store_true", help="Print hits as JSON")
+    commands.add_parser("stats", help="Show packet and document counts per project")
+    args = parser.parse_args()
+
+    try:
+        index = EvidenceIndex(args.index)
+        if args.command == "reindex":
+            started = time.perf_counter()
+            stats = index.reindex(args.roots, force=args.force, project=args.project)
+            stats["seconds"] = round(time.perf_counter() - started, 2)
+            print(json.dumps(stats, indent=2))
+        elif args.command == "search":
+            hits = index.search(args.query, project=args.project, limit=args.limit)
+            if args.json:
+                print(json.dumps(hits, indent=2, ensure_ascii=False))
+            else:
+                for hit in hits:
+                    reference = hit["reference"]
+                    print(
+                        f"{hit['score']:8.3f}  [{hit['project']}] {reference.get('title')}\n"
+                        f"          {reference.get('url')}\n          {hit['snippet']}"
+                    )
+                if not hits:
+                    print("No local evidence matched.")
+        else:
+            print(json.dumps(index.stats(), indent=2))
+    except sqlite3.Error as exc:
+        print(f"Error: evidence index unavailable: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+"""Persistent SQLite cache for research lookup results."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Seconds a cached result stays fresh, per backend. Search results move fastest;
+# a finished deep-research report is stable for longer.
+DEFAULT_TTLS = {
+    "search": 24 * 3600,
+    "research": 7 * 24 * 3600,
+    "chat": 24 * 3600,
+    "perplexity": 24 * 3600,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    backend TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+def default_cache_dir() -> Path:
+    """Return the cache directory, honoring ``XDG_CACHE_HOME``."""
+    base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "scientific-writer" / "research-lookup"
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace so trivially different queries share a key."""
+    return re.sub(r"\s+", " ", query).strip().casefold()
+
+
+def cache_key(
+    backend: str,
+    query: str,
+    *,
+    include_domains: list[str] | None = None,
+    after_date: str | None = None,
+    options: dict[str, Any] | None = None,
+) -> str:
+    """Hash everything that can change a lookup result into one key."""
+    material = {
+        "backend": backend,
+        "query": normalize_query(query),
+        "include_domains": sorted({domain.lower() for domain in include_domains or []}),
+        "after_date": after_date or None,
+        "options": options or {},
+    }
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LookupCache:
+    """Size-bounded LRU cache of lookup results with per-backend TTLs.
+
+    Safe to share between threads; each operation uses its own connection, and
+    SQLite's locking also makes the file safe to share between processes.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: dict[str, float] | None = None,
+    ):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.path = self.directory / "lookups.sqlite3"
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        connection = self._connect()
+        try:
+            connection.executescript(_SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def record(self, hit: bool) -> None:
+        """Count one lookup as a hit or a miss."""
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str, backend: str) -> tuple[dict[str, Any], float] | None:
+        """Return ``(result, age_seconds)`` for a fresh entry, or None."""
+        now = time.time()
+        ttl = self.ttls.get(backend, 0)
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT created, value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[0] > ttl:
+                if row is not None:
+                    connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.record(hit=False)
+                return None
+            connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        finally:
+            connection.close()
+        self.record(hit=True)
+        return json.loads(row[1]), now - row[0]
+
+    def put(self, key: str, backend: str, result: dict[str, Any]) -> None:
+        """Store a result, then evict least recently used entries over ``max_bytes``."""
+        value = json.dumps(result, ensure_ascii=False, default=str)
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, backend, created, accessed, size, value) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, backend, now, now, size, value),
+            )
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                freed = 0
+                stale: list[str] = []
+                for old_key, old_size in connection.execute(
+                    "SELECT key, size FROM entries WHERE key != ? ORDER BY accessed", (key,)
+                ):
+                    stale.append(old_key)
+                    freed += old_size
+                    if freed >= excess:
+                        break
+                connection.executemany(
+                    "DELETE FROM entries WHERE key = ?", [(old_key,) for old_key in stale]
+                )
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def stats(self) -> dict[str, int]:
+        """Return hit and miss counts for this cache object."""
+        with self._counter_lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -3,8 +3,13 @@
 from __future__ import annotations
 
 import json
+import os
+import random
 import re
+import tempfile
+import zlib
 from collections import Counter
+from difflib import SequenceMatcher
 from pathlib import Path
 from typing import Any, Iterable
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
@@ -64,6 +69,18 @@ SCHOLARLY_DOMAINS = {
 }
 
 PREPRINT_DOMAINS = {"arxiv.org", "biorxiv.org", "medrxiv.org"}
+# bioRxiv/medRxiv, arXiv, Research Square, and Preprints.org DOIs.
+PREPRINT_DOI_PREFIXES = ("10.1101/", "10.48550/", "10.21203/", "10.20944/")
+
+# Near-duplicate detection: sources whose title character 4-grams reach
+# NEAR_DUPLICATE_TITLE_THRESHOLD Jaccard similarity, or whose excerpt word
+# 3-grams reach NEAR_DUPLICATE_TEXT_THRESHOLD with broadly similar titles, are
+# merged unless their identifiers or years conflict.
+NEAR_DUPLICATE_TITLE_THRESHOLD = 0.8
+NEAR_DUPLICATE_TEXT_THRESHOLD = 0.7
+NEAR_DUPLICATE_MAX_YEAR_GAP = 2
+MINHASH_BINS = 96
+LSH_BANDS = 16
 
 PUBLICATION_TYPES: tuple[tuple[str, tuple[str, ...]], ...] = (
     ("systematic review", ("systematic review",)),
@@ -237,7 +254,11 @@ def is_preprint_url(url: str) -> bool:
 
 
 def deduplicate_sources(sources: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Merge duplicate search/extract records by DOI, PMID, URL, or title."""
+    """Merge duplicate search/extract records by DOI, PMID, URL, or title.
+
+    Each merged record lists every key it was matched by in ``match_keys``, so
+    a later duplicate that shares only a merged-away URL or title still matches.
+    """
     merged: list[dict[str, Any]] = []
     key_to_index: dict[str, int] = {}
 
@@ -253,8 +274,9 @@ def deduplicate_sources(sources: Iterable[dict[str, Any]]) -> list[dict[str, Any
             f"pmid:{pmid}" if pmid else "",
             f"url:{source['url']}" if source["url"] else "",
             f"title:{title_key}" if len(title_key) >= 20 else "",
+            *(source.get("match_keys") or []),
         ]
-        keys = [key for key in keys if key]
+        keys = list(dict.fromkeys(key for key in keys if key))
         existing = next((key_to_index[key] for key in keys if key in key_to_index), None)
 
         if existing is None:
@@ -262,35 +284,420 @@ def deduplicate_sources(sources: Iterable[dict[str, Any]]) -> list[dict[str, Any
             source["pmid"] = pmid
             source["facets"] = sorted(set(source.get("facets") or []))
             source["excerpts"] = list(dict.fromkeys(source.get("excerpts") or []))
+            source["match_keys"] = keys
             merged.append(source)
             index = len(merged) - 1
             for key in keys:
                 key_to_index[key] = index
             continue
 
-        current = merged[existing]
-        if not current.get("title") and source.get("title"):
-            current["title"] = source["title"]
-        if not current.get("publish_date") and source.get("publish_date"):
-            current["publish_date"] = source["publish_date"]
-        if not current.get("doi") and doi:
-            current["doi"] = doi
-        if not current.get("pmid") and pmid:
-            current["pmid"] = pmid
-        current["excerpts"] = list(
-            dict.fromkeys([*(current.get("excerpts") or []), *(source.get("excerpts") or [])])
-        )
-        current["facets"] = sorted(
-            set(current.get("facets") or []) | set(source.get("facets") or [])
-        )
-        if source.get("extracted"):
-            current["extracted"] = True
+        source["match_keys"] = keys
+        _merge_source(merged[existing], source, doi=doi, pmid=pmid)
         for key in keys:
             key_to_index[key] = existing
 
     return merged
 
 
+def _merge_source(
+    current: dict[str, Any], source: dict[str, Any], *, doi: str, pmid: str
+) -> None:
+    """Fill gaps in ``current`` from a duplicate and union excerpts, facets, and keys."""
+    if not current.get("title") and source.get("title"):
+        current["title"] = source["title"]
+    if not current.get("publish_date") and source.get("publish_date"):
+        current["publish_date"] = source["publish_date"]
+    if not current.get("doi") and doi:
+        current["doi"] = doi
+    if not current.get("pmid") and pmid:
+        current["pmid"] = pmid
+    current["excerpts"] = list(
+        dict.fromkeys([*(current.get("excerpts") or []), *(source.get("excerpts") or [])])
+    )
+    current["facets"] = sorted(
+        set(current.get("facets") or []) | set(source.get("facets") or [])
+    )
+    for field in ("match_keys", "lsh_buckets"):
+        if source.get(field):
+            current[field] = list(
+                dict.fromkeys([*(current.get(field) or []), *source[field]])
+            )
+    if source.get("extracted"):
+        current["extracted"] = True
+
+
+def is_preprint_doi(doi: str) -> bool:
+    return doi.lower().startswith(PREPRINT_DOI_PREFIXES)
+
+
+def _title_shingles(source: dict[str, Any]) -> frozenset[str]:
+    title = normalize_title(str(source.get("title") or ""))
+    if len(title) < 20:
+        return frozenset()
+    return frozenset(title[index : index + 4] for index in range(len(title) - 3))
+
+
+def _title_words(source: dict[str, Any]) -> frozenset[str]:
+    words = normalize_title(str(source.get("title") or "")).split()
+    return frozenset(
+        word[:-1] if word.endswith("s") and len(word) > 3 else word for word in words
+    )
+
+
+def _substitutes_words(left: frozenset[str], right: frozenset[str]) -> bool:
+    """True when each title has a word the other lacks that is not a spelling variant.
+
+    Added words ("preprint", a subtitle) are tolerated; a replaced word, as in
+    "older adults" and "younger adults", marks two different studies.
+    """
+    left_only, right_only = left - right, right - left
+
+    def unmatched(words: frozenset[str], others: frozenset[str]) -> bool:
+        return any(
+            all(SequenceMatcher(None, word, other).ratio() < 0.8 for other in others)
+            for word in words
+        )
+
+    return (
+        bool(left_only and right_only)
+        and unmatched(left_only, right_only)
+        and unmatched(right_only, left_only)
+    )
+
+
+def _text_shingles(source: dict[str, Any]) -> frozenset[str]:
+    excerpts = source.get("excerpts") or []
+    if isinstance(excerpts, str):
+        excerpts = [excerpts]
+    words = normalize_title(" ".join(map(str, excerpts))).split()[:120]
+    if len(words) < 12:
+        return frozenset()
+    return frozenset(" ".join(words[index : index + 3]) for index in range(len(words) - 2))
+
+
+def _jaccard(left: frozenset[str], right: frozenset[str]) -> float:
+    if not left or not right:
+        return 0.0
+    overlap = len(left & right)
+    return overlap / (len(left) + len(right) - overlap)
+
+
+def _densify_probes(bins: int) -> list[list[int]]:
+    """Fixed pseudo-random probe order per bin, shared by every signature."""
+    generator = random.Random(bins)
+    probes: list[list[int]] = []
+    for slot in range(bins):
+        order = [other for other in range(bins) if other != slot]
+        generator.shuffle(order)
+        probes.append(order)
+    return probes
+
+
+_PROBES: dict[int, list[list[int]]] = {}
+
+
+def minhash_signature(shingles: Iterable[str], bins: int = MINHASH_BINS) -> tuple[int, ...]:
+    """Return a one-permutation MinHash signature with optimal densification.
+
+    Each shingle is hashed once and kept as the minimum of one of ``bins``
+    bins, so the cost is linear in the number of shingles rather than in
+    shingles times permutations. An empty bin copies the first non-empty bin
+    in its own fixed pseudo-random probe order, which keeps the probability
+    that two signatures agree in a bin equal to their Jaccard similarity
+    even for short titles.
+    """
+    values = [-1] * bins
+    # Visiting hashes from largest to smallest leaves each bin's minimum last.
+    for hashed in sorted((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), reverse=True):
+        values[hashed % bins] = hashed // bins
+    if max(values) < 0:
+        return ()
+    probes = _PROBES.get(bins)
+    if probes is None:
+        probes = _PROBES[bins] = _densify_probes(bins)
+    signature = list(values)
+    for slot, value in enumerate(values):
+        if value < 0:
+            for other in probes[slot]:
+                if values[other] >= 0:
+                    signature[slot] = values[other]
+                    break
+    return tuple(signature)
+
+
+class NearDuplicateIndex:
+    """Incremental MinHash LSH index that finds near-duplicate sources.
+
+    Title and excerpt signatures are split into ``bands`` bands; sources that
+    share any band bucket become candidates and are confirmed by exact
+    Jaccard similarity, so each insertion only compares against its
+    candidates instead of every earlier source. Buckets are stable CRC32
+    hashes; ``buckets`` returns them so a saved packet can ``restore`` its
+    sources later without re-hashing them.
+    """
+
+    def __init__(
+        self,
+        *,
+        title_threshold: float = NEAR_DUPLICATE_TITLE_THRESHOLD,
+        text_threshold: float = NEAR_DUPLICATE_TEXT_THRESHOLD,
+        bins: int = MINHASH_BINS,
+        bands: int = LSH_BANDS,
+    ):
+        if bins % bands:
+            raise ValueError("bins must be a multiple of bands")
+        self.title_threshold = title_threshold
+        self.text_threshold = text_threshold
+        self.bins = bins
+        self.bands = bands
+        self._rows = bins // bands
+        self._features: dict[Any, dict[str, Any]] = {}
+        self._sources: dict[Any, dict[str, Any]] = {}
+        self._keys: dict[Any, list[int]] = {}
+        self._buckets: dict[int, list[Any]] = {}
+
+    def add(self, key: Any, source: dict[str, Any]) -> list[tuple[Any, dict[str, Any]]]:
+        """Index ``source`` under ``key`` and return ``(earlier_key, evidence)`` matches."""
+        features = self._features_for(source)
+        bucket_keys = self._bucket_keys(features)
+        candidates: dict[Any, None] = {}
+        for bucket_key in bucket_keys:
+            for other in self._buckets.get(bucket_key, ()):
+                candidates[other] = None
+        matches: list[tuple[Any, dict[str, Any]]] = []
+        for other in candidates:
+            evidence = self._compare(features, self._features_of(other))
+            if evidence is not None:
+                matches.append((other, evidence))
+        self._features[key] = features
+        self._index(key, bucket_keys)
+        return matches
+
+    def restore(self, key: Any, source: dict[str, Any], buckets: Iterable[int]) -> None:
+        """Index ``source`` under previously computed ``buckets`` without matching it.
+
+        Its features are computed only if a later ``add`` selects it as a candidate.
+        """
+        self._sources[key] = source
+        self._index(key, list(buckets))
+
+    def buckets(self, key: Any) -> list[int]:
+        """Return the bucket hashes ``key`` was indexed under."""
+        return list(self._keys.get(key, ()))
+
+    def buckets_for(self, source: dict[str, Any]) -> list[int]:
+        """Return the bucket hashes ``source`` would be indexed under."""
+        return self._bucket_keys(self._features_for(source))
+
+    def _bucket_keys(self, features: dict[str, Any]) -> list[int]:
+        bucket_keys: list[int] = []
+        for field in ("title", "text"):
+            signature = minhash_signature(features[field], self.bins)
+            if not signature:
+                continue
+            for band in range(self.bands):
+                rows = signature[band * self._rows : (band + 1) * self._rows]
+                bucket_keys.append(zlib.crc32(repr((field, band, rows)).encode("ascii")))
+        return bucket_keys
+
+    def _index(self, key: Any, bucket_keys: list[int]) -> None:
+        self._keys[key] = bucket_keys
+        for bucket_key in bucket_keys:
+            self._buckets.setdefault(bucket_key, []).append(key)
+
+    def _features_of(self, key: Any) -> dict[str, Any]:
+        features = self._features.get(key)
+        if features is None:
+            features = self._features[key] = self._features_for(self._sources.pop(key))
+        return features
+
+    @staticmethod
+    def _features_for(source: dict[str, Any]) -> dict[str, Any]:
+        url = canonicalize_url(str(source.get("url") or ""))
+        text = source_text(source)
+        # deduplicate_sources already resolved identifiers; only extract when absent.
+        doi = str(
+            source["doi"] if "doi" in source else extract_doi(f"{url}\n{text}")
+        ).lower()
+        pmid = str(source["pmid"] if "pmid" in source else extract_pmid(f"{url}\n{text}"))
+        return {
+            "title": _title_shingles(source),
+            "words": _title_words(source),
+            "text": _text_shingles(source),
+            "doi": doi,
+            "pmid": pmid,
+            "year": extract_year(source, text),
+            "preprint": is_preprint_url(url) or is_preprint_doi(doi),
+        }
+
+    def _compare(
+        self, left: dict[str, Any], right: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        if left["pmid"] and right["pmid"] and left["pmid"] != right["pmid"]:
+            return None
+        if (
+            left["doi"]
+            and right["doi"]
+            and left["doi"] != right["doi"]
+            and not (is_preprint_doi(left["doi"]) or is_preprint_doi(right["doi"]))
+        ):
+            return None
+        if (
+            left["year"]
+            and right["year"]
+            and abs(int(left["year"]) - int(right["year"])) > NEAR_DUPLICATE_MAX_YEAR_GAP
+        ):
+            return None
+        has_titles = bool(left["title"] and right["title"])
+        title_similarity = _jaccard(left["title"], right["title"])
+        text_similarity = _jaccard(left["text"], right["text"])
+        if (
+            has_titles
+            and title_similarity >= self.title_threshold
+            and not _substitutes_words(left["words"], right["words"])
+        ):
+            reason = f"titles {title_similarity:.0%} similar"
+        elif text_similarity >= self.text_threshold and (
+            not has_titles or title_similarity >= self.title_threshold / 2
+        ):
+            reason = f"excerpts {text_similarity:.0%} similar"
+        else:
+            return None
+        if left["preprint"] != right["preprint"]:
+            reason += "; preprint and published versions"
+        return {
+            "reason": reason,
+            "title_similarity": round(title_similarity, 3),
+            "text_similarity": round(text_similarity, 3),
+        }
+
+
+def _representative_rank(source: dict[str, Any]) -> tuple[int, int, int, int]:
+    """Prefer published, extracted, identified, and richer records as cluster heads."""
+    url = str(source.get("url") or "")
+    doi = str(source.get("doi") or "")
+    return (
+        0 if is_preprint_url(url) or is_preprint_doi(doi) else 1,
+        1 if source.get("extracted") else 0,
+        1 if doi or source.get("pmid") else 0,
+        len(source_text(source)),
+    )
+
+
+def _source_label(source: dict[str, Any]) -> dict[str, str]:
+    return {"url": str(source.get("url") or ""), "title": str(source.get("title") or "")}
+
+
+def merge_near_duplicates(
+    sources: Iterable[dict[str, Any]],
+    *,
+    title_threshold: float = NEAR_DUPLICATE_TITLE_THRESHOLD,
+    text_threshold: float = NEAR_DUPLICATE_TEXT_THRESHOLD,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Merge near-duplicate sources that exact deduplication leaves apart.
+
+    Catches preprint and published versions, mirrored PDFs, and records with
+    slightly different titles. Run it after ``deduplicate_sources``.
+
+    Returns:
+        ``(merged_sources, clusters)``. Each cluster names the record that was
+        kept and the records merged into it, plus one ``evidence`` entry per
+        match that joined the cluster with its similarities and a short reason.
+        Every merged source carries the LSH buckets of its members in
+        ``lsh_buckets`` for ``update_manuscript_packet``.
+    """
+    items = list(sources)
+    index = NearDuplicateIndex(title_threshold=title_threshold, text_threshold=text_threshold)
+    parent = list(range(len(items)))
+
+    def root(position: int) -> int:
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    # Published DOIs and PMIDs per cluster root, so chains of pairwise matches
+    # (published A ~ preprint B ~ published C) never merge two distinct works.
+    identifiers: dict[int, tuple[set[str], set[str]]] = {}
+    for position, source in enumerate(items):
+        doi = str(source.get("doi") or "").lower()
+        pmid = str(source.get("pmid") or "")
+        identifiers[position] = (
+            {doi} if doi and not is_preprint_doi(doi) else set(),
+            {pmid} if pmid else set(),
+        )
+
+    edges: list[tuple[int, int, dict[str, Any]]] = []
+    for position, source in enumerate(items):
+        for other, evidence in index.add(position, source):
+            left, right = root(other), root(position)
+            if left == right:
+                edges.append((position, other, evidence))
+                continue
+            (left_dois, left_pmids), (right_dois, right_pmids) = (
+                identifiers[left],
+                identifiers[right],
+            )
+            if len(left_dois | right_dois) > 1 or len(left_pmids | right_pmids) > 1:
+                continue
+            edges.append((position, other, evidence))
+            low, high = min(left, right), max(left, right)
+            parent[high] = low
+            identifiers[low] = (left_dois | right_dois, left_pmids | right_pmids)
+
+    groups: dict[int, list[int]] = {}
+    for position in range(len(items)):
+        groups.setdefault(root(position), []).append(position)
+    evidence_by_group: dict[int, list[dict[str, Any]]] = {}
+    for position, other, evidence in edges:
+        evidence_by_group.setdefault(root(position), []).append(
+            {
+                "url": items[position].get("url", ""),
+                "matched_url": items[other].get("url", ""),
+                **evidence,
+            }
+        )
+
+    merged: list[dict[str, Any]] = []
+    clusters: list[dict[str, Any]] = []
+    for group, members in groups.items():
+        if len(members) == 1:
+            merged.append({**items[members[0]], "lsh_buckets": index.buckets(members[0])})
+            continue
+        head = max(members, key=lambda position: _representative_rank(items[position]))
+        current = {**items[head], "lsh_buckets": index.buckets(head)}
+        head_is_preprint = _representative_rank(current)[0] == 0
+        for position in members:
+            if position == head:
+                continue
+            other = items[position]
+            if not head_is_preprint and _representative_rank(other)[0] == 0:
+                # Preprint wording and extraction must not be attributed to the
+                # published version; the preprint only contributes its facets.
+                other = {
+                    "facets": other.get("facets") or [],
+                    "match_keys": other.get("match_keys") or [],
+                }
+            other = {**other, "lsh_buckets": index.buckets(position)}
+            _merge_source(
+                current,
+                other,
+                doi=str(other.get("doi") or ""),
+                pmid=str(other.get("pmid") or ""),
+            )
+        merged.append(current)
+        clusters.append(
+            {
+                "kept": _source_label(current),
+                "merged": [
+                    _source_label(items[position]) for position in members if position != head
+                ],
+                "evidence": evidence_by_group[group],
+            }
+        )
+    return merged, clusters
+
+
 def normalize_reference(source: dict[str, Any], index: int) -> dict[str, Any]:
     """Convert a source into a structured evidence-matrix record."""
     text = source_text(source)
@@ -413,21 +820,22 @@ def reference_score(reference: dict[str, Any]) -> tuple[int, int, int, int]:
     )
 
 
+def _reference_claims(reference: dict[str, Any]) -> list[dict[str, Any]]:
+    if reference.get("retracted"):
+        return []
+    return [
+        {
+            "claim": finding,
+            "reference_ids": [reference["reference_id"]],
+            "supporting_excerpts": (reference.get("supporting_excerpts") or [])[:2],
+            "status": "single-source",
+        }
+        for finding in reference.get("key_findings") or []
+    ]
+
+
 def _claim_map(references: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    claims: list[dict[str, Any]] = []
-    for reference in references:
-        if reference.get("retracted"):
-            continue
-        for finding in reference.get("key_findings") or []:
-            claims.append(
-                {
-                    "claim": finding,
-                    "reference_ids": [reference["reference_id"]],
-                    "supporting_excerpts": (reference.get("supporting_excerpts") or [])[:2],
-                    "status": "single-source",
-                }
-            )
-    return claims
+    return [claim for reference in references for claim in _reference_claims(reference)]
 
 
 def _synthesis(references: list[dict[str, Any]]) -> dict[str, Any]:
@@ -472,7 +880,10 @@ def _synthesis(references: list[dict[str, Any]]) -> dict[str, Any]:
     }
 
 
-def _section_briefs(references: list[dict[str, Any]]) -> dict[str, Any]:
+def _section_briefs(
+    references: list[dict[str, Any]], sections: Iterable[str] | None = None
+) -> dict[str, Any]:
+    """Build section briefs, only for ``sections`` when given."""
     briefs: dict[str, Any] = {
         "introduction": {
             "purpose": "Established background, significance, and unresolved gap.",
@@ -490,6 +901,9 @@ def _section_briefs(references: list[dict[str, Any]]) -> dict[str, Any]:
             "candidate_evidence": [],
         },
     }
+    if sections is not None:
+        wanted = set(sections)
+        briefs = {section: brief for section, brief in briefs.items() if section in wanted}
     for reference in references:
         for section in reference.get("manuscript_sections") or []:
             brief = briefs.get(section)
@@ -509,51 +923,78 @@ def _section_briefs(references: list[dict[str, Any]]) -> dict[str, Any]:
     return briefs
 
 
+_COVERAGE_COUNTS = (
+    "total_unique_references",
+    "verified_references",
+    "scholarly_sources",
+    "preprints",
+    "retracted_or_withdrawn",
+    "corrections_or_errata",
+    "missing_doi_or_pmid",
+)
+_COVERAGE_MIXES = ("evidence_quality_mix", "verification_mix", "publication_years")
+
+
+def _coverage_tally(reference: dict[str, Any]) -> Counter[tuple[str, str]]:
+    """Count one reference's contribution to each coverage figure."""
+    tally = Counter(
+        {
+            ("total_unique_references", ""): 1,
+            ("verified_references", ""): int(
+                reference.get("verification_status") != "search-only"
+                and not reference.get("retracted")
+            ),
+            ("scholarly_sources", ""): int(bool(reference.get("scholarly_source"))),
+            ("preprints", ""): int(bool(reference.get("preprint"))),
+            ("retracted_or_withdrawn", ""): int(bool(reference.get("retracted"))),
+            ("corrections_or_errata", ""): int(bool(reference.get("corrected"))),
+            ("missing_doi_or_pmid", ""): int(
+                not reference.get("doi") and not reference.get("pmid")
+            ),
+            ("evidence_quality_mix", str(reference.get("evidence_quality") or "unknown")): 1,
+            ("verification_mix", str(reference.get("verification_status") or "unknown")): 1,
+        }
+    )
+    if reference.get("year"):
+        tally["publication_years", str(reference["year"])] = 1
+    return +tally
+
+
+def _coverage_totals(coverage: dict[str, Any]) -> Counter[tuple[str, str]]:
+    """Recover the summed tallies behind a coverage report."""
+    totals: Counter[tuple[str, str]] = Counter()
+    for name in _COVERAGE_COUNTS:
+        totals[name, ""] = int(coverage.get(name) or 0)
+    for name in _COVERAGE_MIXES:
+        for value, count in (coverage.get(name) or {}).items():
+            totals[name, value] = int(count)
+    return +totals
+
+
 def _coverage(
-    references: list[dict[str, Any]], target_references: int
+    references: list[dict[str, Any]],
+    target_references: int,
+    totals: Counter[tuple[str, str]] | None = None,
 ) -> dict[str, Any]:
-    verified = [
-        reference
-        for reference in references
-        if reference.get("verification_status") != "search-only"
-        and not reference.get("retracted")
-    ]
-    years = Counter(
-        str(reference["year"])
-        for reference in references
-        if reference.get("year")
-    )
-    quality = Counter(
-        str(reference.get("evidence_quality") or "unknown")
-        for reference in references
-    )
-    verification = Counter(
-        str(reference.get("verification_status") or "unknown")
-        for reference in references
-    )
+    """Summarize coverage from ``references`` or from precomputed ``totals``."""
+    if totals is None:
+        totals = Counter()
+        for reference in references:
+            totals.update(_coverage_tally(reference))
+    mixes: dict[str, dict[str, int]] = {name: {} for name in _COVERAGE_MIXES}
+    for (name, value), count in totals.items():
+        if name in mixes and count > 0:
+            mixes[name][value] = count
+    verified = totals["verified_references", ""]
     return {
         "requested_references": target_references,
-        "total_unique_references": len(references),
-        "verified_references": len(verified),
-        "shortfall": max(0, target_references - len(verified)),
-        "evidence_quality_mix": dict(quality),
-        "verification_mix": dict(verification),
-        "publication_years": dict(sorted(years.items())),
-        "scholarly_sources": sum(
-            1 for reference in references if reference.get("scholarly_source")
-        ),
-        "preprints": sum(1 for reference in references if reference.get("preprint")),
-        "retracted_or_withdrawn": sum(
-            1 for reference in references if reference.get("retracted")
-        ),
-        "corrections_or_errata": sum(
-            1 for reference in references if reference.get("corrected")
-        ),
-        "missing_doi_or_pmid": sum(
-            1
-            for reference in references
-            if not reference.get("doi") and not reference.get("pmid")
-        ),
+        "total_unique_references": totals["total_unique_references", ""],
+        "verified_references": verified,
+        "shortfall": max(0, target_references - verified),
+        "evidence_quality_mix": mixes["evidence_quality_mix"],
+        "verification_mix": mixes["verification_mix"],
+        "publication_years": dict(sorted(mixes["publication_years"].items())),
+        **{name: totals[name, ""] for name in _COVERAGE_COUNTS[2:]},
         "full_text_note": (
             "Extraction verifies available public page content; paywalled full text may "
             "remain unavailable and must not be represented as reviewed."
@@ -568,23 +1009,66 @@ def build_manuscript_packet(
     search_ledger: list[dict[str, Any]],
     target_references: int = 60,
     manuscript_context: dict[str, Any] | None = None,
+    near_duplicate_threshold: float | None = NEAR_DUPLICATE_TITLE_THRESHOLD,
 ) -> dict[str, Any]:
-    """Build a structured packet without adding facts beyond source excerpts."""
+    """Build a structured packet without adding facts beyond source excerpts.
+
+    After exact deduplication, near-duplicate sources (title similarity of at
+    least ``near_duplicate_threshold``) are merged and reported under
+    ``near_duplicates``; pass None to skip that stage. The merged source
+    records are kept under ``sources``, aligned with ``references``, so
+    ``update_manuscript_packet`` can add sources later without a rebuild.
+    """
     deduplicated = deduplicate_sources(sources)
-    references = [
-        normalize_reference(source, index)
-        for index, source in enumerate(deduplicated, start=1)
-    ]
-    references.sort(key=reference_score, reverse=True)
+    near_duplicates: list[dict[str, Any]] = []
+    if near_duplicate_threshold is not None:
+        deduplicated, near_duplicates = merge_near_duplicates(
+            deduplicated, title_threshold=near_duplicate_threshold
+        )
+    ranked = sorted(
+        (
+            (normalize_reference(source, index), source)
+            for index, source in enumerate(deduplicated, start=1)
+        ),
+        key=lambda pair: reference_score(pair[0]),
+        reverse=True,
+    )
+    references = [reference for reference, _ in ranked]
     for index, reference in enumerate(references, start=1):
         reference["reference_id"] = f"ref-{index:03d}"
 
     coverage = _coverage(references, target_references)
+    coverage["near_duplicates_merged"] = sum(
+        len(cluster["merged"]) for cluster in near_duplicates
+    )
+
+    return {
+        "schema_version": "1.0",
+        "query": query,
+        "manuscript_context": manuscript_context or {},
+        "target_references": target_references,
+        "references": references,
+        "evidence_matrix": references,
+        "claim_source_map": _claim_map(references),
+        "synthesis": _synthesis(references),
+        "section_briefs": _section_briefs(references),
+        "coverage": coverage,
+        "near_duplicates": near_duplicates,
+        "search_ledger": search_ledger,
+        "warnings": _packet_warnings(coverage, manuscript_context),
+        "sources": [source for _, source in ranked],
+    }
+
+
+def _packet_warnings(
+    coverage: dict[str, Any], manuscript_context: dict[str, Any] | None
+) -> list[str]:
     warnings: list[str] = []
     if coverage["shortfall"]:
         warnings.append(
             f"Verified {coverage['verified_references']} of "
-            f"{target_references} requested references; the list was not padded."
+            f"{coverage['requested_references']} requested references; the list was "
+            "not padded."
         )
     if coverage["retracted_or_withdrawn"]:
         warnings.append(
@@ -594,23 +1078,206 @@ def build_manuscript_packet(
         warnings.append(
             "No structured manuscript context was supplied; section briefs are broad."
         )
+    return warnings
+
+
+def update_manuscript_packet(
+    existing: dict[str, Any],
+    new_sources: Iterable[dict[str, Any]],
+    *,
+    search_ledger: list[dict[str, Any]] | None = None,
+    near_duplicate_threshold: float | None = NEAR_DUPLICATE_TITLE_THRESHOLD,
+) -> dict[str, Any]:
+    """Merge ``new_sources`` into a packet without rebuilding it.
+
+    New sources are deduplicated against the packet's ``sources`` by their
+    match keys and LSH buckets, so existing records are neither re-normalized
+    nor re-hashed. Only new references and the references they merge into are
+    normalized. Claims of unchanged references are reused, coverage totals are
+    adjusted by the changed references, and only the section briefs a changed
+    reference belongs to are rebuilt; the rest are renumbered. Synthesis and
+    warnings are recomputed. A near-duplicate is matched against the kept
+    record of an existing cluster, so clusters grow but are never split.
+
+    ``search_ledger`` entries are appended to the packet's ledger. The
+    ``existing`` packet is not modified.
+
+    Raises:
+        ValueError: if ``existing`` has no ``sources`` aligned with its references.
+    """
+    stored = existing.get("sources")
+    if not isinstance(stored, list) or len(stored) != len(existing["references"]):
+        raise ValueError(
+            "Packet has no source records to update; rebuild it with "
+            "build_manuscript_packet."
+        )
+    sources = [dict(source) for source in stored]
+    previous = list(existing["references"])
+    key_to_position = {
+        key: position
+        for position, source in enumerate(sources)
+        for key in source.get("match_keys") or []
+    }
+    index = NearDuplicateIndex(
+        title_threshold=near_duplicate_threshold or NEAR_DUPLICATE_TITLE_THRESHOLD
+    )
+    if near_duplicate_threshold is not None:
+        for position, source in enumerate(sources):
+            index.restore(position, source, source.get("lsh_buckets") or [])
+    clusters = [
+        {**cluster, "merged": list(cluster["merged"]), "evidence": list(cluster["evidence"])}
+        for cluster in existing.get("near_duplicates") or []
+    ]
+    cluster_for = {cluster["kept"]["url"]: cluster for cluster in clusters}
+    # Index keys of new sources merged into an earlier record point at it.
+    owner: dict[Any, int] = {}
+    changed: set[int] = set()
+
+    for offset, source in enumerate(deduplicate_sources(new_sources)):
+        position = next(
+            (key_to_position[key] for key in source["match_keys"] if key in key_to_position),
+            None,
+        )
+        if position is not None:
+            _merge_source(sources[position], source, doi=source["doi"], pmid=source["pmid"])
+            if near_duplicate_threshold is not None:
+                sources[position]["lsh_buckets"] = list(
+                    dict.fromkeys(
+                        [
+                            *(sources[position].get("lsh_buckets") or []),
+                            *index.buckets_for(sources[position]),
+                        ]
+                    )
+                )
+        else:
+            key = f"new-{offset}"
+            matches = []
+            if near_duplicate_threshold is not None:
+                matches = index.add(key, source)
+                source["lsh_buckets"] = index.buckets(key)
+            if not matches:
+                position = len(sources)
+                sources.append(source)
+            else:
+                matched, evidence = min(
+                    matches, key=lambda match: owner.get(match[0], match[0])
+                )
+                position = owner.get(matched, matched)
+                sources[position] = _absorb_near_duplicate(
+                    sources[position], source, evidence, clusters, cluster_for
+                )
+            owner[key] = position
+        for match_key in sources[position].get("match_keys") or []:
+            key_to_position.setdefault(match_key, position)
+        changed.add(position)
+
+    ranked: list[tuple[dict[str, Any], dict[str, Any], bool]] = []
+    totals = _coverage_totals(existing["coverage"])
+    sections: set[str] = set()
+    for position, source in enumerate(sources):
+        if position not in changed:
+            ranked.append((dict(previous[position]), source, False))
+            continue
+        if position < len(previous):
+            totals.subtract(_coverage_tally(previous[position]))
+            sections.update(previous[position].get("manuscript_sections") or [])
+        reference = normalize_reference(source, position + 1)
+        totals.update(_coverage_tally(reference))
+        sections.update(reference.get("manuscript_sections") or [])
+        ranked.append((reference, source, True))
+    # A stable sort keeps unchanged references in their previous relative order,
+    # which is what lets their claims and section briefs be renumbered in place.
+    ranked.sort(key=lambda item: reference_score(item[0]), reverse=True)
+
+    claims_for: dict[str, list[dict[str, Any]]] = {}
+    for claim in existing.get("claim_source_map") or []:
+        claims_for.setdefault(claim["reference_ids"][0], []).append(claim)
+    renamed: dict[str, str] = {}
+    claim_source_map: list[dict[str, Any]] = []
+    for number, (reference, _, fresh) in enumerate(ranked, start=1):
+        reference_id = f"ref-{number:03d}"
+        if fresh:
+            reference["reference_id"] = reference_id
+            claim_source_map.extend(_reference_claims(reference))
+            continue
+        renamed[reference["reference_id"]] = reference_id
+        claim_source_map.extend(
+            {**claim, "reference_ids": [reference_id]}
+            for claim in claims_for.get(reference["reference_id"], [])
+        )
+        reference["reference_id"] = reference_id
+    references = [reference for reference, _, _ in ranked]
+
+    rebuilt = _section_briefs(references, sections)
+    section_briefs = {
+        section: rebuilt[section]
+        if section in rebuilt
+        else {
+            **brief,
+            "reference_ids": [renamed[item] for item in brief["reference_ids"]],
+            "candidate_evidence": [
+                {**item, "reference_id": renamed[item["reference_id"]]}
+                for item in brief["candidate_evidence"]
+            ],
+        }
+        for section, brief in existing["section_briefs"].items()
+    }
 
+    coverage = _coverage(references, existing["target_references"], +totals)
+    coverage["near_duplicates_merged"] = sum(len(cluster["merged"]) for cluster in clusters)
     return {
-        "schema_version": "1.0",
-        "query": query,
-        "manuscript_context": manuscript_context or {},
-        "target_references": target_references,
+        **existing,
         "references": references,
         "evidence_matrix": references,
-        "claim_source_map": _claim_map(references),
+        "claim_source_map": claim_source_map,
         "synthesis": _synthesis(references),
-        "section_briefs": _section_briefs(references),
+        "section_briefs": section_briefs,
         "coverage": coverage,
-        "search_ledger": search_ledger,
-        "warnings": warnings,
+        "near_duplicates": clusters,
+        "search_ledger": [*existing.get("search_ledger", []), *(search_ledger or [])],
+        "warnings": _packet_warnings(coverage, existing.get("manuscript_context")),
+        "sources": [source for _, source, _ in ranked],
     }
 
 
+def _absorb_near_duplicate(
+    current: dict[str, Any],
+    source: dict[str, Any],
+    evidence: dict[str, Any],
+    clusters: list[dict[str, Any]],
+    cluster_for: dict[str, dict[str, Any]],
+) -> dict[str, Any]:
+    """Merge ``source`` into the cluster kept as ``current`` and record why."""
+    cluster = cluster_for.pop(str(current.get("url") or ""), None)
+    if cluster is None:
+        cluster = {"kept": _source_label(current), "merged": [], "evidence": []}
+        clusters.append(cluster)
+    cluster["evidence"].append(
+        {"url": source.get("url", ""), "matched_url": current.get("url", ""), **evidence}
+    )
+    head, other = current, source
+    if _representative_rank(source) > _representative_rank(current):
+        head, other = source, current
+    merged = dict(head)
+    contribution = other
+    if _representative_rank(head)[0] == 1 and _representative_rank(other)[0] == 0:
+        # As in merge_near_duplicates, a preprint only contributes its facets.
+        contribution = {
+            field: other.get(field) or []
+            for field in ("facets", "match_keys", "lsh_buckets")
+        }
+    _merge_source(
+        merged,
+        contribution,
+        doi=str(contribution.get("doi") or ""),
+        pmid=str(contribution.get("pmid") or ""),
+    )
+    cluster["merged"].append(_source_label(other))
+    cluster["kept"] = _source_label(merged)
+    cluster_for[cluster["kept"]["url"]] = cluster
+    return merged
+
+
 def citation_text(reference: dict[str, Any]) -> str:
     """Render a conservative citation without inventing missing metadata."""
     authors = str(reference.get("authors") or "").strip()
@@ -717,7 +1384,12 @@ def bibtex_text(references: list[dict[str, Any]]) -> str:
 
 
 def save_packet(packet: dict[str, Any], directory: str | Path) -> dict[str, str]:
-    """Write reproducible packet artifacts and return their paths."""
+    """Write reproducible packet artifacts and return their paths.
+
+    Every artifact is staged in a temporary file beside it and only then
+    renamed into place, so readers never see a partly written file and an
+    update that fails part-way leaves the previous artifacts intact.
+    """
     destination = Path(directory)
     destination.mkdir(parents=True, exist_ok=True)
     artifacts = {
@@ -730,6 +1402,7 @@ def save_packet(packet: dict[str, Any], directory: str | Path) -> dict[str, str]
         "synthesis": destination / "synthesis.json",
         "section_briefs": destination / "section-briefs.json",
         "coverage": destination / "coverage.json",
+        "near_duplicates": destination / "near-duplicates.json",
         "search_ledger": destination / "search-ledger.json",
     }
     payloads: dict[str, Any] = {
@@ -740,15 +1413,34 @@ def save_packet(packet: dict[str, Any], directory: str | Path) -> dict[str, str]
         "synthesis": packet["synthesis"],
         "section_briefs": packet["section_briefs"],
         "coverage": packet["coverage"],
+        "near_duplicates": packet.get("near_duplicates", []),
         "search_ledger": packet["search_ledger"],
     }
-    for name, payload in payloads.items():
-        artifacts[name].write_text(
-            json.dumps(payload, indent=2, ensure_ascii=False) + "\n",
-            encoding="utf-8",
-        )
-    artifacts["packet_markdown"].write_text(packet_markdown(packet), encoding="utf-8")
-    artifacts["references_bib"].write_text(
-        bibtex_text(packet["references"]), encoding="utf-8"
-    )
+    texts = {
+        name: json.dumps(payload, indent=2, ensure_ascii=False) + "\n"
+        for name, payload in payloads.items()
+    }
+    texts["packet_markdown"] = packet_markdown(packet)
+    texts["references_bib"] = bibtex_text(packet["references"])
+
+    staged: dict[str, str] = {}
+    try:
+        for name, text in texts.items():
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=destination,
+                prefix=f".{artifacts[name].name}.",
+                suffix=".tmp",
+                delete=False,
+            ) as handle:
+                handle.write(text)
+                staged[name] = handle.name
+            os.chmod(staged[name], 0o644)
+        for name, temporary_name in staged.items():
+            os.replace(temporary_name, artifacts[name])
+    finally:
+        for temporary_name in staged.values():
+            if Path(temporary_name).exists():
+                Path(temporary_name).unlink()
     return {name: str(path) for name, path in artifacts.items()}
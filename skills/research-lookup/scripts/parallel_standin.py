@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Offline stand-in for the Parallel and OpenRouter HTTP APIs.
+
+Serves deterministic results for Parallel's ``/v1beta/search``,
+``/v1beta/extract`` and ``/chat/completions``, and for OpenRouter's
+``/api/v1/chat/completions``, over HTTP/1.1 keep-alive, so the HTTP transport
+and every research lookup backend except Deep Research can be exercised and
+benchmarked without network access or API credits. Responses can be slowed by
+a latency with jitter, a share of them can fail with 500/502/503, and each
+route can enforce a rate limit, answering 429 with ``Retry-After`` once its
+token bucket is empty.
+
+Usage:
+    python parallel_standin.py --port 8765 --latency 0.2 --jitter 0.1 \\
+        --error-rate 0.02 --rate-limit search=5
+    PARALLEL_API_BASE=http://127.0.0.1:8765 PARALLEL_API_KEY=test \\
+        python research_lookup.py "sleep and memory consolidation" --transport http
+    OPENROUTER_API_BASE=http://127.0.0.1:8765/api/v1 OPENROUTER_API_KEY=test \\
+        python research_lookup.py "sleep and memory consolidation" --force-backend perplexity
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from parallel_transport import CHAT_PATH, EXTRACT_PATH, SEARCH_PATH
+
+# OpenRouter's chat endpoint, under OPENROUTER_API_BASE=<stand-in>/api/v1.
+OPENROUTER_CHAT_PATH = "/api/v1" + CHAT_PATH
+
+
+def search_payload(body: dict[str, Any]) -> dict[str, Any]:
+    """Return a deterministic Search response for a request body."""
+    objective = str(body.get("objective") or "")
+    digest = hashlib.sha256(objective.encode("utf-8")).hexdigest()[:8]
+    count = int(body.get("max_results") or 10)
+    return {
+        "search_id": f"search_{digest}",
+        "session_id": body.get("session_id") or f"session_{digest}",
+        "results": [
+            {
+                "url": f"https://pubmed.ncbi.nlm.nih.gov/{digest}{index:03d}/",
+                "title": f"Stand-in study {digest}-{index}",
+                "publish_date": f"{2015 + index % 10}-01-01",
+                "excerpts": [
+                    f"A cohort study of {100 + index} participants found an "
+                    "association with the outcome."
+                ],
+            }
+            for index in range(count)
+        ],
+        "usage": [{"name": "sku_search", "count": 1}],
+    }
+
+
+def extract_payload(body: dict[str, Any]) -> dict[str, Any]:
+    """Return a deterministic Extract response for a request body."""
+    urls = [str(url) for url in body.get("urls") or []]
+    return {
+        "extract_id": f"extract_{len(urls)}",
+        "results": [
+            {
+                "url": url,
+                "title": f"Extracted {url.rstrip('/').rsplit('/', 1)[-1]}",
+                "excerpts": [
+                    "This randomized controlled trial found a reduced risk "
+                    "(HR 0.82, 95% CI 0.70-0.95). Limitations include a short follow-up."
+                ],
+            }
+            for url in urls
+        ],
+        "errors": [],
+        "usage": [{"name": "sku_extract", "count": len(urls)}],
+    }
+
+
+def chat_payload(body: dict[str, Any]) -> dict[str, Any]:
+    """Return a deterministic chat completion for a request body.
+
+    The shape covers both APIs: Parallel's ``basis`` sources and OpenRouter's
+    ``search_results``.
+    """
+    messages = body.get("messages") or [{}]
+    question = str(messages[-1].get("content") or "")
+    digest = hashlib.sha256(question.encode("utf-8")).hexdigest()[:8]
+    sources = [
+        {
+            "url": f"https://pubmed.ncbi.nlm.nih.gov/{digest}{index:03d}/",
+            "title": f"Stand-in study {digest}-{index}",
+            "date": f"{2015 + index}-01-01",
+            "snippet": "A cohort study found an association with the outcome.",
+        }
+        for index in range(3)
+    ]
+    content = (
+        f"Stand-in summary {digest}: a cohort study of 1,200 participants found a "
+        "reduced risk (HR 0.82, 95% CI 0.70-0.95) [1]. "
+        f"Reference: Author A, et al. Stand-in study. doi:10.5555/standin.{digest}"
+    )
+    return {
+        "id": f"chatcmpl_{digest}",
+        "object": "chat.completion",
+        "model": str(body.get("model") or ""),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "basis": [{"field": "content", "citations": sources}],
+        "search_results": sources,
+        "usage": {"prompt_tokens": len(question.split()), "completion_tokens": 40},
+    }
+
+
+ROUTES = {
+    SEARCH_PATH: ("search", search_payload),
+    EXTRACT_PATH: ("extract", extract_payload),
+    CHAT_PATH: ("chat", chat_payload),
+    OPENROUTER_CHAT_PATH: ("perplexity", chat_payload),
+}
+ERROR_STATUSES = (500, 502, 503)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StandinServer"
+
+    def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        route = ROUTES.get(self.path)
+        if route is None:
+            self._reply(404, {"error": f"unknown path {self.path}"})
+            return
+        name, handler = route
+        # Search and Extract take x-api-key; the chat APIs take a bearer token.
+        if name in {"search", "extract"}:
+            authorized = bool(self.headers.get("x-api-key"))
+        else:
+            authorized = (self.headers.get("Authorization") or "").startswith("Bearer ")
+        if not authorized:
+            self._reply(401, {"error": "missing API key"})
+            return
+        try:
+            body = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            self._reply(400, {"error": "invalid JSON"})
+            return
+        refusal = self.server.admit(name)
+        if refusal is not None:
+            self._reply(*refusal)
+            return
+        self.server.count_request()
+        self._reply(200, handler(body))
+
+    def _reply(
+        self, status: int, payload: dict[str, Any], headers: dict[str, str] | None = None
+    ) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        del format, args
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Threaded stand-in server.
+
+    ``requests_served`` counts successful calls, ``throttled`` 429 answers and
+    ``errors`` injected 5xx answers. ``rate_limits`` maps route names
+    (``search``, ``extract``, ``chat``, ``perplexity``) to requests per second.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        latency: float = 0.0,
+        *,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limits: dict[str, float] | None = None,
+        seed: int = 7,
+    ):
+        super().__init__(address, StandinHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limits = {name: rate for name, rate in (rate_limits or {}).items() if rate > 0}
+        self.requests_served = 0
+        self.throttled = 0
+        self.errors = 0
+        # Per-route token buckets hold up to one second of requests.
+        self._tokens = {name: max(1.0, rate) for name, rate in self.rate_limits.items()}
+        self._updated = {name: time.monotonic() for name in self.rate_limits}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def admit(self, name: str) -> tuple[int, dict[str, Any], dict[str, str]] | None:
+        """Apply latency, the route's rate limit and error injection.
+
+        Returns None to serve the request, or the reply to send instead.
+        """
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            wait = 0.0
+            rate = self.rate_limits.get(name)
+            if rate:
+                now = time.monotonic()
+                tokens = min(
+                    max(1.0, rate), self._tokens[name] + (now - self._updated[name]) * rate
+                )
+                self._updated[name] = now
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / rate
+                    self.throttled += 1
+                self._tokens[name] = tokens
+            failure = 0
+            if not wait and self.error_rate and self._random.random() < self.error_rate:
+                failure = self._random.choice(ERROR_STATUSES)
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+        if wait:
+            return (
+                429,
+                {"error": "rate limit exceeded"},
+                {"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+        if failure:
+            return failure, {"error": "service temporarily unavailable"}, {}
+        return None
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests_served += 1
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.requests_served = self.throttled = self.errors = 0
+
+
+def start_server(
+    host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, **options: Any
+) -> StandinServer:
+    """Start a stand-in server on a background thread and return it.
+
+    ``options`` are the ``StandinServer`` keyword arguments. Port 0 picks a
+    free port; read it back from ``server.base_url``. Call ``server.shutdown()``
+    when done.
+    """
+    server = StandinServer((host, port), latency, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_rate_limits(values: list[str]) -> dict[str, float]:
+    """Parse ``ROUTE=RATE`` items; a bare ``RATE`` applies to every route."""
+    names = [name for name, _ in ROUTES.values()]
+    limits: dict[str, float] = {}
+    for item in values:
+        name, _, rate = item.rpartition("=")
+        for route in [name] if name else names:
+            if route not in names:
+                raise ValueError(f"unknown route {route!r}; expected one of {', '.join(names)}")
+            limits[route] = float(rate)
+    return limits
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every response"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Up to this many more seconds, at random"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of calls answered with 500/502/503"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="[ROUTE=]RATE",
+        help="Calls per second before 429 (search, extract, chat, perplexity); repeatable",
+    )
+    parser.add_argument("--seed", type=int, default=7, help="Seed for jitter and injected errors")
+    args = parser.parse_args()
+    try:
+        limits = parse_rate_limits(args.rate_limit)
+    except ValueError as exc:
+        parser.error(str(exc))
+    server = StandinServer(
+        (args.host, args.port),
+        args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limits=limits,
+        seed=args.seed,
+    )
+    print(f"Parallel stand-in listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,190 @@
+"""Pooled keep-alive HTTP transport for Parallel Search and Extract.
+
+``research_lookup.py`` describes every Search and Extract call as
+``parallel-cli`` arguments. Running each call as its own process pays
+interpreter start-up, authentication, and a fresh TLS handshake every time. A
+``ParallelHTTPClient`` translates the same arguments into JSON requests sent
+over one pooled ``requests.Session`` that lives for the whole lookup session.
+
+Commands the client does not translate (Research, login, ...) raise
+``UnsupportedCommand`` so the caller can run ``parallel-cli`` instead. Calls
+answered with 429 or 5xx are retried with backoff, honoring ``Retry-After``. Set
+``PARALLEL_API_BASE`` to point the client at ``parallel_standin.py`` or another
+stand-in server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+from typing import Any, NoReturn
+
+
+DEFAULT_API_BASE = "https://api.parallel.ai"
+SEARCH_PATH = "/v1beta/search"
+EXTRACT_PATH = "/v1beta/extract"
+# The OpenAI-compatible Chat API research_lookup.py calls directly.
+CHAT_PATH = "/chat/completions"
+BETA_HEADER = "search-extract-2025-10-10"
+DEFAULT_POOL_SIZE = 16
+
+# Statuses meaning the API did not accept this translation of the call (or this
+# key), so the same call may still succeed through an authenticated parallel-cli.
+FALLBACK_STATUSES = {400, 401, 403, 404, 405, 422}
+
+
+class UnsupportedCommand(Exception):
+    """The arguments describe a call that must go through ``parallel-cli``."""
+
+
+class RequestRejected(UnsupportedCommand):
+    """The API rejected the translated request; later calls should use the CLI."""
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    def error(self, message: str) -> NoReturn:
+        raise UnsupportedCommand(message)
+
+
+def _search_parser() -> argparse.ArgumentParser:
+    parser = _ArgumentParser(prog="search", add_help=False)
+    parser.add_argument("objective")
+    parser.add_argument("--mode", default="basic")
+    parser.add_argument("--max-results", type=int)
+    parser.add_argument("--excerpt-max-chars-total", type=int)
+    parser.add_argument("-q", dest="queries", action="append", default=[])
+    parser.add_argument("--include-domains")
+    parser.add_argument("--after-date")
+    parser.add_argument("--session-id")
+    parser.add_argument("--json", action="store_true")
+    return parser
+
+
+def _extract_parser() -> argparse.ArgumentParser:
+    parser = _ArgumentParser(prog="extract", add_help=False)
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--objective")
+    parser.add_argument("--excerpt-max-chars-per-result", type=int)
+    parser.add_argument("--excerpt-max-chars-total", type=int)
+    parser.add_argument("--json", action="store_true")
+    return parser
+
+
+_PARSERS = {"search": _search_parser(), "extract": _extract_parser()}
+
+
+def request_for_args(args: list[str]) -> tuple[str, dict[str, Any]]:
+    """Translate ``parallel-cli`` arguments into ``(path, json_body)``.
+
+    Raises:
+        UnsupportedCommand: for commands or flags without an HTTP equivalent.
+    """
+    if not args or args[0] not in _PARSERS:
+        raise UnsupportedCommand(f"no HTTP mapping for {args[:1]}")
+    options = _PARSERS[args[0]].parse_args(args[1:])
+    body: dict[str, Any]
+    if args[0] == "search":
+        body = {"objective": options.objective, "mode": options.mode}
+        if options.queries:
+            body["search_queries"] = options.queries
+        if options.max_results:
+            body["max_results"] = options.max_results
+        if options.excerpt_max_chars_total:
+            body["excerpts"] = {"max_chars_total": options.excerpt_max_chars_total}
+        source_policy: dict[str, Any] = {}
+        if options.include_domains:
+            source_policy["include_domains"] = [
+                domain for domain in options.include_domains.split(",") if domain
+            ]
+        if options.after_date:
+            source_policy["after_date"] = options.after_date
+        if source_policy:
+            body["source_policy"] = source_policy
+        if options.session_id:
+            body["session_id"] = options.session_id
+        return SEARCH_PATH, body
+
+    body = {"urls": options.urls, "excerpts": {}}
+    if options.objective:
+        body["objective"] = options.objective
+    if options.excerpt_max_chars_per_result:
+        body["excerpts"]["max_chars_per_result"] = options.excerpt_max_chars_per_result
+    if options.excerpt_max_chars_total:
+        body["excerpts"]["max_chars_total"] = options.excerpt_max_chars_total
+    return EXTRACT_PATH, body
+
+
+class ParallelHTTPClient:
+    """Thread-safe Search/Extract client over a pooled keep-alive session.
+
+    Args:
+        api_key: Parallel API key sent as ``x-api-key``.
+        base_url: API root; defaults to ``PARALLEL_API_BASE`` or the public API.
+        pool_size: Connections kept open per host; size it to the number of
+            concurrent lookups and extract batches.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        base_url: str | None = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ):
+        try:
+            import requests
+            from polite_http import pooled_session, send
+        except ImportError as exc:
+            raise ImportError("The HTTP transport requires requests.") from exc
+
+        self.base_url = (
+            base_url or os.getenv("PARALLEL_API_BASE") or DEFAULT_API_BASE
+        ).rstrip("/")
+        self.requests_made = 0
+        self._lock = threading.Lock()
+        self._session = pooled_session(
+            pool_size,
+            {
+                "x-api-key": api_key,
+                "parallel-beta": BETA_HEADER,
+                "Content-Type": "application/json",
+            },
+        )
+        self._request_error = requests.RequestException
+        self._send = send
+
+    def call(self, args: list[str], *, timeout: float) -> dict[str, Any]:
+        """Run the call ``args`` describes and return its JSON payload.
+
+        Raises:
+            UnsupportedCommand: when ``args`` has no HTTP mapping.
+            RequestRejected: when the API answers with a ``FALLBACK_STATUSES`` code.
+            RuntimeError: for other HTTP, network, or decoding failures.
+        """
+        path, body = request_for_args(args)
+        try:
+            # Search and Extract only read, so throttled and 5xx calls are retried.
+            response = self._send(
+                self._session, "POST", f"{self.base_url}{path}", json=body, timeout=timeout
+            )
+        except self._request_error as exc:
+            raise RuntimeError(f"Parallel API request failed: {exc}") from exc
+        with self._lock:
+            self.requests_made += 1
+        if response.status_code in FALLBACK_STATUSES:
+            raise RequestRejected(
+                f"{path} rejected the request with HTTP {response.status_code}: "
+                f"{response.text[:200]}"
+            )
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f"Parallel API returned HTTP {response.status_code}: {response.text[:500]}"
+            )
+        try:
+            return response.json()
+        except ValueError as exc:
+            raise RuntimeError("Parallel API returned non-JSON output.") from exc
+
+    def close(self) -> None:
+        self._session.close()
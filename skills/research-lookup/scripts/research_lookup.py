@@ -9,19 +9,34 @@ and Perplexity remains an optional explicit/failure fallback.
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
 import os
 import re
 import shutil
+import sqlite3
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
-
+from typing import Any, Callable
+
+from evidence_index import EvidenceIndex, source_from_reference
+from lookup_cache import LookupCache, cache_key
+from parallel_transport import (
+    CHAT_PATH,
+    DEFAULT_API_BASE,
+    DEFAULT_POOL_SIZE,
+    ParallelHTTPClient,
+    RequestRejected,
+    UnsupportedCommand,
+)
 from manuscript_packet import (
+    NearDuplicateIndex,
     build_manuscript_packet,
     canonicalize_url,
     deduplicate_sources,
@@ -29,12 +44,50 @@ from manuscript_packet import (
     packet_markdown,
     reference_score,
     save_packet,
+    update_manuscript_packet,
 )
 
 
 DEFAULT_TARGET_REFERENCES = 60
 DEFAULT_MAX_RESULTS = 20
 DEFAULT_EXTRACT_BATCH_SIZE = 10
+DEFAULT_EXTRACT_CONCURRENCY = 3
+
+# Extracted, non-retracted sources in these evidence tiers count toward
+# ``target_references`` when deciding that the extract stage can stop early.
+EXTRACT_TARGET_QUALITY = ("high", "moderate")
+
+EXTRACT_OBJECTIVE = (
+    "Extract only source-supported bibliographic and study evidence: authors, "
+    "year, journal or venue, DOI/PMID, publication type, study design, population "
+    "or system, sample size, methods, intervention/exposure, comparator, outcomes, "
+    "quantitative findings, uncertainty, limitations, correction/retraction status, "
+    "and conclusions. Preserve exact wording for evidence excerpts."
+)
+
+# OpenRouter API root for the Perplexity backend; OPENROUTER_API_BASE overrides
+# it, e.g. to point at parallel_standin.py.
+OPENROUTER_API_BASE = "https://openrouter.ai/api/v1"
+
+# Client-side request ceilings per backend, in requests per second. Every
+# parallel-cli call and HTTP request takes a token first, so concurrent batch
+# queries share one budget per backend instead of sleeping a fixed delay.
+DEFAULT_RATE_LIMITS = {
+    "search": 5.0,
+    "extract": 5.0,
+    "research": 1.0,
+    "chat": 2.0,
+    "perplexity": 1.0,
+}
+# The service budget each backend draws from, shared by every process on the
+# machine: concurrent runs (and the OpenRouter image generators) split one budget.
+RATE_LIMIT_SERVICES = {
+    "search": "parallel-search",
+    "extract": "parallel-extract",
+    "research": "parallel-research",
+    "chat": "parallel-chat",
+    "perplexity": "openrouter",
+}
 
 ACADEMIC_DOMAINS = (
     "pubmed.ncbi.nlm.nih.gov",
@@ -130,6 +183,238 @@ ACADEMIC_FACETS = (
 )
 
 
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` requests per second.
+
+    Up to ``capacity`` requests may start back to back after an idle period.
+    A rate of zero or less disables limiting. With a ``service`` name, tokens
+    come from that service's bucket in ``polite_http.shared_buckets()``, shared
+    by every process on the machine; without the store the bucket is local.
+    """
+
+    def __init__(
+        self, rate: float, capacity: float | None = None, service: str | None = None
+    ):
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity is not None else rate)
+        self.service = service
+        self._shared: Any = None
+        if service and rate > 0:
+            try:
+                from polite_http import shared_buckets
+            except ImportError:  # requests is not installed
+                pass
+            else:
+                self._shared = shared_buckets()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available; return the seconds spent waiting."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            shared = self._shared
+            if shared is not None:
+                try:
+                    delay = shared.take(self.service, self.rate, self.capacity)
+                except sqlite3.Error:
+                    self._shared = None
+                    continue
+                if delay <= 0:
+                    return waited
+            else:
+                with self._lock:
+                    now = time.monotonic()
+                    self._tokens = min(
+                        self.capacity, self._tokens + (now - self._updated) * self.rate
+                    )
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ExtractionPipeline:
+    """Extract search candidates while later search passes are still running.
+
+    ``offer`` takes each search pass's sources as soon as they arrive. New
+    candidates are deduplicated against everything already offered (by
+    canonical URL, DOI, and PMID, then by ``NearDuplicateIndex``) and queued by ``reference_score``; full
+    batches go out on a thread pool as soon as a slot is free, so the best
+    candidates known at that moment are extracted first. ``finish`` flushes the
+    last partial batch and waits. No new batch is started once ``limit`` URLs
+    have been dispatched or ``target`` extracted sources reach
+    ``EXTRACT_TARGET_QUALITY``.
+
+    ``run_batch`` receives a list of URLs and returns ``(payload, ledger_entry,
+    sources)``; ``payload`` is None when the batch failed.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[
+            [list[str]],
+            tuple[dict[str, Any] | None, dict[str, Any], list[dict[str, Any]]],
+        ],
+        ledger: list[dict[str, Any]],
+        *,
+        limit: int,
+        target: int,
+        batch_size: int = DEFAULT_EXTRACT_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_EXTRACT_CONCURRENCY,
+    ):
+        self.run_batch = run_batch
+        self.ledger = ledger
+        self.limit = limit
+        self.target = target
+        self.batch_size = batch_size
+        self.payloads: list[dict[str, Any]] = []
+        self.sources: list[dict[str, Any]] = []
+        self.qualified = 0
+        self.dispatched = 0
+        self.stopped_early = False
+        self._max_concurrency = max(1, max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._max_concurrency, thread_name_prefix="extract"
+        )
+        self._condition = threading.Condition()
+        self._queue: list[tuple[tuple[int, ...], int, str]] = []
+        self._seen: set[str] = set()
+        self._near_duplicates = NearDuplicateIndex()
+        self._extracted_urls: set[str] = set()
+        self._offered = 0
+        self._in_flight = 0
+        self._flushing = False
+
+    @property
+    def done(self) -> bool:
+        """True once no further batch will be dispatched."""
+        return self.stopped_early or self.dispatched >= self.limit
+
+    def offer(self, sources: list[dict[str, Any]]) -> None:
+        """Queue new, unseen candidates and dispatch any batch that is ready."""
+        with self._condition:
+            if self.done:
+                return
+            for source in sources:
+                self._offered += 1
+                reference = normalize_reference(source, self._offered)
+                url = reference["url"]
+                keys = self._source_keys(reference)
+                if not url or keys & self._seen:
+                    self._seen |= keys
+                    continue
+                self._seen |= keys
+                if self._near_duplicates.add(self._offered, source):
+                    continue
+                priority = tuple(-value for value in reference_score(reference))
+                heapq.heappush(self._queue, (priority, self._offered, url))
+            self._pump()
+
+    def seed(self, sources: list[dict[str, Any]]) -> None:
+        """Count already-extracted sources, such as local index hits, as done.
+
+        They are never extracted again, and those of ``EXTRACT_TARGET_QUALITY``
+        count toward ``target``.
+        """
+        with self._condition:
+            for source in sources:
+                self._offered += 1
+                reference = normalize_reference(source, self._offered)
+                self._seen |= self._source_keys(reference)
+                self._near_duplicates.add(self._offered, source)
+                if reference["url"]:
+                    self._extracted_urls.add(reference["url"])
+                if (
+                    not reference["retracted"]
+                    and reference["evidence_quality"] in EXTRACT_TARGET_QUALITY
+                ):
+                    self.qualified += 1
+            if self.qualified >= self.target and not self.done:
+                self.stopped_early = True
+                self._queue.clear()
+
+    @staticmethod
+    def _source_keys(reference: dict[str, Any]) -> set[str]:
+        keys = {f"url:{reference['url']}"} if reference["url"] else set()
+        if reference["doi"]:
+            keys.add(f"doi:{reference['doi'].lower()}")
+        if reference["pmid"]:
+            keys.add(f"pmid:{reference['pmid']}")
+        return keys
+
+    def finish(self) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Flush remaining candidates, wait for every batch, and return the results.
+
+        Returns:
+            ``(extracted_sources, payloads)`` in completion order.
+        """
+        with self._condition:
+            self._flushing = True
+            self._pump()
+            while self._in_flight:
+                self._condition.wait()
+        self._executor.shutdown(wait=True)
+        return self.sources, self.payloads
+
+    def _pump(self) -> None:
+        """Dispatch batches while slots, budget, and candidates allow. Hold the lock."""
+        while (
+            not self.done
+            and self._queue
+            and self._in_flight < self._max_concurrency
+        ):
+            size = min(self.batch_size, self.limit - self.dispatched)
+            if len(self._queue) < size and not self._flushing:
+                return
+            urls = [heapq.heappop(self._queue)[2] for _ in range(min(size, len(self._queue)))]
+            self.dispatched += len(urls)
+            self._in_flight += 1
+            self._executor.submit(self._run, urls)
+
+    def _run(self, urls: list[str]) -> None:
+        try:
+            payload, entry, sources = self.run_batch(urls)
+        except Exception as exc:  # keep the pipeline draining on unexpected errors
+            payload, sources = None, []
+            entry = {
+                "capability": "extract",
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "urls": urls,
+                "status": "error",
+                "error": str(exc),
+            }
+        with self._condition:
+            self.ledger.append(entry)
+            if payload is not None:
+                self.payloads.append(payload)
+            for source in sources:
+                url = source.get("url")
+                if url and url in self._extracted_urls:
+                    continue
+                if url:
+                    self._extracted_urls.add(url)
+                self.sources.append(source)
+                reference = normalize_reference(source, len(self.sources))
+                if (
+                    not reference["retracted"]
+                    and reference["evidence_quality"] in EXTRACT_TARGET_QUALITY
+                ):
+                    self.qualified += 1
+            if self.qualified >= self.target and not self.done:
+                self.stopped_early = True
+                self._queue.clear()
+            self._in_flight -= 1
+            self._pump()
+            self._condition.notify_all()
+
+
 class ResearchLookup:
     """Research lookup with Parallel Search as the stable default backend."""
 
@@ -152,6 +437,7 @@ class ResearchLookup:
         after_date: str | None = None,
         extract_limit: int | None = None,
         extract_batch_size: int = DEFAULT_EXTRACT_BATCH_SIZE,
+        extract_concurrency: int = DEFAULT_EXTRACT_CONCURRENCY,
         processor: str = "pro-fast",
         chat_model: str = "core",
         previous_interaction_id: str | None = None,
@@ -159,11 +445,31 @@ class ResearchLookup:
         manuscript_context: dict[str, Any] | None = None,
         cli_timeout: int = 300,
         research_timeout: int = 3600,
+        rate_limits: dict[str, float] | None = None,
+        cache: LookupCache | None = None,
+        refresh_cache: bool = False,
+        transport: str = "auto",
+        evidence_index: EvidenceIndex | None = None,
+        index_project: str | None = None,
     ):
         """Initialize routing and retrieval options.
 
         ``parallel`` remains a compatibility alias for the explicit ``research``
-        backend. A bare query always selects ``search``.
+        backend. A bare query always selects ``search``. Academic searches
+        extract up to ``extract_limit`` candidates, ``extract_concurrency``
+        batches at a time, while later search passes run. ``rate_limits``
+        overrides ``DEFAULT_RATE_LIMITS`` per backend (requests per second).
+        With a ``cache``, successful results are reused until the backend's TTL
+        expires; ``refresh_cache`` skips reads but still stores fresh results.
+        ``transport`` picks how Search and Extract reach Parallel: ``"http"``
+        uses one pooled keep-alive session (requires ``PARALLEL_API_KEY``),
+        ``"cli"`` runs ``parallel-cli`` per call, and ``"auto"`` uses HTTP when
+        a key is set. Calls HTTP cannot serve always fall back to the CLI.
+        With an ``evidence_index``, Search lookups start from matching
+        references in saved packets (only ``index_project``'s when given): an
+        academic facet they already cover is not searched again, extracted hits
+        are not extracted again, and a lookup they fully cover makes no
+        network call.
         """
         backend_aliases = {"parallel": "research"}
         normalized_backend = backend_aliases.get(force_backend or "", force_backend)
@@ -186,6 +492,10 @@ class ResearchLookup:
             raise ValueError("max_results must be at least 1")
         if extract_batch_size < 1:
             raise ValueError("extract_batch_size must be at least 1")
+        if extract_concurrency < 1:
+            raise ValueError("extract_concurrency must be at least 1")
+        if transport not in {"auto", "http", "cli"}:
+            raise ValueError("transport must be one of: auto, http, cli")
 
         self.force_backend = normalized_backend
         self.requested_backend = force_backend
@@ -199,6 +509,7 @@ class ResearchLookup:
             target_references if extract_limit is None else max(0, extract_limit)
         )
         self.extract_batch_size = extract_batch_size
+        self.extract_concurrency = extract_concurrency
         self.processor = processor
         self.chat_model = chat_model
         self.previous_interaction_id = previous_interaction_id
@@ -206,12 +517,38 @@ class ResearchLookup:
         self.manuscript_context = manuscript_context or {}
         self.cli_timeout = cli_timeout
         self.research_timeout = research_timeout
+        self.cache = cache
+        self.refresh_cache = refresh_cache
+        self.evidence_index = evidence_index
+        self.index_project = index_project
+        self.rate_limiters = {
+            backend: TokenBucket(rate, service=RATE_LIMIT_SERVICES.get(backend))
+            for backend, rate in {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}.items()
+        }
 
-        self.parallel_available = shutil.which("parallel-cli") is not None
-        self.chat_available = bool(os.getenv("PARALLEL_API_KEY"))
+        self.transport = transport
+        self.http_client: ParallelHTTPClient | None = None
+        self._chat_session: Any = None
+        self._chat_session_lock = threading.Lock()
+        api_key = os.getenv("PARALLEL_API_KEY")
+        if transport == "http" and not api_key:
+            raise ValueError("PARALLEL_API_KEY is required for the HTTP transport.")
+        if transport != "cli" and api_key:
+            try:
+                self.http_client = ParallelHTTPClient(api_key)
+            except ImportError:
+                if transport == "http":
+                    raise
+
+        self.cli_available = shutil.which("parallel-cli") is not None
+        self.parallel_available = self.cli_available or self.http_client is not None
+        self.chat_available = bool(api_key)
         self.perplexity_available = bool(os.getenv("OPENROUTER_API_KEY"))
 
-        if self.force_backend in {"search", "research"} and not self.parallel_available:
+        if (
+            self.force_backend == "search" and not self.parallel_available
+            or self.force_backend == "research" and not self.cli_available
+        ):
             raise ValueError(
                 "parallel-cli is required for the selected Parallel backend. "
                 "Install the pinned CLI version documented in SKILL.md."
@@ -264,11 +601,44 @@ class ResearchLookup:
             return query
         return f"{query}\n\nManuscript context:\n" + "\n".join(context_lines)
 
+    def _api_session(self) -> Any:
+        """Return the keep-alive session shared by the Chat and Perplexity backends."""
+        with self._chat_session_lock:
+            if self._chat_session is None:
+                from polite_http import pooled_session
+
+                self._chat_session = pooled_session(DEFAULT_POOL_SIZE)
+            return self._chat_session
+
+    def _throttle(self, backend: str) -> None:
+        """Take one request token for ``backend``, waiting if its budget is spent."""
+        limiter = self.rate_limiters.get(backend)
+        if limiter is not None:
+            limiter.acquire()
+
     def _run_parallel_cli(
         self, args: list[str], *, timeout: int | None = None
     ) -> dict[str, Any]:
-        """Run the pinned CLI without shell interpolation and parse JSON."""
+        """Run a Parallel call over HTTP when possible, else through the pinned CLI.
+
+        Arguments are passed without shell interpolation and the JSON output
+        is parsed. If the API rejects a translated request, HTTP is switched
+        off for the rest of the session so every later call uses the CLI.
+        """
         command = ["parallel-cli", *args]
+        self._throttle(args[0])
+        client = self.http_client
+        if client is not None:
+            try:
+                return client.call(args, timeout=timeout or self.cli_timeout)
+            except RequestRejected as exc:
+                self.http_client = None
+                print(
+                    f"[Research] HTTP transport disabled, using parallel-cli: {exc}",
+                    file=sys.stderr,
+                )
+            except UnsupportedCommand:
+                pass
         try:
             completed = subprocess.run(
                 command,
@@ -367,84 +737,73 @@ class ResearchLookup:
         }
         return payload, ledger, results
 
-    def _rank_sources_for_extraction(
-        self, sources: list[dict[str, Any]]
-    ) -> list[dict[str, Any]]:
-        ranked: list[tuple[tuple[int, int, int, int], dict[str, Any]]] = []
-        for index, source in enumerate(sources, start=1):
-            reference = normalize_reference(source, index)
-            ranked.append((reference_score(reference), source))
-        ranked.sort(key=lambda item: item[0], reverse=True)
-        return [source for _, source in ranked]
-
-    def _extract_sources(
-        self, sources: list[dict[str, Any]], search_ledger: list[dict[str, Any]]
-    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
-        if self.extract_limit == 0:
-            return sources, []
-        candidates = [
-            source
-            for source in self._rank_sources_for_extraction(sources)
-            if source.get("url")
-        ][: self.extract_limit]
-        extraction_payloads: list[dict[str, Any]] = []
+    def _run_extract_batch(
+        self, urls: list[str]
+    ) -> tuple[dict[str, Any] | None, dict[str, Any], list[dict[str, Any]]]:
+        """Extract one batch of URLs; return the payload, ledger entry, and sources."""
+        args = [
+            "extract",
+            *urls,
+            "--objective",
+            EXTRACT_OBJECTIVE,
+            "--excerpt-max-chars-per-result",
+            "6000",
+            "--excerpt-max-chars-total",
+            str(max(12000, len(urls) * 6000)),
+            "--json",
+        ]
+        timestamp = datetime.now(timezone.utc).isoformat()
+        try:
+            payload = self._run_parallel_cli(args)
+        except RuntimeError as exc:
+            entry = {
+                "capability": "extract",
+                "timestamp": timestamp,
+                "urls": urls,
+                "status": "error",
+                "error": str(exc),
+            }
+            return None, entry, []
+        batch_results = payload.get("results") or []
         extracted_sources: list[dict[str, Any]] = []
-        objective = (
-            "Extract only source-supported bibliographic and study evidence: authors, "
-            "year, journal or venue, DOI/PMID, publication type, study design, population "
-            "or system, sample size, methods, intervention/exposure, comparator, outcomes, "
-            "quantitative findings, uncertainty, limitations, correction/retraction status, "
-            "and conclusions. Preserve exact wording for evidence excerpts."
-        )
-        for offset in range(0, len(candidates), self.extract_batch_size):
-            batch = candidates[offset : offset + self.extract_batch_size]
-            urls = [str(source["url"]) for source in batch]
-            args = [
-                "extract",
-                *urls,
-                "--objective",
-                objective,
-                "--excerpt-max-chars-per-result",
-                "6000",
-                "--excerpt-max-chars-total",
-                str(max(12000, len(urls) * 6000)),
-                "--json",
-            ]
-            timestamp = datetime.now(timezone.utc).isoformat()
-            try:
-                payload = self._run_parallel_cli(args)
-            except RuntimeError as exc:
-                search_ledger.append(
-                    {
-                        "capability": "extract",
-                        "timestamp": timestamp,
-                        "urls": urls,
-                        "status": "error",
-                        "error": str(exc),
-                    }
-                )
-                continue
-            extraction_payloads.append(payload)
-            batch_results = payload.get("results") or []
-            for raw_result in batch_results:
-                source = dict(raw_result)
-                source["url"] = canonicalize_url(str(source.get("url") or ""))
-                source["extracted"] = True
-                source["facets"] = ["extracted-evidence"]
-                extracted_sources.append(source)
-            search_ledger.append(
-                {
-                    "capability": "extract",
-                    "timestamp": timestamp,
-                    "urls": urls,
-                    "result_count": len(batch_results),
-                    "extract_id": payload.get("extract_id"),
-                    "session_id": payload.get("session_id"),
-                    "status": payload.get("status"),
-                    "errors": payload.get("errors") or [],
-                }
+        for raw_result in batch_results:
+            source = dict(raw_result)
+            source["url"] = canonicalize_url(str(source.get("url") or ""))
+            source["extracted"] = True
+            source["facets"] = ["extracted-evidence"]
+            extracted_sources.append(source)
+        entry = {
+            "capability": "extract",
+            "timestamp": timestamp,
+            "urls": urls,
+            "result_count": len(batch_results),
+            "extract_id": payload.get("extract_id"),
+            "session_id": payload.get("session_id"),
+            "status": payload.get("status"),
+            "errors": payload.get("errors") or [],
+        }
+        return payload, entry, extracted_sources
+
+    def _local_sources(self, query: str, limit: int) -> list[dict[str, Any]]:
+        """Return usable sources from the evidence index, best first."""
+        if self.evidence_index is None:
+            return []
+        try:
+            hits = self.evidence_index.search(query, project=self.index_project, limit=limit)
+        except sqlite3.Error as exc:
+            print(f"[Research] Evidence index unavailable: {exc}", file=sys.stderr)
+            return []
+        sources = [
+            source_from_reference(hit["reference"])
+            for hit in hits
+            if not hit["reference"].get("retracted")
+        ]
+        if sources:
+            print(
+                f"[Research] Evidence index: {len(sources)} local reference(s)",
+                file=sys.stderr,
             )
-        return deduplicate_sources([*sources, *extracted_sources]), extraction_payloads
+        return sources
 
     def _parallel_search(self, query: str) -> dict[str, Any]:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -452,13 +811,44 @@ class ResearchLookup:
         contextual_query = self._query_with_context(query)
         search_payloads: list[dict[str, Any]] = []
         ledger: list[dict[str, Any]] = []
-        sources: list[dict[str, Any]] = []
+        local_sources = self._local_sources(
+            query, self.target_references if academic else self.max_results
+        )
+        sources: list[dict[str, Any]] = list(local_sources)
         session_id: str | None = None
         errors: list[str] = []
+        pipeline: ExtractionPipeline | None = None
+        if academic and self.extract_limit:
+            pipeline = ExtractionPipeline(
+                self._run_extract_batch,
+                ledger,
+                limit=self.extract_limit,
+                target=self.target_references,
+                batch_size=self.extract_batch_size,
+                max_concurrency=self.extract_concurrency,
+            )
+            pipeline.seed([source for source in local_sources if source["extracted"]])
+            pipeline.offer([source for source in local_sources if not source["extracted"]])
+        if local_sources:
+            ledger.append(
+                {
+                    "capability": "local-index",
+                    "project": self.index_project,
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "result_count": len(local_sources),
+                }
+            )
+        facets_covered: list[str] = []
 
         if academic:
             mode = "advanced"
             for facet, instruction, keywords in ACADEMIC_FACETS:
+                if (
+                    sum(1 for source in local_sources if facet in source["facets"])
+                    >= self.max_results
+                ):
+                    facets_covered.append(facet)
+                    continue
                 objective = f"{instruction}\n\nTopic: {contextual_query}"
                 keyword_queries = tuple(f"{query} {keyword}" for keyword in keywords)
                 try:
@@ -488,6 +878,8 @@ class ResearchLookup:
                 ledger.append(entry)
                 sources.extend(facet_sources)
                 session_id = session_id or payload.get("session_id")
+                if pipeline is not None:
+                    pipeline.offer(facet_sources)
 
             if len(deduplicate_sources(sources)) < self.target_references:
                 objective = (
@@ -508,6 +900,8 @@ class ResearchLookup:
                     search_payloads.append(payload)
                     ledger.append(entry)
                     sources.extend(general_sources)
+                    if pipeline is not None:
+                        pipeline.offer(general_sources)
                 except RuntimeError as exc:
                     errors.append(f"general-companion: {exc}")
                     ledger.append(
@@ -520,12 +914,12 @@ class ResearchLookup:
                             "error": str(exc),
                         }
                     )
-        else:
+        elif len(local_sources) < self.max_results:
             objective = (
                 "Find current, authoritative, directly relevant information for this "
                 f"research question:\n\n{contextual_query}"
             )
-            payload, entry, sources = self._search_once(
+            payload, entry, general_sources = self._search_once(
                 objective=objective,
                 keyword_queries=(query,),
                 facet="general",
@@ -534,16 +928,19 @@ class ResearchLookup:
             )
             search_payloads.append(payload)
             ledger.append(entry)
+            sources.extend(general_sources)
+        else:
+            facets_covered.append("general")
 
+        extraction_payloads: list[dict[str, Any]] = []
+        if pipeline is not None:
+            extracted_sources, extraction_payloads = pipeline.finish()
+            sources.extend(extracted_sources)
         sources = deduplicate_sources(sources)
         if not sources:
             detail = "; ".join(errors) if errors else "No results returned."
             raise RuntimeError(f"Parallel Search produced no usable sources. {detail}")
 
-        extraction_payloads: list[dict[str, Any]] = []
-        if academic:
-            sources, extraction_payloads = self._extract_sources(sources, ledger)
-
         packet = build_manuscript_packet(
             query=query,
             sources=sources,
@@ -559,6 +956,20 @@ class ResearchLookup:
             packet["warnings"].append(
                 "Some bounded search passes failed: " + "; ".join(errors)
             )
+        if self.evidence_index is not None:
+            packet["local_index"] = {
+                "project": self.index_project,
+                "references_reused": len(local_sources),
+                "searches_skipped": facets_covered,
+            }
+        if pipeline is not None:
+            packet["extraction"] = {
+                "urls_dispatched": pipeline.dispatched,
+                "sources_extracted": len(pipeline.sources),
+                "target_quality_sources": pipeline.qualified,
+                "stopped_early": pipeline.stopped_early,
+                "concurrency": self.extract_concurrency,
+            }
         response = packet_markdown(packet)
         references = packet["references"]
         citations = [
@@ -711,12 +1122,13 @@ class ResearchLookup:
                 "PARALLEL_API_KEY is required for the explicit Chat backend."
             )
         try:
-            import requests
+            from polite_http import send
         except ImportError as exc:
             raise ImportError(
                 "The optional Parallel Chat backend requires requests."
             ) from exc
 
+        self._throttle("chat")
         payload = {
             "model": self.chat_model,
             "messages": [
@@ -725,8 +1137,11 @@ class ResearchLookup:
             ],
             "stream": False,
         }
-        response = requests.post(
-            "https://api.parallel.ai/chat/completions",
+        api_base = os.getenv("PARALLEL_API_BASE") or DEFAULT_API_BASE
+        response = send(
+            self._api_session(),
+            "POST",
+            f"{api_base.rstrip('/')}{CHAT_PATH}",
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json",
@@ -765,7 +1180,7 @@ class ResearchLookup:
         if not api_key:
             raise RuntimeError("OPENROUTER_API_KEY is not set.")
         try:
-            import requests
+            from polite_http import send
         except ImportError as exc:
             raise ImportError(
                 "The optional Perplexity backend requires requests."
@@ -797,8 +1212,12 @@ class ResearchLookup:
             "search_mode": "academic",
             "search_context_size": "high",
         }
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
+        self._throttle("perplexity")
+        api_base = os.getenv("OPENROUTER_API_BASE") or OPENROUTER_API_BASE
+        response = send(
+            self._api_session(),
+            "POST",
+            f"{api_base.rstrip('/')}{CHAT_PATH}",
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json",
@@ -918,9 +1337,67 @@ class ResearchLookup:
             "model": "unknown",
         }
 
+    def _cache_key(self, backend: str, query: str) -> str:
+        """Key a lookup by every option that can change its result."""
+        options: dict[str, Any] = {"context": self.manuscript_context}
+        if backend == "search":
+            options.update(
+                academic=self._is_academic_query(query),
+                search_mode=self.search_mode,
+                max_results=self.max_results,
+                target_references=self.target_references,
+                extract_limit=self.extract_limit,
+            )
+        elif backend == "research":
+            options.update(
+                processor=self.processor,
+                previous_interaction_id=self.previous_interaction_id,
+            )
+        elif backend == "chat":
+            options["model"] = self.chat_model
+        return cache_key(
+            backend,
+            query,
+            include_domains=self.include_domains,
+            after_date=self.after_date,
+            options=options,
+        )
+
     def lookup(self, query: str) -> dict[str, Any]:
         """Perform one lookup while isolating errors in the result envelope."""
         backend = self._select_backend(query)
+        if self.cache is None:
+            return self._lookup_uncached(query, backend)
+
+        key = self._cache_key(backend, query)
+        if self.refresh_cache:
+            self.cache.record(hit=False)
+            cached = None
+        else:
+            try:
+                cached = self.cache.get(key, backend)
+            except sqlite3.Error as exc:
+                print(f"[Research] Cache unavailable: {exc}", file=sys.stderr)
+                cached = None
+        if cached is not None:
+            result, age = cached
+            print(
+                f"[Research] Cache hit ({age / 3600:.1f}h old) | Query: {query[:80]}...",
+                file=sys.stderr,
+            )
+            result["cache"] = {"status": "hit", "age_seconds": round(age), **self.cache.stats()}
+            return result
+        result = self._lookup_uncached(query, backend)
+        if result.get("success") and not result.get("fallback_from"):
+            try:
+                self.cache.put(key, backend, result)
+            except sqlite3.Error as exc:
+                print(f"[Research] Could not cache result: {exc}", file=sys.stderr)
+        status = "refresh" if self.refresh_cache else "miss"
+        result["cache"] = {"status": status, **self.cache.stats()}
+        return result
+
+    def _lookup_uncached(self, query: str, backend: str) -> dict[str, Any]:
         print(
             f"[Research] Backend: {backend} | Query: {query[:80]}...",
             file=sys.stderr,
@@ -959,21 +1436,74 @@ class ResearchLookup:
             return self._failure_result(query, backend, exc)
 
     def batch_lookup(
-        self, queries: list[str], delay: float = 1.0
+        self,
+        queries: list[str],
+        delay: float = 1.0,
+        *,
+        max_workers: int = 1,
+        on_result: Callable[[int, dict[str, Any]], None] | None = None,
     ) -> list[dict[str, Any]]:
-        """Perform multiple lookups with preserved per-query error isolation."""
-        results: list[dict[str, Any]] = []
-        for index, query in enumerate(queries):
-            if index and delay > 0:
-                time.sleep(delay)
-            result = self.lookup(query)
-            results.append(result)
-            print(
-                f"[Research] Completed query {index + 1}/{len(queries)}: "
-                f"{query[:50]}...",
-                file=sys.stderr,
-            )
-        return results
+        """Perform multiple lookups with preserved per-query error isolation.
+
+        With ``max_workers`` of 1, queries run in order with ``delay`` seconds
+        between them. With more workers they run concurrently and ``delay`` is
+        ignored: the per-backend token buckets pace the underlying requests.
+        Results are always returned in query order; ``on_result(index, result)``
+        is called once per query as soon as it completes, one call at a time.
+        An exception from ``on_result`` is reported and the batch continues.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        results: list[dict[str, Any] | None] = [None] * len(queries)
+        report_lock = threading.Lock()
+        completed = 0
+
+        def finish(index: int, result: dict[str, Any]) -> None:
+            nonlocal completed
+            with report_lock:
+                results[index] = result
+                completed += 1
+                print(
+                    f"[Research] Completed query {completed}/{len(queries)}: "
+                    f"{queries[index][:50]}...",
+                    file=sys.stderr,
+                )
+                if on_result is not None:
+                    # A failing callback (say, a packet that cannot be saved)
+                    # must not abort the other queries.
+                    try:
+                        on_result(index, result)
+                    except Exception as exc:
+                        print(
+                            f"[Research] Could not handle result of query {index + 1}: {exc}",
+                            file=sys.stderr,
+                        )
+
+        if max_workers == 1:
+            for index, query in enumerate(queries):
+                if index and delay > 0:
+                    time.sleep(delay)
+                finish(index, self.lookup(query))
+            return [result for result in results if result is not None]
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(queries) or 1),
+            thread_name_prefix="research-lookup",
+        ) as pool:
+            futures = {
+                pool.submit(self.lookup, query): index
+                for index, query in enumerate(queries)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    result = self._failure_result(
+                        queries[index], self.force_backend or "unknown", exc
+                    )
+                finish(index, result)
+        return [result for result in results if result is not None]
 
 
 def _load_context(path: str | None) -> dict[str, Any]:
@@ -992,6 +1522,38 @@ def _split_domains(values: list[str] | None) -> list[str]:
     return list(dict.fromkeys(domains))
 
 
+def _parse_rate_limits(values: list[str] | None) -> dict[str, float]:
+    limits: dict[str, float] = {}
+    for value in values or []:
+        backend, separator, rate = value.partition("=")
+        backend = backend.strip()
+        if not separator or backend not in DEFAULT_RATE_LIMITS:
+            raise ValueError(
+                f"--rate-limit expects BACKEND=RATE with BACKEND one of: "
+                f"{', '.join(DEFAULT_RATE_LIMITS)}"
+            )
+        try:
+            limits[backend] = float(rate)
+        except ValueError as exc:
+            raise ValueError(f"Invalid rate in --rate-limit {value!r}") from exc
+    return limits
+
+
+def _update_saved_packet(path: Path, packet: dict[str, Any]) -> dict[str, Any]:
+    """Merge a fresh lookup packet into the packet saved at ``path``."""
+    existing = json.loads(path.read_text(encoding="utf-8"))
+    updated = update_manuscript_packet(
+        existing, packet["sources"], search_ledger=packet["search_ledger"]
+    )
+    previous_raw = existing.get("raw_service_responses") or {}
+    new_raw = packet.get("raw_service_responses") or {}
+    updated["raw_service_responses"] = {
+        service: [*(previous_raw.get(service) or []), *(new_raw.get(service) or [])]
+        for service in dict.fromkeys([*previous_raw, *new_raw])
+    }
+    return updated
+
+
 def _slug(text: str) -> str:
     return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:60] or "research"
 
@@ -1097,6 +1659,25 @@ Examples:
         type=int,
         help="Maximum academic sources to verify with Extract (default: target)",
     )
+    parser.add_argument(
+        "--extract-concurrency",
+        type=int,
+        default=DEFAULT_EXTRACT_CONCURRENCY,
+        help=(
+            "Extract batches run at once while searches continue "
+            f"(default: {DEFAULT_EXTRACT_CONCURRENCY})"
+        ),
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["auto", "http", "cli"],
+        default="auto",
+        help=(
+            "How Search and Extract reach Parallel: pooled keep-alive HTTP "
+            "(needs PARALLEL_API_KEY), one parallel-cli process per call, or "
+            "HTTP when a key is set (default: auto)"
+        ),
+    )
     parser.add_argument(
         "--no-extract",
         action="store_true",
@@ -1130,11 +1711,70 @@ Examples:
         "--packet-dir",
         help="Write manuscript packet artifacts to this directory",
     )
+    parser.add_argument(
+        "--update-packet",
+        action="store_true",
+        help="Merge new sources into the packet already in --packet-dir instead of replacing it",
+    )
     parser.add_argument(
         "--batch-delay",
         type=float,
         default=1.0,
-        help="Delay between batch queries in seconds",
+        help="Delay between sequential batch queries in seconds",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help=(
+            "Batch queries to run at once (default: 1). Above 1, --batch-delay is "
+            "ignored and per-backend rate limits pace requests instead"
+        ),
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        metavar="BACKEND=RATE",
+        help=(
+            "Requests per second for search, extract, research, chat, or "
+            "perplexity; may be repeated, 0 disables the limit"
+        ),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print each result as soon as it completes (JSON lines with --json)",
+    )
+    parser.add_argument(
+        "--jsonl",
+        help="Append each result to this JSON Lines file as soon as it completes",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the on-disk lookup cache",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached results but store the fresh ones",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Lookup cache directory (default: $XDG_CACHE_HOME/scientific-writer/research-lookup)",
+    )
+    parser.add_argument(
+        "--evidence-index",
+        help="Local evidence index file (default: evidence.sqlite3 in the cache directory)",
+    )
+    parser.add_argument(
+        "--no-evidence-index",
+        action="store_true",
+        help="Neither reuse nor index evidence from saved packets",
+    )
+    parser.add_argument(
+        "--index-project",
+        help="Only reuse local evidence from this project's packets",
     )
     parser.add_argument("-o", "--output", help="Write primary output to a file")
     parser.add_argument("--json", action="store_true", help="Output result JSON")
@@ -1147,8 +1787,33 @@ def main() -> int:
     if not args.query and not args.batch:
         parser.print_help()
         return 1
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.update_packet and not args.packet_dir:
+        parser.error("--update-packet requires --packet-dir")
     try:
         context = _load_context(args.context_file)
+        # The evidence index and the cache only save time, so an unwritable
+        # directory, a corrupt database or an SQLite build without FTS5
+        # downgrades to plain lookups instead of failing the run.
+        evidence_index = None
+        if not args.no_evidence_index:
+            try:
+                evidence_index = EvidenceIndex(args.evidence_index)
+            except (OSError, sqlite3.Error) as exc:
+                print(
+                    f"[Research] Evidence index unavailable, continuing without it: {exc}",
+                    file=sys.stderr,
+                )
+        cache = None
+        if not args.no_cache:
+            try:
+                cache = LookupCache(args.cache_dir)
+            except (OSError, sqlite3.Error) as exc:
+                print(
+                    f"[Research] Cache unavailable, continuing without it: {exc}",
+                    file=sys.stderr,
+                )
         research = ResearchLookup(
             force_backend=args.force_backend,
             academic=args.academic,
@@ -1158,11 +1823,18 @@ def main() -> int:
             include_domains=_split_domains(args.include_domains),
             after_date=args.after_date,
             extract_limit=0 if args.no_extract else args.extract_limit,
+            extract_concurrency=args.extract_concurrency,
             processor=args.processor,
             chat_model=args.chat_model,
             previous_interaction_id=args.previous_interaction_id,
             allow_perplexity_fallback=args.fallback_perplexity,
             manuscript_context=context,
+            rate_limits=_parse_rate_limits(args.rate_limit),
+            cache=cache,
+            refresh_cache=args.refresh,
+            transport=args.transport,
+            evidence_index=evidence_index,
+            index_project=args.index_project,
         )
     except Exception as exc:
         print(f"Error: {exc}", file=sys.stderr)
@@ -1170,17 +1842,64 @@ def main() -> int:
 
     queries = args.batch or [args.query]
     print(f"Running research for {len(queries)} query(s)...", file=sys.stderr)
-    results = research.batch_lookup(queries, delay=args.batch_delay)
 
-    if args.packet_dir:
-        for index, result in enumerate(results):
-            packet = result.get("packet")
-            if not packet:
-                continue
+    jsonl_handle = None
+    if args.jsonl:
+        jsonl_path = Path(args.jsonl)
+        jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+        jsonl_handle = jsonl_path.open("a", encoding="utf-8")
+
+    def handle_result(index: int, result: dict[str, Any]) -> None:
+        packet = result.get("packet")
+        if args.packet_dir and packet:
             destination = Path(args.packet_dir)
-            if len(results) > 1:
+            if len(queries) > 1:
                 destination = destination / f"{index + 1:02d}-{_slug(result['query'])}"
-            result["artifacts"] = save_packet(packet, destination)
+            existing_path = destination / "packet.json"
+            if args.update_packet and existing_path.exists():
+                try:
+                    packet = _update_saved_packet(existing_path, packet)
+                except (OSError, ValueError) as exc:
+                    print(
+                        f"[Research] Not updating {existing_path}: {exc}",
+                        file=sys.stderr,
+                    )
+                    packet = None
+                else:
+                    result["packet"] = packet
+                    result["response"] = packet_markdown(packet)
+            if packet is not None:
+                result["artifacts"] = save_packet(packet, destination)
+                if evidence_index is not None:
+                    try:
+                        evidence_index.add_packet(destination, project=args.index_project)
+                    except (OSError, ValueError, sqlite3.Error) as exc:
+                        print(f"[Research] Could not index packet: {exc}", file=sys.stderr)
+        if jsonl_handle is not None:
+            jsonl_handle.write(
+                json.dumps({"index": index + 1, **result}, ensure_ascii=False, default=str)
+                + "\n"
+            )
+            jsonl_handle.flush()
+        if args.stream:
+            if args.json:
+                print(
+                    json.dumps({"index": index + 1, **result}, ensure_ascii=False, default=str),
+                    flush=True,
+                )
+            else:
+                print(_render_human_result(result, index + 1), flush=True)
+
+    try:
+        results = research.batch_lookup(
+            queries,
+            delay=args.batch_delay,
+            max_workers=args.concurrency,
+            on_result=handle_result,
+        )
+    finally:
+        if jsonl_handle is not None:
+            jsonl_handle.close()
 
     if args.json:
         rendered = json.dumps(results, indent=2, ensure_ascii=False, default=str) + "\n"
@@ -1195,7 +1914,7 @@ def main() -> int:
         output_path = Path(args.output)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         output_path.write_text(rendered, encoding="utf-8")
-    else:
+    elif not args.stream:
         print(rendered, end="")
     return 0 if all(result.get("success") for result in results) else 1
 
@@ -0,0 +1,413 @@
+"""Pooled, rate-limited HTTP helpers shared by the skill scripts.
+
+Metadata and model APIs (CrossRef, doi.org, NCBI E-utilities, arXiv, Parallel,
+OpenRouter) ask clients to stay under a request rate and to back off when told
+to. ``RateLimiter`` is a thread-safe token bucket shared by every worker of one
+script; given a ``service`` name it also draws from ``SharedBuckets``, one
+SQLite-backed bucket per service that every skill process on the machine
+consults, so concurrent runs together stay under the service's limit. ``send``
+retries throttled and transient failures while honoring
+``Retry-After``, ``pooled_session`` keeps keep-alive connections open for the
+worker pool and can cap the requests in flight per host, and
+``ConditionalCache`` revalidates stored GET responses with ``ETag`` and
+``Last-Modified`` so unchanged resources are not downloaded again.
+
+Skills are installed independently, so each skill that needs this module ships
+an identical copy in its ``scripts/`` directory. Edit them together.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import email.utils
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Mapping
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# A read timeout on these may mean the server is still acting on the request
+# (and billing for it), so they are not re-sent after one.
+NON_IDEMPOTENT_METHODS = frozenset({"POST", "PATCH"})
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+# Upper bound on any single wait, so a bad Retry-After cannot stall a batch.
+MAX_RETRY_AFTER = 120.0
+# Response headers kept with a cached body.
+_CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+# Path of the machine-wide rate-limit store, or "off" for per-process limits only.
+RATE_DB_ENV = "SCIENTIFIC_WRITER_RATE_DB"
+
+
+class SharedBuckets:
+    """Per-service token buckets in one SQLite file, shared across processes.
+
+    Each ``take`` is a short ``BEGIN IMMEDIATE`` transaction, so processes and
+    threads serialize on the file lock and never hand out more tokens than the
+    service's rate allows. Buckets use wall-clock time, which every process
+    agrees on. ``pause`` holds a service for every process, so one throttled
+    response backs off all of them.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " service TEXT PRIMARY KEY, tokens REAL NOT NULL,"
+            " updated REAL NOT NULL, not_before REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        # SQLite connections must stay on the thread that opened them.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextlib.contextmanager
+    def _bucket(self, service: str, burst: float):
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated, not_before FROM buckets WHERE service = ?", (service,)
+            ).fetchone()
+            state = list(row) if row else [float(burst), time.time(), 0.0]
+            yield state
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)", (service, *state)
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def take(self, service: str, rate: float, burst: float = 1) -> float:
+        """Take one token for ``service``; return 0 if granted, else seconds to wait."""
+        with self._bucket(service, burst) as state:
+            tokens, updated, not_before = state
+            now = time.time()
+            if now < not_before:
+                return not_before - now
+            tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+            if tokens >= 1:
+                state[:2] = [tokens - 1, now]
+                return 0.0
+            state[:2] = [tokens, now]
+            return (1 - tokens) / rate
+
+    def pause(self, service: str, seconds: float) -> None:
+        """Hold ``service`` for ``seconds`` from now, in every process."""
+        with self._bucket(service, 1) as state:
+            state[2] = max(state[2], time.time() + seconds)
+
+
+_shared_buckets: dict[Path, SharedBuckets] = {}
+_shared_buckets_lock = threading.Lock()
+
+
+def shared_buckets() -> SharedBuckets | None:
+    """Return the machine-wide bucket store, or None when it is off or unusable.
+
+    The store lives next to the HTTP cache unless ``SCIENTIFIC_WRITER_RATE_DB``
+    names another file; setting it to ``off`` keeps limits per process.
+    """
+    location = os.getenv(RATE_DB_ENV, "").strip()
+    if location.lower() == "off":
+        return None
+    path = Path(location) if location else default_cache_dir().parent / "rate_limits.sqlite3"
+    with _shared_buckets_lock:
+        if path not in _shared_buckets:
+            try:
+                _shared_buckets[path] = SharedBuckets(path)
+            except (OSError, sqlite3.Error):
+                return None
+        return _shared_buckets[path]
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing ``rate`` requests per second.
+
+    ``burst`` requests may go out back to back after an idle period. A ``rate`` of
+    0 or less disables limiting. ``pause`` holds every caller until a deadline,
+    which is how one throttled response slows down the whole worker pool.
+
+    With a ``service`` name the tokens come from that service's bucket in
+    ``shared_buckets()`` instead, so every process calling the service shares
+    one budget and one pause. If the store is off or fails, the limiter keeps
+    its own bucket.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, service: str | None = None):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.service = service
+        self._shared = shared_buckets() if service else None
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._not_before = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until one request may be sent."""
+        while True:
+            wait: float | None = None
+            with self._lock:
+                now = time.monotonic()
+                shared = self._shared
+                if now < self._not_before:
+                    wait = self._not_before - now
+                elif self.rate <= 0:
+                    return
+                elif shared is not None:
+                    rate = self.rate
+                else:
+                    elapsed = now - self._updated
+                    self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            if wait is None:
+                try:
+                    wait = shared.take(self.service, rate, self.burst)
+                except sqlite3.Error:
+                    self._shared = None
+                    continue
+                if wait <= 0:
+                    return
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold all callers for ``seconds`` from now, in every process if shared."""
+        with self._lock:
+            self._not_before = max(self._not_before, time.monotonic() + seconds)
+            shared = self._shared
+        if shared is not None:
+            with contextlib.suppress(sqlite3.Error):
+                shared.pause(self.service, seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Lower the rate to a server's advertised ``X-Rate-Limit-*`` budget.
+
+        CrossRef reports its pool limits as ``X-Rate-Limit-Limit: 50`` and
+        ``X-Rate-Limit-Interval: 1s``. The limiter never raises its own rate.
+        """
+        limit = headers.get("X-Rate-Limit-Limit")
+        interval = headers.get("X-Rate-Limit-Interval")
+        if not limit or not interval:
+            return
+        match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*(ms|s|m)?\s*", interval)
+        if not match or not limit.strip().isdigit():
+            return
+        seconds = float(match.group(1)) * {"ms": 0.001, "s": 1.0, "m": 60.0}[match.group(2) or "s"]
+        if seconds <= 0:
+            return
+        advertised = int(limit) / seconds
+        with self._lock:
+            if advertised > 0 and (self.rate <= 0 or advertised < self.rate):
+                self.rate = advertised
+
+
+def retry_after_seconds(value: str | None, default: float) -> float:
+    """Parse a ``Retry-After`` header (delta-seconds or HTTP-date), capped."""
+    if value:
+        value = value.strip()
+        if value.isdigit():
+            return min(float(value), MAX_RETRY_AFTER)
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            when = None
+        if when is not None:
+            return min(max(0.0, when.timestamp() - time.time()), MAX_RETRY_AFTER)
+    return min(default, MAX_RETRY_AFTER)
+
+
+def default_cache_dir() -> Path:
+    """Return the HTTP cache directory, honoring ``XDG_CACHE_HOME``."""
+    base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "scientific-writer" / "http"
+
+
+class ConditionalCache:
+    """GET responses on disk, revalidated with ``ETag`` and ``Last-Modified``.
+
+    ``send`` asks the server whether a stored body is still current
+    (``If-None-Match``/``If-Modified-Since``) and serves a 304 answer from disk,
+    so an unchanged resource costs a round trip but no download. Only 200
+    responses carrying a validator are stored. Entries are replaced atomically,
+    so threads and processes can share a directory; ``revalidated`` counts the
+    responses served from disk.
+    """
+
+    def __init__(self, directory: str | Path | None = None):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.revalidated = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.http"
+
+    def load(self, key: str) -> tuple[dict[str, Any], bytes] | None:
+        """Return ``(metadata, body)`` stored under ``key``, if any."""
+        try:
+            with open(self._path(key), "rb") as handle:
+                metadata = json.loads(handle.readline())
+                return metadata, handle.read()
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, response: requests.Response) -> None:
+        """Store a 200 response that carries a validator."""
+        headers = {name: response.headers[name] for name in _CACHED_HEADERS if name in response.headers}
+        if response.status_code != 200 or not ("ETag" in headers or "Last-Modified" in headers):
+            return
+        metadata = json.dumps({"url": response.url, "headers": headers}).encode("utf-8")
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as handle:
+                handle.write(metadata + b"\n" + response.content)
+            os.replace(temporary, self._path(key))
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.unlink(temporary)
+
+    @staticmethod
+    def validators(metadata: dict[str, Any]) -> dict[str, str]:
+        """Conditional request headers for a stored entry."""
+        headers = metadata.get("headers", {})
+        conditional = {}
+        if "ETag" in headers:
+            conditional["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+    def replay(self, metadata: dict[str, Any], body: bytes, not_modified: requests.Response) -> requests.Response:
+        """Turn a 304 answer into the stored 200 response."""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(metadata.get("headers", {}))
+        response.url = metadata.get("url") or not_modified.url
+        response.request = not_modified.request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = body
+        with self._lock:
+            self.revalidated += 1
+        return response
+
+
+def send(
+    session: requests.Session,
+    method: str,
+    url: str,
+    *,
+    limiter: RateLimiter | None = None,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    cache: ConditionalCache | None = None,
+    idempotent: bool | None = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """Send a request, retrying 429/5xx responses and connection errors.
+
+    Each attempt waits for ``limiter``. A throttled response's ``Retry-After``
+    pauses the shared limiter, so every worker backs off, not just this one;
+    otherwise attempts back off exponentially with jitter. The last response is
+    returned whatever its status, and the last network error is re-raised.
+    With a ``cache``, non-streamed GETs are revalidated against the stored copy
+    and a 304 answer is returned as the stored 200 response.
+
+    Read timeouts are retried only for ``idempotent`` requests, which by
+    default means methods outside ``NON_IDEMPOTENT_METHODS``. A POST that timed
+    out waiting for its answer may still be running, so it is not sent again.
+    """
+    if idempotent is None:
+        idempotent = method.upper() not in NON_IDEMPOTENT_METHODS
+    # ConnectTimeout is a ConnectionError: the request never reached the server
+    retryable = (requests.ConnectionError, requests.Timeout) if idempotent else (requests.ConnectionError,)
+    key = stored = None
+    if cache is not None and method.upper() == "GET" and not kwargs.get("stream"):
+        headers = CaseInsensitiveDict(session.headers)
+        headers.update(kwargs.get("headers") or {})
+        prepared = requests.Request(method, url, params=kwargs.get("params")).prepare()
+        key = f"{headers.get('Accept', '')} {prepared.url}"
+        stored = cache.load(key)
+        if stored is not None:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), **cache.validators(stored[0])}
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            response = session.request(method, url, **kwargs)
+        except retryable:
+            if attempt >= retries:
+                raise
+            time.sleep(backoff * 2**attempt * random.uniform(0.5, 1.0))
+            attempt += 1
+            continue
+        if limiter is not None:
+            limiter.update_from_headers(response.headers)
+        if response.status_code not in RETRY_STATUSES or attempt >= retries:
+            break
+        wait = retry_after_seconds(
+            response.headers.get("Retry-After"),
+            backoff * 2**attempt * random.uniform(0.5, 1.0),
+        )
+        response.close()
+        if limiter is not None and response.status_code in (429, 503):
+            limiter.pause(wait)
+        else:
+            time.sleep(wait)
+        attempt += 1
+    if cache is not None and key is not None:
+        if response.status_code == 304 and stored is not None:
+            return cache.replay(*stored, response)
+        cache.store(key, response)
+    return response
+
+
+def pooled_session(
+    pool_size: int,
+    headers: Mapping[str, str] | None = None,
+    *,
+    per_host: int | None = None,
+) -> requests.Session:
+    """Return a session keeping ``pool_size`` keep-alive connections per host.
+
+    With ``per_host``, at most that many requests to one host are in flight at
+    once, streamed bodies included; further callers wait for a free connection
+    instead of opening another.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=per_host or pool_size,
+        pool_block=per_host is not None,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
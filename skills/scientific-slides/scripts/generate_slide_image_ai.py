@@ -16,7 +16,7 @@ Uses smart iterative refinement:
 
 Requirements:
     - OPENROUTER_API_KEY environment variable
-    - requests library
+    - requests library (and polite_http.py, shipped next to this script)
 
 Usage:
     # Full slide for PDF workflow
@@ -45,6 +45,14 @@ except ImportError:
     print("Error: requests library not found. Install with: pip install requests")
     sys.exit(1)
 
+from polite_http import RateLimiter, pooled_session, send
+
+# Seconds to connect, and to wait for a response: image generation is slow.
+CONNECT_TIMEOUT = 10
+REQUEST_TIMEOUT = 120
+# OpenRouter calls per second, shared with every skill process on the machine.
+OPENROUTER_RATE = 1.0
+
 
 def _resolve_api_key(explicit: Optional[str] = None) -> Optional[str]:
     """Resolve the OpenRouter key from --api-key, the environment, then any .env file.
@@ -188,7 +196,16 @@ STYLE:
         
         self.verbose = verbose
         self._last_error = None
-        self.base_url = "https://openrouter.ai/api/v1"
+        self.base_url = (os.getenv("OPENROUTER_API_BASE") or "https://openrouter.ai/api/v1").rstrip("/")
+        self.limiter = RateLimiter(OPENROUTER_RATE, service="openrouter")
+        # One keep-alive connection for every generation and review call;
+        # throttled and 5xx responses are retried with backoff.
+        self.session = pooled_session(1, {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://github.com/scientific-writer",
+            "X-Title": "Scientific Slide Generator"
+        })
         # Nano Banana Pro for image generation. The slug must be an image-output
         # model; a text-only chat model is rejected with "No endpoints found that
         # support the requested output modalities".
@@ -205,13 +222,6 @@ STYLE:
     def _make_request(self, model: str, messages: List[Dict[str, Any]], 
                      modalities: Optional[List[str]] = None) -> Dict[str, Any]:
         """Make a request to OpenRouter API."""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/scientific-writer",
-            "X-Title": "Scientific Slide Generator"
-        }
-        
         payload = {
             "model": model,
             "messages": messages
@@ -223,11 +233,13 @@ STYLE:
         self._log(f"Making request to {model}...")
         
         try:
-            response = requests.post(
+            response = send(
+                self.session,
+                "POST",
                 f"{self.base_url}/chat/completions",
-                headers=headers,
+                limiter=self.limiter,
                 json=payload,
-                timeout=120
+                timeout=(CONNECT_TIMEOUT, REQUEST_TIMEOUT)
             )
             
             try:
@@ -242,7 +254,7 @@ STYLE:
             
             return response_json
         except requests.exceptions.Timeout:
-            raise RuntimeError("API request timed out after 120 seconds")
+            raise RuntimeError(f"API request timed out after {REQUEST_TIMEOUT} seconds")
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"API request failed: {str(e)}")
     
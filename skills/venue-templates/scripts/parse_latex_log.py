@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Parse LaTeX, BibTeX, and Biber logs into a compact JSON summary.
+
+Reads each log once and reports errors (with file and line), undefined
+references and citations, missing files, and overfull boxes, deduplicated with
+counts. The output is capped at --max-bytes so it can be read instead of the
+raw log during compile-fix loops. Exits 1 when any error was found.
+
+This is a standalone copy of ``scientific_writer.latex_log``; keep them in sync.
+
+Usage:
+    python parse_latex_log.py build/paper.log
+    python parse_latex_log.py build/paper.log build/paper.blg --max-items 10 --max-bytes 4000
+"""
+
+import argparse
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+import re
+import sys
+from typing import Any
+
+DEFAULT_MAX_ITEMS = 20
+DEFAULT_MAX_BYTES = 8000
+# Lengths long strings (messages, paths) are clipped to when dropping records
+# alone cannot meet the size cap.
+CLIP_WIDTHS = (200, 40)
+# TeX hard-wraps log lines at max_print_line, 79 characters by default.
+TEX_WRAP_WIDTH = 79
+CATEGORIES = (
+    "errors",
+    "undefined_references",
+    "undefined_citations",
+    "missing_files",
+    "overfull_boxes",
+)
+
+FILE_LINE_ERROR = re.compile(r"^(?P<file>[^\s:][^:]*\.\w+):(?P<line>\d+): (?P<message>.+)$")
+TEX_ERROR = re.compile(r"^! (?P<message>.+)$")
+CONTEXT_LINE = re.compile(r"^l\.(?P<line>\d+)\b")
+INPUT_LINE = re.compile(r"on input line (?P<line>\d+)")
+UNDEFINED_REFERENCE = re.compile(r"Reference `(?P<key>[^']+)' on page \S+ undefined")
+UNDEFINED_CITATION = re.compile(r"Citation `(?P<key>[^']+)' on page \S+ undefined")
+BIBLATEX_UNDEFINED = re.compile(r"Citation '(?P<key>[^']+)'.*undefined")
+MISSING_FILE = re.compile(
+    r"(?:File `(?P<quoted>[^']+)' not found|^No file (?P<plain>\S+)\.$|"
+    r"I couldn't open (?:database |style |auxiliary )?file (?P<bibtex>\S+)|"
+    r"Cannot find '(?P<biber>[^']+)')"
+)
+OVERFULL = re.compile(
+    r"^(?P<kind>Overfull) \\(?P<box>[hv]box) \((?P<amount>[\d.]+pt) too (?:wide|high)\)"
+    r"(?:.*?lines? (?P<start>\d+)(?:--(?P<end>\d+))?)?"
+)
+BIBTEX_MISSING_ENTRY = re.compile(r"Warning--I didn't find a database entry for \"(?P<key>[^\"]+)\"")
+BIBTEX_LOCATED_ERROR = re.compile(r"^(?P<message>.*?)---line (?P<line>\d+) of file (?P<file>\S+)")
+BIBER_MESSAGE = re.compile(r"^(?:\[\d+\] [^>]*> )?(?P<level>ERROR|WARN) - (?P<message>.+)$")
+BIBER_MISSING_ENTRY = re.compile(r"I didn't find a database entry for '(?P<key>[^']+)'")
+BIBER_LOCATION = re.compile(r"(?P<file>[^\s,:]+\.bib)(?:_\d+\.utf8)?, line (?P<line>\d+)")
+FILE_OPEN = re.compile(r"\(|\)")
+FILE_NAME = re.compile(r"\"?(?P<path>(?:[A-Za-z]:)?[./~]?[^\s()\"]*[/.][^\s()\"]+)")
+
+
+@dataclass
+class LogSummary:
+    """Deduplicated diagnostics from one or more logs.
+
+    Every category maps a dedup key to a record with a ``count`` field, in
+    first-seen order.
+    """
+    logs: list[dict[str, str]] = field(default_factory=list)
+    errors: dict[tuple[Any, ...], dict[str, Any]] = field(default_factory=dict)
+    undefined_references: dict[tuple[Any, ...], dict[str, Any]] = field(default_factory=dict)
+    undefined_citations: dict[tuple[Any, ...], dict[str, Any]] = field(default_factory=dict)
+    missing_files: dict[tuple[Any, ...], dict[str, Any]] = field(default_factory=dict)
+    overfull_boxes: dict[tuple[Any, ...], dict[str, Any]] = field(default_factory=dict)
+    warnings: int = 0
+
+    def add(self, category: str, key: tuple[Any, ...], record: dict[str, Any]) -> None:
+        """Record one occurrence, merging it with earlier identical ones."""
+        bucket: dict[tuple[Any, ...], dict[str, Any]] = getattr(self, category)
+        if key in bucket:
+            bucket[key]["count"] += 1
+        else:
+            bucket[key] = {**record, "count": 1}
+
+    def items(self, category: str) -> list[dict[str, Any]]:
+        """Return the deduplicated records for one category."""
+        return list(getattr(self, category).values())
+
+    @property
+    def counts(self) -> dict[str, int]:
+        counts = {category: len(getattr(self, category)) for category in CATEGORIES}
+        counts["warnings"] = self.warnings
+        return counts
+
+    def to_dict(self, max_items: int | None = DEFAULT_MAX_ITEMS) -> dict[str, Any]:
+        """Convert to a JSON-ready dict, keeping at most ``max_items`` per category."""
+        result: dict[str, Any] = {"logs": self.logs, "counts": self.counts, "truncated": False}
+        for category in CATEGORIES:
+            records = self.items(category)
+            if max_items is not None and len(records) > max_items:
+                records = records[:max_items]
+                result["truncated"] = True
+            result[category] = records
+        return result
+
+
+def detect_log_kind(path: Path, first_line: str = "") -> str:
+    """Classify a log as ``latex``, ``bibtex``, or ``biber``."""
+    if path.suffix.lower() != ".blg":
+        return "latex"
+    if "biber" in first_line.lower() or first_line.startswith("[0]"):
+        return "biber"
+    return "bibtex"
+
+
+def _logical_lines(lines: Iterable[str], wrap_width: int = TEX_WRAP_WIDTH) -> Iterator[str]:
+    """Rejoin lines TeX hard-wrapped at ``wrap_width`` characters."""
+    buffer = ""
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        buffer += line
+        if len(line) == wrap_width:
+            continue
+        yield buffer
+        buffer = ""
+    if buffer:
+        yield buffer
+
+
+def _track_files(line: str, stack: list[str | None]) -> None:
+    """Update the open-file stack from the parentheses TeX writes around inputs."""
+    for match in FILE_OPEN.finditer(line):
+        if match.group() == ")":
+            if stack:
+                stack.pop()
+            continue
+        name = FILE_NAME.match(line, match.end())
+        stack.append(name.group("path") if name else None)
+
+
+def _current_file(stack: list[str | None]) -> str | None:
+    return next((entry for entry in reversed(stack) if entry), None)
+
+
+def _parse_latex(lines: Iterable[str], summary: LogSummary) -> None:
+    stack: list[str | None] = []
+    pending: dict[str, Any] | None = None
+
+    def flush() -> None:
+        nonlocal pending
+        if pending is not None:
+            summary.add(
+                "errors",
+                (pending["file"], pending["line"], pending["message"]),
+                pending,
+            )
+            pending = None
+
+    for line in _logical_lines(lines):
+        if pending is not None:
+            context = CONTEXT_LINE.match(line)
+            if context:
+                pending["line"] = int(context.group("line"))
+                flush()
+                continue
+
+        located = FILE_LINE_ERROR.match(line)
+        tex_error = None if located else TEX_ERROR.match(line)
+        if located or tex_error:
+            flush()
+            match = located or tex_error
+            assert match is not None
+            message = match.group("message").strip()
+            pending = {
+                "file": located.group("file") if located else _current_file(stack),
+                "line": int(located.group("line")) if located else None,
+                "message": message,
+            }
+            missing = MISSING_FILE.search(message)
+            if missing:
+                name = next(group for group in missing.groups() if group)
+                summary.add(
+                    "missing_files",
+                    (name,),
+                    {"name": name, "file": pending["file"], "line": pending["line"]},
+                )
+            if located:
+                flush()
+            continue
+        if line.startswith(("l.", "<", "...")):
+            continue
+
+        if "Warning" in line:
+            summary.warnings += 1
+            input_line = INPUT_LINE.search(line)
+            where = {
+                "file": _current_file(stack),
+                "line": int(input_line.group("line")) if input_line else None,
+            }
+            reference = UNDEFINED_REFERENCE.search(line)
+            citation = UNDEFINED_CITATION.search(line) or BIBLATEX_UNDEFINED.search(line)
+            missing = MISSING_FILE.search(line)
+            if reference:
+                key = reference.group("key")
+                summary.add("undefined_references", (key,), {"key": key, **where})
+            elif citation:
+                key = citation.group("key")
+                summary.add("undefined_citations", (key,), {"key": key, **where})
+            elif missing:
+                name = next(group for group in missing.groups() if group)
+                summary.add("missing_files", (name,), {"name": name, **where})
+            continue
+
+        overfull = OVERFULL.match(line)
+        if overfull:
+            start = overfull.group("start")
+            record = {
+                "file": _current_file(stack),
+                "box": overfull.group("box"),
+                "amount": overfull.group("amount"),
+                "lines": (
+                    f"{start}--{overfull.group('end')}" if overfull.group("end") else start
+                ),
+            }
+            summary.add("overfull_boxes", (record["file"], record["lines"], record["box"]), record)
+            continue
+
+        missing = MISSING_FILE.search(line)
+        if missing and line.startswith("No file"):
+            name = next(group for group in missing.groups() if group)
+            summary.add(
+                "missing_files", (name,), {"name": name, "file": _current_file(stack), "line": None}
+            )
+            continue
+
+        _track_files(line, stack)
+    flush()
+
+
+def _parse_bibtex(lines: Iterable[str], summary: LogSummary, log_name: str) -> None:
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        entry = BIBTEX_MISSING_ENTRY.search(line)
+        if entry:
+            key = entry.group("key")
+            summary.add("undefined_citations", (key,), {"key": key, "file": log_name, "line": None})
+            continue
+        missing = MISSING_FILE.search(line)
+        if missing:
+            name = next(group for group in missing.groups() if group)
+            summary.add("missing_files", (name,), {"name": name, "file": log_name, "line": None})
+            continue
+        located = BIBTEX_LOCATED_ERROR.match(line)
+        if located:
+            record = {
+                "file": located.group("file"),
+                "line": int(located.group("line")),
+                "message": located.group("message").strip() or "BibTeX error",
+            }
+            summary.add("errors", (record["file"], record["line"], record["message"]), record)
+            continue
+        if line.startswith("Warning--"):
+            summary.warnings += 1
+
+
+def _parse_biber(lines: Iterable[str], summary: LogSummary, log_name: str) -> None:
+    for raw_line in lines:
+        match = BIBER_MESSAGE.match(raw_line.rstrip("\r\n"))
+        if not match:
+            continue
+        message = match.group("message").strip()
+        entry = BIBER_MISSING_ENTRY.search(message)
+        missing = MISSING_FILE.search(message)
+        if entry:
+            key = entry.group("key")
+            summary.add("undefined_citations", (key,), {"key": key, "file": log_name, "line": None})
+        elif missing:
+            name = next(group for group in missing.groups() if group)
+            summary.add("missing_files", (name,), {"name": name, "file": log_name, "line": None})
+        elif match.group("level") == "ERROR":
+            location = BIBER_LOCATION.search(message)
+            record = {
+                "file": location.group("file") if location else log_name,
+                "line": int(location.group("line")) if location else None,
+                "message": message,
+            }
+            summary.add("errors", (record["file"], record["line"], record["message"]), record)
+        else:
+            summary.warnings += 1
+
+
+def parse_log(path: str | Path, summary: LogSummary | None = None) -> LogSummary:
+    """
+    Parse one LaTeX ``.log`` or BibTeX/Biber ``.blg`` file in a single pass.
+
+    Args:
+        path: Log file to parse.
+        summary: Existing summary to merge into, so several logs from one
+            build produce one report.
+
+    Returns:
+        The updated summary. A missing log is recorded as a missing file.
+    """
+    log_path = Path(path)
+    summary = summary if summary is not None else LogSummary()
+    if not log_path.is_file():
+        summary.add("missing_files", (log_path.name,), {"name": log_path.name, "file": None, "line": None})
+        return summary
+
+    with log_path.open("r", encoding="utf-8", errors="replace") as handle:
+        first_line = handle.readline()
+        kind = detect_log_kind(log_path, first_line)
+        summary.logs.append({"path": str(log_path), "kind": kind})
+        handle.seek(0)
+        if kind == "latex":
+            _parse_latex(handle, summary)
+        elif kind == "biber":
+            _parse_biber(handle, summary, log_path.name)
+        else:
+            _parse_bibtex(handle, summary, log_path.name)
+    return summary
+
+
+def summarize(
+    summary: LogSummary,
+    max_items: int = DEFAULT_MAX_ITEMS,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> str:
+    """
+    Render a compact JSON summary no larger than ``max_bytes``.
+
+    Per-category lists are shortened, then long messages and paths are clipped,
+    then records and finally log names are dropped until the output fits, with
+    ``truncated`` set. The ``counts`` always reflect the full totals and are
+    always kept, so only a ``max_bytes`` smaller than the counts alone (about
+    200 bytes) can be exceeded.
+    """
+    text = ""
+    for data in _shrinking_summaries(summary, max_items):
+        text = json.dumps(data, separators=(",", ":"))
+        if len(text.encode("utf-8")) <= max_bytes:
+            break
+    return text
+
+
+def _shrinking_summaries(summary: LogSummary, max_items: int) -> Iterator[dict[str, Any]]:
+    """Yield ever smaller renderings of ``summary`` for ``summarize`` to try."""
+    limits = []
+    limit = max_items
+    while limit > 0:
+        limits.append(limit)
+        limit //= 2
+    for width in (None, *CLIP_WIDTHS):
+        for limit in limits:
+            yield _clip(summary.to_dict(max_items=limit), width)
+    for width in (None, *CLIP_WIDTHS):
+        yield _clip(summary.to_dict(max_items=0), width)
+    yield {"logs": [], "counts": summary.counts, "truncated": True}
+
+
+def _clip(data: dict[str, Any], width: int | None) -> dict[str, Any]:
+    """Clip every string longer than ``width`` characters, marking the data truncated."""
+    if width is None:
+        return data
+    clipped = False
+
+    def clip(value: Any) -> Any:
+        nonlocal clipped
+        if isinstance(value, str) and len(value) > width:
+            clipped = True
+            return value[: width - 3] + "..."
+        if isinstance(value, list):
+            return [clip(item) for item in value]
+        if isinstance(value, dict):
+            return {key: clip(item) for key, item in value.items()}
+        return value
+
+    result = clip(data)
+    result["truncated"] = result["truncated"] or clipped
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Print a capped JSON summary for one or more logs; exit 1 when errors were found."""
+    parser = argparse.ArgumentParser(
+        description="Summarize LaTeX/BibTeX/Biber logs as compact JSON.",
+    )
+    parser.add_argument("logs", nargs="+", help=".log or .blg files")
+    parser.add_argument(
+        "--max-items",
+        type=int,
+        default=DEFAULT_MAX_ITEMS,
+        help=f"maximum records per category (default: {DEFAULT_MAX_ITEMS})",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        help=f"maximum size of the JSON output (default: {DEFAULT_MAX_BYTES})",
+    )
+    args = parser.parse_args(argv)
+    if args.max_items < 0 or args.max_bytes <= 0:
+        parser.error("--max-items must be >= 0 and --max-bytes must be > 0")
+
+    summary = LogSummary()
+    for log in args.logs:
+        parse_log(log, summary)
+    print(summarize(summary, max_items=args.max_items, max_bytes=args.max_bytes))
+    return 1 if summary.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@
 
 import asyncio
 from datetime import datetime, timezone
+import json
 import os
 from pathlib import Path
 from types import SimpleNamespace
@@ -162,3 +163,85 @@ def test_generate_paper_reports_missing_input_without_calling_sdk(tmp_path, monk
     assert result["status"] == "failed"
     assert "Input file not found" in result["errors"][0]
     assert called is False
+
+
+def test_generate_paper_drafts_independent_sections_concurrently(tmp_path, monkeypatch):
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    (work_dir / ".claude").mkdir()
+    (work_dir / ".claude" / "WRITER.md").write_text("Instructions")
+    monkeypatch.setattr(api, "setup_claude_skills", lambda package_dir, work_dir: None)
+    running = 0
+    peak = 0
+    hooks_by_stage: dict[str, object] = {}
+
+    async def fake_query(prompt, options):
+        nonlocal running, peak
+        project = next((work_dir / "writing_outputs").iterdir())
+        if "PLANNING STAGE" in prompt:
+            hooks_by_stage["planning"] = options.hooks
+            plan = {
+                "sections": [
+                    {"name": "Introduction"},
+                    {"name": "Methods", "independent": True},
+                    {"name": "Related Work", "independent": True},
+                    {"name": "Discussion", "independent": True},
+                ]
+            }
+            (project / "drafts" / "section_plan.json").write_text(json.dumps(plan))
+            yield SimpleNamespace(content=[SimpleNamespace(text="planned")])
+        elif "SECTION STAGE" in prompt:
+            hooks_by_stage["section"] = options.hooks
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            target = prompt.split("Write it to: ", 1)[1].splitlines()[0]
+            if "discussion" not in target:
+                Path(target).write_text("section text")
+            yield SimpleNamespace(content=[SimpleNamespace(text="hidden section text")])
+        else:
+            hooks_by_stage["merge"] = options.hooks
+            assert "MERGE STAGE" in prompt
+            assert "Discussion (parallel draft failed)" in prompt
+            (project / "final" / "manuscript.tex").write_text("\\title{Merged}")
+            yield SimpleNamespace(content=[SimpleNamespace(text="merged")])
+
+    monkeypatch.setattr(api, "claude_query", fake_query)
+
+    events = _collect(
+        api.generate_paper(
+            "Write a paper",
+            cwd=str(work_dir),
+            api_key="test-key",
+            parallel_sections=True,
+            max_concurrent_sections=2,
+        )
+    )
+
+    section_events = [
+        event["details"]
+        for event in events
+        if event["type"] == "progress" and "section_status" in (event.get("details") or {})
+    ]
+    statuses = {(details["section"], details["section_status"]) for details in section_events}
+    result = events[-1]
+
+    assert peak == 2
+    assert ("Methods", "completed") in statuses
+    assert ("Related Work", "completed") in statuses
+    assert ("Discussion", "failed") in statuses
+    assert not any(
+        event["type"] == "text" and event["content"] == "hidden section text" for event in events
+    )
+    assert hooks_by_stage["planning"] is None and hooks_by_stage["section"] is None
+    assert hooks_by_stage["merge"] is not None
+    assert result["status"] == "success"
+    assert "Parallel draft failed for section: Discussion" in result["errors"]
+
+
+def test_generate_paper_rejects_non_positive_section_concurrency():
+    events = _collect(api.generate_paper("Write", parallel_sections=True, max_concurrent_sections=0))
+
+    assert events[-1]["status"] == "failed"
+    assert "max_concurrent_sections" in events[-1]["errors"][0]
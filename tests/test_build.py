@@ -0,0 +1,150 @@
+"""Tests for scientific_writer.build incremental LaTeX builds."""
+
+import json
+from pathlib import Path
+import subprocess
+
+import pytest
+
+from scientific_writer import build
+
+
+@pytest.fixture
+def fake_latexmk(monkeypatch):
+    """Replace latexmk with a stub that writes outputs and records each command."""
+    calls: list[list[str]] = []
+
+    def fake_run(command, cwd, **kwargs):
+        calls.append(command)
+        outdir = Path(next(arg for arg in command if arg.startswith("-outdir=")).split("=", 1)[1])
+        stem = Path(command[-1]).stem
+        source = (Path(cwd) / command[-1]).read_text()
+        if "\\undefined" in source:
+            (outdir / f"{stem}.log").write_text(
+                "./main.tex:4: Undefined control sequence.\n"
+                "l.4 \\undefined\n"
+                "./main.tex:4: Undefined control sequence.\n"
+                "! Emergency stop.\n"
+                "<*> main.tex\n"
+                "l.9 \n"
+            )
+            return subprocess.CompletedProcess(command, 12, "", "")
+        (outdir / f"{stem}.log").write_text("Output written on main.pdf (1 page).\n")
+        (outdir / f"{stem}.aux").write_text("\\citation{smith2020}\n")
+        (outdir / f"{stem}.bbl").write_text("\\begin{thebibliography}{1}\\end{thebibliography}\n")
+        (outdir / f"{stem}.pdf").write_bytes(b"%PDF " + source.encode())
+        return subprocess.CompletedProcess(command, 0, "", "")
+
+    monkeypatch.setattr(build.shutil, "which", lambda name: "/usr/bin/latexmk")
+    monkeypatch.setattr(build.subprocess, "run", fake_run)
+    return calls
+
+
+def _write_document(tmp_path, body="Text \\cite{smith2020}."):
+    tex = tmp_path / "main.tex"
+    tex.write_text(f"\\documentclass{{article}}\n\\begin{{document}}\n{body}\n\\end{{document}}\n")
+    (tmp_path / "references.bib").write_text("@article{smith2020, title={A}}\n")
+    return tex
+
+
+def test_unchanged_sources_do_not_rerun_latexmk(tmp_path, fake_latexmk):
+    tex = _write_document(tmp_path)
+
+    first = build.build_document(tex)
+    second = build.build_document(tex)
+
+    assert first.success and first.pdf == str(tex.with_suffix(".pdf"))
+    assert second.up_to_date and second.success
+    assert len(fake_latexmk) == 1
+
+
+def test_bibtex_is_skipped_when_bib_and_cite_keys_are_unchanged(tmp_path, fake_latexmk):
+    tex = _write_document(tmp_path)
+    build.build_document(tex)
+
+    _write_document(tmp_path, body="Edited text \\cite{smith2020}.")
+    edited = build.build_document(tex)
+    _write_document(tmp_path, body="New citation \\cite{smith2020,jones2021}.")
+    recited = build.build_document(tex)
+
+    assert "-bibtex" in fake_latexmk[0]
+    assert edited.bibliography_skipped and "-bibtex-" in fake_latexmk[1]
+    assert not recited.bibliography_skipped and "-bibtex" in fake_latexmk[2]
+
+
+def test_bibtex_reruns_when_bibliography_style_changes(tmp_path, fake_latexmk):
+    tex = _write_document(tmp_path, body="Text \\cite{smith2020}.\n\\bibliographystyle{custom}")
+    style = tmp_path / "custom.bst"
+    style.write_text("ENTRY { title } {} {}\n")
+    build.build_document(tex)
+
+    style.write_text("ENTRY { title year } {} {}\n")
+    restyled = build.build_document(tex)
+    _write_document(tmp_path, body="Text \\cite{smith2020}.\n\\bibliographystyle{plainnat}")
+    renamed = build.build_document(tex)
+
+    assert not restyled.bibliography_skipped and "-bibtex" in fake_latexmk[1]
+    assert not renamed.bibliography_skipped and "-bibtex" in fake_latexmk[2]
+
+
+def test_snapshot_is_not_restored_for_another_engine(tmp_path, fake_latexmk):
+    tex = _write_document(tmp_path)
+    build.build_document(tex)
+    _write_document(tmp_path, body="Second version \\cite{smith2020}.")
+    build.build_document(tex, engine="xelatex")
+
+    _write_document(tmp_path)
+    rebuilt = build.build_document(tex, engine="xelatex")
+    restored = build.build_document(tex)
+
+    assert not rebuilt.cache_hit and "-pdfxe" in fake_latexmk[2]
+    assert restored.cache_hit and len(fake_latexmk) == 3
+
+
+def test_reverted_sources_restore_cached_outputs(tmp_path, fake_latexmk):
+    tex = _write_document(tmp_path)
+    build.build_document(tex)
+    _write_document(tmp_path, body="Second version \\cite{smith2020}.")
+    build.build_document(tex)
+
+    _write_document(tmp_path)
+    restored = build.build_document(tex)
+
+    assert restored.cache_hit and restored.success
+    assert len(fake_latexmk) == 2
+    assert b"Text \\cite{smith2020}" in tex.with_suffix(".pdf").read_bytes()
+
+
+def test_failed_build_reports_deduplicated_errors(tmp_path, fake_latexmk):
+    tex = _write_document(tmp_path, body="\\undefined")
+
+    result = build.build_document(tex)
+
+    assert result.success is False
+    assert result.pdf is None
+    assert result.errors[0] == {
+        "file": "./main.tex",
+        "line": 4,
+        "message": "Undefined control sequence.",
+        "count": 2,
+    }
+    assert {"file": None, "line": 9, "message": "Emergency stop.", "count": 1} in result.errors
+    assert result.diagnostics["counts"]["errors"] == 2
+
+
+def test_missing_latexmk_raises_build_error(tmp_path, monkeypatch):
+    tex = _write_document(tmp_path)
+    monkeypatch.setattr(build.shutil, "which", lambda name: None)
+
+    with pytest.raises(build.BuildError, match="latexmk"):
+        build.build_document(tex)
+
+
+def test_cli_prints_json_result(tmp_path, fake_latexmk, capsys):
+    tex = _write_document(tmp_path)
+
+    assert build.main([str(tex), "--json"]) == 0
+    payload = json.loads(capsys.readouterr().out)
+
+    assert payload["success"] is True
+    assert payload["build_dir"].endswith(".latex_build/main")
@@ -1,8 +1,10 @@
 """Tests for scientific_writer.cli."""
 
+import asyncio
 import inspect
 import sys
-from pathlib import Path
+
+import pytest
 
 from scientific_writer import cli
 
@@ -76,21 +78,68 @@ def test_cli_forwards_execution_and_input_controls(monkeypatch):
     }
 
 
-def test_processed_input_signatures_prevent_unchanged_reimports(tmp_path):
-    source = tmp_path / "data.csv"
-    source.write_text("value\n1\n")
-    signatures: dict[Path, tuple[int, int]] = {}
-    processed_info = {
-        "all_files": [
-            {
-                "original": str(source),
-                "destination": str(tmp_path / "project" / "data.csv"),
-            }
-        ]
-    }
+class _FakeInbox:
+    instances: list["_FakeInbox"] = []
+
+    def __init__(self, *args, **kwargs):
+        self.stopped = False
+        _FakeInbox.instances.append(self)
+
+    def start(self):
+        return self
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.mark.parametrize("raised", [EOFError, asyncio.CancelledError])
+def test_session_stops_inbox_watcher_on_any_exit(tmp_path, monkeypatch, raised):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "get_api_key", lambda: "test-key")
+    monkeypatch.setattr(cli, "setup_claude_skills", lambda package_dir, cwd: None)
+    monkeypatch.setattr(cli, "load_system_instructions", lambda cwd: "")
+    monkeypatch.setattr(cli, "InboxWatcher", _FakeInbox)
+    _FakeInbox.instances.clear()
+
+    def fake_input(prompt):
+        raise raised
+
+    monkeypatch.setattr("builtins.input", fake_input)
+
+    if raised is EOFError:
+        asyncio.run(cli.main())
+    else:
+        with pytest.raises(raised):
+            asyncio.run(cli.main())
+
+    assert [inbox.stopped for inbox in _FakeInbox.instances] == [True]
+
+
+def test_inputs_dropped_between_prompts_go_to_the_paper_the_next_prompt_starts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "get_api_key", lambda: "test-key")
+    monkeypatch.setattr(cli, "setup_claude_skills", lambda package_dir, cwd: None)
+    monkeypatch.setattr(cli, "load_system_instructions", lambda cwd: "")
+    (tmp_path / "data").mkdir()
+    prompts = []
+
+    async def fake_query(prompt, options):
+        prompts.append(prompt)
+        if len(prompts) == 1:
+            # Dropped while the first paper is being written, before the next prompt
+            (tmp_path / "data" / "results.csv").write_text("a,b\n1,2\n")
+        return
+        yield
+
+    inputs = iter(["Create a new paper on topic one", "Start a new paper on topic two", "exit"])
+    monkeypatch.setattr(cli, "query", fake_query)
+    monkeypatch.setattr("builtins.input", lambda prompt: next(inputs))
 
-    cli._remember_processed_inputs(processed_info, signatures)
+    asyncio.run(cli.main(consume_inputs=True))
 
-    assert signatures[source.resolve()] == cli._input_signature(source)
-    source.write_text("value\n1\n2\n")
-    assert signatures[source.resolve()] != cli._input_signature(source)
+    first, second = sorted((tmp_path / "writing_outputs").iterdir())
+    assert not (first / "data" / "results.csv").exists()
+    assert (second / "data" / "results.csv").read_text() == "a,b\n1,2\n"
+    assert "results.csv" not in prompts[0]
+    assert str(second) in prompts[1] and "results.csv" in prompts[1]
+    assert not (tmp_path / "data" / "results.csv").exists()
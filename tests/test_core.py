@@ -1,6 +1,8 @@
 """Tests for scientific_writer.core."""
 
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
 import pytest
@@ -240,6 +242,23 @@ def test_create_output_project_is_collision_safe(tmp_path):
         }
 
 
+def test_concurrent_project_allocation_claims_distinct_names(tmp_path):
+    now = datetime(2026, 1, 1, 12, 0, 0).astimezone()
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        projects = list(
+            pool.map(lambda _: create_output_project(tmp_path, "Same query", now), range(200))
+        )
+
+    assert len(set(projects)) == 200
+    assert tmp_path / "20260101_120000_same_query" in projects
+    assert all(
+        len(project.name) == len("20260101_120000_same_query") + 9
+        for project in projects
+        if project.name != "20260101_120000_same_query"
+    )
+
+
 def test_explicit_data_files_resolve_against_cwd(tmp_path):
     source = tmp_path / "results.csv"
     source.write_text("value\n1\n")
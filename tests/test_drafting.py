@@ -0,0 +1,78 @@
+"""Tests for scientific_writer.drafting section plans and prompts."""
+
+import json
+
+import pytest
+
+from scientific_writer.drafting import (
+    build_merge_prompt,
+    build_section_prompt,
+    load_section_plan,
+    section_plan_path,
+)
+
+
+def _write_plan(project, sections):
+    (project / "drafts").mkdir(parents=True, exist_ok=True)
+    section_plan_path(project).write_text(json.dumps({"sections": sections}))
+
+
+def test_load_section_plan_keeps_drafts_inside_drafts_dir(tmp_path):
+    _write_plan(
+        tmp_path,
+        [
+            {"name": "Introduction", "independent": False},
+            {"name": "Methods", "file": "drafts/methods.tex", "independent": True, "brief": "Cohort"},
+            {"name": "Discussion", "file": "../escape.tex", "independent": True},
+            {"name": "Supplementary", "file": "drafts/methods.tex", "independent": True},
+        ],
+    )
+
+    sections = load_section_plan(tmp_path)
+    drafts = (tmp_path / "drafts").resolve()
+
+    assert [section.name for section in sections] == [
+        "Introduction",
+        "Methods",
+        "Discussion",
+        "Supplementary",
+    ]
+    assert [section.independent for section in sections] == [False, True, True, True]
+    assert sections[1].draft_path == drafts / "methods.tex"
+    assert sections[1].brief == "Cohort"
+    assert sections[2].draft_path == drafts / "section_discussion.tex"
+    assert len({section.draft_path for section in sections}) == 4
+    assert all(section.draft_path.parent == drafts for section in sections)
+
+
+@pytest.mark.parametrize("content", [None, "not json", '{"sections": []}', '{"sections": [{}]}'])
+def test_load_section_plan_rejects_unusable_plans(tmp_path, content):
+    if content is not None:
+        (tmp_path / "drafts").mkdir()
+        section_plan_path(tmp_path).write_text(content)
+
+    with pytest.raises(ValueError):
+        load_section_plan(tmp_path)
+
+
+def test_prompts_scope_sections_and_list_merge_work(tmp_path):
+    _write_plan(
+        tmp_path,
+        [
+            {"name": "Introduction"},
+            {"name": "Methods", "independent": True},
+            {"name": "Discussion", "independent": True},
+        ],
+    )
+    intro, methods, discussion = load_section_plan(tmp_path)
+
+    section_prompt = build_section_prompt("User request", tmp_path, methods, [intro, methods, discussion])
+    merge_prompt = build_merge_prompt(
+        "User request", tmp_path, [intro, methods, discussion], [methods], [discussion]
+    )
+
+    assert f"Write only {methods.draft_path}" in section_prompt
+    assert "Methods (this section)" in section_prompt
+    assert f"Methods: {methods.draft_path}" in merge_prompt
+    assert "Introduction" in merge_prompt
+    assert "Discussion (parallel draft failed)" in merge_prompt
@@ -0,0 +1,94 @@
+"""Tests for scientific_writer.inbox background staging."""
+
+import os
+import time
+
+import pytest
+
+from scientific_writer import inbox
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / "data").mkdir()
+    project = tmp_path / "project"
+    project.mkdir()
+    return tmp_path, project
+
+
+def test_unchanged_inputs_are_not_restaged(workspace):
+    cwd, project = workspace
+    source = cwd / "data" / "data.csv"
+    source.write_text("value\n1\n")
+    watcher = inbox.InboxWatcher(cwd, use_inotify=False)
+
+    first = watcher.stage(project)
+    assert [record["name"] for record in first["all_files"]] == ["data.csv"]
+    assert watcher.pending_count(project) == 0
+    assert watcher.stage(project) is None
+
+    source.write_text("value\n1\n2\n")
+    os.utime(source, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+    assert watcher.pending_count(project) == 1
+    assert [record["name"] for record in watcher.stage(project)["all_files"]] == ["data_2.csv"]
+
+
+@pytest.mark.parametrize("use_inotify", [False, True])
+def test_new_inputs_are_staged_in_the_background(workspace, use_inotify):
+    cwd, project = workspace
+    watcher = inbox.InboxWatcher(cwd, poll_interval=0.05, use_inotify=use_inotify)
+    with watcher:
+        if use_inotify and watcher.mode != "inotify":
+            pytest.skip("inotify is not available on this platform")
+        watcher.set_project(project)
+        for name in ("notes.md", "plot.png", "results.csv"):
+            (cwd / "data" / name).write_text(name)
+
+        assert _wait_for(lambda: (project / "data" / "results.csv").is_file())
+        assert _wait_for(lambda: (project / "figures" / "plot.png").is_file())
+        assert _wait_for(lambda: (project / "sources" / "notes.md").is_file())
+        assert watcher.pending_count(project) == 3
+
+        processed = watcher.stage(project)
+
+    assert sorted(record["name"] for record in processed["all_files"]) == [
+        "notes.md",
+        "plot.png",
+        "results.csv",
+    ]
+    assert [record["name"] for record in processed["image_files"]] == ["plot.png"]
+
+
+def test_files_present_before_a_project_exists_wait_for_stage(workspace):
+    cwd, project = workspace
+    (cwd / "data" / "draft.tex").write_text("\\section{Intro}")
+    with inbox.InboxWatcher(cwd, poll_interval=0.05, use_inotify=False) as watcher:
+        time.sleep(0.2)
+        assert not (project / "drafts" / "draft.tex").exists()
+        assert watcher.pending_count() == 1
+
+        processed = watcher.stage(project)
+
+    assert [record["name"] for record in processed["manuscript_files"]] == ["draft.tex"]
+
+
+def test_consumed_inputs_are_removed_after_staging(workspace):
+    cwd, project = workspace
+    source = cwd / "data" / "table.csv"
+    source.write_text("a,b\n")
+    watcher = inbox.InboxWatcher(cwd, delete_originals=True, use_inotify=False)
+
+    processed = watcher.stage(project)
+
+    assert processed["data_files"][0]["name"] == "table.csv"
+    assert not source.exists()
+    assert watcher.pending_count(project) == 0
@@ -0,0 +1,164 @@
+"""Tests for scientific_writer.latex_log structured log summaries."""
+
+import importlib.util
+import json
+from pathlib import Path
+
+from scientific_writer import latex_log
+
+
+ROOT = Path(__file__).parents[1]
+SKILL_SCRIPT = ROOT / "skills" / "venue-templates" / "scripts" / "parse_latex_log.py"
+
+LATEX_LOG = """\
+This is pdfTeX, Version 3.141592653-2.6-1.40.25 (TeX Live 2023) (preloaded format=pdflatex)
+**main.tex
+(./main.tex
+LaTeX2e <2023-06-01>
+(/usr/share/texlive/texmf-dist/tex/latex/base/article.cls
+Document Class: article 2023/05/17 v1.4n Standard LaTeX document class
+(/usr/share/texlive/texmf-dist/tex/latex/base/size10.clo))
+(./sections/intro.tex
+LaTeX Warning: Citation `smith2020' on page 1 undefined on input line 12.
+
+Overfull \\hbox (15.2pt too wide) in paragraph at lines 20--22
+[]\\OT1/cmr/m/n/10 Some text
+
+./sections/intro.tex:30: Undefined control sequence.
+l.30 \\foo
+
+)
+LaTeX Warning: Reference `fig:overview' on page 2 undefined on input line 40.
+
+! LaTeX Error: File `missing.sty' not found.
+
+Type X to quit or <RETURN> to proceed,
+l.5 \\usepackage
+               {missing}
+No file main.bbl.
+LaTeX Warning: Citation `smith2020' on page 3 undefined on input line 55.
+)
+"""
+
+BIBTEX_LOG = """\
+This is BibTeX, Version 0.99d (TeX Live 2023)
+Database file #1: refs.bib
+Warning--I didn't find a database entry for "jones2021"
+I was expecting a `,' or a `}'---line 12 of file refs.bib
+Warning--empty journal in smith2020
+"""
+
+BIBER_LOG = """\
+[0] Config.pm:307> INFO - This is Biber 2.19
+[45] Utils.pm:410> WARN - I didn't find a database entry for 'doe2019' (section 0)
+[52] Utils.pm:410> ERROR - BibTeX subsystem: refs.bib_123.utf8, line 8, syntax error: found "}"
+"""
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+def test_latex_log_attributes_diagnostics_to_files_and_lines(tmp_path):
+    summary = latex_log.parse_log(_write(tmp_path, "main.log", LATEX_LOG))
+
+    assert summary.items("errors") == [
+        {"file": "./sections/intro.tex", "line": 30, "message": "Undefined control sequence.", "count": 1},
+        {"file": "./main.tex", "line": 5, "message": "LaTeX Error: File `missing.sty' not found.", "count": 1},
+    ]
+    assert summary.items("undefined_citations") == [
+        {"key": "smith2020", "file": "./sections/intro.tex", "line": 12, "count": 2}
+    ]
+    assert summary.items("undefined_references") == [
+        {"key": "fig:overview", "file": "./main.tex", "line": 40, "count": 1}
+    ]
+    assert [item["name"] for item in summary.items("missing_files")] == ["missing.sty", "main.bbl"]
+    assert summary.items("overfull_boxes") == [
+        {"file": "./sections/intro.tex", "box": "hbox", "amount": "15.2pt", "lines": "20--22", "count": 1}
+    ]
+
+
+def test_wrapped_log_lines_are_rejoined(tmp_path):
+    warning = "LaTeX Warning: Reference `sec:a-very-long-label-name' on page 1 undefined on input line 77."
+    wrapped = "\n".join(warning[i:i + 79] for i in range(0, len(warning), 79))
+    summary = latex_log.parse_log(_write(tmp_path, "main.log", wrapped + "\n"))
+
+    assert summary.items("undefined_references")[0]["line"] == 77
+
+
+def test_bibtex_and_biber_logs_merge_into_one_summary(tmp_path):
+    summary = latex_log.parse_log(_write(tmp_path, "main.blg", BIBTEX_LOG))
+    latex_log.parse_log(_write(tmp_path, "biber.blg", BIBER_LOG), summary)
+
+    assert [log["kind"] for log in summary.logs] == ["bibtex", "biber"]
+    assert [item["key"] for item in summary.items("undefined_citations")] == ["jones2021", "doe2019"]
+    assert {"file": "refs.bib", "line": 12, "message": "I was expecting a `,' or a `}'", "count": 1} in (
+        summary.items("errors")
+    )
+    assert summary.items("errors")[-1]["file"] == "refs.bib"
+    assert summary.items("errors")[-1]["line"] == 8
+
+
+def test_summary_is_capped_but_counts_stay_complete(tmp_path):
+    log = "".join(
+        f"LaTeX Warning: Citation `key{index}' on page 1 undefined on input line {index}.\n"
+        for index in range(200)
+    )
+    summary = latex_log.parse_log(_write(tmp_path, "main.log", log))
+
+    text = latex_log.summarize(summary, max_items=50, max_bytes=1500)
+    data = json.loads(text)
+
+    assert len(text.encode("utf-8")) <= 1500
+    assert data["truncated"] is True
+    assert data["counts"]["undefined_citations"] == 200
+    assert 0 < len(data["undefined_citations"]) < 50
+
+
+def test_oversized_messages_and_paths_are_clipped_to_the_cap(tmp_path):
+    log = "".join(f"./main.tex:{index}: {'Undefined control sequence ' * 200}\n" for index in range(3))
+    summary = latex_log.parse_log(_write(tmp_path, "main.log", log))
+    summary.logs.append({"path": "/very/long/build/path/" * 300 + "main.log", "kind": "latex"})
+
+    text = latex_log.summarize(summary, max_bytes=1500)
+    data = json.loads(text)
+
+    assert len(text.encode("utf-8")) <= 1500
+    assert data["truncated"] is True
+    assert data["counts"]["errors"] == 3
+    assert data["errors"] and data["errors"][0]["message"].endswith("...")
+
+
+def test_summary_keeps_counts_when_nothing_else_fits(tmp_path):
+    summary = latex_log.parse_log(_write(tmp_path, "main.log", LATEX_LOG))
+
+    data = json.loads(latex_log.summarize(summary, max_bytes=250))
+
+    assert data == {"logs": [], "counts": summary.counts, "truncated": True}
+
+
+def test_main_exits_nonzero_when_errors_are_found(tmp_path, capsys):
+    clean = _write(tmp_path, "clean.log", "Output written on clean.pdf (1 page).\n")
+    broken = _write(tmp_path, "main.log", LATEX_LOG)
+
+    assert latex_log.main([str(clean)]) == 0
+    capsys.readouterr()
+    assert latex_log.main([str(broken), "--max-items", "1"]) == 1
+    assert len(json.loads(capsys.readouterr().out)["errors"]) == 1
+
+
+def test_skill_script_matches_package_parser(tmp_path):
+    spec = importlib.util.spec_from_file_location("parse_latex_log", SKILL_SCRIPT)
+    assert spec is not None and spec.loader is not None
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+
+    log = _write(tmp_path, "main.log", LATEX_LOG)
+    blg = _write(tmp_path, "main.blg", BIBTEX_LOG)
+    expected = latex_log.parse_log(blg, latex_log.parse_log(log))
+    actual = script.parse_log(blg, script.parse_log(log))
+
+    assert actual.to_dict() == expected.to_dict()
+    assert script.summarize(actual, max_bytes=600) == latex_log.summarize(expected, max_bytes=600)
@@ -0,0 +1,178 @@
+"""Tests for the pooled HTTP helpers shipped in the skills' scripts directories."""
+
+import importlib.util
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+
+ROOT = Path(__file__).parents[1]
+SOURCE = ROOT / "skills" / "citation-management" / "scripts" / "polite_http.py"
+COPIES = sorted((ROOT / "skills").glob("*/scripts/polite_http.py"))
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("polite_http", SOURCE)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+polite_http = load_module()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.calls[self.path] = server.calls.get(self.path, 0) + 1
+            calls = server.calls[self.path]
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            if self.path == "/flaky" and calls == 1:
+                self.reply(503, b"", {"Retry-After": "0"})
+            elif self.path == "/slow":
+                time.sleep(0.1)
+                self.reply(200, b"slow", {})
+            elif self.headers.get("If-None-Match") == '"v1"':
+                self.reply(304, b"", {"ETag": '"v1"'})
+            else:
+                self.reply(200, b'{"title": "Cached"}', {"ETag": '"v1"', "Content-Type": "application/json"})
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    do_POST = do_GET
+
+    def reply(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.lock = threading.Lock()
+    httpd.calls = {}
+    httpd.active = httpd.peak = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_skill_copies_are_identical():
+    assert len(COPIES) > 1
+    source = SOURCE.read_bytes()
+    for copy in COPIES:
+        assert copy.read_bytes() == source, f"{copy.relative_to(ROOT)} differs from {SOURCE.relative_to(ROOT)}"
+
+
+def test_unchanged_resource_is_replayed_from_conditional_cache(server, tmp_path):
+    cache = polite_http.ConditionalCache(tmp_path)
+    session = polite_http.pooled_session(2)
+
+    first = polite_http.send(session, "GET", f"{server.base_url}/work", params={"q": 1}, cache=cache)
+    second = polite_http.send(session, "GET", f"{server.base_url}/work", params={"q": 1}, cache=cache)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == {"title": "Cached"}
+    assert second.headers["ETag"] == '"v1"'
+    assert cache.revalidated == 1
+    assert server.calls["/work?q=1"] == 2
+
+
+def test_throttled_response_is_retried_after_retry_after(server):
+    session = polite_http.pooled_session(1)
+
+    response = polite_http.send(session, "GET", f"{server.base_url}/flaky", backoff=0.0)
+
+    assert response.status_code == 200
+    assert server.calls["/flaky"] == 2
+
+
+@pytest.mark.parametrize(("method", "attempts"), [("GET", 2), ("POST", 1)])
+def test_read_timeouts_are_only_retried_for_idempotent_requests(server, method, attempts):
+    session = polite_http.pooled_session(1)
+
+    with pytest.raises(polite_http.requests.ReadTimeout):
+        polite_http.send(session, method, f"{server.base_url}/slow", retries=1, backoff=0.0, timeout=0.02)
+
+    assert server.calls["/slow"] == attempts
+
+
+def test_per_host_limit_caps_requests_in_flight(server):
+    session = polite_http.pooled_session(8, per_host=2)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda _: polite_http.send(session, "GET", f"{server.base_url}/slow"), range(8)))
+
+    assert [response.status_code for response in responses] == [200] * 8
+    assert server.peak == 2
+
+
+def test_shared_bucket_spans_processes(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCIENTIFIC_WRITER_RATE_DB", str(tmp_path / "rates.sqlite3"))
+    # Both processes start drawing tokens at the same moment, once they are running.
+    start = time.time() + 1.5
+    script = dedent(
+        f"""
+        import sys, time
+        sys.path.insert(0, {str(SOURCE.parent)!r})
+        from polite_http import RateLimiter
+        limiter = RateLimiter(20, service="stand-in")
+        time.sleep(max(0.0, {start!r} - time.time()))
+        for _ in range(12):
+            limiter.acquire()
+        print(time.time())
+        """
+    )
+    workers = [subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True) for _ in range(2)]
+    finished = [float(worker.communicate()[0]) for worker in workers]
+
+    assert all(worker.returncode == 0 for worker in workers)
+    # One 20/s budget with a burst of one: the 24th token cannot be granted
+    # before 23 intervals have passed. Scheduling delays only make this later;
+    # two separate 20/s budgets would both finish after about 0.55 s.
+    assert max(finished) - start >= 23 / 20 - 0.01
+
+
+def test_pause_holds_the_service_for_every_store_handle(tmp_path):
+    path = tmp_path / "rates.sqlite3"
+    first, second = polite_http.SharedBuckets(path), polite_http.SharedBuckets(path)
+
+    assert first.take("crossref", 10.0) == 0.0
+    first.pause("crossref", 5.0)
+
+    assert second.take("crossref", 10.0) > 4.0
+    assert second.take("arxiv", 10.0) == 0.0
+
+
+def test_shared_limits_can_be_turned_off(monkeypatch):
+    monkeypatch.setenv("SCIENTIFIC_WRITER_RATE_DB", "off")
+
+    limiter = polite_http.RateLimiter(1000, service="crossref")
+    limiter.acquire()
+
+    assert polite_http.shared_buckets() is None
+    assert limiter._shared is None
@@ -73,6 +73,21 @@ def test_count_citations_ignores_bibtex_directives(tmp_path):
     assert count_citations_in_bib(str(bib)) == 1
 
 
+def test_count_citations_ignores_at_signs_inside_entries(tmp_path):
+    bib = tmp_path / "references.bib"
+    bib.write_text(
+        '@article{nested,\n'
+        '  title = {The {RNA} world {of {nested}} braces},\n'
+        '  abstract = {Contact a@b.org; see @misc{fake, title={Fake}}}\n'
+        '}\n'
+        '@comment{old @book{gone, title={Gone}}}\n'
+        '@book(paren, title = {Paren (style) book})\n'
+        '@misc{after, title={After}}\n'
+    )
+
+    assert count_citations_in_bib(str(bib)) == 3
+
+
 def test_count_words_preserves_formatted_text_and_ignores_preamble(tmp_path):
     tex = tmp_path / "main.tex"
     tex.write_text(